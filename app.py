@@ -6,21 +6,31 @@ Reduzido de 1468 para aproximadamente 300 linhas
 import streamlit as st
 import pandas as pd
 import json
-import time
 import sys
+import os
+from functools import partial
 from typing import Dict, Optional
 
-sys.path.append("src")
+# Raiz única de imports (src/): os módulos internos importam "filters.*", "tools.*", etc.;
+# importar também como "src.filters.*" criaria cópias dos módulos e de seus registros globais
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "src"))
 
 # Importar módulos refatorados
-from src.utils.data_loaders import load_parquet_data, initialize_agent
-from src.utils.formatters import format_context_for_display, format_sql_query
-from src.filters.filter_manager import (
+from utils.data_loaders import load_parquet_data, initialize_agent
+from utils.formatters import format_context_for_display, format_sql_query
+from filters.filter_manager import (
     filter_user_friendly_context,
     create_enhanced_filter_manager
 )
-from src.filters.json_filter_manager import get_json_filter_manager
-from src.visualization.plotly_charts import render_plotly_visualization
+from filters.json_filter_manager import get_json_filter_manager
+from filters.filter_state import FilterState
+from filters.dataset_stats import get_dataset_stats
+from filters.bitmap_index import get_bitmap_index
+from filters.value_autocomplete import get_value_autocomplete
+from visualization.plotly_charts import render_plotly_visualization
+from utils.agent_executor import get_agent_executor, JobStatus, AGENT_JOB_TIMEOUT_SECONDS
+from utils.agent_turn import run_agent_turn
+from utils.turn_recorder import get_turn_recorder
 
 # Page configuration
 st.set_page_config(page_title="Agente IA Target v0.51", page_icon="🤖", layout="wide")
@@ -43,8 +53,17 @@ def main():
         st.error(f"❌ {agent_error}")
         st.stop()
 
+    # Filtros e índices usam o mesmo DataFrame normalizado do agente (valores dos filtros
+    # vêm normalizados das queries); cada índice é construído uma vez por dataset
+    df_dataset = getattr(agent, 'df_normalized', None)
+    if df_dataset is None:
+        df_dataset = df
+    get_dataset_stats(df_dataset)
+    get_bitmap_index(df_dataset)
+    get_value_autocomplete(df_dataset)
+
     # Main application interface
-    _render_main_interface(agent, df)
+    _render_main_interface(agent, df_dataset)
 
     # Company footer
     _render_footer()
@@ -519,7 +538,7 @@ def _render_header():
     """Renderiza cabeçalho da aplicação com design profissional"""
     # Import selected_model from config
     try:
-        from src.config.model_config import SELECTED_MODEL as selected_model
+        from config.model_config import SELECTED_MODEL as selected_model
     except ImportError:
         selected_model = "gpt-4"  # Fallback
 
@@ -564,6 +583,10 @@ def _render_main_interface(agent, df):
     with st.sidebar:
         _render_sidebar(df)
 
+    # Agente acompanha as novas versões do estado dos filtros
+    if agent is not None:
+        _get_filter_state().subscribe('agent', lambda state, changes: _sync_agent_context(agent, state))
+
     # Main content area with improved layout
     main_col1, main_col2, main_col3 = st.columns([0.5, 4, 0.5])
 
@@ -589,22 +612,92 @@ def _render_sidebar(df):
     st.markdown("---")
 
     # Enhanced Filter management with new JSON system
-    if 'last_context' in st.session_state and st.session_state.last_context:
-        user_context = filter_user_friendly_context(st.session_state.last_context)
-        create_enhanced_filter_manager(user_context, show_suggestions=True)
+    filter_state = _get_filter_state()
+    filters_slot = st.empty()
+    _render_filter_section(filters_slot, df, filter_state)
+
+    # Redesenhar apenas a seção de filtros, no mesmo ciclo, quando o estado muda de versão
+    filter_state.subscribe('sidebar', lambda state, changes: _render_filter_section(filters_slot, df, state))
+
+    # Editor de filtros com autocomplete de valores
+    _render_filter_editor(df, filter_state)
+
+
+def _render_filter_editor(df, filter_state):
+    """Adiciona um filtro escolhendo a coluna e completando o valor pelo prefixo digitado"""
+    with st.expander("➕ Adicionar Filtro", expanded=False):
+        autocomplete = get_value_autocomplete(df)
+        column = st.selectbox("Coluna", list(autocomplete.indexes), key="filter_editor_column")
+        prefix = st.text_input("Valor", key="filter_editor_prefix", placeholder="Digite o início do valor")
+
+        completions = autocomplete.complete(prefix, column=column, k=10)
+        if completions:
+            choice = st.selectbox(
+                "Sugestões", completions, key="filter_editor_choice",
+                format_func=lambda completion: f"{completion.value} ({completion.count:,} registros)"
+            )
+            if st.button("Aplicar filtro", key="filter_editor_apply"):
+                filter_state.set(column, choice.value)
+        elif prefix:
+            st.caption("Nenhum valor encontrado")
+
+
+def _get_filter_state():
+    """Estado versionado dos filtros da sessão (espelhado em st.session_state.last_context)"""
+    if 'filter_state' not in st.session_state:
+        filter_state = FilterState(st.session_state.get('last_context') or {})
+        filter_state.subscribe(
+            'last_context', lambda state, changes: setattr(st.session_state, 'last_context', state.snapshot())
+        )
+        st.session_state.filter_state = filter_state
+    return st.session_state.filter_state
+
+
+def _render_filter_section(slot, df, filter_state):
+    """Renderiza os filtros ativos da versão atual do estado dentro do placeholder da sidebar"""
+    with slot.container():
+        if len(filter_state):
+            user_context = filter_user_friendly_context(filter_state.snapshot())
+            create_enhanced_filter_manager(
+                user_context, show_suggestions=True,
+                record_counter=lambda active_context: _format_record_counter(df, active_context),
+                filter_state=filter_state
+            )
+
+            # Mostrar resumo dos filtros ativos usando novo sistema
+            try:
+                json_manager = get_json_filter_manager(df, session_id=st.session_state.get('session_user_id'))
+                json_manager.sincronizar_com_contexto_agente(user_context)
+                summary = json_manager.obter_resumo_filtros_ativos()
+                if summary != "Nenhum filtro ativo":
+                    st.markdown(f"📊 *{summary}*")
+            except Exception:
+                # Fallback para sistema antigo se necessário
+                pass
+        else:
+            create_enhanced_filter_manager({}, show_suggestions=False)
 
-        # Mostrar resumo dos filtros ativos usando novo sistema
-        try:
-            json_manager = get_json_filter_manager(df)
-            json_manager.sincronizar_com_contexto_agente(user_context)
-            summary = json_manager.obter_resumo_filtros_ativos()
-            if summary != "Nenhum filtro ativo":
-                st.markdown(f"📊 *{summary}*")
-        except Exception:
-            # Fallback para sistema antigo se necessário
-            pass
-    else:
-        create_enhanced_filter_manager({}, show_suggestions=False)
+
+def _sync_agent_context(agent, filter_state):
+    """Atualiza o contexto persistente do agente quando difere do estado dos filtros"""
+    context = filter_state.snapshot()
+    if getattr(agent, 'persistent_context', None) == context:
+        return
+    if hasattr(agent, 'update_persistent_context'):
+        agent.update_persistent_context(context)
+    elif hasattr(agent, 'persistent_context'):
+        agent.persistent_context = context
+
+
+def _format_record_counter(df, active_context):
+    """Texto do contador de registros: contagem exata pelo índice bitmap, estimativa como fallback"""
+    estimate = get_dataset_stats(df).estimate(active_context)
+    rows = get_bitmap_index(df).count(active_context)
+    if rows is not None:
+        # Faturamento exato apenas quando a estimativa também é exata
+        revenue = f" · R$ {estimate['revenue']:,.2f}" if estimate["exact"] else ""
+        return f"{rows:,} registros{revenue}"
+    return f"≈ {estimate['rows']:,} registros · R$ {estimate['revenue']:,.2f}"
 
 
 def _render_chat_interface(agent):
@@ -612,7 +705,7 @@ def _render_chat_interface(agent):
     # Initialize chat history
     if "messages" not in st.session_state:
         st.session_state.messages = []
-        st.session_state.last_context = {}
+        _get_filter_state().clear()
 
         # Add welcome message as first assistant message
         welcome_msg = """👋 Olá! Sou o **Agente IA Target**, seu assistente para análise de dados comerciais.
@@ -633,6 +726,8 @@ Como posso ajudá-lo hoje?"""
         if st.button("🗑️ Limpar", type="secondary"):
             # Clear all session state related to chat
             st.session_state.messages = []
+            st.session_state.pop('pending_job_id', None)
+            cleared_session_id = st.session_state.get('session_user_id')
             if "session_user_id" in st.session_state:
                 del st.session_state.session_user_id
 
@@ -651,12 +746,11 @@ Como posso ajudá-lo hoje?"""
             # Clear disabled filters
             if 'disabled_filters' in st.session_state:
                 st.session_state.disabled_filters.clear()
-            if 'last_context' in st.session_state:
-                del st.session_state.last_context
+            _get_filter_state().clear()
 
             # Clear JSON filter manager state
-            from src.filters.json_filter_manager import reset_json_filter_manager
-            reset_json_filter_manager()
+            from filters.json_filter_manager import reset_json_filter_manager
+            reset_json_filter_manager(cleared_session_id or 'default')
             # Force app rerun to refresh everything
             st.rerun()
 
@@ -670,8 +764,13 @@ Como posso ajudá-lo hoje?"""
             else:
                 st.markdown(message["content"])
 
-    # Chat input
-    if prompt := st.chat_input("💬 Faça sua pergunta sobre os dados comerciais..."):
+    # Retomar acompanhamento de job ainda em execução (ex.: após rerun da sidebar)
+    if st.session_state.get('pending_job_id'):
+        _render_pending_agent_job(agent)
+
+    # Chat input (bloqueado enquanto o turno anterior não for anexado à sessão)
+    if prompt := st.chat_input("💬 Faça sua pergunta sobre os dados comerciais...",
+                               disabled=bool(st.session_state.get('pending_job_id'))):
         _handle_user_input(prompt, agent)
 
 
@@ -719,6 +818,45 @@ def _render_debug_info(debug_info, message_context=None):
             for norm in debug_info["string_normalizations"]:
                 st.markdown(f"- **{norm['column']}**: '{norm['original_value']}' → '{norm['normalized_value']}'")
 
+        # Telemetria do turno (modelo e ferramentas)
+        if "telemetry" in debug_info and debug_info["telemetry"]:
+            telemetry = debug_info["telemetry"]
+            st.markdown("### 📊 Telemetria do Turno")
+            st.markdown(
+                f"- **Modelo:** {telemetry.get('model_latency', 0):.2f}s em "
+                f"{telemetry.get('model_requests', 0)} chamada(s)\n"
+                f"- **Tokens:** {telemetry.get('input_tokens', 0)} entrada / "
+                f"{telemetry.get('output_tokens', 0)} saída"
+            )
+            for tool_type, stats in telemetry.get("tools_by_type", {}).items():
+                st.markdown(f"- **{tool_type}:** {stats['calls']} chamada(s), {stats['time']:.2f}s")
+
+        # View com filtros persistentes compilados
+        if "filtered_view" in debug_info and debug_info["filtered_view"]:
+            filtered_view = debug_info["filtered_view"]
+            st.markdown("### 🧮 View dados_filtrados")
+            st.code(filtered_view.get("predicate", "TRUE"), language="sql")
+            st.markdown(f"- **Recriada neste turno:** {'sim' if filtered_view.get('rebuilt') else 'não'}")
+            if filtered_view.get("materialized"):
+                st.markdown(f"- **Fatia materializada:** `{filtered_view['materialized']}`")
+
+        # Consultas evitadas pelo índice bitmap (resultado vazio garantido)
+        if "skipped_empty_queries" in debug_info and debug_info["skipped_empty_queries"]:
+            st.markdown("### ⏭️ Consultas Vazias Evitadas")
+            for skipped_query in debug_info["skipped_empty_queries"]:
+                st.code(skipped_query, language="sql")
+
+        # Cache de extração de filtros SQL
+        if "filter_cache_stats" in debug_info and debug_info["filter_cache_stats"]:
+            cache_stats = debug_info["filter_cache_stats"]
+            st.markdown("### 🗃️ Cache de Extração de Filtros")
+            st.markdown(
+                f"- **Acertos:** {cache_stats.get('hits', 0)} / "
+                f"{cache_stats.get('hits', 0) + cache_stats.get('misses', 0)} "
+                f"({cache_stats.get('hit_rate', 0):.0%})\n"
+                f"- **Queries em cache:** {cache_stats.get('size', 0)}"
+            )
+
         # Response timing
         if "response_time" in debug_info:
             st.markdown(f"### ⏱️ Tempo de Resposta: {debug_info['response_time']:.2f}s")
@@ -728,19 +866,17 @@ def _sincronizar_contexto_agente(agent):
     """
     Sincroniza contexto entre session_state e agent de forma robusta
     """
-    # Se há contexto no session_state mas o agente está vazio, restaurar
-    if (st.session_state.get('last_context') and
+    # Se há filtros na sessão mas o agente está vazio, restaurar
+    filter_state = _get_filter_state()
+    if (len(filter_state) and
         (not hasattr(agent, 'persistent_context') or not agent.persistent_context)):
-        agent.persistent_context = st.session_state.last_context.copy()
+        agent.persistent_context = filter_state.snapshot()
         return True
     return False
 
 
 def _handle_user_input(prompt, agent):
     """Processa entrada do usuário com novo sistema JSON de filtros"""
-    # Reset do flag de rerun para permitir nova atualização
-    st.session_state.rerun_triggered = False
-
     # CORREÇÃO: Sincronizar contexto antes de processar
     context_restored = _sincronizar_contexto_agente(agent)
     if context_restored and st.session_state.get('debug_mode', False):
@@ -753,279 +889,239 @@ def _handle_user_input(prompt, agent):
     with st.chat_message("user"):
         st.markdown(prompt)
 
-    # Process agent response
-    with st.chat_message("assistant"):
-        with st.spinner("🤖 Analisando..."):
-            start_time = time.time()
+    # Aplicar filtros desabilitados ao contexto antes de enviar para o agente
+    current_context = getattr(agent, 'persistent_context', {}) if hasattr(agent, 'persistent_context') else {}
+    disabled_filters = getattr(st.session_state, 'disabled_filters', set())
+
+    if disabled_filters and current_context:
+        from filters.json_filter_manager import get_json_filter_manager
+        df_dataset = getattr(agent, 'df_normalized', None)
+        if df_dataset is not None:
+            json_manager = get_json_filter_manager(
+                df_dataset, session_id=st.session_state.get('session_user_id')
+            )
+            current_context = json_manager.aplicar_filtros_desabilitados(current_context, disabled_filters)
+            if hasattr(agent, 'persistent_context'):
+                agent.persistent_context = current_context
+
+    # Submeter o turno ao pool de workers: a UI não bloqueia em agent.run e
+    # reruns (toggles da sidebar, st.rerun) não interrompem a chamada ao modelo
+    executor = get_agent_executor()
+    st.session_state.pending_job_id = executor.submit(
+        agent, prompt,
+        session_id=st.session_state.get('session_user_id', 'default_user'),
+        turn_fn=partial(run_agent_turn, recorder=get_turn_recorder())
+    )
 
-            # Aplicar filtros desabilitados ao contexto antes de enviar para o agente
-            current_context = getattr(agent, 'persistent_context', {}) if hasattr(agent, 'persistent_context') else {}
-            disabled_filters = getattr(st.session_state, 'disabled_filters', set())
+    _render_pending_agent_job(agent)
 
-            if disabled_filters and current_context:
-                from src.filters.json_filter_manager import get_json_filter_manager
-                df_dataset = getattr(agent, 'df_normalized', None)
-                if df_dataset is not None:
-                    json_manager = get_json_filter_manager(df_dataset)
-                    current_context = json_manager.aplicar_filtros_desabilitados(current_context, disabled_filters)
-                    if hasattr(agent, 'persistent_context'):
-                        agent.persistent_context = current_context
 
-            try:
-                # Clear execution state if needed
-                if hasattr(agent, 'clear_execution_state'):
-                    agent.clear_execution_state()
-
-                # Get agent response
-                response = agent.run(prompt)
-                response_time = time.time() - start_time
-
-                # Process response content
-                response_content = str(response.content) if hasattr(response, 'content') else str(response)
-
-                # Extract context and debug info
-                context = {}
-                debug_info = {"response_time": response_time}
-                visualization_data = None
-
-                if hasattr(agent, 'debug_info'):
-                    debug_info.update(agent.debug_info)
-
-                    # CORREÇÃO CRÍTICA: Extrair filtros ANTES de limpar debug_info
-                    # Processar filtros usando APENAS as queries SQL
-                    try:
-                        df_dataset = getattr(agent, 'df_normalized', None)
-                        # Usar debug_info local que contém as queries (não agent.debug_info)
-                        if df_dataset is not None and 'sql_queries' in debug_info:
-                            from src.filters.json_filter_manager import processar_filtros_apenas_sql
-
-                            sql_queries = debug_info.get('sql_queries', [])
-                            if sql_queries:
-                                # Extrair filtros das queries SQL
-                                updated_context_temp, filter_changes = processar_filtros_apenas_sql(
-                                    sql_queries, {}, df_dataset
-                                )
-                                # Salvar resultado para uso posterior
-                                debug_info['extracted_filters'] = updated_context_temp
-                                debug_info['filter_changes'] = filter_changes
-                    except Exception as e:
-                        debug_info['filter_extraction_error'] = str(e)
-
-                    agent.debug_info.clear()  # Clear for next query
-
-                if hasattr(agent, 'persistent_context'):
-                    context = agent.persistent_context.copy()
-
-                    # CORREÇÃO CRÍTICA: Sempre detectar e restaurar contexto (não apenas em debug)
-                    if 'last_agent_id' in st.session_state:
-                        if st.session_state.last_agent_id != id(agent):
-                            # AGENTE FOI RECRIADO - RESTAURAR CONTEXTO AUTOMATICAMENTE
-                            if st.session_state.get('last_context'):
-                                agent.persistent_context = st.session_state.last_context.copy()
-                                context = agent.persistent_context.copy()
-                                # Log apenas em debug mode
-                                if st.session_state.get('debug_mode', False):
-                                    st.warning(f"⚠️ AGENTE RECRIADO! Contexto restaurado: {context}")
-                    st.session_state.last_agent_id = id(agent)
-
-                    # DEBUG: Log contexto inicial do agente apenas em debug mode
-                    if st.session_state.get('debug_mode', False):
-                        st.info(f"🔍 Contexto INICIAL do agente: {context}")
-                        st.info(f"🔍 Agent ID: {id(agent)}")
-                        if hasattr(agent, '_creation_time'):
-                            st.info(f"🔍 Agent criado em: {agent._creation_time}")
-                        st.info(f"🔍 Session state keys: {list(st.session_state.keys())}")
-                        st.info(f"🔍 Last context in session: {st.session_state.get('last_context', 'NONE')}")
-
-                # SISTEMA LIMPO: Extrair filtros APENAS das queries SQL
-                try:
-                    df_dataset = getattr(agent, 'df_normalized', None)
-                    if df_dataset is not None:
-                        from src.filters.json_filter_manager import processar_filtros_apenas_sql
-
-                        # DEBUG: Log contexto antes do processamento
-                        if st.session_state.get('debug_mode', False):
-                            st.info(f"🔍 **ANTES** do processamento:")
-                            st.info(f"  - Contexto: {context}")
-                            st.info(f"  - Total de filtros: {len(context)} campos")
-                            st.info(f"  - SQL queries disponíveis: {debug_info.get('sql_queries', [])}")
-
-                        # USAR FILTROS JÁ EXTRAÍDOS (antes da limpeza do debug_info)
-                        if 'extracted_filters' in debug_info:
-                            extracted_context = debug_info['extracted_filters']
-                            filter_changes = debug_info.get('filter_changes', [])
-                            # Merge contexto existente com filtros extraídos
-                            updated_context = context.copy()
-                            updated_context.update(extracted_context)
-                        else:
-                            # Fallback: nenhum filtro foi extraído
-                            updated_context = context
-                            filter_changes = ["INFO: Nenhum filtro extraído das queries SQL"]
-
-                        # DEBUG: Log resultado do processamento
-                        if st.session_state.get('debug_mode', False):
-                            st.info(f"🔍 **DEPOIS** do processamento:")
-                            st.info(f"  - Contexto atualizado: {updated_context}")
-                            st.info(f"  - Total de filtros: {len(updated_context)} campos")
-                            st.info(f"  - Queries processadas: {len(debug_info.get('sql_queries', []))}")
-
-                            # Análise de diferenças
-                            filtros_adicionados = set(updated_context.keys()) - set(context.keys())
-                            filtros_removidos = set(context.keys()) - set(updated_context.keys())
-                            filtros_modificados = {k for k in context.keys() & updated_context.keys()
-                                                 if context[k] != updated_context[k]}
-
-                            if filtros_adicionados:
-                                st.success(f"➕ Filtros adicionados: {filtros_adicionados}")
-                            if filtros_removidos:
-                                st.error(f"➖ Filtros removidos: {filtros_removidos}")
-                            if filtros_modificados:
-                                st.warning(f"🔄 Filtros modificados: {filtros_modificados}")
-
-                        # Sempre atualizar contexto após processamento
-                        context = updated_context
-
-                        # Sempre atualizar contexto persistente do agente
-                        if hasattr(agent, 'update_persistent_context'):
-                            agent.update_persistent_context(updated_context)
-                        elif hasattr(agent, 'persistent_context'):
-                            agent.persistent_context = updated_context
-
-                        # Mostrar filtros extraídos se há mudanças
-                        if filter_changes and any(not change.startswith("INFO:") for change in filter_changes):
-                            with st.expander("🔍 Extração de Filtros das Queries SQL", expanded=True):
-                                st.markdown("**Processamento realizado:**")
-                                for change in filter_changes:
-                                    if change.startswith("SQL:"):
-                                        st.success(change)  # Sucesso na extração SQL
-                                    elif change.startswith("  +"):
-                                        st.markdown(f"- {change}")  # Detalhes dos filtros
-                                    elif change.startswith("ℹ️"):
-                                        st.info(change)  # Informações
-                                    else:
-                                        st.markdown(f"- {change}")
-
-                except Exception as e:
-                    # Se houver erro na extração, continuar normalmente sem fallback
-                    if st.session_state.get('debug_mode', False):
-                        st.error(f"❌ **ERRO** no processamento de filtros SQL:")
-                        st.error(f"  - Exceção: {str(e)}")
-                        st.error(f"  - Tipo: {type(e).__name__}")
-                        st.error(f"  - Debug info disponível: {hasattr(agent, 'debug_info') and bool(agent.debug_info)}")
-                        import traceback
-                        st.error(f"  - Stack trace: {traceback.format_exc()}")
-                    else:
-                        st.warning(f"⚠️ Erro no processamento de filtros SQL: {str(e)}")
-
-                    # Em caso de erro, manter contexto atual (não usar fallback)
-                    pass
-
-                # Extract visualization data if DuckDB tool has results
-                if hasattr(agent, 'tools'):
-                    for tool in agent.tools:
-                        if hasattr(tool, 'last_result_df') and tool.last_result_df is not None:
-                            df_result = tool.last_result_df
-                            if not df_result.empty and len(df_result) <= 20:
-                                visualization_data = _prepare_visualization_data(df_result)
-                            break
-
-                # Display response
-                st.markdown(response_content)
-
-                # Display visualization
-                if visualization_data:
-                    render_plotly_visualization(visualization_data)
-
-                # Display response time
-                st.markdown(f"⏱️ *Tempo de resposta: {response_time:.2f}s*")
-
-                # Store message with all metadata
-                assistant_message = {
-                    "role": "assistant",
-                    "content": response_content,
-                    "context": context,
-                    "debug_info": debug_info
-                }
+def _render_pending_agent_job(agent):
+    """Acompanha o job pendente da sessão e anexa o resultado quando concluído"""
+    job_id = st.session_state.get('pending_job_id')
+    if not job_id:
+        return
 
-                if visualization_data:
-                    assistant_message["visualization_data"] = visualization_data
+    executor = get_agent_executor()
 
-                st.session_state.messages.append(assistant_message)
-
-                # ATUALIZAÇÃO IMEDIATA DA SIDEBAR: Detectar se o contexto mudou
-                previous_context = st.session_state.get('last_context', {})
-                context_changed = context != previous_context
+    with st.chat_message("assistant"):
+        status_placeholder = st.empty()
 
-                st.session_state.last_context = context
+        def _show_progress(job):
+            label = "na fila" if job.status == JobStatus.PENDING else "analisando"
+            status_placeholder.caption(f"⏳ Agente {label}... ({job.elapsed:.0f}s)")
 
-                # DEBUG: Log estado final do contexto
+        with st.spinner("🤖 Analisando..."):
+            job = executor.wait(job_id, timeout=AGENT_JOB_TIMEOUT_SECONDS, on_poll=_show_progress)
+        status_placeholder.empty()
+
+        if job is None:
+            st.session_state.pop('pending_job_id', None)
+            st.warning("⚠️ A análise em andamento foi perdida. Por favor, repita a pergunta.")
+            return
+
+        # Tempo de espera esgotado: o turno continua no worker (e já altera a memória e o
+        # contexto do agente), então o job segue pendente e o resultado é anexado no próximo rerun
+        if not job.is_finished:
+            st.warning(
+                f"⏳ A análise ainda está em andamento após {AGENT_JOB_TIMEOUT_SECONDS}s. "
+                "O resultado será exibido quando a página for atualizada."
+            )
+            if st.button("🔄 Verificar resultado", key="pending_job_refresh"):
+                st.rerun()
+            return
+
+        # Job concluído: anexar resultado à sessão
+        st.session_state.pop('pending_job_id', None)
+        executor.pop_result(job_id)
+
+        if job.status == JobStatus.ERROR:
+            error_msg = f"❌ **Erro:** {job.error}"
+            st.error(error_msg)
+            st.session_state.messages.append({
+                "role": "assistant",
+                "content": error_msg,
+                "context": {},
+                "debug_info": {"error": job.error, "response_time": job.elapsed}
+            })
+            return
+
+        _finalize_agent_response(job.result, agent)
+
+
+def _finalize_agent_response(turn_result, agent):
+    """Processa o resultado de um turno concluído: filtros, visualização e histórico"""
+    try:
+        response_content = turn_result["response_content"]
+        response_time = turn_result["response_time"]
+        debug_info = turn_result["debug_info"]
+        visualization_data = turn_result["visualization_data"]
+
+        # Extract context
+        context = {}
+
+        if hasattr(agent, 'persistent_context'):
+            context = agent.persistent_context.copy()
+
+            # CORREÇÃO CRÍTICA: Sempre detectar e restaurar contexto (não apenas em debug)
+            if 'last_agent_id' in st.session_state:
+                if st.session_state.last_agent_id != id(agent):
+                    # AGENTE FOI RECRIADO - RESTAURAR CONTEXTO AUTOMATICAMENTE
+                    if len(_get_filter_state()):
+                        agent.persistent_context = _get_filter_state().snapshot()
+                        context = agent.persistent_context.copy()
+                        # Log apenas em debug mode
+                        if st.session_state.get('debug_mode', False):
+                            st.warning(f"⚠️ AGENTE RECRIADO! Contexto restaurado: {context}")
+            st.session_state.last_agent_id = id(agent)
+
+            # DEBUG: Log contexto inicial do agente apenas em debug mode
+            if st.session_state.get('debug_mode', False):
+                st.info(f"🔍 Contexto INICIAL do agente: {context}")
+                st.info(f"🔍 Agent ID: {id(agent)}")
+                if hasattr(agent, '_creation_time'):
+                    st.info(f"🔍 Agent criado em: {agent._creation_time}")
+                st.info(f"🔍 Session state keys: {list(st.session_state.keys())}")
+                st.info(f"🔍 Filtros na sessão (v{_get_filter_state().version}): {_get_filter_state().snapshot()}")
+
+        # SISTEMA LIMPO: Extrair filtros APENAS das queries SQL
+        try:
+            df_dataset = getattr(agent, 'df_normalized', None)
+            if df_dataset is not None:
+                # DEBUG: Log contexto antes do processamento
                 if st.session_state.get('debug_mode', False):
-                    st.info(f"🔍 CONTEXTO FINAL salvo na sessão: {st.session_state.last_context}")
-                    st.info(f"🔍 Agent context final: {getattr(agent, 'persistent_context', 'NONE')}")
-                    st.info(f"🔍 Context changed: {context_changed}")
-
-                # Display debug info if enabled
-                if debug_info and st.session_state.get('debug_mode', False):
-                    _render_debug_info(debug_info, context)
-
-                # FORÇAR ATUALIZAÇÃO VISUAL IMEDIATA da sidebar se contexto mudou
-                if context_changed and context:
-                    # Marcar que filtros foram atualizados para trigger rerun
-                    st.session_state.filters_just_updated = True
-                    # Fazer rerun apenas uma vez para atualizar sidebar
-                    if not st.session_state.get('rerun_triggered', False):
-                        st.session_state.rerun_triggered = True
-                        st.rerun()
-
-            except Exception as e:
-                error_msg = f"❌ **Erro:** {str(e)}"
-                st.error(error_msg)
-                st.session_state.messages.append({
-                    "role": "assistant",
-                    "content": error_msg,
-                    "context": {},
-                    "debug_info": {"error": str(e), "response_time": time.time() - start_time}
-                })
-
-
-
-def _prepare_visualization_data(df_result):
-    """Prepara dados para visualização automática"""
-    if df_result.empty or len(df_result.columns) < 2:
-        return None
-
-    # Tentar identificar colunas de valor e rótulo
-    numeric_cols = df_result.select_dtypes(include=['number']).columns
-    text_cols = df_result.select_dtypes(include=['object', 'string']).columns
-
-    if len(numeric_cols) >= 1 and len(text_cols) >= 1:
-        value_col = numeric_cols[0]
-        label_col = text_cols[0]
-
-        # Detectar se é dados temporais
-        is_temporal = any(
-            keyword in label_col.lower()
-            for keyword in ['data', 'mes', 'ano', 'periodo', 'date', 'month', 'year']
-        )
+                    st.info(f"🔍 **ANTES** do processamento:")
+                    st.info(f"  - Contexto: {context}")
+                    st.info(f"  - Total de filtros: {len(context)} campos")
+                    st.info(f"  - SQL queries disponíveis: {debug_info.get('sql_queries', [])}")
+
+                # USAR FILTROS JÁ EXTRAÍDOS (antes da limpeza do debug_info)
+                if 'extracted_filters' in debug_info:
+                    extracted_context = debug_info['extracted_filters']
+                    filter_changes = debug_info.get('filter_changes', [])
+                    # Merge contexto existente com filtros extraídos
+                    updated_context = context.copy()
+                    updated_context.update(extracted_context)
+                else:
+                    # Fallback: nenhum filtro foi extraído
+                    updated_context = context
+                    filter_changes = ["INFO: Nenhum filtro extraído das queries SQL"]
+
+                # Aplicar ao estado versionado: diferenças calculadas na mutação,
+                # assinantes (agente, sidebar, last_context) notificados se mudou
+                filter_state = _get_filter_state()
+                state_changes = filter_state.replace(updated_context)
+                _sync_agent_context(agent, filter_state)
+                context = filter_state.snapshot()
+
+                # DEBUG: Log resultado do processamento
+                if st.session_state.get('debug_mode', False):
+                    st.info(f"🔍 **DEPOIS** do processamento:")
+                    st.info(f"  - Contexto atualizado (v{filter_state.version}): {context}")
+                    st.info(f"  - Total de filtros: {len(context)} campos")
+                    st.info(f"  - Queries processadas: {len(debug_info.get('sql_queries', []))}")
+
+                    # Análise de diferenças (produzidas pelo FilterState)
+                    for kind, label, show in (('added', "➕ Filtros adicionados", st.success),
+                                              ('removed', "➖ Filtros removidos", st.error),
+                                              ('modified', "🔄 Filtros modificados", st.warning)):
+                        keys = {change.key for change in state_changes if change.kind == kind}
+                        if keys:
+                            show(f"{label}: {keys}")
+
+                # Mostrar filtros extraídos se há mudanças
+                if filter_changes and any(not change.startswith("INFO:") for change in filter_changes):
+                    with st.expander("🔍 Extração de Filtros das Queries SQL", expanded=True):
+                        st.markdown("**Processamento realizado:**")
+                        for change in filter_changes:
+                            if change.startswith("SQL:"):
+                                st.success(change)  # Sucesso na extração SQL
+                            elif change.startswith("  +"):
+                                st.markdown(f"- {change}")  # Detalhes dos filtros
+                            elif change.startswith("ℹ️"):
+                                st.info(change)  # Informações
+                            else:
+                                st.markdown(f"- {change}")
+
+        except Exception as e:
+            # Se houver erro na extração, continuar normalmente sem fallback
+            if st.session_state.get('debug_mode', False):
+                st.error(f"❌ **ERRO** no processamento de filtros SQL:")
+                st.error(f"  - Exceção: {str(e)}")
+                st.error(f"  - Tipo: {type(e).__name__}")
+                st.error(f"  - Debug info disponível: {hasattr(agent, 'debug_info') and bool(agent.debug_info)}")
+                import traceback
+                st.error(f"  - Stack trace: {traceback.format_exc()}")
+            else:
+                st.warning(f"⚠️ Erro no processamento de filtros SQL: {str(e)}")
+
+            # Em caso de erro, manter contexto atual (não usar fallback)
+            pass
 
-        chart_type = 'line_chart' if is_temporal else 'bar_chart'
+        # Display response
+        st.markdown(response_content)
 
-        # Preparar dados no formato esperado
-        chart_data = df_result[[label_col, value_col]].copy()
-        chart_data.columns = ['label' if not is_temporal else 'date', 'value']
+        # Display visualization
+        if visualization_data:
+            render_plotly_visualization(visualization_data)
 
-        return {
-            'type': chart_type,
-            'data': chart_data,
-            'has_data': True,
-            'config': {
-                'title': f'Top {len(chart_data)} Resultados',
-                'value_format': 'currency' if 'valor' in value_col.lower() else 'number',
-                'is_categorical_id': chart_data['label' if not is_temporal else 'date'].dtype == 'object'
-            }
+        # Display response time
+        st.markdown(f"⏱️ *Tempo de resposta: {response_time:.2f}s*")
+
+        # Store message with all metadata
+        assistant_message = {
+            "role": "assistant",
+            "content": response_content,
+            "context": context,
+            "debug_info": debug_info
         }
 
-    return None
+        if visualization_data:
+            assistant_message["visualization_data"] = visualization_data
+
+        st.session_state.messages.append(assistant_message)
+
+        # Contexto final da sessão (sem efeito se já aplicado acima)
+        _get_filter_state().replace(context)
+
+        # DEBUG: Log estado final do contexto
+        if st.session_state.get('debug_mode', False):
+            st.info(f"🔍 CONTEXTO FINAL salvo na sessão (v{_get_filter_state().version}): {_get_filter_state().snapshot()}")
+            st.info(f"🔍 Agent context final: {getattr(agent, 'persistent_context', 'NONE')}")
+
+        # Display debug info if enabled
+        if debug_info and st.session_state.get('debug_mode', False):
+            _render_debug_info(debug_info, context)
+
+    except Exception as e:
+        error_msg = f"❌ **Erro:** {str(e)}"
+        st.error(error_msg)
+        st.session_state.messages.append({
+            "role": "assistant",
+            "content": error_msg,
+            "context": {},
+            "debug_info": {"error": str(e), "response_time": turn_result.get("response_time", 0.0)}
+        })
 
 
 def _render_footer():
@@ -1090,7 +1186,7 @@ def _build_intelligent_filter_json(message_context: Dict) -> Dict:
 
     # LÓGICA INTELIGENTE PARA PERÍODO - PRESERVAR GRANULARIDADE
     try:
-        from src.text_normalizer import normalizer
+        from text_normalizer import normalizer
 
         # CORREÇÃO CRÍTICA: Verificar se há estrutura inicio/fim (novo formato)
         if message_context.get("inicio") and message_context.get("fim"):
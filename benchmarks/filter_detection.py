@@ -0,0 +1,224 @@
+"""
+Benchmark do IntelligentFilterDetector: tabelas originais com re.search padrão
+a padrão (sem âncoras de palavra, como antes das famílias compiladas) x
+famílias compiladas em uma alternância ancorada em início de palavra
+
+Correção: toda divergência em relação às tabelas originais precisa vir de um
+casamento das tabelas originais dentro de outra palavra (ex.: 'sp' em
+'especiais', 'ba' em 'embalagens', 'mai' em 'mais', 'sem' em 'semestre'); as
+divergências são agrupadas por esse trecho e qualquer outra encerra com erro.
+Vazão: perguntas por segundo em detect_filters_from_text.
+
+Uso:
+    python benchmarks/filter_detection.py [--size 5000] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+from collections import Counter
+
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from filters.legacy.intelligent_filter_detector import IntelligentFilterDetector
+
+
+# Tabelas do detector antes das famílias compiladas (padrão, valor), na ordem
+# original dos dicionários, com as flags de cada busca
+ORIGINAL_TABLES = {
+    'temporal': (0, (
+        (r'janeiro|jan', '01'),
+        (r'fevereiro|fev', '02'),
+        (r'março|mar', '03'),
+        (r'abril|abr', '04'),
+        (r'maio|mai', '05'),
+        (r'junho|jun', '06'),
+        (r'julho|jul', '07'),
+        (r'agosto|ago', '08'),
+        (r'setembro|set', '09'),
+        (r'outubro|out', '10'),
+        (r'novembro|nov', '11'),
+        (r'dezembro|dez', '12'),
+        (r'mesmo\s+m[eê]s\s+(do|no)\s+ano\s+(passado|anterior)', 'same_month_last_year'),
+        (r'acumulado\s+(do|no)\s+ano|\bytd\b', 'ytd'),
+        (r'trimestre\s+(passado|anterior)', 'last_quarter'),
+        (r'semestre\s+(passado|anterior)', 'last_semester'),
+        (r'último\s+mês|mês\s+passado|mês\s+anterior', 'last_month'),
+        (r'últimos?\s+(\d+)\s+meses?', 'last_n_months'),
+        (r'último\s+ano|ano\s+passado', 'last_year'),
+        (r'últimos?\s+(\d+)\s+anos?', 'last_n_years'),
+        (r'este\s+mês|mês\s+atual', 'this_month'),
+        (r'este\s+ano|ano\s+atual', 'this_year'),
+    )),
+    'geographic': (re.IGNORECASE, (
+        (r'são\s+paulo|sp|s\.?p\.?', 'SP'),
+        (r'rio\s+de\s+janeiro|rj|r\.?j\.?', 'RJ'),
+        (r'minas\s+gerais|mg|m\.?g\.?', 'MG'),
+        (r'para(í|i)ba|pb|p\.?b\.?', 'PB'),
+        (r'pernambuco|pe|p\.?e\.?', 'PE'),
+        (r'bahia|ba|b\.?a\.?', 'BA'),
+        (r'brasília|df|d\.?f\.?', 'DF'),
+        (r'cidade\s+de\s+([^,\s]+)', 'cidade'),
+        (r'município\s+de\s+([^,\s]+)', 'cidade'),
+    )),
+    'exclusion': (re.IGNORECASE, (
+        (r'excluir|exceto|sem|não\s+incluir|remover', 'exclude'),
+        (r'apenas|somente|só|incluir\s+apenas', 'include_only'),
+        (r'todos?\s+exceto', 'all_except'),
+    )),
+    'clear': (re.IGNORECASE, tuple((pattern, True) for pattern in (
+        r'sem\s+filtros?',
+        r'remover?\s+(todos?\s+)?filtros?',
+        r'limpar\s+filtros?',
+        r'sem\s+restrições?',
+        r'consulta\s+geral',
+        r'todos?\s+os?\s+dados?',
+    ))),
+}
+
+
+QUESTIONS = [
+    'Qual o faturamento {local} {periodo}?',
+    '{modo} {local} {periodo}, por linha de produto',
+    'Mostre as vendas especiais de embalagens {local} {periodo}',
+    'Compare o volume {periodo} com o mesmo período {local}',
+    'Quais os top 5 clientes {local} {periodo} {modo}',
+    'ranking de vendedores por pessoa {local} {periodo}',
+    '{limpar}',
+]
+LOCAIS = [
+    'em SP', 'em são paulo', 'no RJ', 'em Minas Gerais', 'na Paraíba', 'em PE', 'na bahia', 'no DF',
+    'na cidade de Joinville', 'no município de Blumenau, SC', 'em S.P.', 'para mais clientes', '',
+]
+PERIODOS = [
+    'em março de 2024', 'em jan de 2023', 'no último mês', 'no mês passado', 'nos últimos 3 meses',
+    'nos últimos 2 anos', 'no ano passado', 'este ano', 'neste mês', 'no trimestre passado',
+    'no semestre anterior', 'no acumulado do ano', 'no mesmo mês do ano anterior', 'em 2023',
+    'de setembro de 2024', 'mais de 2023', '',
+]
+MODOS = ['apenas', 'somente', 'exceto', 'sem', 'todos exceto', 'incluir', '']
+LIMPAR = ['sem filtros', 'remover todos os filtros', 'limpar filtros', 'consulta geral', 'todos os dados']
+
+MAX_DATE = pd.Timestamp('2024-12-24')
+
+
+def original_first(family, text):
+    """Primeiro padrão da tabela original com ocorrência no texto: (valor, match) ou None"""
+    flags, entries = ORIGINAL_TABLES[family]
+    for pattern, value in entries:
+        match = re.search(pattern, text, flags)
+        if match:
+            return value, match
+    return None
+
+
+class ReferenceDetector(IntelligentFilterDetector):
+    """Detecção padrão a padrão sobre as tabelas originais, sem âncoras de palavra"""
+
+    def _first(self, family, text):
+        found = original_first(family, text)
+        return (found[0], found[1].groups()) if found else None
+
+
+def inside_word_hits(question, compiled):
+    """
+    Famílias cujo resultado mudou porque a tabela original casou dentro de uma palavra
+
+    Returns:
+        Descrições 'família: trecho em palavra' (vazia se a divergência tem outra causa)
+    """
+    text = question.lower()
+    hits = []
+    for family in ORIGINAL_TABLES:
+        found = original_first(family, text)
+        if found is None:
+            continue
+        current = compiled._first(family, text)
+        if current is not None and current[0] == found[0]:
+            continue
+        start, end = found[1].span()
+        starts_inside = start > 0 and text[start - 1].isalnum() and text[start].isalnum()
+        ends_inside = end < len(text) and text[end - 1].isalnum() and text[end].isalnum()
+        if starts_inside or ends_inside:
+            word_start = start
+            while word_start > 0 and text[word_start - 1].isalnum():
+                word_start -= 1
+            word_end = end
+            while word_end < len(text) and text[word_end].isalnum():
+                word_end += 1
+            hits.append(f"{family}: '{found[1].group(0)}' em '{text[word_start:word_end]}'")
+    return hits
+
+
+def generate_corpus(size, seed=42):
+    """Perguntas geradas a partir dos modelos"""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        question = rng.choice(QUESTIONS).format(
+            local=rng.choice(LOCAIS), periodo=rng.choice(PERIODOS),
+            modo=rng.choice(MODOS), limpar=rng.choice(LIMPAR)
+        )
+        corpus.append(' '.join(question.split()))
+    return corpus
+
+
+def best_time(detector, corpus, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for question in corpus:
+            detector.detect_filters_from_text(question, max_date=MAX_DATE)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = generate_corpus(args.size)
+    compiled, reference = IntelligentFilterDetector(), ReferenceDetector()
+
+    divergences = [
+        question for question in corpus
+        if compiled.detect_filters_from_text(question, max_date=MAX_DATE)
+        != reference.detect_filters_from_text(question, max_date=MAX_DATE)
+    ]
+    causes = Counter()
+    unexpected = []
+    for question in divergences:
+        hits = inside_word_hits(question, compiled)
+        if hits:
+            causes.update(hits)
+        else:
+            unexpected.append(question)
+
+    reference_time = best_time(reference, corpus, args.repeat)
+    compiled_time = best_time(compiled, corpus, args.repeat)
+
+    print(f"Perguntas: {len(corpus)} ({len(set(corpus))} distintas)")
+    print(f"{'método':<30}{'total (ms)':>12}{'perguntas/s':>14}")
+    print(f"{'tabelas originais':<30}{reference_time * 1000:>12.1f}{len(corpus) / reference_time:>14.0f}")
+    print(f"{'famílias compiladas':<30}{compiled_time * 1000:>12.1f}{len(corpus) / compiled_time:>14.0f}")
+    print(f"Speedup: {reference_time / compiled_time:.1f}x")
+    print(f"Divergências: {len(divergences)} ({len(divergences) - len(unexpected)} por casamento dentro de palavra)")
+    for cause, count in causes.most_common():
+        print(f"  {count:>6}  {cause}")
+    print(f"Divergências inesperadas: {len(unexpected)}")
+    for question in unexpected[:10]:
+        print(f"  - {question}")
+
+    if unexpected:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
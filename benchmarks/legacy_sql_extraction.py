@@ -0,0 +1,195 @@
+"""
+Benchmark do extrator SQL legado (UnifiedFilterManager): sqlparse + caminhada
+recursiva por query (subconsultas reanalisadas a partir do texto) x camada
+compartilhada de queries analisadas (uma análise por texto, uma travessia)
+
+Correção: nenhum filtro encontrado pela implementação recursiva pode faltar na
+nova (os predicados que o sqlparse separa em tokens soltos, como
+"data >= '...'", passam a ser recuperados e são apenas contados). Vazão:
+queries por segundo com o cache vazio (só textos distintos) e no fluxo real,
+em que o agente repete as mesmas queries.
+
+Uso:
+    python benchmarks/legacy_sql_extraction.py [--size 2000] [--distinct 300] [--repeat 3]
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+import sqlparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from filters.legacy.unified_filter_core import FilterCategory, FilterDefinition, SQLFilterExtractor
+from parsers.parsed_query import parsed_query_cache_stats, reset_parsed_queries
+
+
+COLUMNS = ['UF_Cliente', 'Municipio_Cliente', 'Des_Linha_Produto', 'Cod_Segmento_Cliente', 'Cod_Vendedor']
+VALUES = ['SP', 'Joinville', 'Papel Cartão', 'VAREJO', '1042', 'SC', 'Blumenau', 'Rótulos Adesivos']
+DATES = ['2023-01-01', '2023-07-01', '2024-01-01', '2024-04-01', '2024-10-01']
+GROUPS = ['UF_Cliente', 'Des_Linha_Produto', 'Municipio_Cliente', 'Cod_Vendedor']
+
+TEMPLATES = [
+    "SELECT {group}, SUM(Valor_Vendido) AS total FROM dados WHERE {conditions} GROUP BY {group} ORDER BY total DESC LIMIT {limit}",
+    "SELECT COUNT(DISTINCT Cod_Cliente) FROM dados WHERE {conditions}",
+    "SELECT * FROM (SELECT * FROM dados WHERE {inner}) sub WHERE {conditions} LIMIT {limit}",
+    "SELECT {group}, SUM(Valor_Vendido) FROM dados WHERE {conditions} AND Cod_Cliente IN "
+    "(SELECT Cod_Cliente FROM dados WHERE {inner}) GROUP BY {group}",
+    "SELECT {group}, SUM(Valor_Vendido) AS total FROM dados WHERE {conditions} GROUP BY {group} "
+    "HAVING {group} <> '{value}' ORDER BY total DESC",
+    "WITH base AS (SELECT * FROM dados WHERE {inner}) SELECT {group}, AVG(Valor_Vendido) FROM base "
+    "WHERE {conditions} GROUP BY {group}",
+]
+
+
+class RecursiveSqlparseExtractor(SQLFilterExtractor):
+    """Implementação anterior: análise por chamada e reanálise de cada subconsulta"""
+
+    def extract_filters_from_sql(self, sql_query):
+        try:
+            parsed = sqlparse.parse(sql_query)[0]
+            filters = []
+            filters.extend(self._walk_where(parsed))
+            filters.extend(self._walk_subqueries(parsed))
+            return filters
+        except Exception:
+            return self._fallback_regex_extraction(sql_query)
+
+    def _walk_where(self, parsed_query):
+        filters = []
+
+        def extract_from_token(token):
+            if hasattr(token, 'tokens'):
+                for subtoken in token.tokens:
+                    extract_from_token(subtoken)
+            elif token.ttype is sqlparse.tokens.Keyword and token.value.upper() == 'WHERE':
+                parent = token.parent
+                if parent:
+                    where_index = parent.tokens.index(token)
+                    for i in range(where_index + 1, len(parent.tokens)):
+                        next_token = parent.tokens[i]
+                        if (next_token.ttype is sqlparse.tokens.Keyword and
+                                next_token.value.upper() in ['GROUP', 'ORDER', 'HAVING', 'LIMIT']):
+                            break
+                        filters.extend(self._parse_condition(next_token))
+
+        extract_from_token(parsed_query)
+        return filters
+
+    def _walk_subqueries(self, parsed_query):
+        filters = []
+
+        def find_subqueries(token):
+            if hasattr(token, 'tokens'):
+                for subtoken in token.tokens:
+                    if isinstance(subtoken, sqlparse.sql.Parenthesis):
+                        subquery_content = str(subtoken)[1:-1]
+                        if 'SELECT' in subquery_content.upper():
+                            filters.extend(self.extract_filters_from_sql(subquery_content))
+                    find_subqueries(subtoken)
+
+        find_subqueries(parsed_query)
+        return filters
+
+    def _parse_condition(self, token):
+        filters = []
+        condition_str = str(token).strip()
+        patterns = [
+            (r"(\w+)\s*=\s*'([^']*)'", "="),
+            (r"(\w+)\s*>\s*'([^']*)'", ">"),
+            (r"(\w+)\s*<\s*'([^']*)'", "<"),
+            (r"(\w+)\s*>=\s*'([^']*)'", ">="),
+            (r"(\w+)\s*<=\s*'([^']*)'", "<="),
+            (r"(\w+)\s+LIKE\s+'([^']*)'", "LIKE"),
+        ]
+        for pattern, operator in patterns:
+            for match in re.finditer(pattern, condition_str, re.IGNORECASE):
+                column = match.group(1).lower()
+                filters.append(FilterDefinition(
+                    key=column, value=match.group(2),
+                    category=self.category_mapping.get(column, FilterCategory.OTHER),
+                    operator=operator, source="sql"
+                ))
+        return filters
+
+
+def generate_queries(count, seed=42):
+    """Queries no formato gerado pelo agente (filtros, agrupamentos, subconsultas, CTEs)"""
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(count):
+        conditions = [f"{rng.choice(COLUMNS)} = '{rng.choice(VALUES)}'" for _ in range(rng.randint(1, 3))]
+        if rng.random() < 0.7:
+            start = rng.choice(DATES)
+            conditions.append(f"Data >= '{start}' AND Data < '{start[:5]}12-31'")
+        inner = f"{rng.choice(COLUMNS)} = '{rng.choice(VALUES)}'"
+        queries.append(rng.choice(TEMPLATES).format(
+            group=rng.choice(GROUPS), conditions=" AND ".join(conditions), inner=inner,
+            limit=rng.choice([5, 10, 20]), value=rng.choice(VALUES)
+        ))
+    return queries
+
+
+def filter_keys(filters):
+    return {(f.key, f.operator, f.value) for f in filters}
+
+
+def best_time(extractor, workload, repeat, reset=False):
+    best = float('inf')
+    for _ in range(repeat):
+        if reset:
+            reset_parsed_queries()
+        start = time.perf_counter()
+        for query in workload:
+            extractor.extract_filters_from_sql(query)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--size', type=int, default=2000, help='Queries no fluxo (com repetições)')
+    parser.add_argument('--distinct', type=int, default=300, help='Textos de query distintos')
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    distinct = generate_queries(args.distinct)
+    rng = random.Random(7)
+    workload = [rng.choice(distinct) for _ in range(args.size)]
+
+    reference, shared = RecursiveSqlparseExtractor(), SQLFilterExtractor()
+
+    reset_parsed_queries()
+    lost, recovered = [], 0
+    for query in distinct:
+        old, new = filter_keys(reference.extract_filters_from_sql(query)), filter_keys(shared.extract_filters_from_sql(query))
+        if old - new:
+            lost.append((query, sorted(old - new)))
+        recovered += len(new - old)
+
+    cold_reference = best_time(reference, distinct, args.repeat)
+    cold_shared = best_time(shared, distinct, args.repeat, reset=True)
+    flow_reference = best_time(reference, workload, args.repeat)
+    flow_shared = best_time(shared, workload, args.repeat, reset=True)
+
+    print(f"Queries distintas: {len(distinct)}  fluxo: {len(workload)}")
+    print(f"{'método':<34}{'distintas (q/s)':>18}{'fluxo (q/s)':>14}")
+    print(f"{'sqlparse recursivo por query':<34}{len(distinct) / cold_reference:>18.0f}{len(workload) / flow_reference:>14.0f}")
+    print(f"{'query analisada compartilhada':<34}{len(distinct) / cold_shared:>18.0f}{len(workload) / flow_shared:>14.0f}")
+    print(f"Speedup: {cold_reference / cold_shared:.1f}x (distintas), {flow_reference / flow_shared:.1f}x (fluxo)")
+    print(f"Cache: {parsed_query_cache_stats()}")
+    print(f"Predicados recuperados a mais: {recovered}")
+    print(f"Filtros perdidos: {len(lost)}")
+    for query, keys in lost[:5]:
+        print(f"  - {keys} em {query}")
+
+    if lost:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
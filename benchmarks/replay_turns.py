@@ -0,0 +1,62 @@
+"""
+Benchmark de replay: reexecuta os turnos gravados e mede o tempo das etapas não-LLM
+
+Uso:
+    python benchmarks/replay_turns.py [--fixtures tests/fixtures/turns] [--dataset caminho] [--repeat 20]
+"""
+
+import argparse
+import glob
+import os
+import statistics
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from models.mock_model import MockModel
+from utils.turn_recorder import build_replay_agent, load_dataset, load_fixture, replay_turn
+from utils.turn_telemetry import get_telemetry_log
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--fixtures', default='tests/fixtures/turns')
+    parser.add_argument('--dataset', default=None, help='Sobrescreve o dataset_path das fixtures')
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.fixtures, '*.json')))
+    if not paths:
+        print(f"Nenhuma fixture encontrada em {args.fixtures}")
+        return
+
+    # Telemetria dos turnos reexecutados em arquivo temporário (não polui o log real)
+    get_telemetry_log(os.path.join(tempfile.mkdtemp(), 'turn_metrics.jsonl'))
+
+    datasets = {}
+    for path in paths:
+        fixture = load_fixture(path)
+        dataset_path = args.dataset or fixture['dataset_path']
+        if dataset_path not in datasets:
+            df = load_dataset(dataset_path)
+            datasets[dataset_path] = (df, build_replay_agent(df, MockModel()))
+        df, agent = datasets[dataset_path]
+
+        timings = {}
+        mismatches = set()
+        for _ in range(args.repeat):
+            report = replay_turn(fixture, df=df, agent=agent)
+            mismatches.update(report['mismatches'])
+            for stage, seconds in report['stage_times'].items():
+                timings.setdefault(stage, []).append(seconds)
+
+        status = "OK" if not mismatches else f"DIVERGE: {sorted(mismatches)}"
+        print(f"\n{os.path.basename(path)} [{status}]")
+        for stage, values in timings.items():
+            print(f"  {stage:<18} mediana {statistics.median(values) * 1000:8.2f} ms"
+                  f"   p90 {sorted(values)[int(len(values) * 0.9) - 1] * 1000:8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Benchmark do motor temporal: parser original (regex em sequência) x motor compilado com cache
+
+O corpus combina modelos de perguntas comerciais com expressões de período em
+português (mês/ano, intervalos, anos, último mês, últimos N meses/dias...).
+
+Uso:
+    python benchmarks/temporal_parsing.py [--dataset caminho] [--size 3000] [--repeat 5]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'tests', 'fixtures'))
+
+from legacy_temporal_parser import LegacyTemporalParser
+from temporal_engine import TemporalEngine
+from text_normalizer import TextNormalizer
+from utils.turn_recorder import load_dataset
+
+
+DEFAULT_DATASET = os.path.join(os.path.dirname(__file__), '..', 'tests', 'fixtures', 'dados_comerciais_amostra.csv')
+
+MONTH_NAMES = [
+    'janeiro', 'fevereiro', 'março', 'marco', 'abril', 'maio', 'junho', 'julho', 'agosto',
+    'setembro', 'outubro', 'novembro', 'dezembro', 'jan', 'fev', 'mar', 'abr', 'mai', 'jun',
+    'jul', 'ago', 'set', 'out', 'nov', 'dez'
+]
+YEARS = ['2021', '2022', '2023', '2024', '2025']
+
+QUESTIONS = [
+    'Qual o faturamento {periodo}?',
+    'Quais os top 5 clientes de Joinville {periodo}?',
+    'Mostre as vendas de papel cartão por UF {periodo}',
+    'Compare o volume por linha de produto {periodo}',
+    'Quanto vendemos para o segmento 3 {periodo}',
+    'ranking de vendedores da região sul {periodo}',
+    'Qual a evolução mensal do faturamento {periodo}?',
+    'Liste os municípios de SC com maior ticket médio',
+    'Qual o faturamento total por família de produto?',
+]
+
+PERIODS = [
+    'em {mes} de {ano}', '{mes} de {ano}', 'no mês de {mes} {ano}', 'em {mes}/{ano}',
+    'durante {mes} de {ano}', 'entre {mes} e {mes2} de {ano}', 'de {mes} a {mes2} de {ano}',
+    'entre {mes}/{ano} e {mes2}/{ano}', 'do período de {mes} a {mes2} de {ano}',
+    'entre os meses de {mes} e {mes2} de {ano}', 'no período de {mes}/{ano} a {mes2}/{ano}',
+    'em {ano}', 'no ano de {ano}', 'durante {ano}', 'no período de {ano}',
+    'no último mês', 'no mês passado', 'no mês anterior', 'no período mais recente',
+    'nos últimos {n} meses', 'nos ultimos {n} dias', 'nos últimos {n} anos',
+    'nos últimos {n} trimestres', 'nos últimos {n} semestres', '',
+]
+
+
+def generate_corpus(size: int, seed: int = 42):
+    """Perguntas com expressões de período geradas a partir dos modelos"""
+    rng = random.Random(seed)
+    corpus = []
+    for _ in range(size):
+        periodo = rng.choice(PERIODS).format(
+            mes=rng.choice(MONTH_NAMES), mes2=rng.choice(MONTH_NAMES),
+            ano=rng.choice(YEARS), n=rng.randint(1, 12)
+        )
+        corpus.append(rng.choice(QUESTIONS).format(periodo=periodo).strip())
+    return corpus
+
+
+def time_parser(parse, corpus, repeat):
+    """Menor tempo total (s) de `repeat` passadas sobre o corpus"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in corpus:
+            parse(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--dataset', default=DEFAULT_DATASET)
+    parser.add_argument('--size', type=int, default=3000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    normalizer = TextNormalizer()
+    normalizer.set_dataset_context(load_dataset(args.dataset))
+    context = normalizer.dataset_context
+
+    corpus = generate_corpus(args.size)
+    print(f"Corpus: {len(corpus)} perguntas ({len(set(corpus))} distintas)")
+
+    legacy = LegacyTemporalParser(context)
+    legacy_time = time_parser(legacy.parse_temporal_entities, corpus, args.repeat)
+
+    # Sem cache: mede apenas a gramática compilada e a tokenização
+    uncached = TemporalEngine(context, cache_size=0)
+    uncached_time = time_parser(uncached.parse, corpus, args.repeat)
+
+    engine = TemporalEngine(context, cache_size=len(corpus))
+    cold_time = time_parser(engine.parse, corpus, 1)
+    warm_time = time_parser(engine.parse, corpus, args.repeat)
+
+    mismatches = sum(1 for text in corpus if engine.parse(text) != legacy.parse_temporal_entities(text))
+
+    per_item = lambda seconds: seconds / len(corpus) * 1e6
+    print(f"{'parser':<28}{'total (ms)':>12}{'µs/pergunta':>14}{'speedup':>10}")
+    for label, seconds in (
+        ('original', legacy_time),
+        ('motor sem cache', uncached_time),
+        ('motor com cache (frio)', cold_time),
+        ('motor com cache (quente)', warm_time),
+    ):
+        print(f"{label:<28}{seconds * 1000:>12.1f}{per_item(seconds):>14.1f}{legacy_time / seconds:>9.1f}x")
+
+    print(f"\nCache: {engine.cache_stats()}")
+    print(f"Divergências em relação ao parser original: {mismatches}")
+
+
+if __name__ == '__main__':
+    main()
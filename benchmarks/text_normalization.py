@@ -0,0 +1,92 @@
+"""
+Microbenchmark de normalização: normalize_text (um valor por vez) x normalize_many (lote)
+
+Mede dois cenários: colunas de texto do dataset (valores repetidos, como em
+normalize_dataframe) e frases distintas com acentos (sem reaproveitamento).
+
+Uso:
+    python benchmarks/text_normalization.py [--dataset caminho] [--rows 200000] [--repeat 3] [--min-speedup 10]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from text_normalizer import TextNormalizer
+from utils.turn_recorder import load_dataset
+
+
+DEFAULT_DATASET = os.path.join(os.path.dirname(__file__), '..', 'tests', 'fixtures', 'dados_comerciais_amostra.csv')
+
+WORDS = [
+    'Florianópolis', 'São', 'José', 'Joinville', 'Chapecó', 'Jaraguá', 'Itajaí', 'Criciúma', 'Balneário',
+    'papel', 'cartão', 'ondulado', 'embalagem', 'logística', 'região', 'família', 'produção', 'Paraná',
+    'Goiânia', 'Maceió', 'Belém', 'Ribeirão', 'Preto', 'Pirassununga', 'comércio', 'indústria', 'NÚCLEO',
+]
+
+
+def dataset_values(path, rows):
+    """Valores das colunas de texto do dataset, repetidos até `rows`"""
+    normalizer = TextNormalizer()
+    df = load_dataset(path)
+    values = [value for col in normalizer.identify_text_columns(df) for value in df[col].tolist()]
+    return (values * (rows // max(len(values), 1) + 1))[:rows]
+
+
+def unique_phrases(rows, seed=42):
+    """Frases distintas com acentos, espaços múltiplos e caixa variada"""
+    rng = random.Random(seed)
+    return [
+        '  '.join(rng.sample(WORDS, 3)) + f"  {index}\t" if index % 2 else ' '.join(rng.sample(WORDS, 4)).upper() + f" {index}"
+        for index in range(rows)
+    ]
+
+
+def best_time(function, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--dataset', default=DEFAULT_DATASET)
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--min-speedup', type=float, default=10.0,
+                        help='Falha (código 1) se o cenário do dataset ficar abaixo deste speedup')
+    args = parser.parse_args()
+
+    normalizer = TextNormalizer()
+    scenarios = [
+        ('colunas do dataset', dataset_values(args.dataset, args.rows)),
+        ('frases distintas', unique_phrases(args.rows)),
+    ]
+
+    print(f"{'cenário':<22}{'normalize_text (ms)':>22}{'normalize_many (ms)':>22}{'speedup':>10}")
+    speedups = {}
+    for label, values in scenarios:
+        expected = [normalizer.normalize_text(value) for value in values]
+        if normalizer.normalize_many(values) != expected:
+            print(f"ERRO: normalize_many diverge de normalize_text em '{label}'")
+            sys.exit(1)
+
+        single = best_time(lambda: [normalizer.normalize_text(value) for value in values], args.repeat)
+        batch = best_time(lambda: normalizer.normalize_many(values), args.repeat)
+        speedups[label] = single / batch
+        print(f"{label:<22}{single * 1000:>22.1f}{batch * 1000:>22.1f}{speedups[label]:>9.1f}x")
+
+    if speedups['colunas do dataset'] < args.min_speedup:
+        print(f"\nSpeedup abaixo do mínimo de {args.min_speedup:.0f}x")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,134 @@
+"""
+Casamento de aliases em uma única varredura
+Autômato Aho-Corasick construído uma vez a partir do mapeamento de aliases
+normalizado (alias.yaml): encontra todas as ocorrências na pergunta em tempo
+linear, respeitando limites de palavra e resolvendo sobreposições pela
+ocorrência mais à esquerda e mais longa
+"""
+
+from collections import deque
+from typing import Callable, Dict, List, NamedTuple, Tuple
+
+
+class AliasTarget(NamedTuple):
+    """Coluna associada a um alias"""
+    column: str
+    original_alias: str
+
+
+class AliasHit(NamedTuple):
+    """Ocorrência de um alias na pergunta normalizada"""
+    alias: str  # alias normalizado
+    start: int
+    end: int
+    targets: Tuple[AliasTarget, ...]  # na ordem do mapeamento
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum() or char == '_'
+
+
+class AliasMatcher:
+    """
+    Autômato de aliases.
+
+    goto[estado]: transições por caractere; fail[estado]: maior sufixo próprio
+    que também é prefixo de algum alias; outputs[estado]: aliases que terminam
+    no estado (incluindo os herdados pelo link de falha).
+    """
+
+    def __init__(self, mapping: Dict[str, List[str]], normalize: Callable[[str], str]):
+        """
+        Args:
+            mapping: Coluna -> aliases (formato de alias.yaml)
+            normalize: Função de normalização aplicada a cada alias (a mesma da pergunta)
+        """
+        targets: Dict[str, List[AliasTarget]] = {}
+        for column, aliases in (mapping or {}).items():
+            for alias in aliases or []:
+                key = normalize(alias).strip()
+                if key:
+                    targets.setdefault(key, []).append(AliasTarget(column, alias))
+
+        self.targets: Dict[str, Tuple[AliasTarget, ...]] = {key: tuple(value) for key, value in targets.items()}
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._outputs: List[Tuple[str, ...]] = [()]
+
+        for key in self.targets:
+            state = 0
+            for char in key:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._outputs.append(())
+                state = next_state
+            self._outputs[state] = (key,)
+
+        # Links de falha em largura (estados rasos primeiro)
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._outputs[next_state] = self._outputs[next_state] + self._outputs[self._fail[next_state]]
+
+    def __len__(self) -> int:
+        return len(self.targets)
+
+    def find_all(self, text: str) -> List[AliasHit]:
+        """
+        Todas as ocorrências de aliases delimitadas por limites de palavra
+
+        Args:
+            text: Pergunta já normalizada
+
+        Returns:
+            Ocorrências (podem se sobrepor), ordenadas pelo início
+        """
+        hits = []
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        state = 0
+        length = len(text)
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not outputs[state]:
+                continue
+            end = position + 1
+            if end < length and _is_word_char(text[end]):
+                continue
+            for alias in outputs[state]:
+                start = end - len(alias)
+                if start == 0 or not _is_word_char(text[start - 1]):
+                    hits.append(AliasHit(alias, start, end, self.targets[alias]))
+        hits.sort(key=lambda hit: (hit.start, -(hit.end - hit.start)))
+        return hits
+
+    def find(self, text: str) -> List[AliasHit]:
+        """
+        Ocorrências sem sobreposição (mais à esquerda e, entre elas, a mais longa)
+
+        Args:
+            text: Pergunta já normalizada
+
+        Returns:
+            Ocorrências na ordem em que aparecem
+        """
+        resolved = []
+        covered_until = 0
+        for hit in self.find_all(text):
+            if hit.start >= covered_until:
+                resolved.append(hit)
+                covered_until = hit.end
+        return resolved
+
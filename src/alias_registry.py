@@ -0,0 +1,181 @@
+"""
+Registro de aliases com recarga a quente
+Lê data/mappings/alias.yaml uma vez, acompanha o mtime do arquivo e publica um
+snapshot imutável e compilado (aliases normalizados, índice reverso e autômato).
+Agentes e prompts consultam o snapshot vigente a cada uso, então edições no
+arquivo passam a valer sem reiniciar a aplicação
+"""
+
+import os
+import threading
+import time
+from types import MappingProxyType
+from typing import Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+import yaml
+
+from alias_matcher import AliasMatcher
+from text_normalizer import TextNormalizer
+
+
+DEFAULT_ALIAS_PATH = "data/mappings/alias.yaml"
+
+# Intervalo mínimo entre verificações do mtime (segundos)
+ALIAS_CHECK_INTERVAL_SECONDS = 2.0
+
+
+class AliasSnapshot(NamedTuple):
+    """Versão compilada do arquivo de aliases (não deve ser modificada)"""
+    version: int
+    mtime: Optional[int]  # st_mtime_ns do arquivo; None: arquivo ausente
+    mapping: Mapping[str, Tuple[str, ...]]  # coluna -> aliases originais
+    alias_columns: Mapping[str, Tuple[str, ...]]  # alias normalizado -> colunas
+    column_aliases: Mapping[str, Tuple[str, ...]]  # coluna -> aliases normalizados
+    matcher: AliasMatcher
+
+    def as_dict(self) -> Dict[str, List[str]]:
+        """Cópia mutável no formato de load_alias_mapping (coluna -> lista de aliases)"""
+        return {column: list(aliases) for column, aliases in self.mapping.items()}
+
+
+def compile_alias_snapshot(mapping: Dict[str, List[str]], version: int = 0,
+                           mtime: Optional[int] = None) -> AliasSnapshot:
+    """
+    Compila um mapeamento coluna -> aliases em um snapshot
+
+    Args:
+        mapping: Seção 'columns' de alias.yaml
+        version: Versão do snapshot
+        mtime: st_mtime_ns do arquivo de origem
+
+    Returns:
+        AliasSnapshot
+    """
+    normalizer = TextNormalizer()
+    frozen = {column: tuple(aliases or ()) for column, aliases in (mapping or {}).items()}
+    matcher = AliasMatcher(frozen, normalizer.normalize_text)
+
+    # Aliases normalizados de cada coluna, na ordem do arquivo
+    column_aliases = {
+        column: tuple(dict.fromkeys(
+            key for key in (normalizer.normalize_text(alias).strip() for alias in aliases) if key
+        ))
+        for column, aliases in frozen.items()
+    }
+
+    return AliasSnapshot(
+        version=version,
+        mtime=mtime,
+        mapping=MappingProxyType(frozen),
+        alias_columns=MappingProxyType({
+            alias: tuple(dict.fromkeys(target.column for target in targets))
+            for alias, targets in matcher.targets.items()
+        }),
+        column_aliases=MappingProxyType(column_aliases),
+        matcher=matcher
+    )
+
+
+class AliasRegistry:
+    """
+    Snapshot vigente de um arquivo de aliases.
+
+    snapshot() verifica o mtime no máximo a cada check_interval segundos e,
+    se o arquivo mudou, compila e publica a nova versão (troca atômica da
+    referência). Um YAML inválido mantém o snapshot anterior.
+    """
+
+    def __init__(self, path: str = DEFAULT_ALIAS_PATH, check_interval: float = ALIAS_CHECK_INTERVAL_SECONDS):
+        self.path = path
+        self.check_interval = check_interval
+        self.reloads = 0
+        self._lock = threading.Lock()
+        self._last_check = float('-inf')
+        self._snapshot = compile_alias_snapshot({})
+        self._file_mtime: Optional[int] = None
+        self._missing = False
+        self.snapshot()
+
+    @property
+    def version(self) -> int:
+        return self._snapshot.version
+
+    def snapshot(self) -> AliasSnapshot:
+        """Snapshot vigente, recarregando o arquivo se ele mudou"""
+        if time.monotonic() - self._last_check >= self.check_interval:
+            self.reload_if_changed()
+        return self._snapshot
+
+    def reload_if_changed(self) -> bool:
+        """
+        Recarrega o arquivo se o mtime mudou desde a última leitura
+
+        Returns:
+            True se um novo snapshot foi publicado
+        """
+        with self._lock:
+            self._last_check = time.monotonic()
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except FileNotFoundError:
+                if self._missing:
+                    return False
+                print(f"Warning: Alias file not found at {self.path}")
+                self._missing = True
+                self._file_mtime = None
+                if self._snapshot.mapping:
+                    self._publish({}, None)
+                    return True
+                return False
+
+            self._missing = False
+            if mtime == self._file_mtime:
+                return False
+            self._file_mtime = mtime
+
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    alias_data = yaml.safe_load(f) or {}
+            except yaml.YAMLError:
+                print(f"Warning: Invalid YAML in alias file {self.path}")
+                return False
+
+            # Extrair apenas o mapeamento de colunas
+            self._publish(alias_data.get('columns', {}) or {}, mtime)
+            return True
+
+    def _publish(self, mapping: Dict[str, List[str]], mtime: Optional[int]):
+        """Compila e publica um novo snapshot (chamado com o lock)"""
+        self._snapshot = compile_alias_snapshot(mapping, self._snapshot.version + 1, mtime)
+        self.reloads += 1
+
+
+# Registro global: caminho absoluto -> registro
+_alias_registries: Dict[str, AliasRegistry] = {}
+_alias_registries_lock = threading.Lock()
+
+
+def get_alias_registry(path: Optional[str] = None) -> AliasRegistry:
+    """
+    Retorna o registro de aliases do arquivo, criando-o na primeira chamada
+
+    Args:
+        path: Caminho do arquivo de aliases (padrão: data/mappings/alias.yaml)
+
+    Returns:
+        AliasRegistry compartilhado por todos os agentes
+    """
+    path = path or DEFAULT_ALIAS_PATH
+    key = os.path.abspath(path)
+    with _alias_registries_lock:
+        registry = _alias_registries.get(key)
+        if registry is None:
+            registry = AliasRegistry(path)
+            _alias_registries[key] = registry
+        return registry
+
+
+def reset_alias_registries():
+    """Descarta os registros de aliases (útil para testes)"""
+    with _alias_registries_lock:
+        _alias_registries.clear()
@@ -18,12 +18,21 @@ import tempfile
 from dotenv import load_dotenv
 
 # Importar módulos refatorados
-from text_normalizer import TextNormalizer, load_alias_mapping
+from text_normalizer import TextNormalizer
+from alias_registry import AliasRegistry, get_alias_registry
 from config.model_config import SELECTED_MODEL, OPENAI_API_KEY, DATA_CONFIG
 from config.agent_config import COLUMN_HIERARCHY, AGENT_CONFIG
 from prompts.chatbot_prompt import create_chatbot_prompt
 from tools.optimized_python_tools import OptimizedPythonTools
 from tools.debug_duckdb_tools import DebugDuckDbTools
+from tools.tool_memo import ToolCallMemo
+from filters.filter_compiler import FilteredView, FILTERED_VIEW_NAME, BASE_TABLE_NAME
+from filters.value_autocomplete import get_value_autocomplete
+from filters.entity_resolver import get_entity_resolver
+from filters.dataset_profile import get_dataset_profile
+from utils.turn_telemetry import (
+    TurnTelemetry, build_tool_type_map, make_telemetry_tool_hook, get_telemetry_log
+)
 
 load_dotenv()
 
@@ -38,7 +47,9 @@ class PrincipalAgent(Agent):
                  session_user_id, conversation_memory="", *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.normalizer = normalizer
-        self.alias_mapping = alias_mapping
+        # Registro de aliases: o mapeamento vigente é lido a cada uso (recarga a quente)
+        self.alias_registry = alias_mapping if isinstance(alias_mapping, AliasRegistry) else None
+        self._static_alias_mapping = None if self.alias_registry else alias_mapping
         self.df_normalized = df_normalized
         self.text_columns = text_columns
         self.session_user_id = session_user_id or "default_user"
@@ -52,14 +63,49 @@ class PrincipalAgent(Agent):
 
         # Substituir ferramentas por versões otimizadas
         self.python_tool_ref = None  # Referência para o PythonTool otimizado
+        self.duckdb_tool_ref = None  # Referência para o DuckDbTools com debug
         for i, tool in enumerate(self.tools):
             if isinstance(tool, DuckDbTools):
                 self.tools[i] = DebugDuckDbTools(debug_info_ref=self)
+                self.duckdb_tool_ref = self.tools[i]
             elif isinstance(tool, PythonTools):
                 optimized_tool = OptimizedPythonTools(debug_info_ref=self, run_code=True, pip_install=False)
                 self.tools[i] = optimized_tool
                 self.python_tool_ref = optimized_tool
 
+        # MEMOIZAÇÃO POR TURNO: chamadas repetidas (mesma ferramenta e argumentos)
+        # retornam o resultado já calculado
+        self.tool_memo = ToolCallMemo()
+        if self.duckdb_tool_ref is not None:
+            self.tool_memo.register_hit_callback('run_query', self.duckdb_tool_ref.restore_cached_result)
+
+        # VIEW FILTRADA: filtros persistentes compilados em dados_filtrados
+        # (recriada apenas quando o contexto muda)
+        self.filtered_view = FilteredView(self.duckdb_tool_ref.connection) if self.duckdb_tool_ref else None
+        self._active_filter = None
+
+        # CALENDÁRIO: tabela calendario para resolver períodos relativos em SQL
+        # (junção por mês + igualdade em month_offset, quarter_offset, ytd...)
+        calendar = normalizer.calendar_dimension if normalizer is not None else None
+        if self.duckdb_tool_ref is not None and calendar is not None:
+            calendar.register(self.duckdb_tool_ref.connection)
+
+        # TELEMETRIA POR TURNO: cronometrar todas as ferramentas via tool_hook
+        # (hook externo: chamadas servidas pelo cache também são contabilizadas)
+        self._active_telemetry = None
+        self._tool_types = build_tool_type_map(self.tools)
+        self.tool_hooks = list(self.tool_hooks or []) + [
+            make_telemetry_tool_hook(lambda: self._active_telemetry),
+            self.tool_memo.as_tool_hook()
+        ]
+
+    @property
+    def alias_mapping(self):
+        """Mapeamento coluna -> aliases vigente (snapshot atual do registro, se houver)"""
+        if self.alias_registry is not None:
+            return self.alias_registry.snapshot().mapping
+        return self._static_alias_mapping
+
     def update_conversation_memory(self, new_memory):
         """
         Atualiza a memória de conversação com novo histórico.
@@ -149,6 +195,10 @@ class PrincipalAgent(Agent):
         if not self.persistent_context:
             return ""
 
+        # Filtros já aplicados na view: nota curta em vez da lista por categoria
+        if self._active_filter is not None and self._active_filter.applied:
+            return self._format_filtered_view_for_prompt(self._active_filter)
+
         context_parts = []
         context_parts.append("FILTROS ATIVOS NA CONVERSA:")
 
@@ -186,12 +236,101 @@ class PrincipalAgent(Agent):
 
         return "\n".join(context_parts)
 
+    def _format_filtered_view_for_prompt(self, compiled):
+        """
+        Nota curta para filtros já aplicados na view dados_filtrados.
+
+        Args:
+            compiled: CompiledFilter sincronizado na view
+
+        Returns:
+            str: Contexto formatado para o prompt
+        """
+        applied = ", ".join(f"{key}: {value}" for key, value in compiled.applied.items())
+        context_parts = [
+            f"FILTROS ATIVOS NA CONVERSA (já aplicados na view {FILTERED_VIEW_NAME}): {applied}"
+        ]
+        if compiled.skipped:
+            skipped = ", ".join(f"{key}: {value}" for key, value in compiled.skipped.items())
+            context_parts.append(f"- Considere também: {skipped}")
+        context_parts.append(
+            f"Consulte {FILTERED_VIEW_NAME} sem repetir estes filtros no WHERE; "
+            f"para alterar ou remover um filtro ativo, consulte {BASE_TABLE_NAME}."
+        )
+        context_parts.append("\nIMPORTANTE: PRESERVE estes filtros no seu JSON response, adicionando apenas novos filtros detectados na pergunta atual.")
+        return "\n".join(context_parts)
+
+    def _sync_filtered_view(self):
+        """
+        Sincroniza a view dados_filtrados com o contexto persistente.
+
+        Returns:
+            CompiledFilter aplicado ou None (tabela base ausente ou falha na view)
+        """
+        if self.filtered_view is None:
+            return None
+
+        rebuilds_before = self.filtered_view.rebuilds
+        compiled = self.filtered_view.sync(self.persistent_context)
+
+        if compiled is not None and hasattr(self, 'debug_info') and self.debug_info is not None:
+            self.debug_info['filtered_view'] = {
+                'predicate': compiled.to_sql(),
+                'applied': list(compiled.applied.keys()),
+                'skipped': list(compiled.skipped.keys()),
+                'rebuilt': self.filtered_view.rebuilds != rebuilds_before,
+                'materialized': self.filtered_view.slice_table
+            }
+        return compiled
+
+    def _format_entity_hints(self, message):
+        """
+        Sugere valores do dataset para termos parciais ou digitados com erro na pergunta.
+
+        Args:
+            message: Pergunta do usuário
+
+        Returns:
+            str: Bloco de sugestões para o prompt ou string vazia
+        """
+        if self.df_normalized is None or not isinstance(message, str):
+            return ""
+
+        resolved = get_value_autocomplete(self.df_normalized).resolve_partial_entities(message)
+        misspelled = get_entity_resolver(self.df_normalized).resolve_question(message)
+        if not resolved and not misspelled:
+            return ""
+
+        if hasattr(self, 'debug_info') and self.debug_info is not None:
+            self.debug_info['entity_hints'] = {
+                term: [(c.column, c.value) for c in completions] for term, completions in resolved.items()
+            }
+            self.debug_info['fuzzy_entities'] = {
+                span: [(m.column, m.value, round(m.score, 3)) for m in matches] for span, matches in misspelled.items()
+            }
+
+        lines = []
+        if resolved:
+            lines.append("NOMES PARCIAIS NA PERGUNTA (valores existentes no dataset, mais frequentes primeiro):")
+            for term, completions in resolved.items():
+                options = ", ".join(f"{c.column} = '{c.value}' ({c.count} registros)" for c in completions)
+                lines.append(f"- '{term}': {options}")
+        if misspelled:
+            lines.append("NOMES APROXIMADOS NA PERGUNTA (possíveis erros de digitação, mais parecidos primeiro):")
+            for span, matches in misspelled.items():
+                options = ", ".join(f"{m.column} = '{m.value}' (similaridade {m.score:.2f})" for m in matches)
+                lines.append(f"- '{span}': {options}")
+        return "\n".join(lines)
+
     def run(self, message, **kwargs):
         """
         Override do método run para incluir memória de conversação e contexto persistente de filtros.
         """
         final_message = message
 
+        # COMPILAR FILTROS PERSISTENTES na view dados_filtrados
+        self._active_filter = self._sync_filtered_view()
+
         # INTEGRAR MEMÓRIA DE CONVERSAÇÃO SE DISPONÍVEL
         if self.conversation_memory and self.conversation_memory.strip():
             conversation_context = self.get_conversation_summary()
@@ -202,6 +341,11 @@ class PrincipalAgent(Agent):
             filter_context = self._format_persistent_context_for_prompt()
             final_message = f"{final_message}\n\n{filter_context}"
 
+        # RESOLVER NOMES PARCIAIS de entidades (ex.: 'joinv' -> joinville)
+        entity_hints = self._format_entity_hints(message)
+        if entity_hints:
+            final_message = f"{final_message}\n\n{entity_hints}"
+
         # Log para debugging
         if hasattr(self, 'debug_info') and self.debug_info is not None:
             if 'query_modifications' not in self.debug_info:
@@ -214,11 +358,46 @@ class PrincipalAgent(Agent):
             })
 
         # Executar com a mensagem e contexto de conversação + filtros
-        return super().run(final_message, **kwargs)
+        telemetry = TurnTelemetry(prompt=message, session_id=self.session_user_id,
+                                  tool_types=self._tool_types)
+        self._active_telemetry = telemetry
+        try:
+            response = super().run(final_message, **kwargs)
+        finally:
+            self._active_telemetry = None
+
+        self._record_turn_telemetry(telemetry, response)
+        return response
+
+    def _record_turn_telemetry(self, telemetry, response):
+        """
+        Finaliza a telemetria do turno, expondo-a em debug_info e no log JSONL.
+
+        Args:
+            telemetry: Coletor TurnTelemetry do turno
+            response: RunOutput retornado pelo agno
+        """
+        record = telemetry.finish(response)
+        record['tool_memo'] = self.tool_memo.stats()
+
+        if hasattr(self, 'debug_info') and self.debug_info is not None:
+            self.debug_info['telemetry'] = record
+
+        try:
+            telemetry_log = get_telemetry_log()
+            if telemetry_log is not None:
+                telemetry_log.append(record)
+        except OSError:
+            # Falha ao gravar métricas não deve interromper a resposta
+            pass
 
 
     def clear_execution_state(self):
         """Limpa o estado de execução entre consultas relacionadas"""
+        self.tool_memo.clear()
+        if self.duckdb_tool_ref:
+            self.duckdb_tool_ref.clear_turn_cache()
+
         if self.python_tool_ref:
             self.python_tool_ref.executed_calculations.clear()
             # Manter apenas variáveis importantes no cache
@@ -229,10 +408,40 @@ class PrincipalAgent(Agent):
             self.python_tool_ref.variable_cache = important_vars
 
 
-def create_agent(session_user_id=None, debug_mode=False, conversation_memory=""):
+def make_instructions(data_path, df, text_columns, alias_registry):
+    """
+    Instruções do agente como função: o prompt é recriado apenas quando
+    uma nova versão de alias.yaml é publicada no registro
+
+    Args:
+        data_path: Caminho para o arquivo de dados
+        df: DataFrame com os dados carregados
+        text_columns: Colunas de texto normalizadas
+        alias_registry: AliasRegistry com o mapeamento de aliases
+
+    Returns:
+        Função sem argumentos que retorna o prompt vigente
+    """
+    cache = {}
+
+    def instructions():
+        snapshot = alias_registry.snapshot()
+        if cache.get('version') != snapshot.version:
+            cache['prompt'] = create_chatbot_prompt(data_path, df, text_columns, snapshot.as_dict())
+            cache['version'] = snapshot.version
+        return cache['prompt']
+
+    return instructions
+
+
+def create_agent(session_user_id=None, debug_mode=False, conversation_memory="", model=None):
     """
     Cria e configura o agente DuckDB com acesso aos dados comerciais e memória temporária
     Versão refatorada e modularizada
+
+    Args:
+        model: Modelo agno opcional (ex.: MockModel para execução offline);
+               padrão é OpenAIChat com SELECTED_MODEL
     """
     os.environ["OPENAI_API_KEY"] = OPENAI_API_KEY
 
@@ -248,8 +457,9 @@ def create_agent(session_user_id=None, debug_mode=False, conversation_memory="")
     # Criar versão normalizada do DataFrame para buscas
     df_normalized = normalizer.normalize_dataframe(df, text_columns)
 
-    # Carregar mapeamento de aliases
-    alias_mapping = load_alias_mapping()
+    # Registro de aliases (alias.yaml recarregado quando o arquivo muda)
+    alias_registry = get_alias_registry()
+    alias_mapping = alias_registry.snapshot().mapping
 
     # Criar knowledge base com os dados usando Knowledge
     knowledge = Knowledge()
@@ -276,6 +486,7 @@ CONTEXTO TEMPORAL IMPORTANTE:
 
 IMPORTANTE: Os dados passaram por normalização de texto para garantir consistência:
 - Colunas de texto normalizadas: {", ".join(text_columns)}
+- Colunas de código (números armazenados como texto, sem normalização): {", ".join(get_dataset_profile(df).code_columns) or "Nenhuma"}
 - Normalização aplicada: conversão para minúsculas, remoção de acentos, normalização de espaços
 - Aliases disponíveis para consultas: {", ".join(alias_mapping.keys()) if alias_mapping else "Nenhum"}
 
@@ -299,13 +510,13 @@ Tipos de dados:
     # Criar o agente principal com todas as ferramentas
     agent = PrincipalAgent(
         normalizer=normalizer,
-        alias_mapping=alias_mapping,
+        alias_mapping=alias_registry,
         df_normalized=df_normalized,
         text_columns=text_columns,
         session_user_id=session_user_id,
         conversation_memory=conversation_memory,
         db=db,
-        model=OpenAIChat(id=SELECTED_MODEL, reasoning_effort="low"),
+        model=model or OpenAIChat(id=SELECTED_MODEL, reasoning_effort="low"),
         tools=[
             ReasoningTools(add_instructions=True),
             CalculatorTools(),
@@ -314,7 +525,7 @@ Tipos de dados:
         ],
         knowledge=knowledge,
         enable_agentic_memory=True,
-        instructions=create_chatbot_prompt(data_path, df, text_columns, alias_mapping),
+        instructions=make_instructions(data_path, df, text_columns, alias_registry),
         debug_mode=debug_mode,
         markdown=True,
     )
@@ -7,6 +7,9 @@ from dotenv import load_dotenv
 
 load_dotenv()
 
+# Raiz do projeto (caminhos gerados pela aplicação não dependem do diretório atual)
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
 # Configuração do modelo OpenAI
 SELECTED_MODEL = "gpt-5-nano-2025-08-07"
 
@@ -17,4 +20,16 @@ OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 DATA_CONFIG = {
     "data_path": "data/raw/DadosComercial_resumido_v02.parquet",
     "alias_mapping_path": "data/mappings/alias.yaml"
-}
\ No newline at end of file
+}
+
+# Configurações de telemetria por turno
+TELEMETRY_CONFIG = {
+    "enabled": True,
+    "metrics_log_path": os.path.join(PROJECT_ROOT, "logs", "turn_metrics.jsonl")
+}
+
+# Gravação de turnos como fixtures de replay (habilitar com AGENT_RECORD_TURNS=1)
+RECORDER_CONFIG = {
+    "enabled": os.getenv("AGENT_RECORD_TURNS") == "1",
+    "fixtures_dir": os.path.join(PROJECT_ROOT, "tests", "fixtures", "turns")
+}
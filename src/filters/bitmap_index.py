@@ -0,0 +1,374 @@
+"""
+Índice bitmap sobre as colunas de filtro
+Um bitmap por valor distinto (UF, município, segmento, família/linha de produto,
+vendedor) e por mês de Data, para contar exatamente combinações AND/OR dos
+filtros ativos sem consultar o banco
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .dataset_stats import normalize_stat_key
+from .json_filter_manager import calcular_fingerprint_dataset
+
+
+BITMAP_COLUMNS = [
+    'UF_Cliente', 'Municipio_Cliente', 'Cod_Segmento_Cliente',
+    'Cod_Familia_Produto', 'Cod_Linha_Produto', 'Des_Linha_Produto',
+    'Cod_Vendedor'
+]
+DATE_COLUMN = 'Data'
+DATE_KEYS = ('Data', 'Data_>=', 'Data_>', 'Data_<', 'Data_<=')
+
+# Valores com menos linhas que total/SPARSE_RATIO ficam como lista ordenada de
+# posições (menor que o bitmap denso, como os containers do roaring)
+SPARSE_RATIO = 32
+
+# Máximo de datasets indexados em memória (chave: fingerprint)
+MAX_CACHED_INDEXES = 4
+
+
+# Posting: ('dense', bitmap empacotado uint8) ou ('sparse', posições int64 ordenadas)
+Posting = Tuple[str, np.ndarray]
+
+# Expressão: contexto de filtros (AND entre chaves, OR dentro de listas) ou
+# ('and' | 'or', [subexpressões])
+Expression = Union[Dict[str, Any], Tuple[str, Sequence[Any]]]
+
+
+class BitmapIndex:
+    """
+    Índice bitmap imutável de um dataset.
+
+    Valores são comparados pela chave normalizada (sem acentos, maiúsculas).
+    Intervalos de data usam os buckets mensais; meses parcialmente cobertos
+    são resolvidos por busca binária nas linhas ordenadas por dia, mantendo a
+    contagem exata.
+    """
+
+    def __init__(self, df: pd.DataFrame, columns: Optional[List[str]] = None):
+        self.num_rows = int(len(df))
+        self.num_bytes = (self.num_rows + 7) // 8
+        self.columns = [col for col in (columns or BITMAP_COLUMNS) if col in df.columns]
+
+        # Colunas numéricas: valores do filtro ('0123', 5.0) comparados pelo número
+        self.numeric_columns = {col for col in self.columns if pd.api.types.is_numeric_dtype(df[col])}
+
+        self.postings: Dict[str, Dict[str, Posting]] = {}
+        for column in self.columns:
+            codes, uniques = pd.factorize(df[column])
+            keys = [normalize_stat_key(value) for value in uniques]
+            self.postings[column] = self._build_postings(codes, keys)
+
+        self.month_postings: Dict[Tuple[int, int], Posting] = {}
+        self.sorted_days: Optional[np.ndarray] = None
+        self.day_order: Optional[np.ndarray] = None
+        self.has_time = False
+        if DATE_COLUMN in df.columns:
+            dates = pd.to_datetime(df[DATE_COLUMN])
+            self.has_time = bool((dates.dropna() != dates.dropna().dt.normalize()).any())
+            # Linhas ordenadas por dia (dias desde 1970-01-01) para refinar meses parciais
+            valid_dates = np.flatnonzero(dates.notna().to_numpy())
+            days = dates.to_numpy(dtype='datetime64[D]').astype(np.int64)[valid_dates]
+            day_sort = np.argsort(days, kind='stable')
+            self.sorted_days = days[day_sort]
+            self.day_order = valid_dates[day_sort]
+            month_codes = (dates.dt.year * 12 + dates.dt.month - 1).to_numpy()
+            month_codes = np.where(dates.isna().to_numpy(), -1, month_codes)
+            codes, uniques = pd.factorize(month_codes)
+            keys = [(int(code) // 12, int(code) % 12 + 1) if code >= 0 else None for code in uniques]
+            self.month_postings = self._build_postings(codes, keys)
+            self.month_postings.pop(None, None)
+
+    # ------------------------------------------------------------------
+    # Construção e operações sobre postings
+    # ------------------------------------------------------------------
+
+    def _build_postings(self, codes: np.ndarray, keys: List[Any]) -> Dict[Any, Posting]:
+        """Agrupa as posições por código (uma ordenação) e cria um posting por chave"""
+        valid = np.flatnonzero(codes >= 0)
+        order = valid[np.argsort(codes[valid], kind='stable')]
+        counts = np.bincount(codes[valid], minlength=len(keys))
+        bounds = np.concatenate(([0], np.cumsum(counts)))
+
+        grouped: Dict[Any, List[np.ndarray]] = {}
+        for code, key in enumerate(keys):
+            grouped.setdefault(key, []).append(order[bounds[code]:bounds[code + 1]])
+
+        postings = {}
+        for key, parts in grouped.items():
+            positions = np.sort(np.concatenate(parts)) if len(parts) > 1 else parts[0]
+            postings[key] = self._make_posting(positions)
+        return postings
+
+    def _make_posting(self, positions: np.ndarray) -> Posting:
+        """Escolhe a representação densa ou esparsa pelo número de posições"""
+        if len(positions) * SPARSE_RATIO < self.num_rows:
+            return ('sparse', positions.astype(np.int64))
+        mask = np.zeros(self.num_rows, dtype=bool)
+        mask[positions] = True
+        return ('dense', np.packbits(mask))
+
+    def _empty(self) -> Posting:
+        return ('sparse', np.empty(0, dtype=np.int64))
+
+    def _full(self) -> Posting:
+        return ('dense', np.packbits(np.ones(self.num_rows, dtype=bool)))
+
+    def _to_dense(self, posting: Posting) -> np.ndarray:
+        kind, data = posting
+        if kind == 'dense':
+            return data
+        return self._set_bits(np.zeros(self.num_bytes, dtype=np.uint8), data)
+
+    @staticmethod
+    def _set_bits(bitmap: np.ndarray, positions: np.ndarray) -> np.ndarray:
+        """Liga (in-place) os bits das posições em um bitmap empacotado"""
+        np.bitwise_or.at(bitmap, positions >> 3, (128 >> (positions & 7)).astype(np.uint8))
+        return bitmap
+
+    @staticmethod
+    def _bits_at(bitmap: np.ndarray, positions: np.ndarray) -> np.ndarray:
+        """Bits de um bitmap empacotado nas posições informadas"""
+        return ((bitmap[positions >> 3] >> (7 - (positions & 7))) & 1).astype(bool)
+
+    def _and(self, left: Posting, right: Posting) -> Posting:
+        if left[0] == 'sparse' and right[0] == 'sparse':
+            return ('sparse', np.intersect1d(left[1], right[1], assume_unique=True))
+        if left[0] == 'sparse':
+            return ('sparse', left[1][self._bits_at(right[1], left[1])])
+        if right[0] == 'sparse':
+            return ('sparse', right[1][self._bits_at(left[1], right[1])])
+        return ('dense', np.bitwise_and(left[1], right[1]))
+
+    def _or(self, left: Posting, right: Posting) -> Posting:
+        if left[0] == 'sparse' and not len(left[1]):
+            return right
+        if right[0] == 'sparse' and not len(right[1]):
+            return left
+        if left[0] == 'sparse' and right[0] == 'sparse':
+            return ('sparse', np.union1d(left[1], right[1]))
+        if left[0] == 'sparse':
+            left, right = right, left
+        if right[0] == 'sparse':
+            return ('dense', self._set_bits(left[1].copy(), right[1]))
+        return ('dense', np.bitwise_or(left[1], right[1]))
+
+    def _count_posting(self, posting: Posting) -> int:
+        kind, data = posting
+        if kind == 'sparse':
+            return int(len(data))
+        return _popcount(data)
+
+    # ------------------------------------------------------------------
+    # Avaliação de filtros
+    # ------------------------------------------------------------------
+
+    def _column_posting(self, column: str, values: List[Any]) -> Posting:
+        """OR dos bitmaps dos valores de uma coluna"""
+        if column in self.numeric_columns:
+            values = [_to_number(value) for value in values]
+        result = self._empty()
+        postings = self.postings[column]
+        for key in {normalize_stat_key(value) for value in values}:
+            posting = postings.get(key)
+            if posting is not None:
+                result = self._or(result, posting)
+        return result
+
+    def _date_posting(self, start: Optional[date], end: Optional[date]) -> Posting:
+        """Linhas com Data em [start, end): meses inteiros pelo bucket, parciais pelo dia"""
+        start_day = (start - date(1970, 1, 1)).days if start else None
+        end_day = (end - date(1970, 1, 1)).days if end else None
+
+        result = self._empty()
+        for (year, month), posting in self.month_postings.items():
+            month_start = date(year, month, 1)
+            month_end = date(year + month // 12, month % 12 + 1, 1)
+            if (start and month_end <= start) or (end and month_start >= end):
+                continue
+            if (start is None or month_start >= start) and (end is None or month_end <= end):
+                result = self._or(result, posting)
+                continue
+
+            # Mês parcial: linhas do trecho coberto via busca binária nos dias ordenados
+            month_start_day = (month_start - date(1970, 1, 1)).days
+            month_end_day = (month_end - date(1970, 1, 1)).days
+            low = max(month_start_day, start_day) if start_day is not None else month_start_day
+            high = min(month_end_day, end_day) if end_day is not None else month_end_day
+            bounds = np.searchsorted(self.sorted_days, [low, high])
+            result = self._or(result, ('sparse', np.sort(self.day_order[bounds[0]:bounds[1]])))
+        return result
+
+    def supports(self, context: Dict[str, Any]) -> bool:
+        """Se todas as chaves do contexto são indexadas (contagem exata possível)"""
+        return all(
+            key in self.postings or (key in DATE_KEYS and self.month_postings)
+            for key, value in context.items()
+            if value is not None and value != "" and value != []
+        )
+
+    def indexed_context(self, conditions: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Mantém apenas as condições indexadas, com o nome canônico das colunas
+
+        Args:
+            conditions: Condições extraídas de SQL (nomes sem diferenciar maiúsculas)
+
+        Returns:
+            Contexto avaliável pelo índice (ex.: {'UF_Cliente': 'sp', 'Data_>=': '2024-01-01'})
+        """
+        columns = {column.lower(): column for column in self.postings}
+        date_keys = {key.lower(): key for key in DATE_KEYS} if self.month_postings else {}
+
+        context = {}
+        for key, value in conditions.items():
+            canonical = columns.get(key.lower()) or date_keys.get(key.lower())
+            if canonical is not None:
+                context[canonical] = value
+        return context
+
+    def _context_posting(self, context: Dict[str, Any]) -> Posting:
+        """AND entre as chaves do contexto; chaves não indexadas são ignoradas"""
+        result = None
+        start = end = None
+        has_dates = False
+
+        for key, value in context.items():
+            if value is None or value == "" or value == []:
+                continue
+            if key in self.postings:
+                posting = self._column_posting(key, value if isinstance(value, list) else [value])
+                result = posting if result is None else self._and(result, posting)
+            elif key in DATE_KEYS and self.month_postings:
+                parsed = _parse_date(value)
+                if parsed is None:
+                    continue
+                has_dates = True
+                if key == 'Data':
+                    start, end = parsed, parsed + timedelta(days=1)
+                elif key == 'Data_>=':
+                    start = parsed
+                elif key == 'Data_>':
+                    # Com horário em Data, '>' inclui o próprio dia (superconjunto seguro)
+                    start = parsed if self.has_time else parsed + timedelta(days=1)
+                elif key == 'Data_<':
+                    end = parsed
+                elif key == 'Data_<=':
+                    end = parsed + timedelta(days=1)
+
+        if has_dates:
+            posting = self._date_posting(start, end)
+            result = posting if result is None else self._and(result, posting)
+
+        return self._full() if result is None else result
+
+    def _evaluate(self, expression: Expression) -> Posting:
+        if isinstance(expression, dict):
+            return self._context_posting(expression)
+
+        operator, operands = expression
+        postings = [self._evaluate(operand) for operand in operands]
+        if not postings:
+            return self._full() if operator == 'and' else self._empty()
+
+        result = postings[0]
+        for posting in postings[1:]:
+            result = self._and(result, posting) if operator == 'and' else self._or(result, posting)
+        return result
+
+    def count(self, context: Dict[str, Any]) -> Optional[int]:
+        """
+        Contagem exata de linhas que atendem ao contexto
+
+        Args:
+            context: Filtros ativos (AND entre chaves, OR dentro de listas)
+
+        Returns:
+            Número de linhas ou None se alguma chave não é indexada
+        """
+        if not self.supports(context or {}):
+            return None
+        return self._count_posting(self._context_posting(context or {}))
+
+    def count_expression(self, expression: Expression) -> int:
+        """
+        Contagem exata de uma combinação AND/OR de contextos
+
+        Args:
+            expression: Contexto ou ('and' | 'or', [subexpressões]);
+                        chaves não indexadas são ignoradas (superconjunto)
+
+        Returns:
+            Número de linhas
+        """
+        return self._count_posting(self._evaluate(expression))
+
+
+def _popcount(bitmap: np.ndarray) -> int:
+    """Total de bits ligados (popcount SWAR em palavras de 64 bits)"""
+    padding = (-len(bitmap)) % 8
+    if padding:
+        bitmap = np.concatenate((bitmap, np.zeros(padding, dtype=np.uint8)))
+    words = bitmap.view(np.uint64)
+    words = words - ((words >> np.uint64(1)) & np.uint64(0x5555555555555555))
+    words = (words & np.uint64(0x3333333333333333)) + ((words >> np.uint64(2)) & np.uint64(0x3333333333333333))
+    words = (words + (words >> np.uint64(4))) & np.uint64(0x0F0F0F0F0F0F0F0F)
+    return int(((words * np.uint64(0x0101010101010101)) >> np.uint64(56)).sum())
+
+
+def _to_number(value: Any) -> Any:
+    """Converte textos numéricos em float (mantém o valor original se não for número)"""
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return value
+
+
+def _parse_date(value: Any) -> Optional[date]:
+    """Converte valores de contexto (ex.: '2024-01-01') em date"""
+    try:
+        return pd.Timestamp(str(value)[:10]).date()
+    except (ValueError, TypeError):
+        return None
+
+
+# Registro global: fingerprint do dataset -> índice
+_index_registry: "OrderedDict[str, BitmapIndex]" = OrderedDict()
+_index_lock = threading.Lock()
+
+
+def get_bitmap_index(df: pd.DataFrame) -> BitmapIndex:
+    """
+    Retorna o índice bitmap do dataset, construindo-o na primeira chamada
+
+    Args:
+        df: DataFrame do dataset
+
+    Returns:
+        BitmapIndex compartilhado por todas as sessões com o mesmo dataset
+    """
+    fingerprint = calcular_fingerprint_dataset(df)
+    with _index_lock:
+        index = _index_registry.get(fingerprint)
+        if index is not None:
+            _index_registry.move_to_end(fingerprint)
+            return index
+
+    index = BitmapIndex(df)
+    with _index_lock:
+        _index_registry[fingerprint] = index
+        while len(_index_registry) > MAX_CACHED_INDEXES:
+            _index_registry.popitem(last=False)
+    return index
+
+
+def reset_bitmap_indexes():
+    """Descarta os índices em cache (útil para testes)"""
+    with _index_lock:
+        _index_registry.clear()
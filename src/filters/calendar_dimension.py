@@ -0,0 +1,251 @@
+"""
+Dimensão calendário do dataset
+Uma linha por mês entre a primeira e a última data do dataset, com offsets e
+marcadores relativos à data máxima (mês, trimestre, semestre, ano, acumulado
+do ano e mesmo mês do ano anterior). Registrada como tabela calendario na
+conexão DuckDB do agente, transforma períodos relativos em junções/igualdades
+em SQL; no Python, os mesmos períodos são resolvidos por consulta O(1)
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+import pandas as pd
+
+
+CALENDAR_TABLE_NAME = 'calendario'
+
+# Junção da tabela de fatos com o calendário (coluna de data -> mês)
+CALENDAR_JOIN = "date_trunc('month', {date_column}) = {alias}.mes_inicio"
+
+# Períodos nomeados: nome -> condição SQL sobre o calendário
+NAMED_PERIOD_CONDITIONS = {
+    'current_month': 'month_offset = 0',           # mês da data máxima ("último mês" do dataset)
+    'previous_month': 'month_offset = 1',
+    'this_quarter': 'quarter_offset = 0',
+    'last_quarter': 'quarter_offset = 1',
+    'this_semester': 'semester_offset = 0',
+    'last_semester': 'semester_offset = 1',
+    'this_year': 'year_offset = 0',
+    'last_year': 'year_offset = 1',
+    'ytd': 'ytd',
+    'same_month_last_year': 'same_month_last_year',
+}
+
+# Máximo de calendários em memória (chave: data mínima e máxima)
+MAX_CACHED_CALENDARS = 8
+
+
+class CalendarPeriod(NamedTuple):
+    """Intervalo [start, end) de meses completos e a condição equivalente no calendário"""
+    name: str
+    start: date
+    end: date  # exclusivo
+    condition: str
+
+    def as_filters(self) -> Dict[str, str]:
+        """Filtros no formato do contexto ({'Data_>=': ..., 'Data_<': ...})"""
+        return {'Data_>=': self.start.strftime('%Y-%m-%d'), 'Data_<': self.end.strftime('%Y-%m-%d')}
+
+
+def _month_start(index: int) -> date:
+    """Primeiro dia do mês de índice ano * 12 + (mês - 1)"""
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class CalendarDimension:
+    """
+    Calendário mensal ancorado na data máxima do dataset.
+
+    Os offsets contam períodos para trás a partir do período da data máxima
+    (0 = período atual do dataset, 1 = anterior...). Os períodos nomeados são
+    calculados uma vez na construção; janelas móveis são aritmética de índice
+    de mês, sem percorrer datas.
+    """
+
+    def __init__(self, max_date, min_date=None):
+        """
+        Args:
+            max_date: Data máxima do dataset ("hoje" das análises)
+            min_date: Data mínima do dataset (padrão: data máxima)
+        """
+        self.max_date = pd.Timestamp(max_date)
+        self.min_date = pd.Timestamp(min_date) if min_date is not None else self.max_date
+        self.end = (self.max_date.normalize() + timedelta(days=1)).date()  # dia seguinte à data máxima
+
+        self._anchor = self.max_date.year * 12 + self.max_date.month - 1
+        self._quarter_anchor = self._anchor // 3
+        self._semester_anchor = self._anchor // 6
+
+        # Consulta O(1) dos períodos nomeados
+        ranges = {
+            'current_month': self.months(0, 0),
+            'previous_month': self.months(1, 1),
+            'this_quarter': self.quarter(0),
+            'last_quarter': self.quarter(1),
+            'this_semester': self.semester(0),
+            'last_semester': self.semester(1),
+            'this_year': self.year(0),
+            'last_year': self.year(1),
+            'ytd': self.months(self.max_date.month - 1, 0),
+            'same_month_last_year': self.months(12, 12),
+        }
+        self.periods: Dict[str, CalendarPeriod] = {
+            name: period._replace(name=name, condition=NAMED_PERIOD_CONDITIONS[name])
+            for name, period in ranges.items()
+        }
+
+    def period(self, name: str) -> CalendarPeriod:
+        """Período nomeado (ver NAMED_PERIOD_CONDITIONS)"""
+        return self.periods[name]
+
+    def months(self, first_offset: int, last_offset: int = 0) -> CalendarPeriod:
+        """
+        Meses completos entre dois offsets (inclusive)
+
+        Args:
+            first_offset: Offset do mês inicial (ex.: 2 = dois meses antes do mês da data máxima)
+            last_offset: Offset do mês final (0 = mês da data máxima)
+
+        Returns:
+            CalendarPeriod do início do mês inicial ao início do mês seguinte ao final
+        """
+        return CalendarPeriod(
+            'months',
+            _month_start(self._anchor - first_offset),
+            _month_start(self._anchor - last_offset + 1),
+            f'month_offset BETWEEN {last_offset} AND {first_offset}'
+        )
+
+    def quarter(self, offset: int) -> CalendarPeriod:
+        """Trimestre civil (0 = trimestre da data máxima)"""
+        first = (self._quarter_anchor - offset) * 3
+        return CalendarPeriod('quarter', _month_start(first), _month_start(first + 3), f'quarter_offset = {offset}')
+
+    def semester(self, offset: int) -> CalendarPeriod:
+        """Semestre civil (0 = semestre da data máxima)"""
+        first = (self._semester_anchor - offset) * 6
+        return CalendarPeriod('semester', _month_start(first), _month_start(first + 6), f'semester_offset = {offset}')
+
+    def year(self, offset: int) -> CalendarPeriod:
+        """Ano civil (0 = ano da data máxima)"""
+        year = self.max_date.year - offset
+        return CalendarPeriod('year', date(year, 1, 1), date(year + 1, 1, 1), f'year_offset = {offset}')
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Linhas da tabela calendario: um mês por linha, da data mínima à máxima
+
+        Returns:
+            DataFrame com mes_inicio, mes_fim (exclusivo), ano, mes, ano_mes,
+            trimestre, semestre, offsets e marcadores ytd/same_month_last_year
+        """
+        first = self.min_date.year * 12 + self.min_date.month - 1
+        indexes = range(min(first, self._anchor), self._anchor + 1)
+        rows = []
+        for index in indexes:
+            year, month = index // 12, index % 12 + 1
+            month_offset = self._anchor - index
+            rows.append({
+                'mes_inicio': _month_start(index),
+                'mes_fim': _month_start(index + 1),
+                'ano': year,
+                'mes': month,
+                'ano_mes': f"{year:04d}-{month:02d}",
+                'trimestre': (month - 1) // 3 + 1,
+                'semestre': (month - 1) // 6 + 1,
+                'month_offset': month_offset,
+                'quarter_offset': self._quarter_anchor - index // 3,
+                'semester_offset': self._semester_anchor - index // 6,
+                'year_offset': self.max_date.year - year,
+                'ytd': year == self.max_date.year,
+                'same_month_last_year': month_offset == 12,
+            })
+        return pd.DataFrame(rows)
+
+    def register(self, connection, table_name: str = CALENDAR_TABLE_NAME):
+        """
+        Cria (ou recria) a tabela do calendário na conexão DuckDB
+
+        A tabela é persistente (não TEMP) para ser visível também nos cursores
+        usados por run_queries.
+
+        Args:
+            connection: Conexão DuckDB
+            table_name: Nome da tabela (padrão: calendario)
+        """
+        frame = self.to_frame()
+        connection.register('_calendario_df', frame)
+        try:
+            connection.execute(f'CREATE OR REPLACE TABLE "{table_name}" AS SELECT * FROM _calendario_df')
+        finally:
+            connection.unregister('_calendario_df')
+
+    def prompt_section(self, date_column: str = 'Data', table_name: str = CALENDAR_TABLE_NAME) -> str:
+        """Descrição da tabela e dos períodos nomeados para o prompt do agente"""
+        join = CALENDAR_JOIN.format(date_column=f'"{date_column}"', alias='c')
+        lines = [
+            f"- Tabela `{table_name}`: uma linha por mês do dataset (mes_inicio, mes_fim, ano, mes, ano_mes, "
+            "trimestre, semestre, month_offset, quarter_offset, semester_offset, year_offset, ytd, "
+            "same_month_last_year), com offsets contados a partir do mês da data máxima "
+            f"{self.max_date.strftime('%Y-%m-%d')} (offset 0)",
+            f"- Junção: `JOIN {table_name} c ON {join}`",
+        ]
+        labels = {
+            'current_month': 'último mês', 'previous_month': 'mês anterior ao último',
+            'this_quarter': 'trimestre atual', 'last_quarter': 'trimestre passado',
+            'this_semester': 'semestre atual', 'last_semester': 'semestre passado',
+            'this_year': 'ano atual', 'last_year': 'ano passado',
+            'ytd': 'acumulado do ano', 'same_month_last_year': 'mesmo mês do ano anterior',
+        }
+        for name, label in labels.items():
+            period = self.periods[name]
+            lines.append(
+                f"  * \"{label}\" → `WHERE c.{period.condition}` "
+                f"({period.start.strftime('%Y-%m-%d')} até {period.end.strftime('%Y-%m-%d')}, exclusivo)"
+            )
+        return "\n".join(lines)
+
+
+# Registro global: (data mínima, data máxima) -> calendário
+_calendars: "OrderedDict[Tuple[str, str], CalendarDimension]" = OrderedDict()
+_calendars_lock = threading.Lock()
+
+
+def get_calendar_dimension(max_date, min_date=None) -> CalendarDimension:
+    """
+    Retorna o calendário do dataset, construindo-o na primeira chamada
+
+    Args:
+        max_date: Data máxima do dataset
+        min_date: Data mínima do dataset
+
+    Returns:
+        CalendarDimension compartilhado entre normalizadores, detectores e agentes
+    """
+    key = (str(pd.Timestamp(min_date)) if min_date is not None else '', str(pd.Timestamp(max_date)))
+    with _calendars_lock:
+        calendar = _calendars.get(key)
+        if calendar is None:
+            calendar = CalendarDimension(max_date, min_date)
+            _calendars[key] = calendar
+            while len(_calendars) > MAX_CACHED_CALENDARS:
+                _calendars.popitem(last=False)
+        else:
+            _calendars.move_to_end(key)
+        return calendar
+
+
+def calendar_from_context(dataset_context: Optional[Dict[str, Any]]) -> Optional[CalendarDimension]:
+    """Calendário do contexto de TextNormalizer.set_dataset_context (None sem contexto)"""
+    if not dataset_context or dataset_context.get('max_date') is None:
+        return None
+    return get_calendar_dimension(dataset_context['max_date'], dataset_context.get('min_date'))
+
+
+def reset_calendar_dimensions():
+    """Descarta os calendários em cache (útil para testes)"""
+    with _calendars_lock:
+        _calendars.clear()
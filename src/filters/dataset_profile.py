@@ -0,0 +1,180 @@
+"""
+Perfil de colunas do dataset
+Classificação das colunas (texto, código numérico em string, numérica, data)
+calculada uma vez a partir do schema Arrow e de uma verificação vetorizada de
+amostra, compartilhada por normalização, índice de busca e criação do agente
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Dict, List, NamedTuple, Optional
+
+import pandas as pd
+import pyarrow as pa
+
+from .json_filter_manager import calcular_fingerprint_dataset
+
+
+TEXT = 'text'          # texto livre: normalizado e indexado
+CODE = 'code'          # código numérico armazenado como string (ex.: Cod_Produto): não normalizado
+NUMERIC = 'numeric'
+DATETIME = 'datetime'
+OTHER = 'other'
+
+# Linhas lidas para inferir o schema Arrow
+SCHEMA_SAMPLE_ROWS = 1000
+
+# Valores não nulos verificados por coluna de strings
+VALUE_SAMPLE_SIZE = 100
+
+# Fração mínima de valores não numéricos para a coluna ser tratada como texto
+TEXT_SHARE_THRESHOLD = 0.1
+
+# Máximo de perfis em memória (chave: fingerprint)
+MAX_CACHED_PROFILES = 4
+
+
+class ColumnProfile(NamedTuple):
+    """Classificação de uma coluna"""
+    name: str
+    kind: str  # TEXT | CODE | NUMERIC | DATETIME | OTHER
+    arrow_type: Optional[str]  # None: tipos mistos (sem tipo Arrow único)
+    text_share: float  # fração de valores não numéricos na amostra (colunas de strings)
+
+
+def _arrow_types(df: pd.DataFrame) -> Dict[str, Optional[pa.DataType]]:
+    """Tipos Arrow das colunas, inferidos das primeiras linhas"""
+    sample = df.iloc[:SCHEMA_SAMPLE_ROWS]
+    try:
+        schema = pa.Schema.from_pandas(sample, preserve_index=False)
+        return {field.name: field.type for field in schema}
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        pass
+
+    # Alguma coluna com tipos mistos: inferir coluna a coluna
+    types = {}
+    for col in df.columns:
+        try:
+            types[col] = pa.Schema.from_pandas(sample[[col]], preserve_index=False).field(0).type
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            types[col] = None
+    return types
+
+
+def _is_string_type(arrow_type: pa.DataType) -> bool:
+    if pa.types.is_dictionary(arrow_type):
+        arrow_type = arrow_type.value_type
+    return pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type)
+
+
+def _value_sample(series: pd.Series) -> pd.Series:
+    """Primeiros valores não nulos (sem copiar a coluna inteira quando possível)"""
+    sample = series.iloc[:SCHEMA_SAMPLE_ROWS].dropna()
+    if len(sample) < VALUE_SAMPLE_SIZE:
+        sample = series.dropna()
+    return pd.Series(sample.head(VALUE_SAMPLE_SIZE).to_numpy(dtype=object))
+
+
+def _text_share(series: pd.Series) -> float:
+    """
+    Fração da amostra com strings não numéricas (ignorando '.', ',' e espaços nas pontas)
+    """
+    sample = _value_sample(series)
+    if sample.empty:
+        return 0.0
+
+    strings = sample
+    if pd.api.types.infer_dtype(sample, skipna=False) != 'string':
+        # Tipos mistos: apenas strings contam como texto
+        strings = pd.Series([value for value in sample if isinstance(value, str)], dtype=object)
+        if strings.empty:
+            return 0.0
+
+    numeric = strings.str.strip().str.replace('.', '', regex=False).str.replace(',', '', regex=False).str.isdigit()
+    return float((~numeric).sum()) / len(sample)
+
+
+def _classify(series: pd.Series, arrow_type: Optional[pa.DataType]) -> ColumnProfile:
+    name = series.name
+    if arrow_type is not None and not _is_string_type(arrow_type) and not pa.types.is_null(arrow_type):
+        if pa.types.is_integer(arrow_type) or pa.types.is_floating(arrow_type) or pa.types.is_decimal(arrow_type):
+            kind = NUMERIC
+        elif pa.types.is_timestamp(arrow_type) or pa.types.is_date(arrow_type):
+            kind = DATETIME
+        else:
+            kind = OTHER
+        return ColumnProfile(name, kind, str(arrow_type), 0.0)
+
+    share = _text_share(series)
+    if share > TEXT_SHARE_THRESHOLD:
+        kind = TEXT
+    elif share == 0.0 and arrow_type is not None and _is_string_type(arrow_type):
+        kind = CODE
+    else:
+        kind = OTHER
+    return ColumnProfile(name, kind, str(arrow_type) if arrow_type is not None else None, share)
+
+
+class DatasetProfile:
+    """
+    Classificação de todas as colunas de um dataset.
+
+    - text_columns: colunas de texto (normalizadas e indexadas)
+    - code_columns: códigos numéricos em string (ex.: Cod_Cliente), que não
+      passam pela normalização
+    """
+
+    def __init__(self, df: pd.DataFrame):
+        arrow_types = _arrow_types(df)
+        self.columns: Dict[str, ColumnProfile] = {
+            col: _classify(df[col], arrow_types.get(col)) for col in df.columns
+        }
+        self.text_columns: List[str] = [col for col, profile in self.columns.items() if profile.kind == TEXT]
+        self.code_columns: List[str] = [col for col, profile in self.columns.items() if profile.kind == CODE]
+
+    def kind(self, column: str) -> Optional[str]:
+        profile = self.columns.get(column)
+        return profile.kind if profile else None
+
+    def summary(self) -> Dict[str, List[str]]:
+        """Colunas agrupadas por classificação (para debug)"""
+        grouped: Dict[str, List[str]] = {}
+        for col, profile in self.columns.items():
+            grouped.setdefault(profile.kind, []).append(col)
+        return grouped
+
+
+# Registro global: fingerprint do dataset -> perfil
+_profile_registry: "OrderedDict[str, DatasetProfile]" = OrderedDict()
+_profile_lock = threading.Lock()
+
+
+def get_dataset_profile(df: pd.DataFrame) -> DatasetProfile:
+    """
+    Retorna o perfil do dataset, construindo-o na primeira chamada
+
+    Args:
+        df: DataFrame do dataset
+
+    Returns:
+        DatasetProfile compartilhado por todas as sessões com o mesmo dataset
+    """
+    fingerprint = calcular_fingerprint_dataset(df)
+    with _profile_lock:
+        profile = _profile_registry.get(fingerprint)
+        if profile is not None:
+            _profile_registry.move_to_end(fingerprint)
+            return profile
+
+    profile = DatasetProfile(df)
+    with _profile_lock:
+        _profile_registry[fingerprint] = profile
+        while len(_profile_registry) > MAX_CACHED_PROFILES:
+            _profile_registry.popitem(last=False)
+    return profile
+
+
+def reset_dataset_profiles():
+    """Descarta os perfis em cache (útil para testes)"""
+    with _profile_lock:
+        _profile_registry.clear()
@@ -0,0 +1,295 @@
+"""
+Estatísticas de cardinalidade do dataset
+Contagens e faturamento por valor das colunas filtráveis, histograma mensal de
+datas e contagens conjuntas de pares comuns, construídos uma vez na carga do
+dataset para estimar instantaneamente o impacto de um conjunto de filtros
+"""
+
+import threading
+import unicodedata
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from config.agent_config import COLUMN_HIERARCHY
+from .json_filter_manager import calcular_fingerprint_dataset
+
+
+VALUE_COLUMN = 'Valor_Vendido'
+DATE_COLUMN = 'Data'
+
+# Chaves temporais do contexto convertidas em intervalo de datas
+DATE_KEYS = ('Data', 'Data_>=', 'Data_>', 'Data_<', 'Data_<=')
+
+# Pares frequentes na conversa: respondidos com contagens conjuntas exatas
+JOINT_PAIRS = [
+    ('UF_Cliente', 'Municipio_Cliente'),
+    ('UF_Cliente', 'Des_Linha_Produto'),
+    ('UF_Cliente', 'Cod_Segmento_Cliente'),
+    ('Des_Linha_Produto', 'Cod_Segmento_Cliente'),
+]
+
+# Máximo de datasets com estatísticas em memória (chave: fingerprint)
+MAX_CACHED_STATS = 4
+
+
+def normalize_stat_key(value: Any) -> str:
+    """Chave de comparação: sem acentos, maiúsculas e sem espaços nas pontas"""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    text = unicodedata.normalize('NFKD', str(value))
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return text.upper().strip()
+
+
+def _aggregate_by_key(keys: pd.Series, revenue: np.ndarray) -> Dict[str, Tuple[int, float]]:
+    """Contagem e soma de faturamento por chave normalizada (normaliza só os valores distintos)"""
+    codes, uniques = pd.factorize(keys)
+    valid = codes >= 0
+    counts = np.bincount(codes[valid], minlength=len(uniques))
+    sums = np.bincount(codes[valid], weights=revenue[valid], minlength=len(uniques))
+
+    aggregated: Dict[str, Tuple[int, float]] = {}
+    for unique, count, total in zip(uniques, counts, sums):
+        key = normalize_stat_key(unique)
+        prev_count, prev_total = aggregated.get(key, (0, 0.0))
+        aggregated[key] = (prev_count + int(count), prev_total + float(total))
+    return aggregated
+
+
+def _aggregate_pair(first: pd.Series, second: pd.Series, revenue: np.ndarray) -> Dict[Tuple[str, str], Tuple[int, float]]:
+    """Contagem e faturamento conjuntos para um par de colunas"""
+    first_codes, first_uniques = pd.factorize(first)
+    second_codes, second_uniques = pd.factorize(second)
+    valid = (first_codes >= 0) & (second_codes >= 0)
+
+    combined = first_codes[valid].astype(np.int64) * len(second_uniques) + second_codes[valid]
+    pair_codes, inverse = np.unique(combined, return_inverse=True)
+    counts = np.bincount(inverse)
+    sums = np.bincount(inverse, weights=revenue[valid])
+
+    first_keys = [normalize_stat_key(v) for v in first_uniques]
+    second_keys = [normalize_stat_key(v) for v in second_uniques]
+    aggregated: Dict[Tuple[str, str], Tuple[int, float]] = {}
+    for code, count, total in zip(pair_codes, counts, sums):
+        key = (first_keys[code // len(second_uniques)], second_keys[code % len(second_uniques)])
+        prev_count, prev_total = aggregated.get(key, (0, 0.0))
+        aggregated[key] = (prev_count + int(count), prev_total + float(total))
+    return aggregated
+
+
+def _parse_date(value: Any) -> Optional[date]:
+    """Converte valores de contexto (ex.: '2024-01-01') em date"""
+    try:
+        return pd.Timestamp(str(value)[:10]).date()
+    except (ValueError, TypeError):
+        return None
+
+
+class DatasetStats:
+    """
+    Estatísticas pré-computadas para estimar linhas e faturamento de filtros.
+
+    - column_stats: coluna -> chave normalizada -> (linhas, faturamento)
+    - monthly: 'YYYY-MM' -> (linhas, faturamento)
+    - joint_stats: (coluna_a, coluna_b) -> (chave_a, chave_b) -> (linhas, faturamento)
+
+    Filtros em colunas diferentes são combinados assumindo independência,
+    exceto pares presentes em joint_stats, que usam a contagem conjunta exata.
+    """
+
+    def __init__(self, df: pd.DataFrame, columns: Optional[Iterable[str]] = None,
+                 joint_pairs: Optional[List[Tuple[str, str]]] = None):
+        if columns is None:
+            columns = [col for cols in COLUMN_HIERARCHY.values() for col in cols]
+        self.columns = [col for col in columns if col in df.columns]
+
+        revenue = (df[VALUE_COLUMN].fillna(0).to_numpy(dtype=float)
+                   if VALUE_COLUMN in df.columns else np.zeros(len(df)))
+        self.total_rows = int(len(df))
+        self.total_revenue = float(revenue.sum())
+
+        self.column_stats = {col: _aggregate_by_key(df[col], revenue) for col in self.columns}
+
+        self.joint_stats = {}
+        for first, second in (JOINT_PAIRS if joint_pairs is None else joint_pairs):
+            if first in self.columns and second in self.columns:
+                self.joint_stats[(first, second)] = _aggregate_pair(df[first], df[second], revenue)
+
+        self.monthly: Dict[str, Tuple[int, float]] = {}
+        if DATE_COLUMN in df.columns:
+            months = pd.to_datetime(df[DATE_COLUMN]).dt.strftime('%Y-%m')
+            self.monthly = dict(sorted(_aggregate_by_key(months, revenue).items()))
+
+        # Limites [início, fim) de cada mês, pré-calculados para o rateio
+        self._month_bounds = []
+        for month, (count, total) in self.monthly.items():
+            month_start = date(int(month[:4]), int(month[5:7]), 1)
+            month_end = date(month_start.year + month_start.month // 12, month_start.month % 12 + 1, 1)
+            self._month_bounds.append((month_start, month_end, count, total))
+
+    def _column_share(self, column: str, values: List[Any]) -> Tuple[float, float]:
+        """Fração de linhas e de faturamento cobertas pelos valores de uma coluna"""
+        stats = self.column_stats[column]
+        rows = revenue = 0.0
+        for key in {normalize_stat_key(v) for v in values}:
+            count, total = stats.get(key, (0, 0.0))
+            rows += count
+            revenue += total
+        return self._shares(rows, revenue)
+
+    def _pair_share(self, pair: Tuple[str, str], first_values: List[Any], second_values: List[Any]) -> Tuple[float, float]:
+        """Fração de linhas e de faturamento pela contagem conjunta do par"""
+        stats = self.joint_stats[pair]
+        rows = revenue = 0.0
+        for first in {normalize_stat_key(v) for v in first_values}:
+            for second in {normalize_stat_key(v) for v in second_values}:
+                count, total = stats.get((first, second), (0, 0.0))
+                rows += count
+                revenue += total
+        return self._shares(rows, revenue)
+
+    def _date_share(self, start: Optional[date], end: Optional[date]) -> Tuple[float, float, bool]:
+        """
+        Fração de linhas e faturamento no intervalo [start, end)
+
+        Meses parcialmente cobertos são rateados pelos dias (estimativa).
+        """
+        rows = revenue = 0.0
+        exact = True
+        for month_start, month_end, count, total in self._month_bounds:
+            overlap_start = max(month_start, start) if start else month_start
+            overlap_end = min(month_end, end) if end else month_end
+            if overlap_end <= overlap_start:
+                continue
+            fraction = (overlap_end - overlap_start).days / (month_end - month_start).days
+            if fraction < 1:
+                exact = False
+            rows += count * fraction
+            revenue += total * fraction
+        rows_share, revenue_share = self._shares(rows, revenue)
+        return rows_share, revenue_share, exact
+
+    def _shares(self, rows: float, revenue: float) -> Tuple[float, float]:
+        rows_share = rows / self.total_rows if self.total_rows else 0.0
+        revenue_share = revenue / self.total_revenue if self.total_revenue else 0.0
+        return rows_share, revenue_share
+
+    @staticmethod
+    def _date_interval(context: Dict[str, Any]) -> Tuple[Optional[date], Optional[date], bool]:
+        """Intervalo [início, fim) a partir das chaves temporais do contexto"""
+        start = end = None
+        found = False
+        for key, value in context.items():
+            parsed = _parse_date(value) if key in DATE_KEYS else None
+            if parsed is None:
+                continue
+            found = True
+            if key == 'Data':
+                start, end = parsed, parsed + timedelta(days=1)
+            elif key == 'Data_>=':
+                start = parsed
+            elif key == 'Data_>':
+                start = parsed + timedelta(days=1)
+            elif key == 'Data_<':
+                end = parsed
+            elif key == 'Data_<=':
+                end = parsed + timedelta(days=1)
+        return start, end, found
+
+    def estimate(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Estima linhas e faturamento cobertos por um persistent_context
+
+        Args:
+            context: Filtros ativos (ex.: {'UF_Cliente': 'SP', 'Data_>=': '2024-01-01'})
+
+        Returns:
+            Dict com rows, revenue, selectivity, exact (sem hipótese de
+            independência nem rateio) e ignored (chaves sem estatística)
+        """
+        column_filters = {}
+        ignored = []
+        for key, value in (context or {}).items():
+            if value is None or value == "" or value == []:
+                continue
+            if key in self.column_stats:
+                column_filters[key] = value if isinstance(value, list) else [value]
+            elif key not in DATE_KEYS or _parse_date(value) is None:
+                # Inclui chaves temporais desconhecidas ou com data inválida
+                ignored.append(key)
+
+        factors: List[Tuple[float, float]] = []
+        # Filtros ignorados tornam o resultado uma cota superior, não um valor exato
+        exact = not ignored
+
+        # Pares com contagem conjunta primeiro
+        for pair in self.joint_stats:
+            if pair[0] in column_filters and pair[1] in column_filters:
+                factors.append(self._pair_share(pair, column_filters.pop(pair[0]), column_filters.pop(pair[1])))
+
+        for column, values in column_filters.items():
+            factors.append(self._column_share(column, values))
+
+        start, end, has_dates = self._date_interval(context or {})
+        if has_dates and self.monthly:
+            rows_share, revenue_share, dates_exact = self._date_share(start, end)
+            factors.append((rows_share, revenue_share))
+            exact = exact and dates_exact
+        elif has_dates:
+            exact = False
+
+        # Mais de um fator: combinação por independência (estimativa)
+        exact = exact and len(factors) <= 1
+
+        selectivity = float(np.prod([f[0] for f in factors])) if factors else 1.0
+        revenue_share = float(np.prod([f[1] for f in factors])) if factors else 1.0
+
+        return {
+            "rows": int(round(selectivity * self.total_rows)),
+            "revenue": revenue_share * self.total_revenue,
+            "selectivity": selectivity,
+            "exact": exact,
+            "ignored": ignored
+        }
+
+
+# Registro global: fingerprint do dataset -> estatísticas
+_stats_registry: "OrderedDict[str, DatasetStats]" = OrderedDict()
+_stats_lock = threading.Lock()
+
+
+def get_dataset_stats(df: pd.DataFrame) -> DatasetStats:
+    """
+    Retorna as estatísticas do dataset, construindo-as na primeira chamada
+
+    Args:
+        df: DataFrame do dataset
+
+    Returns:
+        DatasetStats compartilhado por todas as sessões com o mesmo dataset
+    """
+    fingerprint = calcular_fingerprint_dataset(df)
+    with _stats_lock:
+        stats = _stats_registry.get(fingerprint)
+        if stats is not None:
+            _stats_registry.move_to_end(fingerprint)
+            return stats
+
+    stats = DatasetStats(df)
+    with _stats_lock:
+        _stats_registry[fingerprint] = stats
+        while len(_stats_registry) > MAX_CACHED_STATS:
+            _stats_registry.popitem(last=False)
+    return stats
+
+
+def reset_dataset_stats():
+    """Descarta as estatísticas em cache (útil para testes)"""
+    with _stats_lock:
+        _stats_registry.clear()
@@ -0,0 +1,264 @@
+"""
+Resolução aproximada de entidades (municípios, linhas de produto, segmentos...)
+Índice invertido de trigramas de caracteres sobre os valores distintos
+normalizados de cada coluna, em layout CSR. A similaridade de Jaccard entre os
+trigramas da consulta e os de todos os valores é calculada de uma vez com
+numpy (contagem das interseções por bincount), sem varrer os valores
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from .dataset_stats import normalize_stat_key
+from .json_filter_manager import calcular_fingerprint_dataset
+from .value_autocomplete import QUESTION_STOPWORDS
+
+
+FUZZY_COLUMNS = ['Municipio_Cliente', 'Des_Linha_Produto', 'Cod_Segmento_Cliente', 'Cod_Regiao_Vendedor']
+
+TRIGRAM_SIZE = 3
+
+# Similaridade mínima para aceitar um valor aproximado (validação de filtros)
+MIN_FUZZY_SCORE = 0.5
+
+# Similaridade mínima para sugerir um valor a partir de um trecho da pergunta
+MIN_QUESTION_SCORE = 0.6
+
+# Máximo de datasets indexados em memória (chave: fingerprint)
+MAX_CACHED_RESOLVERS = 4
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+class FuzzyMatch(NamedTuple):
+    """Valor do dataset semelhante à consulta"""
+    column: str
+    value: Any  # valor como aparece no dataset (variação mais frequente)
+    score: float  # Jaccard dos trigramas (1.0 = mesma chave normalizada)
+    count: int  # linhas com o valor
+
+
+def fuzzy_key(value: Any) -> str:
+    """Chave de comparação: minúsculas, sem acentos e com espaços simples"""
+    return " ".join(normalize_stat_key(value).lower().split())
+
+
+def _trigrams(key: str) -> set:
+    """Trigramas da chave com uma borda de espaço (palavras curtas também geram trigramas)"""
+    padded = f" {key} "
+    return {padded[i:i + TRIGRAM_SIZE] for i in range(len(padded) - TRIGRAM_SIZE + 1)}
+
+
+class ColumnTrigramIndex:
+    """
+    Índice de trigramas de uma coluna.
+
+    keys[i] é a chave normalizada do valor i; os valores que contêm o
+    trigrama t são postings[offsets[t]:offsets[t + 1]] e sizes[i] é o número
+    de trigramas distintos do valor i.
+    """
+
+    def __init__(self, column: str, series: pd.Series):
+        self.column = column
+        counts = series.dropna().value_counts(sort=False)
+
+        # Valores distintos após normalização (soma das frequências das variações)
+        grouped: Dict[str, List] = {}
+        for value, count in counts.items():
+            key = fuzzy_key(value)
+            if not key:
+                continue
+            entry = grouped.setdefault(key, [value, 0, 0])
+            entry[1] += int(count)
+            if count > entry[2]:
+                entry[0], entry[2] = value, int(count)  # variação mais frequente para exibir
+
+        self.keys: List[str] = list(grouped)
+        self.slots: Dict[str, int] = {key: slot for slot, key in enumerate(self.keys)}
+        self.values = [entry[0] for entry in grouped.values()]
+        self.counts = np.array([entry[1] for entry in grouped.values()], dtype=np.int64)
+        self.words = frozenset(word for key in self.keys for word in key.split())
+        self.max_words = max((len(key.split()) for key in self.keys), default=0)
+
+        vocabulary: Dict[str, int] = {}
+        pairs: List[tuple] = []
+        sizes = []
+        for slot, key in enumerate(self.keys):
+            trigrams = _trigrams(key)
+            sizes.append(len(trigrams))
+            for trigram in trigrams:
+                pairs.append((vocabulary.setdefault(trigram, len(vocabulary)), slot))
+
+        self.vocabulary = vocabulary
+        self.sizes = np.array(sizes, dtype=np.int32)
+        trigram_ids = np.array([pair[0] for pair in pairs], dtype=np.int64)
+        slots = np.array([pair[1] for pair in pairs], dtype=np.int32)
+        order = np.argsort(trigram_ids, kind='stable')
+        self.postings = slots[order]
+        self.offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(trigram_ids, minlength=len(vocabulary)), out=self.offsets[1:])
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def scores(self, key: str) -> np.ndarray:
+        """Jaccard entre os trigramas da chave e os de todos os valores da coluna"""
+        query = _trigrams(key)
+        ids = [self.vocabulary[t] for t in query if t in self.vocabulary]
+        if not ids:
+            return np.zeros(len(self.keys), dtype=np.float64)
+        hits = np.concatenate([self.postings[self.offsets[i]:self.offsets[i + 1]] for i in ids])
+        intersection = np.bincount(hits, minlength=len(self.keys))
+        return intersection / (len(query) + self.sizes - intersection)
+
+    def search(self, text: str, k: int = 5, min_score: float = MIN_FUZZY_SCORE) -> List[FuzzyMatch]:
+        """
+        Valores mais parecidos com o texto
+
+        Args:
+            text: Texto informado (sem diferenciar maiúsculas e acentos)
+            k: Máximo de resultados
+            min_score: Similaridade mínima
+
+        Returns:
+            Lista de FuzzyMatch, mais parecidos (e mais frequentes) primeiro
+        """
+        key = fuzzy_key(text)
+        if not key or not self.keys:
+            return []
+        slot = self.slots.get(key)
+        if slot is not None:
+            return [FuzzyMatch(self.column, self.values[slot], 1.0, int(self.counts[slot]))]
+
+        scores = self.scores(key)
+        candidates = np.flatnonzero(scores >= min_score)
+        if len(candidates) > k:
+            candidates = candidates[np.argpartition(-scores[candidates], k - 1)[:k]]
+        ordered = sorted(candidates.tolist(), key=lambda s: (-scores[s], -self.counts[s]))
+        return [FuzzyMatch(self.column, self.values[s], float(scores[s]), int(self.counts[s])) for s in ordered]
+
+
+class EntityResolver:
+    """Resolução aproximada sobre as colunas de entidades de um dataset"""
+
+    def __init__(self, df: pd.DataFrame, columns: Optional[Iterable[str]] = None):
+        self.indexes: Dict[str, ColumnTrigramIndex] = {
+            column: ColumnTrigramIndex(column, df[column])
+            for column in (columns or FUZZY_COLUMNS)
+            if column in df.columns
+        }
+        self.words = frozenset(word for index in self.indexes.values() for word in index.words)
+        self.max_words = max((index.max_words for index in self.indexes.values()), default=0)
+
+    def resolve(self, text: str, column: Optional[str] = None, k: int = 5,
+                min_score: float = MIN_FUZZY_SCORE) -> List[FuzzyMatch]:
+        """
+        Top-k valores semelhantes ao texto (ex.: 'sao jose dos campo' -> São José dos Campos)
+
+        Args:
+            text: Nome possivelmente com erro de digitação
+            column: Restringe a uma coluna; None busca em todas
+            k: Máximo de resultados
+            min_score: Similaridade mínima (Jaccard dos trigramas)
+
+        Returns:
+            Lista de FuzzyMatch ordenada pela similaridade
+        """
+        if column is not None:
+            index = self.indexes.get(column)
+            return index.search(text, k, min_score) if index else []
+
+        matches = [m for index in self.indexes.values() for m in index.search(text, k, min_score)]
+        matches.sort(key=lambda m: (-m.score, -m.count))
+        return matches[:k]
+
+    def best(self, column: str, text: str, min_score: float = MIN_FUZZY_SCORE) -> Optional[Any]:
+        """Valor mais parecido da coluna ou None"""
+        matches = self.resolve(text, column, k=1, min_score=min_score)
+        return matches[0].value if matches else None
+
+    def resolve_question(self, text: str, k: int = 3,
+                         min_score: float = MIN_QUESTION_SCORE) -> Dict[str, List[FuzzyMatch]]:
+        """
+        Trechos da pergunta que parecem nomes do dataset digitados com erro
+
+        Só considera trechos com ao menos uma palavra desconhecida (que não
+        aparece em nenhum valor), sem palavras de ligação nas pontas e com no
+        máximo tantas palavras quanto o maior valor. Trechos sobrepostos ficam
+        com o de maior similaridade.
+
+        Args:
+            text: Pergunta do usuário
+            k: Máximo de valores por trecho
+            min_score: Similaridade mínima
+
+        Returns:
+            Dict trecho normalizado -> valores sugeridos
+        """
+        words = WORD_PATTERN.findall(fuzzy_key(text))
+        candidates = []
+        for start in range(len(words)):
+            if words[start] in QUESTION_STOPWORDS or words[start].isdigit():
+                continue
+            for end in range(start + 1, min(len(words), start + self.max_words) + 1):
+                span = words[start:end]
+                if span[-1] in QUESTION_STOPWORDS:
+                    continue
+                if all(word in self.words for word in span):
+                    continue
+                matches = self.resolve(" ".join(span), k=k, min_score=min_score)
+                if matches and matches[0].score < 1.0:
+                    candidates.append((matches[0].score, start, end, matches))
+
+        # Trechos sem sobreposição, mais parecidos primeiro
+        resolved: Dict[str, List[FuzzyMatch]] = {}
+        covered = set()
+        for score, start, end, matches in sorted(candidates, key=lambda c: (-c[0], c[1] - c[2])):
+            positions = set(range(start, end))
+            if positions & covered:
+                continue
+            covered |= positions
+            resolved[" ".join(words[start:end])] = matches
+        return resolved
+
+
+# Registro global: fingerprint do dataset -> resolvedor
+_resolver_registry: "OrderedDict[str, EntityResolver]" = OrderedDict()
+_resolver_lock = threading.Lock()
+
+
+def get_entity_resolver(df: pd.DataFrame, fingerprint: Optional[str] = None) -> EntityResolver:
+    """
+    Retorna o resolvedor do dataset, construindo-o na primeira chamada
+
+    Args:
+        df: DataFrame do dataset
+        fingerprint: Fingerprint já calculado (evita recalcular)
+
+    Returns:
+        EntityResolver compartilhado por todas as sessões com o mesmo dataset
+    """
+    fingerprint = fingerprint or calcular_fingerprint_dataset(df)
+    with _resolver_lock:
+        resolver = _resolver_registry.get(fingerprint)
+        if resolver is not None:
+            _resolver_registry.move_to_end(fingerprint)
+            return resolver
+
+    resolver = EntityResolver(df)
+    with _resolver_lock:
+        _resolver_registry[fingerprint] = resolver
+        while len(_resolver_registry) > MAX_CACHED_RESOLVERS:
+            _resolver_registry.popitem(last=False)
+    return resolver
+
+
+def reset_entity_resolvers():
+    """Descarta os resolvedores em cache (útil para testes)"""
+    with _resolver_lock:
+        _resolver_registry.clear()
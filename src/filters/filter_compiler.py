@@ -0,0 +1,293 @@
+"""
+Compilador de filtros persistentes
+Converte o persistent_context do agente em um predicado SQL parametrizado e
+mantém a view dados_filtrados na conexão DuckDB do agente, recriada apenas
+quando o contexto muda e apoiada em uma fatia materializada quando o contexto
+se mantém estável
+"""
+
+import hashlib
+import json
+import threading
+import uuid
+from typing import Any, Dict, List, Optional
+
+import duckdb
+
+from .slice_cache import MATERIALIZE_AFTER_TURNS, SliceCache, get_slice_cache, table_memory_bytes
+
+
+BASE_TABLE_NAME = 'dados_comerciais'
+FILTERED_VIEW_NAME = 'dados_filtrados'
+SLICE_TABLE_PREFIX = 'fatia_'
+DATE_COLUMN = 'Data'
+
+# Chaves de intervalo temporal do contexto -> operador SQL
+DATE_RANGE_OPERATORS = {
+    'Data_>=': '>=',
+    'Data_>': '>',
+    'Data_<': '<',
+    'Data_<=': '<=',
+}
+
+# Tipos comparados como texto (sem diferenciar maiúsculas e acentos)
+TEXT_TYPES = {'VARCHAR'}
+
+
+def _quote_identifier(name: str) -> str:
+    """Identificador SQL entre aspas duplas"""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _sql_literal(value: Any) -> str:
+    """Literal SQL seguro para um parâmetro (views do DuckDB não aceitam parâmetros)"""
+    if isinstance(value, bool):
+        return 'TRUE' if value else 'FALSE'
+    if isinstance(value, (int, float)):
+        return repr(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+class CompiledFilter:
+    """
+    Predicado compilado a partir do contexto de filtros.
+
+    clauses usam placeholders '?' na ordem de params; applied lista as chaves
+    do contexto representadas no predicado e skipped as que não puderam ser
+    compiladas (ex.: 'periodo' em texto livre), que continuam indo ao prompt.
+    """
+
+    def __init__(self, clauses: List[str], params: List[Any], applied: Dict[str, Any], skipped: Dict[str, Any]):
+        self.clauses = clauses
+        self.params = params
+        self.applied = applied
+        self.skipped = skipped
+
+    @property
+    def predicate(self) -> str:
+        """Predicado parametrizado (TRUE quando não há filtros)"""
+        return " AND ".join(self.clauses) if self.clauses else "TRUE"
+
+    @property
+    def fingerprint(self) -> str:
+        """Identifica o predicado efetivo (contextos equivalentes -> mesmo fingerprint)"""
+        payload = json.dumps([self.predicate, self.params], ensure_ascii=False, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    def to_sql(self) -> str:
+        """Predicado com os parâmetros embutidos como literais"""
+        parts = self.predicate.split('?')
+        rendered = [parts[0]]
+        for param, part in zip(self.params, parts[1:]):
+            rendered.append(_sql_literal(param))
+            rendered.append(part)
+        return "".join(rendered)
+
+
+def compile_filter_context(context: Dict[str, Any], column_types: Dict[str, str]) -> CompiledFilter:
+    """
+    Compila o contexto persistente em predicado SQL parametrizado
+
+    Args:
+        context: persistent_context do agente (ex.: {'UF_Cliente': 'SP', 'Data_>=': '2024-01-01'})
+        column_types: Coluna -> tipo DuckDB da tabela base
+
+    Returns:
+        CompiledFilter com cláusulas, parâmetros e chaves aplicadas/ignoradas
+    """
+    clauses: List[str] = []
+    params: List[Any] = []
+    applied: Dict[str, Any] = {}
+    skipped: Dict[str, Any] = {}
+
+    # Ordem estável: contextos com as mesmas chaves geram o mesmo predicado
+    for key in sorted(context):
+        value = context[key]
+        if value is None or value == "" or value == []:
+            continue
+
+        if key in DATE_RANGE_OPERATORS and DATE_COLUMN in column_types:
+            clauses.append(f"{_quote_identifier(DATE_COLUMN)} {DATE_RANGE_OPERATORS[key]} CAST(? AS DATE)")
+            params.append(str(value)[:10])
+            applied[key] = value
+            continue
+
+        if key == DATE_COLUMN and DATE_COLUMN in column_types and not isinstance(value, list):
+            clauses.append(f"CAST({_quote_identifier(DATE_COLUMN)} AS DATE) = CAST(? AS DATE)")
+            params.append(str(value)[:10])
+            applied[key] = value
+            continue
+
+        if key not in column_types or key == DATE_COLUMN:
+            skipped[key] = value
+            continue
+
+        values = value if isinstance(value, list) else [value]
+        column = _quote_identifier(key)
+        column_type = column_types[key]
+        if column_type in TEXT_TYPES:
+            placeholders = ", ".join("strip_accents(LOWER(?))" for _ in values)
+            clauses.append(f"strip_accents(LOWER({column})) IN ({placeholders})")
+            params.extend(str(v) for v in values)
+        else:
+            placeholders = ", ".join(f"TRY_CAST(? AS {column_type})" for _ in values)
+            clauses.append(f"{column} IN ({placeholders})")
+            params.extend(values)
+        applied[key] = value
+
+    return CompiledFilter(clauses, params, applied, skipped)
+
+
+class FilteredView:
+    """
+    View dados_filtrados de uma conexão DuckDB (uma por agente/sessão).
+
+    A view é persistente (não TEMP) para ser visível também nos cursores usados
+    por run_queries, e só é recriada quando o fingerprint do predicado muda.
+
+    Após materialize_after turnos consecutivos com o mesmo predicado, a fatia
+    filtrada é gravada em uma tabela (também não TEMP, pelo mesmo motivo) e a
+    view passa a ler dela. A fatia é descartada quando os filtros mudam ou
+    quando o SliceCache global a libera para abrir espaço; o lock da view
+    serializa as alterações de view e fatia na conexão.
+    """
+
+    def __init__(self, connection, base_table: str = BASE_TABLE_NAME, view_name: str = FILTERED_VIEW_NAME,
+                 materialize_after: int = MATERIALIZE_AFTER_TURNS, slice_cache: Optional[SliceCache] = None):
+        self.connection = connection
+        self.base_table = base_table
+        self.view_name = view_name
+        self.fingerprint: Optional[str] = None
+        self.compiled: Optional[CompiledFilter] = None
+        self.rebuilds = 0
+        self._column_types: Optional[Dict[str, str]] = None
+
+        self.materialize_after = materialize_after
+        self.slice_cache = slice_cache
+        self.stable_turns = 0
+        self.slice_table: Optional[str] = None
+        self.materializations = 0
+        self._slice_owner = uuid.uuid4().hex[:12]
+        self._release_pending = False
+        self._lock = threading.RLock()
+
+    def column_types(self) -> Optional[Dict[str, str]]:
+        """Tipos das colunas da tabela base (None enquanto a tabela não existe)"""
+        if self._column_types is None:
+            rows = self.connection.execute(
+                "SELECT column_name, data_type FROM duckdb_columns() WHERE table_name = ?",
+                [self.base_table]
+            ).fetchall()
+            if rows:
+                self._column_types = dict(rows)
+        return self._column_types
+
+    def sync(self, context: Dict[str, Any]) -> Optional[CompiledFilter]:
+        """
+        Garante que a view reflete o contexto (chamado uma vez por turno)
+
+        Args:
+            context: persistent_context atual
+
+        Returns:
+            CompiledFilter aplicado ou None se a view não pôde ser criada
+        """
+        column_types = self.column_types()
+        if not column_types:
+            return None
+
+        compiled = compile_filter_context(context or {}, column_types)
+        with self._lock:
+            self._drop_pending_release()
+
+            if compiled.fingerprint != self.fingerprint:
+                self._drop_slice(self.connection)
+                try:
+                    self._point_view(self.connection, self._base_select(compiled))
+                except duckdb.Error:
+                    self.fingerprint = None
+                    self.compiled = None
+                    self.stable_turns = 0
+                    return None
+                self.fingerprint = compiled.fingerprint
+                self.rebuilds += 1
+                self.stable_turns = 1
+            else:
+                self.stable_turns += 1
+
+            self.compiled = compiled
+            if self.slice_table is not None:
+                self._cache().touch(self._slice_owner)
+            elif compiled.clauses and self.stable_turns >= self.materialize_after:
+                self._materialize(compiled)
+
+            # Liberação pedida por outra sessão durante este sync
+            self._drop_pending_release()
+        return compiled
+
+    def _cache(self) -> SliceCache:
+        return self.slice_cache if self.slice_cache is not None else get_slice_cache()
+
+    def _base_select(self, compiled: CompiledFilter) -> str:
+        return f"SELECT * FROM {_quote_identifier(self.base_table)} WHERE {compiled.to_sql()}"
+
+    def _point_view(self, connection, select_sql: str):
+        connection.execute(f"CREATE OR REPLACE VIEW {_quote_identifier(self.view_name)} AS {select_sql}")
+
+    def _materialize(self, compiled: CompiledFilter):
+        """Grava a fatia filtrada em uma tabela e aponta a view para ela"""
+        table = _quote_identifier(f"{SLICE_TABLE_PREFIX}{self._slice_owner}")
+        try:
+            # Tamanho real da fatia: memória das tabelas antes e depois de gravá-la
+            used_before = table_memory_bytes(self.connection)
+            self.connection.execute(f"CREATE OR REPLACE TABLE {table} AS {self._base_select(compiled)}")
+            size_bytes = max(table_memory_bytes(self.connection) - used_before, 0)
+        except duckdb.Error:
+            return
+
+        if not self._cache().register(self._slice_owner, size_bytes, self._release_slice):
+            # Fatia maior que o orçamento inteiro: continuar lendo da tabela base
+            self.connection.execute(f"DROP TABLE IF EXISTS {table}")
+            return
+
+        self._point_view(self.connection, f"SELECT * FROM {table}")
+        self.slice_table = f"{SLICE_TABLE_PREFIX}{self._slice_owner}"
+        self.materializations += 1
+
+    def _drop_slice(self, connection):
+        """Volta a view para a tabela base e remove a fatia (chamado com o lock)"""
+        if self.slice_table is None:
+            return
+        self._cache().discard(self._slice_owner)
+        if self.compiled is not None:
+            self._point_view(connection, self._base_select(self.compiled))
+        connection.execute(f"DROP TABLE IF EXISTS {_quote_identifier(self.slice_table)}")
+        self.slice_table = None
+        self.stable_turns = 0
+
+    def _drop_pending_release(self):
+        """Remove a fatia liberada pelo SliceCache enquanto a view estava ocupada (chamado com o lock)"""
+        if self._release_pending:
+            self._release_pending = False
+            self._drop_slice(self.connection)
+
+    def _release_slice(self):
+        """
+        Liberação pedida pelo SliceCache (pode vir da thread de outra sessão)
+
+        Remove a tabela na hora, com o lock da view e em um cursor próprio.
+        Se a view está ocupada (sync em andamento, possivelmente registrando
+        outra fatia e aguardando este mesmo cache), apenas marca a fatia para
+        o dono removê-la ao fim do sync em andamento ou no próximo.
+        """
+        if not self._lock.acquire(blocking=False):
+            self._release_pending = True
+            return
+        try:
+            cursor = self.connection.cursor()
+            try:
+                self._drop_slice(cursor)
+            finally:
+                cursor.close()
+        finally:
+            self._lock.release()
@@ -7,7 +7,7 @@ import streamlit as st
 import sys
 import os
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 
 
 def apply_disabled_filters_to_context(context_dict, disabled_filters=None):
@@ -100,9 +100,13 @@ def filter_user_friendly_context(context_dict):
     return filtered_context
 
 
-def create_interactive_filter_manager(context_dict):
+def create_interactive_filter_manager(context_dict, key_suffix: str = ""):
     """
     Cria interface interativa para gerenciar filtros na sidebar
+
+    Args:
+        context_dict: Contexto de filtros atual
+        key_suffix: Sufixo das chaves dos controles (permite redesenhar no mesmo ciclo)
     """
     if not context_dict or context_dict.get('sem_filtros') == 'consulta_geral':
         st.markdown("🔍 **Consulta Geral**\n\n*Nenhum filtro ativo*")
@@ -163,14 +167,14 @@ def create_interactive_filter_manager(context_dict):
             representative_filters.append((key, value))
 
     # Criar controles para cada categoria
-    _create_temporal_filter_controls(temporal_filters)
-    _create_region_filter_controls(region_filters)
-    _create_client_filter_controls(client_filters)
-    _create_product_filter_controls(product_filters)
-    _create_representative_filter_controls(representative_filters)
+    _create_temporal_filter_controls(temporal_filters, key_suffix)
+    _create_region_filter_controls(region_filters, key_suffix)
+    _create_client_filter_controls(client_filters, key_suffix)
+    _create_product_filter_controls(product_filters, key_suffix)
+    _create_representative_filter_controls(representative_filters, key_suffix)
 
 
-def _create_temporal_filter_controls(temporal_filters):
+def _create_temporal_filter_controls(temporal_filters, key_suffix=""):
     """Cria controles para filtros temporais"""
     if not temporal_filters:
         return
@@ -199,7 +203,7 @@ def _create_temporal_filter_controls(temporal_filters):
         enabled = st.checkbox(
             label=display_text,
             value=is_enabled,
-            key=f"checkbox_{filter_id}"
+            key=f"checkbox_{filter_id}{key_suffix}"
         )
 
         if enabled and filter_id in st.session_state.disabled_filters:
@@ -209,46 +213,46 @@ def _create_temporal_filter_controls(temporal_filters):
     else:
         # Filtros temporais individuais
         for key, value in temporal_filters:
-            _create_single_filter_control(key, value, _get_temporal_display_text)
+            _create_single_filter_control(key, value, _get_temporal_display_text, key_suffix)
 
 
-def _create_region_filter_controls(region_filters):
+def _create_region_filter_controls(region_filters, key_suffix=""):
     """Cria controles para filtros de região"""
     if not region_filters:
         return
 
     for key, value in region_filters:
-        _create_single_filter_control(key, value, _get_region_display_text)
+        _create_single_filter_control(key, value, _get_region_display_text, key_suffix)
 
 
-def _create_client_filter_controls(client_filters):
+def _create_client_filter_controls(client_filters, key_suffix=""):
     """Cria controles para filtros de cliente"""
     if not client_filters:
         return
 
     for key, value in client_filters:
-        _create_single_filter_control(key, value, _get_client_display_text)
+        _create_single_filter_control(key, value, _get_client_display_text, key_suffix)
 
 
-def _create_product_filter_controls(product_filters):
+def _create_product_filter_controls(product_filters, key_suffix=""):
     """Cria controles para filtros de produto"""
     if not product_filters:
         return
 
     for key, value in product_filters:
-        _create_single_filter_control(key, value, _get_product_display_text)
+        _create_single_filter_control(key, value, _get_product_display_text, key_suffix)
 
 
-def _create_representative_filter_controls(representative_filters):
+def _create_representative_filter_controls(representative_filters, key_suffix=""):
     """Cria controles para filtros de representante"""
     if not representative_filters:
         return
 
     for key, value in representative_filters:
-        _create_single_filter_control(key, value, _get_representative_display_text)
+        _create_single_filter_control(key, value, _get_representative_display_text, key_suffix)
 
 
-def _create_single_filter_control(key, value, display_text_func):
+def _create_single_filter_control(key, value, display_text_func, key_suffix=""):
     """Cria um controle de checkbox individual para um filtro"""
     filter_id = f"{key}:{value}"
     is_enabled = filter_id not in st.session_state.disabled_filters
@@ -258,7 +262,7 @@ def _create_single_filter_control(key, value, display_text_func):
     enabled = st.checkbox(
         label=display_text,
         value=is_enabled,
-        key=f"checkbox_{filter_id}"
+        key=f"checkbox_{filter_id}{key_suffix}"
     )
 
     if enabled and filter_id in st.session_state.disabled_filters:
@@ -417,13 +421,19 @@ def _get_representative_display_text(key, value):
 # Nota: Funções antigas removidas - agora usando sistema JSON Filter Manager
 
 
-def create_enhanced_filter_manager(context_dict: Dict, show_suggestions: bool = True) -> None:
+def create_enhanced_filter_manager(context_dict: Dict, show_suggestions: bool = True,
+                                   record_counter: Optional[Callable[[Dict], str]] = None,
+                                   filter_state=None) -> None:
     """
     Versão melhorada do gerenciador de filtros com funcionalidades automáticas
 
     Args:
         context_dict: Contexto atual dos filtros
         show_suggestions: Se deve mostrar sugestões de filtros
+        record_counter: Função que recebe os filtros habilitados e retorna o
+                        texto do contador de registros (atualizado a cada clique)
+        filter_state: FilterState da sessão; sua versão identifica os controles,
+                      permitindo redesenhar a sidebar no mesmo ciclo após um turno
     """
     if not context_dict or context_dict.get('sem_filtros') == 'consulta_geral':
         _render_empty_filter_state()
@@ -433,16 +443,24 @@ def create_enhanced_filter_manager(context_dict: Dict, show_suggestions: bool =
     if 'disabled_filters' not in st.session_state:
         st.session_state.disabled_filters = set()
 
-    # Limpeza automática de filtros obsoletos
-    _cleanup_obsolete_filters(context_dict)
+    version = filter_state.version if filter_state is not None else None
+
+    # Limpeza de filtros obsoletos apenas quando o contexto mudou de versão
+    if version is None or st.session_state.get('disabled_filters_version') != version:
+        _cleanup_obsolete_filters(context_dict)
+        st.session_state.disabled_filters_version = version
 
     # Header principal
     st.markdown("✅ **Filtros Ativos**")
 
     # Botão de limpeza
-    if st.button("🗑️ Limpar Todos os Filtros", key="clear_all_filters"):
+    key_suffix = f"_v{version}" if version is not None else ""
+    if st.button("🗑️ Limpar Todos os Filtros", key=f"clear_all_filters{key_suffix}"):
         st.session_state.disabled_filters = set()
-        st.session_state.last_context = {}
+        if filter_state is not None:
+            filter_state.clear()
+        else:
+            st.session_state.last_context = {}
         st.rerun()
 
     st.markdown("*Desmarque para ignorar na próxima consulta*")
@@ -454,7 +472,15 @@ def create_enhanced_filter_manager(context_dict: Dict, show_suggestions: bool =
     st.markdown("---")
 
     # Criar controles existentes
-    _create_enhanced_filter_controls(context_dict)
+    _create_enhanced_filter_controls(context_dict, key_suffix)
+
+    # Contador ao vivo dos registros cobertos pelos filtros habilitados
+    if record_counter is not None:
+        active_context = apply_disabled_filters_to_context(context_dict, st.session_state.disabled_filters)
+        try:
+            st.markdown(f"🔢 *{record_counter(active_context)}*")
+        except Exception:
+            pass
 
 
 def _render_empty_filter_state():
@@ -504,7 +530,7 @@ def _show_filter_analysis(context_dict: Dict):
             st.info("ℹ️ Muitos filtros ativos podem tornar os resultados muito específicos.")
 
 
-def _create_enhanced_filter_controls(context_dict: Dict):
+def _create_enhanced_filter_controls(context_dict: Dict, key_suffix: str = ""):
     """Cria controles de filtro com funcionalidades melhoradas"""
     # Categorizar filtros baseado na hierarquia completa
     temporal_filters = []
@@ -531,57 +557,57 @@ def _create_enhanced_filter_controls(context_dict: Dict):
             representative_filters.append((key, value))
 
     # Criar controles para cada categoria com contadores
-    _create_temporal_filter_controls_enhanced(temporal_filters)
-    _create_region_filter_controls_enhanced(region_filters)
-    _create_client_filter_controls_enhanced(client_filters)
-    _create_product_filter_controls_enhanced(product_filters)
-    _create_representative_filter_controls_enhanced(representative_filters)
+    _create_temporal_filter_controls_enhanced(temporal_filters, key_suffix)
+    _create_region_filter_controls_enhanced(region_filters, key_suffix)
+    _create_client_filter_controls_enhanced(client_filters, key_suffix)
+    _create_product_filter_controls_enhanced(product_filters, key_suffix)
+    _create_representative_filter_controls_enhanced(representative_filters, key_suffix)
 
 
-def _create_temporal_filter_controls_enhanced(temporal_filters):
+def _create_temporal_filter_controls_enhanced(temporal_filters, key_suffix=""):
     """Cria controles melhorados para filtros temporais"""
     if not temporal_filters:
         return
 
     st.markdown(f"📅 **Período**")
 
-    _create_temporal_filter_controls(temporal_filters)
+    _create_temporal_filter_controls(temporal_filters, key_suffix)
 
 
-def _create_region_filter_controls_enhanced(region_filters):
+def _create_region_filter_controls_enhanced(region_filters, key_suffix=""):
     """Cria controles melhorados para filtros de região"""
     if not region_filters:
         return
 
     st.markdown(f"📍 **Região**")
-    _create_region_filter_controls(region_filters)
+    _create_region_filter_controls(region_filters, key_suffix)
 
 
-def _create_client_filter_controls_enhanced(client_filters):
+def _create_client_filter_controls_enhanced(client_filters, key_suffix=""):
     """Cria controles melhorados para filtros de cliente"""
     if not client_filters:
         return
 
     st.markdown(f"👥 **Cliente**")
-    _create_client_filter_controls(client_filters)
+    _create_client_filter_controls(client_filters, key_suffix)
 
 
-def _create_product_filter_controls_enhanced(product_filters):
+def _create_product_filter_controls_enhanced(product_filters, key_suffix=""):
     """Cria controles melhorados para filtros de produto"""
     if not product_filters:
         return
 
     st.markdown(f"🛍️ **Produto**")
-    _create_product_filter_controls(product_filters)
+    _create_product_filter_controls(product_filters, key_suffix)
 
 
-def _create_representative_filter_controls_enhanced(representative_filters):
+def _create_representative_filter_controls_enhanced(representative_filters, key_suffix=""):
     """Cria controles melhorados para filtros de representante"""
     if not representative_filters:
         return
 
     st.markdown(f"👨‍💼 **Representante**")
-    _create_representative_filter_controls(representative_filters)
+    _create_representative_filter_controls(representative_filters, key_suffix)
 
 
 def _generate_change_summary(old_context: Dict, new_context: Dict, detected_filters: Dict) -> List[str]:
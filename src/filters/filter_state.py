@@ -0,0 +1,167 @@
+"""
+Estado versionado dos filtros da sessão
+Cada mutação gera as diferenças estruturais (adicionados, removidos,
+modificados) no momento da alteração, incrementa a versão e notifica os
+assinantes, para que UI e agente só sejam atualizados quando algo mudou
+"""
+
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional
+
+
+class FilterChange(NamedTuple):
+    """Alteração de uma chave de filtro"""
+    kind: str  # 'added' | 'removed' | 'modified'
+    key: str
+    old: Any
+    new: Any
+
+
+# Assinante: recebe o estado e as alterações da mutação
+Subscriber = Callable[["FilterState", List[FilterChange]], None]
+
+# Quantidade de mutações mantidas para changes_since
+HISTORY_SIZE = 64
+
+
+class FilterState:
+    """
+    Filtros ativos com versão monotônica e eventos de alteração.
+
+    - version: incrementada apenas quando uma mutação altera o conteúdo
+    - set / remove / update / replace / clear: retornam as alterações aplicadas
+    - subscribe(nome, callback): callback(estado, alterações) a cada nova versão;
+      registrar o mesmo nome substitui o assinante anterior (reruns do Streamlit)
+    """
+
+    def __init__(self, initial: Optional[Dict[str, Any]] = None, history_size: int = HISTORY_SIZE):
+        self._filters: Dict[str, Any] = dict(initial or {})
+        self._version = 0
+        self._history = deque(maxlen=history_size)  # (versão, alterações)
+        self._subscribers: Dict[str, Subscriber] = {}
+        self._lock = threading.RLock()
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Cópia dos filtros atuais"""
+        with self._lock:
+            return dict(self._filters)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._filters.get(key, default)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._filters
+
+    def __len__(self) -> int:
+        return len(self._filters)
+
+    # ------------------------------------------------------------------
+    # Mutações
+    # ------------------------------------------------------------------
+
+    def set(self, key: str, value: Any) -> List[FilterChange]:
+        """Define o valor de um filtro"""
+        return self.update({key: value})
+
+    def remove(self, key: str) -> List[FilterChange]:
+        """Remove um filtro (sem efeito se não existir)"""
+        return self.remove_many([key])
+
+    def remove_many(self, keys: Iterable[str]) -> List[FilterChange]:
+        """Remove vários filtros em uma única versão"""
+        with self._lock:
+            changes = [
+                FilterChange('removed', key, self._filters[key], None)
+                for key in dict.fromkeys(keys) if key in self._filters
+            ]
+            for change in changes:
+                del self._filters[change.key]
+            return self._commit(changes)
+
+    def update(self, values: Dict[str, Any]) -> List[FilterChange]:
+        """Adiciona ou altera filtros, mantendo os demais"""
+        with self._lock:
+            changes = []
+            for key, value in values.items():
+                if key not in self._filters:
+                    changes.append(FilterChange('added', key, None, value))
+                elif self._filters[key] != value:
+                    changes.append(FilterChange('modified', key, self._filters[key], value))
+            for change in changes:
+                self._filters[change.key] = change.new
+            return self._commit(changes)
+
+    def replace(self, values: Dict[str, Any]) -> List[FilterChange]:
+        """Substitui todos os filtros pelo novo contexto"""
+        with self._lock:
+            changes = [
+                FilterChange('removed', key, value, None)
+                for key, value in self._filters.items() if key not in values
+            ]
+            for key, value in values.items():
+                if key not in self._filters:
+                    changes.append(FilterChange('added', key, None, value))
+                elif self._filters[key] != value:
+                    changes.append(FilterChange('modified', key, self._filters[key], value))
+            if changes:
+                self._filters = dict(values)
+            return self._commit(changes)
+
+    def clear(self) -> List[FilterChange]:
+        """Remove todos os filtros"""
+        return self.replace({})
+
+    def _commit(self, changes: List[FilterChange]) -> List[FilterChange]:
+        """Registra a nova versão e notifica os assinantes (chamado com o lock)"""
+        if not changes:
+            return changes
+        self._version += 1
+        self._history.append((self._version, changes))
+
+        for callback in list(self._subscribers.values()):
+            callback(self, changes)
+        return changes
+
+    # ------------------------------------------------------------------
+    # Assinaturas e histórico
+    # ------------------------------------------------------------------
+
+    def subscribe(self, name: str, callback: Subscriber):
+        """
+        Registra um assinante de alterações
+
+        Args:
+            name: Identificador do assinante (substitui um registro anterior com o mesmo nome)
+            callback: Função chamada com (estado, alterações) a cada nova versão
+        """
+        with self._lock:
+            self._subscribers[name] = callback
+
+    def unsubscribe(self, name: str):
+        """Remove um assinante (sem efeito se não existir)"""
+        with self._lock:
+            self._subscribers.pop(name, None)
+
+    def changes_since(self, version: int) -> Optional[List[FilterChange]]:
+        """
+        Alterações aplicadas depois de uma versão
+
+        Args:
+            version: Versão conhecida pelo chamador
+
+        Returns:
+            Lista de alterações em ordem (vazia se já está atualizado) ou None
+            se o histórico não cobre a versão (o chamador deve reler o snapshot)
+        """
+        with self._lock:
+            if version >= self._version:
+                return []
+            if not self._history or self._history[0][0] > version + 1:
+                return None
+            return [change for entry_version, changes in self._history
+                    if entry_version > version for change in changes]
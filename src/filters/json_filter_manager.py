@@ -5,8 +5,32 @@ focando exclusivamente na extração das cláusulas WHERE do SQL.
 """
 
 import pandas as pd
-from typing import Dict, List, Set, Optional, Tuple
+from collections import OrderedDict
+from types import MappingProxyType
+from typing import Dict, List, Set, Optional, Tuple, Mapping
 import copy
+import hashlib
+import threading
+import weakref
+
+from .value_index import ColumnValueIndex, build_value_indexes
+
+
+# Colunas com validação de valores contra o dataset
+COLUNAS_VALIDACAO = [
+    "UF_Cliente", "Municipio_Cliente", "Cod_Cliente", "Cod_Segmento_Cliente",
+    "Cod_Linha_Produto", "Des_Linha_Produto", "Cod_Familia_Produto",
+    "Cod_Grupo_Produto", "Cod_Vendedor", "Cod_Regiao_Vendedor"
+]
+
+
+# Campos que sempre são aceitos sem validação rígida
+CAMPOS_PERMISSIVOS = [
+    'Data', 'Data_>=', 'Data_<', 'periodo', 'mes', 'ano',  # Temporais
+    'cidade', 'estado', 'municipio', 'uf',  # Regionais alternativos
+    'cliente', 'produto', 'linha', 'segmento'  # Genéricos
+]
+CAMPOS_PERMISSIVOS_LOWER = {c.lower() for c in CAMPOS_PERMISSIVOS}
 
 
 class JSONFilterManager:
@@ -14,14 +38,19 @@ class JSONFilterManager:
     Gerenciador de filtros focado exclusivamente em extração SQL
     """
 
-    def __init__(self, df_dataset: pd.DataFrame):
+    def __init__(self, df_dataset: pd.DataFrame, fingerprint: Optional[str] = None,
+                 indices_validacao: Optional[Mapping[str, ColumnValueIndex]] = None):
         """
         Inicializa o gerenciador com o dataset para validação
 
         Args:
             df_dataset: DataFrame com dados para validação de valores
+            fingerprint: Fingerprint do dataset (já calculado pelo registro)
+            indices_validacao: Índices compartilhados do registro (evita recálculo)
         """
         self.df_dataset = df_dataset
+        self.fingerprint = fingerprint
+        self.indices_validacao = indices_validacao
         self.filtros_persistentes = {
             "periodo": {"Data": None},
             "regiao": {"UF_Cliente": [], "Municipio_Cliente": []},
@@ -39,20 +68,13 @@ class JSONFilterManager:
         self._gerar_valores_validos()
 
     def _gerar_valores_validos(self):
-        """Gera listas de valores válidos diretamente do dataset"""
-        self.valores_validos = {}
-
-        # Lista de colunas possíveis para validação
-        colunas_validacao = [
-            "UF_Cliente", "Municipio_Cliente", "Cod_Cliente", "Cod_Segmento_Cliente",
-            "Cod_Linha_Produto", "Des_Linha_Produto", "Cod_Familia_Produto",
-            "Cod_Grupo_Produto", "Cod_Vendedor", "Cod_Regiao_Vendedor"
-        ]
-
-        # Apenas adicionar colunas que existem no dataset
-        for coluna in colunas_validacao:
-            if coluna in self.df_dataset.columns:
-                self.valores_validos[coluna] = self.df_dataset[coluna].dropna().unique().tolist()
+        """Obtém listas de valores válidos e índices de validação do registro por dataset"""
+        # Índices imutáveis compartilhados: construídos uma única vez por versão do dataset
+        if self.indices_validacao is None:
+            self.fingerprint, self.indices_validacao = obter_indices_validacao(self.df_dataset)
+        self.valores_validos = {
+            coluna: indice.values for coluna, indice in self.indices_validacao.items()
+        }
 
     def validar_valores(self, campo: str, valores: List[str], categoria: str) -> List[str]:
         """
@@ -67,33 +89,29 @@ class JSONFilterManager:
             Lista de valores válidos
         """
         # Campos que sempre são aceitos sem validação rígida
-        campos_permissivos = [
-            'Data', 'Data_>=', 'Data_<', 'periodo', 'mes', 'ano',  # Temporais
-            'cidade', 'estado', 'municipio', 'uf',  # Regionais alternativos
-            'cliente', 'produto', 'linha', 'segmento'  # Genéricos
-        ]
-
-        # Se é um campo permissivo, aceitar diretamente
-        if campo in campos_permissivos or campo.lower() in [c.lower() for c in campos_permissivos]:
+        if campo in CAMPOS_PERMISSIVOS or campo.lower() in CAMPOS_PERMISSIVOS_LOWER:
             return valores
 
         # Para campos com validação no dataset
-        if campo in self.valores_validos:
+        indice = self.indices_validacao.get(campo)
+        if indice is not None:
             # Converter valores para string para comparação consistente
             valores_str = [str(v) for v in valores]
-            validos_str = [str(v) for v in self.valores_validos[campo]]
 
             # Validação exata primeiro
-            valores_exatos = [v for v in valores_str if v in validos_str]
+            valores_exatos = [v for v in valores_str if indice.contains(v)]
 
             # Se não encontrou exatos, tentar validação fuzzy (parcial)
             if not valores_exatos and valores_str:
                 valores_fuzzy = []
                 for valor in valores_str:
-                    # Busca parcial case-insensitive
-                    matches = [v for v in validos_str if valor.upper() in v.upper() or v.upper() in valor.upper()]
-                    if matches:
-                        valores_fuzzy.extend(matches[:1])  # Apenas primeiro match
+                    # Busca parcial case-insensitive (apenas primeiro match)
+                    match = indice.fuzzy_match(valor)
+                    if match is None:
+                        # Erros de digitação: valor mais parecido por trigramas
+                        match = self._resolver_entidades().best(campo, valor)
+                    if match is not None:
+                        valores_fuzzy.append(str(match))
 
                 if valores_fuzzy:
                     return valores_fuzzy
@@ -103,6 +121,12 @@ class JSONFilterManager:
         # Para campos não mapeados, aceitar como está (estratégia permissiva)
         return valores
 
+    def _resolver_entidades(self):
+        """Resolvedor aproximado (trigramas) do dataset, compartilhado entre sessões"""
+        # Import local: entity_resolver depende deste módulo
+        from .entity_resolver import get_entity_resolver
+        return get_entity_resolver(self.df_dataset, self.fingerprint)
+
     def sincronizar_com_contexto_agente(self, contexto_agente: Dict) -> bool:
         """
         Sincroniza filtros persistentes com contexto do agente
@@ -228,32 +252,167 @@ class JSONFilterManager:
         return contexto_filtrado
 
 
-# Instância global para uso em toda a aplicação
-_global_json_filter_manager: Optional[JSONFilterManager] = None
+# Fingerprints já calculados por objeto DataFrame: id -> (referência fraca, assinatura da amostra, fingerprint)
+_fingerprints_calculados: Dict[int, Tuple[weakref.ref, str, str]] = {}
+_fingerprints_lock = threading.RLock()  # reentrante: o descarte roda no coletor de lixo
+
+
+def _assinatura_amostra(df_dataset: pd.DataFrame, amostras: int) -> str:
+    """Assinatura barata: tamanho, colunas, dtypes e hash de uma amostra espaçada de linhas"""
+    total = len(df_dataset)
+    passo = max(1, total // amostras)
+    posicoes = sorted(set(range(0, total, passo)) | ({total - 1} if total else set()))
+
+    digest = hashlib.sha1()
+    digest.update(str(total).encode())
+    digest.update("|".join(map(str, df_dataset.columns)).encode())
+    digest.update("|".join(map(str, df_dataset.dtypes)).encode())
+    digest.update(_hash_linhas(df_dataset.iloc[posicoes]))
+    return digest.hexdigest()
+
+
+def _hash_linhas(df_dataset: pd.DataFrame) -> bytes:
+    """Hash de cada linha do DataFrame"""
+    try:
+        return pd.util.hash_pandas_object(df_dataset, index=False).values.tobytes()
+    except TypeError:
+        # Colunas com objetos não hasheáveis (listas, dicts): usar representação textual
+        return df_dataset.astype(str).to_csv(index=False).encode()
+
+
+def _descartar_fingerprint(chave: int, referencia: weakref.ref):
+    """Remove o fingerprint memoizado de um DataFrame coletado"""
+    with _fingerprints_lock:
+        entrada = _fingerprints_calculados.get(chave)
+        if entrada is not None and entrada[0] is referencia:
+            del _fingerprints_calculados[chave]
+
+
+def calcular_fingerprint_dataset(df_dataset: pd.DataFrame, amostras: int = 256) -> str:
+    """
+    Calcula a impressão digital do dataset (versão dos dados)
+
+    Combina tamanho, colunas, dtypes e o hash de todas as linhas. O hash
+    completo é memoizado por objeto DataFrame: novas chamadas com o mesmo
+    objeto recalculam apenas a assinatura de uma amostra de linhas e só
+    refazem o hash completo se ela mudar. Um dataset recarregado (novo
+    objeto) é sempre hasheado por inteiro.
+
+    Args:
+        df_dataset: DataFrame com dados
+        amostras: Número máximo de linhas da assinatura barata
+
+    Returns:
+        Hash hexadecimal do dataset
+    """
+    assinatura = _assinatura_amostra(df_dataset, amostras)
+    chave = id(df_dataset)
+    with _fingerprints_lock:
+        entrada = _fingerprints_calculados.get(chave)
+        if entrada is not None and entrada[0]() is df_dataset and entrada[1] == assinatura:
+            return entrada[2]
+
+    digest = hashlib.sha1()
+    digest.update(assinatura.encode())
+    digest.update(_hash_linhas(df_dataset))
+    fingerprint = digest.hexdigest()
+
+    referencia = weakref.ref(df_dataset, lambda ref, chave=chave: _descartar_fingerprint(chave, ref))
+    with _fingerprints_lock:
+        _fingerprints_calculados[chave] = (referencia, assinatura, fingerprint)
+    return fingerprint
+
 
+# Registro de índices imutáveis por fingerprint do dataset (compartilhado entre sessões)
+MAX_DATASETS_REGISTRADOS = 4
+_indices_por_dataset: "OrderedDict[str, Mapping[str, ColumnValueIndex]]" = OrderedDict()
+_registro_lock = threading.Lock()
 
-def get_json_filter_manager(df_dataset: pd.DataFrame) -> JSONFilterManager:
+# Gerenciadores leves por (sessão, fingerprint): estado de filtros nunca é compartilhado
+# (LRU: sessões inativas há mais tempo são descartadas acima do limite)
+MAX_GERENCIADORES_SESSAO = 64
+_gerenciadores_por_sessao: "OrderedDict[Tuple[str, str], JSONFilterManager]" = OrderedDict()
+_gerenciadores_lock = threading.Lock()
+
+
+def obter_indices_validacao(df_dataset: pd.DataFrame) -> Tuple[str, Mapping[str, ColumnValueIndex]]:
     """
-    Singleton para obter instância global do JSONFilterManager
+    Retorna os índices de validação do dataset, construindo-os apenas na primeira vez
 
     Args:
         df_dataset: DataFrame com dados
 
+    Returns:
+        Tupla (fingerprint, índices por coluna somente leitura)
+    """
+    fingerprint = calcular_fingerprint_dataset(df_dataset)
+
+    with _registro_lock:
+        indices = _indices_por_dataset.get(fingerprint)
+        if indices is None:
+            indices = MappingProxyType(build_value_indexes(df_dataset, COLUNAS_VALIDACAO))
+            _indices_por_dataset[fingerprint] = indices
+            # Descartar versões antigas do dataset
+            while len(_indices_por_dataset) > MAX_DATASETS_REGISTRADOS:
+                _indices_por_dataset.popitem(last=False)
+        else:
+            _indices_por_dataset.move_to_end(fingerprint)
+
+    return fingerprint, indices
+
+
+def get_json_filter_manager(df_dataset: pd.DataFrame, session_id: Optional[str] = None) -> JSONFilterManager:
+    """
+    Obtém o JSONFilterManager da sessão para a versão atual do dataset
+
+    Um dataset recarregado (fingerprint diferente) gera um novo gerenciador com
+    índices atualizados; sessões distintas nunca compartilham filtros persistentes.
+
+    Args:
+        df_dataset: DataFrame com dados
+        session_id: ID da sessão (padrão: sessão única "default")
+
     Returns:
         Instância do JSONFilterManager
     """
-    global _global_json_filter_manager
+    fingerprint, indices = obter_indices_validacao(df_dataset)
+    chave = (session_id or "default", fingerprint)
+
+    with _gerenciadores_lock:
+        manager = _gerenciadores_por_sessao.get(chave)
+        if manager is None:
+            # Versões antigas do dataset desta sessão deixam de ser válidas
+            for chave_antiga in [k for k in _gerenciadores_por_sessao if k[0] == chave[0]]:
+                del _gerenciadores_por_sessao[chave_antiga]
+            manager = JSONFilterManager(df_dataset, fingerprint=fingerprint, indices_validacao=indices)
+            _gerenciadores_por_sessao[chave] = manager
+            while len(_gerenciadores_por_sessao) > MAX_GERENCIADORES_SESSAO:
+                _gerenciadores_por_sessao.popitem(last=False)
+        else:
+            _gerenciadores_por_sessao.move_to_end(chave)
 
-    if _global_json_filter_manager is None:
-        _global_json_filter_manager = JSONFilterManager(df_dataset)
+    return manager
 
-    return _global_json_filter_manager
+
+def reset_json_filter_manager(session_id: Optional[str] = None):
+    """
+    Reset dos gerenciadores (útil para testes e ao limpar o chat)
+
+    Args:
+        session_id: Sessão a resetar (padrão: todas as sessões)
+    """
+    with _gerenciadores_lock:
+        if session_id is None:
+            _gerenciadores_por_sessao.clear()
+        else:
+            for chave in [k for k in _gerenciadores_por_sessao if k[0] == session_id]:
+                del _gerenciadores_por_sessao[chave]
 
 
-def reset_json_filter_manager():
-    """Reset da instância global (útil para testes)"""
-    global _global_json_filter_manager
-    _global_json_filter_manager = None
+def reset_filter_index_registry():
+    """Descarta todos os índices de validação registrados (útil para testes)"""
+    with _registro_lock:
+        _indices_por_dataset.clear()
 
 
 def processar_filtros_apenas_sql(sql_queries: List[str], contexto_atual: Dict,
@@ -269,7 +428,7 @@ def processar_filtros_apenas_sql(sql_queries: List[str], contexto_atual: Dict,
     Returns:
         Tuple[Dict, List[str]]: (contexto_atualizado, lista_de_mudanças)
     """
-    from .sql_filter_extractor import SQLFilterExtractor
+    from .sql_filter_extractor import get_sql_filter_extractor
 
     mudancas = []
     contexto_atualizado = contexto_atual.copy()
@@ -279,7 +438,7 @@ def processar_filtros_apenas_sql(sql_queries: List[str], contexto_atual: Dict,
         return contexto_atualizado, mudancas
 
     # ÚNICA ESTRATÉGIA: Extrair filtros das queries SQL
-    extractor = SQLFilterExtractor(df_dataset)
+    extractor = get_sql_filter_extractor()
     sql_filters = extractor.extract_filters_from_multiple_queries(sql_queries)
 
     if sql_filters and any(sql_filters.values()):
@@ -3,75 +3,180 @@ Detector inteligente de filtros baseado em linguagem natural
 """
 
 import re
-from datetime import datetime, timedelta
-from typing import Dict, List, Tuple, Optional
+import threading
+from datetime import datetime
+from typing import Any, Dict, List, Tuple, Optional, Sequence
 import pandas as pd
 
+from ..calendar_dimension import get_calendar_dimension
+
+
+# Ações de período relativo -> período nomeado do calendário do dataset
+CALENDAR_ACTIONS = {
+    'last_month': 'previous_month',
+    'last_quarter': 'last_quarter',
+    'last_semester': 'last_semester',
+    'last_year': 'last_year',
+    'ytd': 'ytd',
+    'same_month_last_year': 'same_month_last_year',
+}
+
+# Tabelas de padrões (padrão, valor): em cada família vale o PRIMEIRO padrão
+# da tabela com ocorrência no texto. Todo padrão começa em início de palavra
+# (o limite \b é aplicado pela PatternFamily), de modo que palavras curtas
+# (meses abreviados, UFs, 'sem', 'só') não casam dentro de outras palavras.
+TEMPORAL_PATTERNS: Tuple[Tuple[str, str], ...] = (
+    # Meses específicos
+    (r'(?:janeiro|jan)\b', '01'),
+    (r'(?:fevereiro|fev)\b', '02'),
+    (r'(?:março|marco|mar)\b', '03'),
+    (r'(?:abril|abr)\b', '04'),
+    (r'(?:maio|mai)\b', '05'),
+    (r'(?:junho|jun)\b', '06'),
+    (r'(?:julho|jul)\b', '07'),
+    (r'(?:agosto|ago)\b', '08'),
+    (r'(?:setembro|set)\b', '09'),
+    (r'(?:outubro|out)\b', '10'),
+    (r'(?:novembro|nov)\b', '11'),
+    (r'(?:dezembro|dez)\b', '12'),
+
+    # Períodos relativos
+    (r'mesmo\s+m[eê]s\s+(?:do|no)\s+ano\s+(?:passado|anterior)', 'same_month_last_year'),
+    (r'acumulado\s+(?:do|no)\s+ano|ytd\b', 'ytd'),
+    (r'trimestre\s+(?:passado|anterior)', 'last_quarter'),
+    (r'semestre\s+(?:passado|anterior)', 'last_semester'),
+    (r'último\s+mês|mês\s+passado|mês\s+anterior', 'last_month'),
+    (r'últimos?\s+(\d+)\s+meses?', 'last_n_months'),
+    (r'último\s+ano|ano\s+passado', 'last_year'),
+    (r'últimos?\s+(\d+)\s+anos?', 'last_n_years'),
+    (r'[dn]?este\s+mês|mês\s+atual', 'this_month'),
+    (r'[dn]?este\s+ano|ano\s+atual', 'this_year'),
+)
+
+GEOGRAPHIC_PATTERNS: Tuple[Tuple[str, str], ...] = (
+    (r'(?:são\s+paulo|s\.?p\.?)(?!\w)', 'SP'),
+    (r'(?:rio\s+de\s+janeiro|r\.?j\.?)(?!\w)', 'RJ'),
+    (r'(?:minas\s+gerais|m\.?g\.?)(?!\w)', 'MG'),
+    (r'(?:para[íi]ba|p\.?b\.?)(?!\w)', 'PB'),
+    (r'(?:pernambuco|p\.?e\.?)(?!\w)', 'PE'),
+    (r'(?:bahia|b\.?a\.?)(?!\w)', 'BA'),
+    (r'(?:brasília|d\.?f\.?)(?!\w)', 'DF'),
+    # Cidades
+    (r'cidade\s+de\s+([^,\s]+)', 'cidade'),
+    (r'município\s+de\s+([^,\s]+)', 'cidade'),
+)
+
+EXCLUSION_PATTERNS: Tuple[Tuple[str, str], ...] = (
+    (r'(?:excluir|exceto|sem|não\s+incluir|remover)\b', 'exclude'),
+    (r'(?:apenas|somente|só|incluir\s+apenas)\b', 'include_only'),
+    (r'todos?\s+exceto\b', 'all_except'),
+)
+
+CLEAR_PATTERNS: Tuple[Tuple[str, bool], ...] = tuple((pattern, True) for pattern in (
+    r'sem\s+filtros?',
+    r'remover?\s+(?:todos?\s+)?filtros?',
+    r'limpar\s+filtros?',
+    r'sem\s+restrições?',
+    r'consulta\s+geral',
+    r'todos?\s+os?\s+dados?',
+))
+
+YEAR_PATTERN = re.compile(r'\b(20\d{2})\b')
+MONTH_YEAR_PATTERN = re.compile(r'(\w+)\s+de\s+(20\d{2})')
+
+WORD_START = r'\b'
+
+
+class PatternFamily:
+    """
+    Família de padrões compilada em uma única alternância ancorada em início
+    de palavra.
+
+    A varredura visita, em ordem, cada posição onde algum padrão casa; ali o
+    padrão de maior prioridade é identificado casando os padrões compilados
+    individualmente só naquela posição. O menor índice visto é o primeiro
+    padrão da tabela com ocorrência no texto (mesmo resultado de re.search
+    padrão a padrão, na ordem da tabela). As alternativas não são envolvidas
+    em grupos nomeados: o marcador do grupo antes do primeiro literal impede
+    o descarte rápido de cada alternativa pelo motor de regex.
+    """
+
+    def __init__(self, entries: Sequence[Tuple[str, Any]], flags: int = 0):
+        self.entries = tuple(entries)
+        self.values = tuple(value for _, value in self.entries)
+        self.flags = flags
+        self.patterns = tuple(re.compile(f"{WORD_START}(?:{pattern})", flags) for pattern, _ in self.entries)
+        self.regex = re.compile(WORD_START + "(?:" + "|".join(pattern for pattern, _ in self.entries) + ")", flags)
+
+    def first(self, text: str) -> Optional[Tuple[Any, Tuple[Optional[str], ...]]]:
+        """
+        Primeiro padrão da tabela com ocorrência no texto
+
+        Args:
+            text: Texto a examinar
+
+        Returns:
+            (valor do padrão, grupos de captura do padrão na primeira ocorrência) ou None
+        """
+        best_index, best_match = len(self.patterns), None
+        match = self.regex.search(text)
+        while match is not None:
+            start = match.start()
+            for index in range(best_index):
+                hit = self.patterns[index].match(text, start)
+                if hit:
+                    best_index, best_match = index, hit
+                    break
+            if best_index == 0:
+                break
+            match = self.regex.search(text, start + 1)
+
+        if best_match is None:
+            return None
+        return self.values[best_index], best_match.groups()
+
+    def any(self, text: str) -> bool:
+        """Algum padrão da família ocorre no texto"""
+        return self.regex.search(text) is not None
+
 
 class IntelligentFilterDetector:
     """
     Detecta filtros automaticamente a partir de texto em linguagem natural
     """
 
+    # Tabelas compiladas na primeira instância e compartilhadas por todas
+    _families: Optional[Dict[str, PatternFamily]] = None
+    _families_lock = threading.Lock()
+
     def __init__(self, alias_mapping=None, text_normalizer=None):
         self.alias_mapping = alias_mapping or {}
         self.text_normalizer = text_normalizer
 
-        # Padrões temporais
-        self.temporal_patterns = {
-            # Meses específicos
-            r'janeiro|jan': '01',
-            r'fevereiro|fev': '02',
-            r'março|mar': '03',
-            r'abril|abr': '04',
-            r'maio|mai': '05',
-            r'junho|jun': '06',
-            r'julho|jul': '07',
-            r'agosto|ago': '08',
-            r'setembro|set': '09',
-            r'outubro|out': '10',
-            r'novembro|nov': '11',
-            r'dezembro|dez': '12',
-
-            # Períodos relativos
-            r'último\s+mês|mês\s+passado|mês\s+anterior': 'last_month',
-            r'últimos?\s+(\d+)\s+meses?': 'last_n_months',
-            r'último\s+ano|ano\s+passado': 'last_year',
-            r'últimos?\s+(\d+)\s+anos?': 'last_n_years',
-            r'este\s+mês|mês\s+atual': 'this_month',
-            r'este\s+ano|ano\s+atual': 'this_year',
-        }
-
-        # Padrões geográficos
-        self.geographic_patterns = {
-            r'são\s+paulo|sp|s\.?p\.?': 'SP',
-            r'rio\s+de\s+janeiro|rj|r\.?j\.?': 'RJ',
-            r'minas\s+gerais|mg|m\.?g\.?': 'MG',
-            r'para(í|i)ba|pb|p\.?b\.?': 'PB',
-            r'pernambuco|pe|p\.?e\.?': 'PE',
-            r'bahia|ba|b\.?a\.?': 'BA',
-            r'brasília|df|d\.?f\.?': 'DF',
-            # Cidades
-            r'cidade\s+de\s+([^,\s]+)': 'cidade',
-            r'município\s+de\s+([^,\s]+)': 'cidade',
-        }
-
-        # Padrões de exclusão/inclusão
-        self.exclusion_patterns = {
-            r'excluir|exceto|sem|não\s+incluir|remover': 'exclude',
-            r'apenas|somente|só|incluir\s+apenas': 'include_only',
-            r'todos?\s+exceto': 'all_except',
-        }
-
-        # Padrões de limpeza de filtros
-        self.clear_patterns = [
-            r'sem\s+filtros?',
-            r'remover?\s+(todos?\s+)?filtros?',
-            r'limpar\s+filtros?',
-            r'sem\s+restrições?',
-            r'consulta\s+geral',
-            r'todos?\s+os?\s+dados?',
-        ]
+        # Tabelas de padrões (somente leitura)
+        self.temporal_patterns = dict(TEMPORAL_PATTERNS)
+        self.geographic_patterns = dict(GEOGRAPHIC_PATTERNS)
+        self.exclusion_patterns = dict(EXCLUSION_PATTERNS)
+        self.clear_patterns = [pattern for pattern, _ in CLEAR_PATTERNS]
+        self.families = self.compiled_families()
+
+    @classmethod
+    def compiled_families(cls) -> Dict[str, PatternFamily]:
+        """Famílias de padrões compiladas uma única vez por processo"""
+        if cls._families is None:
+            with cls._families_lock:
+                if cls._families is None:
+                    cls._families = {
+                        'temporal': PatternFamily(TEMPORAL_PATTERNS),
+                        'geographic': PatternFamily(GEOGRAPHIC_PATTERNS, re.IGNORECASE),
+                        'exclusion': PatternFamily(EXCLUSION_PATTERNS, re.IGNORECASE),
+                        'clear': PatternFamily(CLEAR_PATTERNS, re.IGNORECASE),
+                    }
+        return cls._families
+
+    def _first(self, family: str, text: str) -> Optional[Tuple[Any, Tuple[Optional[str], ...]]]:
+        """Primeiro padrão da família com ocorrência no texto (valor, grupos)"""
+        return self.families[family].first(text)
 
     def detect_filters_from_text(self, text: str, current_context: Dict = None,
                                 max_date: Optional[datetime] = None) -> Dict:
@@ -118,10 +223,7 @@ class IntelligentFilterDetector:
 
     def _is_clear_filters_command(self, text: str) -> bool:
         """Verifica se o texto contém comando de limpeza de filtros"""
-        for pattern in self.clear_patterns:
-            if re.search(pattern, text, re.IGNORECASE):
-                return True
-        return False
+        return self._first('clear', text) is not None
 
     def _detect_temporal_filters(self, text: str, max_date: Optional[datetime] = None) -> Dict:
         """Detecta filtros temporais do texto"""
@@ -129,63 +231,47 @@ class IntelligentFilterDetector:
 
         # Data máxima padrão se não fornecida
         if max_date is None:
-            max_date = datetime.now()
+            max_date = pd.Timestamp.now().normalize()
 
         # Buscar anos específicos (2020, 2021, etc.)
-        year_matches = re.findall(r'\b(20\d{2})\b', text)
+        year_matches = YEAR_PATTERN.findall(text)
         if year_matches:
             year = year_matches[0]
             filters['Data_>='] = f'{year}-01-01'
             filters['Data_<'] = f'{int(year)+1}-01-01'
 
         # Buscar meses específicos com anos
-        month_year_match = re.search(r'(\w+)\s+de\s+(20\d{2})', text)
+        month_year_match = MONTH_YEAR_PATTERN.search(text)
         if month_year_match:
             month_name = month_year_match.group(1).lower()
             year = month_year_match.group(2)
 
-            for pattern, month_num in self.temporal_patterns.items():
-                if re.search(pattern, month_name):
-                    if month_num.isdigit():
-                        filters['Data_>='] = f'{year}-{month_num.zfill(2)}-01'
-                        # Próximo mês
-                        next_month = int(month_num) + 1
-                        if next_month > 12:
-                            filters['Data_<'] = f'{int(year)+1}-01-01'
-                        else:
-                            filters['Data_<'] = f'{year}-{str(next_month).zfill(2)}-01'
-                    break
-
-        # Períodos relativos
-        for pattern, action in self.temporal_patterns.items():
-            if re.search(pattern, text):
-                if action == 'last_month':
-                    last_month = max_date.replace(day=1) - timedelta(days=1)
-                    start_date = last_month.replace(day=1)
-                    filters['Data_>='] = start_date.strftime('%Y-%m-%d')
-                    filters['Data_<'] = max_date.replace(day=1).strftime('%Y-%m-%d')
-                elif action == 'this_month':
-                    start_date = max_date.replace(day=1)
-                    filters['Data_>='] = start_date.strftime('%Y-%m-%d')
-                elif action == 'last_year':
-                    last_year = max_date.year - 1
-                    filters['Data_>='] = f'{last_year}-01-01'
-                    filters['Data_<'] = f'{max_date.year}-01-01'
-                elif action == 'this_year':
-                    filters['Data_>='] = f'{max_date.year}-01-01'
-                elif 'last_n_months' in action:
-                    match = re.search(r'últimos?\s+(\d+)\s+meses?', text)
-                    if match:
-                        n_months = int(match.group(1))
-                        start_date = max_date - timedelta(days=30 * n_months)
-                        filters['Data_>='] = start_date.strftime('%Y-%m-%d')
-                elif 'last_n_years' in action:
-                    match = re.search(r'últimos?\s+(\d+)\s+anos?', text)
-                    if match:
-                        n_years = int(match.group(1))
-                        start_year = max_date.year - n_years
-                        filters['Data_>='] = f'{start_year}-01-01'
-                break
+            found = self._first('temporal', month_name)
+            if found and found[0].isdigit():
+                month_num = found[0]
+                filters['Data_>='] = f'{year}-{month_num.zfill(2)}-01'
+                # Próximo mês
+                next_month = int(month_num) + 1
+                if next_month > 12:
+                    filters['Data_<'] = f'{int(year)+1}-01-01'
+                else:
+                    filters['Data_<'] = f'{year}-{str(next_month).zfill(2)}-01'
+
+        # Períodos relativos: consultas ao calendário ancorado na data máxima
+        found = self._first('temporal', text)
+        if found:
+            action, groups = found
+            calendar = get_calendar_dimension(max_date)
+            if action in CALENDAR_ACTIONS:
+                filters.update(calendar.period(CALENDAR_ACTIONS[action]).as_filters())
+            elif action == 'this_month':
+                filters['Data_>='] = calendar.period('current_month').as_filters()['Data_>=']
+            elif action == 'this_year':
+                filters['Data_>='] = calendar.period('this_year').as_filters()['Data_>=']
+            elif action == 'last_n_months':
+                filters['Data_>='] = calendar.months(int(groups[0])).as_filters()['Data_>=']
+            elif action == 'last_n_years':
+                filters['Data_>='] = calendar.year(int(groups[0])).as_filters()['Data_>=']
 
         return filters
 
@@ -193,18 +279,17 @@ class IntelligentFilterDetector:
         """Detecta filtros geográficos do texto"""
         filters = {}
 
-        for pattern, value in self.geographic_patterns.items():
-            match = re.search(pattern, text, re.IGNORECASE)
-            if match:
-                if value == 'cidade':
-                    # Capturar nome da cidade
-                    city_name = match.group(1) if match.groups() else None
-                    if city_name:
-                        filters['Municipio_Cliente'] = city_name.title()
-                else:
-                    # Estado
-                    filters['UF_Cliente'] = value
-                break
+        found = self._first('geographic', text)
+        if found:
+            value, groups = found
+            if value == 'cidade':
+                # Capturar nome da cidade
+                city_name = groups[0] if groups else None
+                if city_name:
+                    filters['Municipio_Cliente'] = city_name.title()
+            else:
+                # Estado
+                filters['UF_Cliente'] = value
 
         return filters
 
@@ -236,10 +321,8 @@ class IntelligentFilterDetector:
 
     def _detect_exclusion_patterns(self, text: str) -> Optional[str]:
         """Detecta padrões de exclusão/inclusão"""
-        for pattern, mode in self.exclusion_patterns.items():
-            if re.search(pattern, text, re.IGNORECASE):
-                return mode
-        return None
+        found = self._first('exclusion', text)
+        return found[0] if found else None
 
     def _normalize_filter_values(self, filters: Dict) -> Dict:
         """Aplica normalização aos valores dos filtros"""
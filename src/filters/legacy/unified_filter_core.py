@@ -4,7 +4,6 @@ Solução single source of truth para gerenciamento de filtros
 """
 
 import re
-import sqlparse
 from datetime import datetime, timedelta
 from typing import Dict, List, Set, Optional, Tuple, Any, Union
 from enum import Enum
@@ -12,6 +11,8 @@ from dataclasses import dataclass, field
 import copy
 import json
 
+from parsers.parsed_query import ParsedQuery, Predicate, get_parsed_query
+
 
 class FilterAction(Enum):
     """Ações possíveis sobre filtros"""
@@ -201,105 +202,45 @@ class SQLFilterExtractor:
     def extract_filters_from_sql(self, sql_query: str) -> List[FilterDefinition]:
         """
         Extrai filtros de uma query SQL usando sqlparse
-        Muito mais robusto que o parser regex anterior
+        A análise é feita uma vez por texto de query e compartilhada
+        (parsers.parsed_query): WHERE, HAVING e subconsultas saem da mesma
+        travessia, sem reanalisar o texto de cada subconsulta
         """
-        try:
-            # Parse da query SQL
-            parsed = sqlparse.parse(sql_query)[0]
-            filters = []
-
-            # Extrair filtros de diferentes partes da query
-            filters.extend(self._extract_from_where_clause(parsed))
-            filters.extend(self._extract_from_having_clause(parsed))
-            filters.extend(self._extract_from_subqueries(parsed))
-
-            return filters
-
-        except Exception as e:
+        parsed = get_parsed_query(sql_query)
+        if not parsed.valid:
             # Fallback para parser regex se sqlparse falhar
             return self._fallback_regex_extraction(sql_query)
 
-    def _extract_from_where_clause(self, parsed_query) -> List[FilterDefinition]:
-        """Extrai filtros da cláusula WHERE"""
         filters = []
 
-        def extract_from_token(token):
-            if hasattr(token, 'tokens'):
-                for subtoken in token.tokens:
-                    extract_from_token(subtoken)
-            elif token.ttype is sqlparse.tokens.Keyword and token.value.upper() == 'WHERE':
-                # Encontrou WHERE, próximos tokens são condições
-                parent = token.parent
-                if parent:
-                    where_index = parent.tokens.index(token)
-                    for i in range(where_index + 1, len(parent.tokens)):
-                        next_token = parent.tokens[i]
-                        if (next_token.ttype is sqlparse.tokens.Keyword and
-                            next_token.value.upper() in ['GROUP', 'ORDER', 'HAVING', 'LIMIT']):
-                            break
-                        filters.extend(self._parse_condition_token(next_token))
-
-        extract_from_token(parsed_query)
-        return filters
-
-    def _extract_from_having_clause(self, parsed_query) -> List[FilterDefinition]:
-        """Extrai filtros da cláusula HAVING"""
-        # Implementação similar ao WHERE
-        return []
+        # Extrair filtros de diferentes partes da query
+        filters.extend(self._extract_from_where_clause(parsed))
+        filters.extend(self._extract_from_having_clause(parsed))
+        filters.extend(self._extract_from_subqueries(parsed))
 
-    def _extract_from_subqueries(self, parsed_query) -> List[FilterDefinition]:
-        """Extrai filtros de subconsultas"""
-        filters = []
-
-        def find_subqueries(token):
-            if hasattr(token, 'tokens'):
-                for subtoken in token.tokens:
-                    if isinstance(subtoken, sqlparse.sql.Parenthesis):
-                        # Possível subconsulta
-                        subquery_content = str(subtoken)[1:-1]  # Remove parênteses
-                        if 'SELECT' in subquery_content.upper():
-                            filters.extend(self.extract_filters_from_sql(subquery_content))
-                    find_subqueries(subtoken)
-
-        find_subqueries(parsed_query)
         return filters
 
-    def _parse_condition_token(self, token) -> List[FilterDefinition]:
-        """Parse de um token de condição específico"""
-        filters = []
-
-        # Implementar parsing de condições específicas
-        # Por agora, usar fallback regex para condições simples
-        condition_str = str(token).strip()
-
-        # Padrões comuns de filtros
-        patterns = [
-            (r"(\w+)\s*=\s*'([^']*)'", "="),
-            (r"(\w+)\s*>\s*'([^']*)'", ">"),
-            (r"(\w+)\s*<\s*'([^']*)'", "<"),
-            (r"(\w+)\s*>=\s*'([^']*)'", ">="),
-            (r"(\w+)\s*<=\s*'([^']*)'", "<="),
-            (r"(\w+)\s+LIKE\s+'([^']*)'", "LIKE"),
-        ]
-
-        for pattern, operator in patterns:
-            matches = re.finditer(pattern, condition_str, re.IGNORECASE)
-            for match in matches:
-                column = match.group(1).lower()
-                value = match.group(2)
-
-                category = self.category_mapping.get(column, FilterCategory.OTHER)
+    def _extract_from_where_clause(self, parsed_query: ParsedQuery) -> List[FilterDefinition]:
+        """Extrai filtros da cláusula WHERE"""
+        return [self._predicate_to_filter(p) for p in parsed_query.where_predicates]
 
-                filter_def = FilterDefinition(
-                    key=column,
-                    value=value,
-                    category=category,
-                    operator=operator,
-                    source="sql"
-                )
-                filters.append(filter_def)
+    def _extract_from_having_clause(self, parsed_query: ParsedQuery) -> List[FilterDefinition]:
+        """Extrai filtros da cláusula HAVING"""
+        return [self._predicate_to_filter(p) for p in parsed_query.having_predicates]
 
-        return filters
+    def _extract_from_subqueries(self, parsed_query: ParsedQuery) -> List[FilterDefinition]:
+        """Extrai filtros de subconsultas"""
+        return [self._predicate_to_filter(p) for p in parsed_query.subquery_predicates]
+
+    def _predicate_to_filter(self, predicate: Predicate) -> FilterDefinition:
+        """Converte um predicado da query analisada em FilterDefinition"""
+        return FilterDefinition(
+            key=predicate.column,
+            value=predicate.value,
+            category=self.category_mapping.get(predicate.column, FilterCategory.OTHER),
+            operator=predicate.operator,
+            source="sql"
+        )
 
     def _fallback_regex_extraction(self, sql_query: str) -> List[FilterDefinition]:
         """Fallback para extração via regex quando sqlparse falha"""
@@ -0,0 +1,125 @@
+"""
+Cache global de fatias materializadas
+Quando um contexto de filtros se mantém estável por alguns turnos, a view
+dados_filtrados passa a ler de uma tabela com a fatia já filtrada. Este módulo
+controla o orçamento de memória dessas tabelas entre todas as sessões,
+descartando as fatias usadas há mais tempo (LRU)
+"""
+
+import threading
+import weakref
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+
+# Turnos consecutivos com o mesmo contexto antes de materializar a fatia
+MATERIALIZE_AFTER_TURNS = 3
+
+# Orçamento de memória somado de todas as fatias (bytes)
+SLICE_CACHE_BUDGET_BYTES = 512 * 1024 * 1024
+
+
+def table_memory_bytes(connection) -> int:
+    """Bytes ocupados pelas tabelas em memória do banco da conexão (duckdb_memory)"""
+    row = connection.execute(
+        "SELECT COALESCE(SUM(memory_usage_bytes), 0) FROM duckdb_memory() WHERE tag = 'IN_MEMORY_TABLE'"
+    ).fetchone()
+    return int(row[0])
+
+
+class SliceCache:
+    """
+    Registro LRU das fatias materializadas de todas as sessões.
+
+    Cada fatia é registrada com o tamanho medido após a materialização e uma
+    função de liberação (referência fraca, para não manter agentes descartados
+    vivos). Ao exceder o orçamento, as fatias menos usadas saem do registro e
+    seus donos removem as tabelas imediatamente.
+    """
+
+    def __init__(self, budget_bytes: int = SLICE_CACHE_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()  # dono -> (bytes, liberação fraca)
+        self._used_bytes = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+
+    def register(self, owner: str, size_bytes: int, release: Callable[[], None]) -> bool:
+        """
+        Registra uma fatia, liberando as menos usadas se necessário
+
+        Args:
+            owner: Identificador da fatia (um por view)
+            size_bytes: Tamanho medido da fatia
+            release: Método do dono que descarta a fatia
+
+        Returns:
+            False se a fatia sozinha excede o orçamento (não registrada)
+        """
+        if size_bytes > self.budget_bytes:
+            return False
+
+        to_release = []
+        with self._lock:
+            self._discard_locked(owner)
+            while self._entries and self._used_bytes + size_bytes > self.budget_bytes:
+                evicted_owner, (evicted_bytes, evicted_release) = self._entries.popitem(last=False)
+                self._used_bytes -= evicted_bytes
+                self.evictions += 1
+                to_release.append(evicted_release)
+            self._entries[owner] = (size_bytes, weakref.WeakMethod(release))
+            self._used_bytes += size_bytes
+
+        # Liberar fora do lock (cada dono remove a própria tabela)
+        for weak_release in to_release:
+            callback = weak_release()
+            if callback is not None:
+                callback()
+        return True
+
+    def touch(self, owner: str):
+        """Marca a fatia como usada recentemente"""
+        with self._lock:
+            if owner in self._entries:
+                self._entries.move_to_end(owner)
+
+    def discard(self, owner: str):
+        """Remove a fatia do registro (o dono já a descartou)"""
+        with self._lock:
+            self._discard_locked(owner)
+
+    def _discard_locked(self, owner: str):
+        entry = self._entries.pop(owner, None)
+        if entry is not None:
+            self._used_bytes -= entry[0]
+
+    def stats(self) -> Dict[str, int]:
+        """Ocupação atual do cache"""
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "used_bytes": self._used_bytes,
+                "budget_bytes": self.budget_bytes,
+                "evictions": self.evictions,
+            }
+
+
+# Instância global compartilhada por todas as sessões
+_slice_cache: Optional[SliceCache] = None
+_slice_cache_lock = threading.Lock()
+
+
+def get_slice_cache() -> SliceCache:
+    """Retorna o cache global de fatias materializadas"""
+    global _slice_cache
+    with _slice_cache_lock:
+        if _slice_cache is None:
+            _slice_cache = SliceCache()
+        return _slice_cache
+
+
+def reset_slice_cache(budget_bytes: int = SLICE_CACHE_BUDGET_BYTES):
+    """Recria o cache global (útil para testes); fatias existentes deixam de ser contabilizadas"""
+    global _slice_cache
+    with _slice_cache_lock:
+        _slice_cache = SliceCache(budget_bytes)
@@ -0,0 +1,445 @@
+"""
+Extração de condições WHERE a partir da árvore sintática do DuckDB
+Percorre o resultado de json_serialize_sql em uma única passada, cobrindo CTEs,
+subqueries no FROM/SELECT, UNIONs, grupos OR, NOT IN e colunas qualificadas
+"""
+
+import json
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import duckdb
+
+
+# Operadores de comparação -> sufixo usado nas chaves de condição (ex.: Data_>=)
+COMPARISON_SUFFIXES = {
+    'COMPARE_GREATERTHANOREQUALTO': '>=',
+    'COMPARE_GREATERTHAN': '>',
+    'COMPARE_LESSTHANOREQUALTO': '<=',
+    'COMPARE_LESSTHAN': '<',
+}
+
+# Operadores espelhados quando a constante está à esquerda ('2024-01-01' <= Data)
+MIRRORED_SUFFIXES = {'>=': '<=', '>': '<', '<=': '>=', '<': '>'}
+
+# Funções transparentes em torno da coluna (não alteram o filtro semântico)
+TRANSPARENT_FUNCTIONS = {'lower', 'upper', 'trim', 'strip_accents'}
+
+# Funções de LIKE/ILIKE na árvore do DuckDB
+LIKE_FUNCTIONS = {'~~', '~~*'}
+
+# Tipos (duckdb_columns().data_type e constantes da árvore) comparáveis sem conversão
+INTEGER_TYPES = {
+    'TINYINT', 'SMALLINT', 'INTEGER', 'BIGINT', 'HUGEINT',
+    'UTINYINT', 'USMALLINT', 'UINTEGER', 'UBIGINT', 'UHUGEINT',
+}
+DATE_TYPES = {'DATE', 'TIMESTAMP', 'TIMESTAMP_S', 'TIMESTAMP_MS', 'TIMESTAMP_NS'}
+
+# Limites de data aceitos pelo índice sem truncar horário
+DATE_LITERAL_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+# Conexão dedicada ao parser (json_serialize_sql não acessa tabelas)
+_parser_connection = None
+_parser_lock = threading.Lock()
+_aggregate_functions = None
+
+
+def _get_parser_connection():
+    """Conexão do parser, criada na primeira chamada (chamar com _parser_lock)"""
+    global _parser_connection
+    if _parser_connection is None:
+        _parser_connection = duckdb.connect()
+    return _parser_connection
+
+
+def _parse_sql(sql_query: str) -> Optional[Dict]:
+    """Serializa a árvore sintática da query ou retorna None se não for parseável"""
+    with _parser_lock:
+        try:
+            serialized = _get_parser_connection().execute("SELECT json_serialize_sql(?)", [sql_query]).fetchone()[0]
+        except duckdb.Error:
+            return None
+
+    tree = json.loads(serialized)
+    if tree.get('error'):
+        return None
+    return tree
+
+
+def _iter_select_nodes(node: Any):
+    """
+    Percorre a árvore em pós-ordem devolvendo os nós com cláusula WHERE
+    (escopos internos primeiro). Subqueries usadas como predicado (IN (SELECT ...),
+    EXISTS) não são visitadas: seus filtros não restringem a consulta externa.
+    """
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key != 'where_clause':
+                yield from _iter_select_nodes(value)
+        if node.get('where_clause'):
+            yield node
+    elif isinstance(node, list):
+        for item in node:
+            yield from _iter_select_nodes(item)
+
+
+def _column_operand(expression: Dict) -> Optional[Tuple[str, bool]]:
+    """
+    Resolve uma referência de coluna, possivelmente qualificada e envolvida por
+    funções transparentes (LOWER, UPPER, TRIM)
+
+    Returns:
+        Tupla (nome da coluna, se há LOWER na cadeia) ou None
+    """
+    lowered = False
+    while expression.get('class') == 'FUNCTION' and expression.get('function_name') in TRANSPARENT_FUNCTIONS:
+        if len(expression.get('children', [])) != 1:
+            return None
+        lowered = lowered or expression['function_name'] == 'lower'
+        expression = expression['children'][0]
+
+    if expression.get('class') == 'COLUMN_REF':
+        return expression['column_names'][-1], lowered
+    return None
+
+
+def _year_operand(expression: Dict) -> Optional[str]:
+    """Coluna de YEAR(coluna) ou EXTRACT(YEAR FROM coluna), se for o caso"""
+    if expression.get('class') != 'FUNCTION':
+        return None
+
+    children = expression.get('children', [])
+    name = expression.get('function_name')
+    if name == 'year' and len(children) == 1:
+        column = _column_operand(children[0])
+    elif name in ('date_part', 'datepart') and len(children) == 2 and \
+            str(_constant_value(children[0])).lower() == 'year':
+        column = _column_operand(children[1])
+    else:
+        return None
+    return column[0] if column else None
+
+
+def _constant_value(expression: Dict) -> Any:
+    """Valor de uma constante (também sob CAST, ex.: DATE '2024-01-01'), ou None"""
+    while expression.get('class') == 'CAST':
+        expression = expression['child']
+
+    if expression.get('class') != 'CONSTANT' or expression['value'].get('is_null'):
+        return None
+    return expression['value'].get('value')
+
+
+def _normalize_value(value: Any, lowered: bool) -> Any:
+    """Aplica a mesma convenção do extrator por regex: LOWER(coluna) -> valor em maiúsculas"""
+    if lowered and isinstance(value, str):
+        return value.upper()
+    return value
+
+
+def _predicate_conditions(predicate: Dict) -> Optional[Dict[str, Any]]:
+    """
+    Converte um predicado atômico (ou grupo OR) em condições
+
+    Returns:
+        Dict de condições, {} para predicados sem filtro representável
+        (exclusões, comparações entre colunas, subqueries) ou None para
+        grupos OR que não se reduzem a uma lista de valores
+    """
+    predicate_type = predicate.get('type')
+    predicate_class = predicate.get('class')
+
+    if predicate_type == 'COMPARE_EQUAL':
+        left, right = predicate['left'], predicate['right']
+        for column_side, value_side in ((left, right), (right, left)):
+            value = _constant_value(value_side)
+            if value is None:
+                continue
+            column = _column_operand(column_side)
+            if column:
+                return {column[0]: _normalize_value(value, column[1])}
+            year_column = _year_operand(column_side)
+            if year_column and str(value).isdigit():
+                year = int(value)
+                return {f"{year_column}_>=": f"{year}-01-01", f"{year_column}_<": f"{year + 1}-01-01"}
+        return {}
+
+    if predicate_type in COMPARISON_SUFFIXES:
+        suffix = COMPARISON_SUFFIXES[predicate_type]
+        left, right = predicate['left'], predicate['right']
+        column, value = _column_operand(left), _constant_value(right)
+        if column is None:
+            column, value = _column_operand(right), _constant_value(left)
+            suffix = MIRRORED_SUFFIXES[suffix]
+        if column is None or value is None:
+            return {}
+        return {f"{column[0]}_{suffix}": _normalize_value(str(value), column[1])}
+
+    if predicate_type == 'COMPARE_BETWEEN':
+        column = _column_operand(predicate['input'])
+        lower, upper = _constant_value(predicate['lower']), _constant_value(predicate['upper'])
+        if column is None or lower is None or upper is None:
+            return {}
+        return {f"{column[0]}_>=": str(lower), f"{column[0]}_<=": str(upper)}
+
+    if predicate_type == 'COMPARE_IN':
+        children = predicate.get('children', [])
+        column = _column_operand(children[0]) if children else None
+        values = [_constant_value(child) for child in children[1:]]
+        if column is None or not values or any(value is None for value in values):
+            return {}
+        values = [_normalize_value(value, column[1]) for value in values]
+        # Para campos UF, converter para maiúsculo (mesma regra do extrator por regex)
+        if column[0].lower() == 'uf_cliente':
+            values = [str(value).upper() for value in values]
+        return {column[0]: values if len(values) > 1 else values[0]}
+
+    if predicate_class == 'FUNCTION' and predicate.get('function_name') in LIKE_FUNCTIONS:
+        children = predicate.get('children', [])
+        if len(children) != 2:
+            return {}
+        column, value = _column_operand(children[0]), _constant_value(children[1])
+        if column is None or value is None:
+            return {}
+        return {column[0]: _normalize_value(value, column[1])}
+
+    if predicate_type == 'CONJUNCTION_OR':
+        return _or_group_conditions(predicate)
+
+    # NOT IN, <>, NOT (...), subqueries e demais predicados: não viram filtro positivo
+    return {}
+
+
+def _or_group_conditions(predicate: Dict) -> Optional[Dict[str, Any]]:
+    """Grupo OR sobre uma única coluna -> lista de valores; qualquer outro OR -> None"""
+    column_name = None
+    merged: List[Any] = []
+
+    for branch in predicate.get('children', []):
+        if branch.get('type') not in ('COMPARE_EQUAL', 'COMPARE_IN', 'CONJUNCTION_OR') and not (
+                branch.get('class') == 'FUNCTION' and branch.get('function_name') in LIKE_FUNCTIONS):
+            return None
+
+        conditions = _predicate_conditions(branch)
+        if not conditions or len(conditions) != 1:
+            return None
+
+        (branch_column, value), = conditions.items()
+        if column_name is not None and branch_column != column_name:
+            return None
+        column_name = branch_column
+
+        for item in value if isinstance(value, list) else [value]:
+            if item not in merged:
+                merged.append(item)
+
+    if column_name is None:
+        return None
+    return {column_name: merged if len(merged) > 1 else merged[0]}
+
+
+def _flatten_and(expression: Dict) -> List[Dict]:
+    """Achata conjunções AND aninhadas em uma lista de predicados"""
+    if expression.get('type') == 'CONJUNCTION_AND':
+        predicates = []
+        for child in expression.get('children', []):
+            predicates.extend(_flatten_and(child))
+        return predicates
+    return [expression]
+
+
+def extract_where_conditions_ast(sql_query: str) -> Optional[Dict[str, Any]]:
+    """
+    Extrai as condições de todas as cláusulas WHERE da query via árvore sintática
+
+    Produz o mesmo formato de SQLFilterExtractor._extract_where_conditions:
+    coluna -> valor (ou lista) e coluna_<op> -> valor para intervalos.
+    Escopos internos (CTEs, subqueries) são processados antes do externo, que
+    prevalece em caso de conflito.
+
+    Args:
+        sql_query: Query SQL
+
+    Returns:
+        Dict com condições ou None se a query não puder ser parseada
+    """
+    tree = _parse_sql(sql_query)
+    if tree is None:
+        return None
+
+    conditions: Dict[str, Any] = {}
+    for select_node in _iter_select_nodes(tree.get('statements', [])):
+        for predicate in _flatten_and(select_node['where_clause']):
+            predicate_conditions = _predicate_conditions(predicate)
+            if predicate_conditions:
+                conditions.update(predicate_conditions)
+
+    return conditions
+
+
+def _contains_like(predicate: Dict) -> bool:
+    """Se o predicado (ou algum ramo de OR) usa LIKE/ILIKE"""
+    if predicate.get('class') == 'FUNCTION' and predicate.get('function_name') in LIKE_FUNCTIONS:
+        return True
+    if predicate.get('type') == 'CONJUNCTION_OR':
+        return any(_contains_like(child) for child in predicate.get('children', []))
+    return False
+
+
+def _aggregate_function_names() -> frozenset:
+    """Nomes das funções de agregação do DuckDB (consultados uma única vez)"""
+    global _aggregate_functions
+
+    with _parser_lock:
+        if _aggregate_functions is None:
+            rows = _get_parser_connection().execute(
+                "SELECT DISTINCT function_name FROM duckdb_functions() WHERE function_type = 'aggregate'"
+            ).fetchall()
+            _aggregate_functions = frozenset(row[0] for row in rows) | {'count_star'}
+    return _aggregate_functions
+
+
+def _contains_aggregate(node: Any, aggregates: frozenset) -> bool:
+    """Se a expressão (ou alguma subexpressão) chama uma função de agregação"""
+    if isinstance(node, dict):
+        if node.get('class') == 'FUNCTION' and node.get('function_name') in aggregates:
+            return True
+        return any(_contains_aggregate(value, aggregates) for value in node.values())
+    if isinstance(node, list):
+        return any(_contains_aggregate(item, aggregates) for item in node)
+    return False
+
+
+def _operand_type(expression: Dict, column_types: Dict[str, str]) -> Optional[Tuple[str, bool]]:
+    """
+    Tipo da coluna comparada em um operando
+
+    Returns:
+        Tupla (tipo da coluna, se o operando é YEAR(coluna)) ou None se o
+        operando não é uma coluna de tipo conhecido. LOWER/UPPER/TRIM só são
+        aceitos sobre colunas VARCHAR.
+    """
+    wrapped = False
+    while expression.get('class') == 'FUNCTION' and expression.get('function_name') in TRANSPARENT_FUNCTIONS:
+        if len(expression.get('children', [])) != 1:
+            return None
+        wrapped = True
+        expression = expression['children'][0]
+
+    if expression.get('class') == 'COLUMN_REF':
+        column_type = column_types.get(expression['column_names'][-1].lower())
+        if column_type is None or (wrapped and column_type != 'VARCHAR'):
+            return None
+        return column_type, False
+
+    year_column = None if wrapped else _year_operand(expression)
+    if year_column and year_column.lower() in column_types:
+        return column_types[year_column.lower()], True
+    return None
+
+
+def _literal_matches(column_type: str, expression: Dict, year: bool = False) -> bool:
+    """
+    Se a constante tem exatamente o tipo da coluna (sem conversão implícita)
+
+    Datas só são aceitas no formato AAAA-MM-DD (texto ou DATE '...'): limites
+    com horário seriam truncados pelo índice.
+    """
+    cast_type = None
+    if expression.get('class') == 'CAST':
+        cast_type = expression.get('cast_type', {}).get('id')
+        expression = expression.get('child', {})
+    if expression.get('class') != 'CONSTANT' or expression['value'].get('is_null'):
+        return False
+
+    literal_type = expression['value']['type']['id']
+    if year:
+        return column_type in DATE_TYPES and cast_type is None and literal_type in INTEGER_TYPES
+    if column_type in DATE_TYPES:
+        return cast_type in (None, 'DATE') and literal_type == 'VARCHAR' and \
+            bool(DATE_LITERAL_PATTERN.match(str(expression['value'].get('value'))))
+    if cast_type is not None:
+        return False
+    if column_type == 'VARCHAR':
+        return literal_type == 'VARCHAR'
+    if column_type in INTEGER_TYPES:
+        return literal_type in INTEGER_TYPES
+    return False
+
+
+def _predicate_types_match(predicate: Dict, column_types: Dict[str, str]) -> bool:
+    """Se todas as constantes do predicado (ou dos ramos do OR) têm o tipo exato da coluna"""
+    predicate_type = predicate.get('type')
+
+    if predicate_type == 'COMPARE_EQUAL' or predicate_type in COMPARISON_SUFFIXES:
+        left, right = predicate['left'], predicate['right']
+        for column_side, value_side in ((left, right), (right, left)):
+            operand = _operand_type(column_side, column_types)
+            if operand is not None:
+                return _literal_matches(operand[0], value_side, operand[1])
+        return False
+
+    if predicate_type == 'COMPARE_BETWEEN':
+        operand = _operand_type(predicate['input'], column_types)
+        return operand is not None and not operand[1] and all(
+            _literal_matches(operand[0], predicate[bound]) for bound in ('lower', 'upper')
+        )
+
+    if predicate_type == 'COMPARE_IN':
+        children = predicate.get('children', [])
+        operand = _operand_type(children[0], column_types) if children else None
+        return operand is not None and not operand[1] and all(
+            _literal_matches(operand[0], child) for child in children[1:]
+        )
+
+    if predicate_type == 'CONJUNCTION_OR':
+        return all(_predicate_types_match(child, column_types) for child in predicate.get('children', []))
+
+    return False
+
+
+def extract_table_conditions_ast(sql_query: str,
+                                 column_types: Dict[str, str]) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """
+    Condições obrigatórias de um SELECT simples sobre uma única tabela
+
+    Versão estrita de extract_where_conditions_ast: só aceita um SELECT sem CTE
+    nem UNION com FROM direto em uma tabela e sem agregações (COUNT/SUM sempre
+    devolvem uma linha) e considera apenas predicados do AND de topo (sem LIKE)
+    cujas constantes têm exatamente o tipo da coluna. Toda linha do resultado
+    atende às condições devolvidas, o que permite decidir que a consulta é
+    vazia sem executá-la.
+
+    Args:
+        sql_query: Query SQL
+        column_types: Coluna (minúsculas) -> tipo no DuckDB (ex.: 'VARCHAR', 'TIMESTAMP_NS')
+
+    Returns:
+        Tupla (nome da tabela, condições) ou None se a query não for elegível
+    """
+    tree = _parse_sql(sql_query)
+    if tree is None or len(tree.get('statements', [])) != 1:
+        return None
+
+    node = tree['statements'][0].get('node', {})
+    if node.get('type') != 'SELECT_NODE' or node.get('cte_map', {}).get('map'):
+        return None
+    from_table = node.get('from_table') or {}
+    if from_table.get('type') != 'BASE_TABLE' or from_table.get('schema_name'):
+        return None
+    aggregates = _aggregate_function_names()
+    if _contains_aggregate(node.get('select_list'), aggregates) or \
+            _contains_aggregate(node.get('having'), aggregates):
+        return None
+
+    conditions: Dict[str, Any] = {}
+    if node.get('where_clause'):
+        for predicate in _flatten_and(node['where_clause']):
+            if _contains_like(predicate) or not _predicate_types_match(predicate, column_types):
+                continue
+            predicate_conditions = _predicate_conditions(predicate)
+            if predicate_conditions:
+                conditions.update(predicate_conditions)
+
+    return from_table['table_name'], conditions
@@ -5,17 +5,150 @@ mapeando para estrutura JSON esperada pelo sistema de filtros.
 """
 
 import re
+import threading
 import pandas as pd
+from collections import OrderedDict
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Union
 import copy
 
+from .sql_ast_extractor import extract_where_conditions_ast
+
+
+class _ExtractionCache:
+    """
+    Cache LRU thread-safe: query canônica -> estrutura de filtros extraída
+    """
+
+    def __init__(self, max_size: int = 512):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: Dict):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "hit_rate": self.hits / total if total else 0.0
+            }
+
+
+# Cache compartilhado por todas as instâncias (a extração depende apenas do texto da query)
+_extraction_cache = _ExtractionCache()
+
 
 class SQLFilterExtractor:
     """
     Extrator que analisa queries SQL para gerar filtros em formato JSON
     """
 
+    # Mapeamento de colunas SQL para categorias JSON
+    COLUMN_MAPPING = {
+        # Período
+        'Data': 'periodo',
+        'Data_>=': 'periodo',
+        'Data_<': 'periodo',
+        'Data_<=': 'periodo',
+        'Data_>': 'periodo',
+        'periodo': 'periodo',
+        'mes': 'periodo',
+        'ano': 'periodo',
+
+        # Região
+        'UF_Cliente': 'regiao',
+        'Municipio_Cliente': 'regiao',
+        'cidade': 'regiao',
+        'estado': 'regiao',
+
+        # Cliente
+        'Cod_Cliente': 'cliente',
+        'Cod_Segmento_Cliente': 'cliente',
+        'cliente': 'cliente',
+
+        # Produto
+        'Cod_Familia_Produto': 'produto',
+        'Cod_Grupo_Produto': 'produto',
+        'Cod_Linha_Produto': 'produto',
+        'Des_Linha_Produto': 'produto',
+        'produto': 'produto',
+        'familia': 'produto',
+        'grupo': 'produto',
+        'linha': 'produto',
+
+        # Representante
+        'Cod_Vendedor': 'representante',
+        'Cod_Regiao_Vendedor': 'representante',
+        'vendedor': 'representante',
+        'representante': 'representante'
+    }
+
+    # Padrões pré-compilados (compilados uma única vez na carga do módulo)
+    WHITESPACE_PATTERN = re.compile(r'\s+')
+    WHERE_PATTERN = re.compile(
+        r'\bWHERE\b(.*?)(?:\bGROUP BY\b|\bORDER BY\b|\bHAVING\b|\bLIMIT\b|$)',
+        re.IGNORECASE
+    )
+    IN_VALUE_PATTERN = re.compile(r"'([^']*)'|\"([^\"]*)\"")
+    OPERATOR_SUFFIX_PATTERN = re.compile(r'_[><=!]+$')
+
+    # Padrões para extrair diferentes tipos de condições
+    CONDITION_PATTERNS = [
+        (re.compile(pattern, re.IGNORECASE), condition_type)
+        for pattern, condition_type in [
+            # Igualdade com LOWER(): LOWER(coluna) = 'valor'
+            (r"LOWER\((\w+)\)\s*=\s*'([^']*)'", 'equality_lower'),
+
+            # Igualdade simples: coluna = 'valor'
+            (r"(?<!LOWER\()(\w+)\s*=\s*'([^']*)'", 'equality'),
+
+            # Igualdade com aspas duplas
+            (r"(?:LOWER\()?(\w+)\)?\s*=\s*\"([^\"]*)\"", 'equality'),
+
+            # LIKE com LOWER(): LOWER(coluna) LIKE 'valor'
+            (r"LOWER\((\w+)\)\s+LIKE\s+'([^']*)'", 'like_lower'),
+
+            # LIKE simples: coluna LIKE 'valor'
+            (r"(?<!LOWER\()(\w+)\s+LIKE\s+'([^']*)'", 'like'),
+
+            # Comparações com datas: coluna >= DATE '2024-01-01' ou coluna >= '2024-01-01'
+            (r"(\w+)\s*([><=!]+)\s*(?:DATE\s*)?'([^']*)'", 'comparison'),
+
+            # IN: coluna IN (valores)
+            (r"(?:LOWER\()?(\w+)\)?\s+IN\s*\(([^)]+)\)", 'in_values'),
+
+            # BETWEEN: coluna BETWEEN valor1 AND valor2
+            (r"(\w+)\s+BETWEEN\s+([^\s]+)\s+AND\s+([^\s]+)", 'between')
+        ]
+    ]
+
     def __init__(self, df_dataset: Optional[pd.DataFrame] = None):
         """
         Inicializa o extrator com dataset para validação opcional
@@ -25,45 +158,8 @@ class SQLFilterExtractor:
         """
         self.df_dataset = df_dataset
 
-        # Mapeamento de colunas SQL para categorias JSON
-        self.column_mapping = {
-            # Período
-            'Data': 'periodo',
-            'Data_>=': 'periodo',
-            'Data_<': 'periodo',
-            'Data_<=': 'periodo',
-            'Data_>': 'periodo',
-            'periodo': 'periodo',
-            'mes': 'periodo',
-            'ano': 'periodo',
-
-            # Região
-            'UF_Cliente': 'regiao',
-            'Municipio_Cliente': 'regiao',
-            'cidade': 'regiao',
-            'estado': 'regiao',
-
-            # Cliente
-            'Cod_Cliente': 'cliente',
-            'Cod_Segmento_Cliente': 'cliente',
-            'cliente': 'cliente',
-
-            # Produto
-            'Cod_Familia_Produto': 'produto',
-            'Cod_Grupo_Produto': 'produto',
-            'Cod_Linha_Produto': 'produto',
-            'Des_Linha_Produto': 'produto',
-            'produto': 'produto',
-            'familia': 'produto',
-            'grupo': 'produto',
-            'linha': 'produto',
-
-            # Representante
-            'Cod_Vendedor': 'representante',
-            'Cod_Regiao_Vendedor': 'representante',
-            'vendedor': 'representante',
-            'representante': 'representante'
-        }
+        # Mapeamento compartilhado (constante de classe, não reconstruído por instância)
+        self.column_mapping = self.COLUMN_MAPPING
 
     def extract_filters_from_sql(self, sql_query: str) -> Dict:
         """
@@ -75,10 +171,28 @@ class SQLFilterExtractor:
         Returns:
             Dict com filtros estruturados no formato JSON esperado
         """
-        try:
-            # Normalizar query
-            normalized_query = re.sub(r'\s+', ' ', sql_query.strip())
+        # Normalizar query (forma canônica usada como chave do cache)
+        normalized_query = self.WHITESPACE_PATTERN.sub(' ', sql_query.strip())
+
+        cached = _extraction_cache.get(normalized_query)
+        if cached is None:
+            cached = self._extract_filters_uncached(normalized_query)
+            _extraction_cache.put(normalized_query, cached)
+
+        # Cópia para que o chamador nunca altere o resultado em cache
+        return copy.deepcopy(cached)
+
+    def _extract_filters_uncached(self, normalized_query: str) -> Dict:
+        """
+        Extrai filtros de uma query já normalizada (sem consultar o cache)
+
+        Args:
+            normalized_query: Query SQL com espaços normalizados
 
+        Returns:
+            Dict com filtros estruturados no formato JSON esperado
+        """
+        try:
             # Extrair cláusula WHERE
             where_context = self._extract_where_conditions(normalized_query)
 
@@ -97,6 +211,26 @@ class SQLFilterExtractor:
         """
         Extrai condições da cláusula WHERE de forma robusta
 
+        Usa a árvore sintática do DuckDB (CTEs, subqueries, OR, NOT IN e colunas
+        qualificadas); o extrator por regex fica como fallback para queries que
+        o parser não aceita.
+
+        Args:
+            sql_query: Query SQL normalizada
+
+        Returns:
+            Dict com condições extraídas
+        """
+        conditions = extract_where_conditions_ast(sql_query)
+        if conditions is not None:
+            return conditions
+
+        return self._extract_where_conditions_regex(sql_query)
+
+    def _extract_where_conditions_regex(self, sql_query: str) -> Dict:
+        """
+        Extrai condições da cláusula WHERE por expressões regulares (fallback)
+
         Args:
             sql_query: Query SQL normalizada
 
@@ -104,10 +238,7 @@ class SQLFilterExtractor:
             Dict com condições extraídas
         """
         # Encontrar cláusula WHERE
-        where_match = re.search(
-            r'\bWHERE\b(.*?)(?:\bGROUP BY\b|\bORDER BY\b|\bHAVING\b|\bLIMIT\b|$)',
-            sql_query, re.IGNORECASE
-        )
+        where_match = self.WHERE_PATTERN.search(sql_query)
 
         if not where_match:
             return {}
@@ -115,35 +246,8 @@ class SQLFilterExtractor:
         where_clause = where_match.group(1).strip()
         conditions = {}
 
-        # Padrões para extrair diferentes tipos de condições
-        patterns = [
-            # Igualdade com LOWER(): LOWER(coluna) = 'valor'
-            (r"LOWER\((\w+)\)\s*=\s*'([^']*)'", 'equality_lower'),
-
-            # Igualdade simples: coluna = 'valor'
-            (r"(?<!LOWER\()(\w+)\s*=\s*'([^']*)'", 'equality'),
-
-            # Igualdade com aspas duplas
-            (r"(?:LOWER\()?(\w+)\)?\s*=\s*\"([^\"]*)\"", 'equality'),
-
-            # LIKE com LOWER(): LOWER(coluna) LIKE 'valor'
-            (r"LOWER\((\w+)\)\s+LIKE\s+'([^']*)'", 'like_lower'),
-
-            # LIKE simples: coluna LIKE 'valor'
-            (r"(?<!LOWER\()(\w+)\s+LIKE\s+'([^']*)'", 'like'),
-
-            # Comparações com datas: coluna >= DATE '2024-01-01' ou coluna >= '2024-01-01'
-            (r"(\w+)\s*([><=!]+)\s*(?:DATE\s*)?'([^']*)'", 'comparison'),
-
-            # IN: coluna IN (valores)
-            (r"(?:LOWER\()?(\w+)\)?\s+IN\s*\(([^)]+)\)", 'in_values'),
-
-            # BETWEEN: coluna BETWEEN valor1 AND valor2
-            (r"(\w+)\s+BETWEEN\s+([^\s]+)\s+AND\s+([^\s]+)", 'between')
-        ]
-
-        for pattern, condition_type in patterns:
-            matches = re.finditer(pattern, where_clause, re.IGNORECASE)
+        for pattern, condition_type in self.CONDITION_PATTERNS:
+            matches = pattern.finditer(where_clause)
 
             for match in matches:
                 if condition_type in ['equality', 'equality_lower', 'like', 'like_lower']:
@@ -173,7 +277,7 @@ class SQLFilterExtractor:
                     values_str = match.group(2)
 
                     # Extrair valores individuais
-                    values = re.findall(r"'([^']*)'|\"([^\"]*)\"", values_str)
+                    values = self.IN_VALUE_PATTERN.findall(values_str)
                     if values:
                         clean_values = [v[0] or v[1] for v in values]
                         # Para campos UF, converter para maiúsculo
@@ -220,7 +324,7 @@ class SQLFilterExtractor:
         # Processar outras condições
         for sql_column, value in other_conditions.items():
             # Remover sufixos de operador para mapear coluna
-            base_column = re.sub(r'_[><=!]+$', '', sql_column)
+            base_column = self.OPERATOR_SUFFIX_PATTERN.sub('', sql_column)
 
             if base_column in self.column_mapping:
                 category = self.column_mapping[base_column]
@@ -562,6 +666,37 @@ class SQLFilterExtractor:
         return result
 
 
+# Instância global do extrator (sem estado por dataset: pode ser compartilhada)
+_global_sql_filter_extractor: Optional[SQLFilterExtractor] = None
+
+
+def get_sql_filter_extractor() -> SQLFilterExtractor:
+    """
+    Singleton para obter o extrator de filtros SQL
+
+    Returns:
+        Instância do SQLFilterExtractor
+    """
+    global _global_sql_filter_extractor
+
+    if _global_sql_filter_extractor is None:
+        _global_sql_filter_extractor = SQLFilterExtractor()
+
+    return _global_sql_filter_extractor
+
+
+def reset_sql_filter_extractor():
+    """Descarta o extrator global e o cache de extração"""
+    global _global_sql_filter_extractor
+    _global_sql_filter_extractor = None
+    _extraction_cache.clear()
+
+
+def get_extraction_cache_stats() -> Dict[str, Any]:
+    """Estatísticas do cache de extração (hits, misses, tamanho e taxa de acerto)"""
+    return _extraction_cache.stats()
+
+
 def extract_filters_from_sql(sql_query: str, df_dataset: Optional[pd.DataFrame] = None) -> Dict:
     """
     Função de conveniência para extrair filtros de uma query SQL
@@ -573,8 +708,8 @@ def extract_filters_from_sql(sql_query: str, df_dataset: Optional[pd.DataFrame]
     Returns:
         Dict com filtros em formato JSON
     """
-    extractor = SQLFilterExtractor(df_dataset)
-    return extractor.extract_filters_from_sql(sql_query)
+    # df_dataset não participa da extração: usar o extrator compartilhado
+    return get_sql_filter_extractor().extract_filters_from_sql(sql_query)
 
 
 def extract_filters_from_debug_info(debug_info: Dict, df_dataset: Optional[pd.DataFrame] = None) -> Dict:
@@ -595,5 +730,4 @@ def extract_filters_from_debug_info(debug_info: Dict, df_dataset: Optional[pd.Da
     if not sql_queries:
         return {}
 
-    extractor = SQLFilterExtractor(df_dataset)
-    return extractor.extract_filters_from_multiple_queries(sql_queries)
\ No newline at end of file
+    return get_sql_filter_extractor().extract_filters_from_multiple_queries(sql_queries)
\ No newline at end of file
@@ -0,0 +1,241 @@
+"""
+Autocomplete de valores de filtro
+Índice de prefixos em array ordenado sobre os valores normalizados das colunas
+filtráveis (município, linha de produto, segmento, vendedor...), com as
+completações ordenadas pela frequência de linhas
+"""
+
+import re
+import threading
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from .dataset_stats import normalize_stat_key
+from .json_filter_manager import calcular_fingerprint_dataset
+
+
+AUTOCOMPLETE_COLUMNS = [
+    'UF_Cliente', 'Municipio_Cliente', 'Cod_Segmento_Cliente',
+    'Cod_Familia_Produto', 'Cod_Grupo_Produto', 'Cod_Linha_Produto', 'Des_Linha_Produto',
+    'Cod_Vendedor', 'Cod_Regiao_Vendedor'
+]
+
+# Colunas usadas para resolver nomes parciais na pergunta do usuário
+ENTITY_HINT_COLUMNS = ['Municipio_Cliente', 'Des_Linha_Produto']
+
+# Tamanho mínimo de um termo parcial para sugerir completações
+MIN_PARTIAL_LENGTH = 4
+
+# Palavras de ligação, interrogativas e termos comuns de perguntas (sem acentos):
+# não iniciam nem terminam um trecho candidato e não são tratadas como nomes parciais
+QUESTION_STOPWORDS = frozenset({
+    'a', 'as', 'o', 'os', 'um', 'uma', 'uns', 'umas', 'ao', 'aos', 'de', 'da', 'das', 'do', 'dos',
+    'e', 'ou', 'em', 'na', 'nas', 'no', 'nos', 'para', 'pra', 'por', 'pelo', 'pela', 'pelos', 'pelas',
+    'com', 'sem', 'entre', 'ate', 'sobre', 'desde', 'que', 'se', 'mais', 'menos', 'cada',
+    'todo', 'toda', 'todos', 'todas', 'este', 'esta', 'esse', 'essa', 'isso', 'isto',
+    'meu', 'minha', 'nosso', 'nossa', 'seu', 'sua',
+    'qual', 'quais', 'quanto', 'quanta', 'quantos', 'quantas', 'quando', 'onde', 'como', 'quem', 'porque',
+    'vendas', 'venda', 'vendido', 'vendidos', 'faturamento', 'faturado', 'receita', 'top', 'total', 'totais',
+    'valor', 'valores', 'media', 'soma', 'dia', 'dias', 'mes', 'meses', 'ano', 'anos', 'periodo',
+    'trimestre', 'semestre', 'ultimo', 'ultimos', 'ultima', 'ultimas', 'maior', 'maiores', 'menor', 'menores',
+    'mostre', 'mostrar', 'liste', 'listar', 'compare', 'comparar', 'quero', 'gostaria', 'ver',
+    'cliente', 'clientes', 'produto', 'produtos', 'cidade', 'cidades', 'estado', 'estados',
+    'municipio', 'municipios', 'regiao', 'vendedor', 'vendedores', 'ranking',
+})
+
+# Fração mínima das linhas da coluna para um valor ser sugerido a partir de um termo parcial
+MIN_HINT_FREQUENCY = 0.001
+
+# Termos que completam mais valores distintos que isso são genéricos demais para sugestão
+MAX_HINT_MATCHES = 25
+
+# Máximo de datasets indexados em memória (chave: fingerprint)
+MAX_CACHED_AUTOCOMPLETES = 4
+
+WORD_PATTERN = re.compile(r"[A-Z0-9]+")
+
+
+class Completion(NamedTuple):
+    """Valor sugerido para um prefixo"""
+    column: str
+    value: Any  # valor como aparece no dataset
+    count: int
+
+
+class ColumnPrefixIndex:
+    """
+    Índice de prefixos de uma coluna.
+
+    keys: chaves normalizadas ordenadas (o valor inteiro e cada sufixo que
+    começa em uma palavra, para que 'cart' encontre 'Papel Cartão');
+    entry_values: posição do valor de cada chave. Um prefixo corresponde a um
+    intervalo contíguo de keys, localizado por busca binária.
+    """
+
+    def __init__(self, column: str, series: pd.Series):
+        self.column = column
+        counts = series.dropna().value_counts(sort=False)
+
+        # Valores distintos após normalização (soma das frequências das variações)
+        grouped: Dict[str, List] = {}
+        for value, count in counts.items():
+            key = normalize_stat_key(value)
+            if not key:
+                continue
+            entry = grouped.setdefault(key, [value, 0, 0])
+            entry[1] += int(count)
+            if count > entry[2]:
+                entry[0], entry[2] = value, int(count)  # variação mais frequente para exibir
+
+        self.values = [entry[0] for entry in grouped.values()]
+        self.counts = np.array([entry[1] for entry in grouped.values()], dtype=np.int64)
+        self.total = int(self.counts.sum())
+        self.words = set()
+
+        entries = []
+        for position, key in enumerate(grouped):
+            entries.append((key, position))
+            for match in WORD_PATTERN.finditer(key):
+                self.words.add(match.group())
+                if match.start() > 0:
+                    entries.append((key[match.start():], position))
+        entries.sort()
+
+        self.keys = [key for key, _ in entries]
+        self.entry_values = np.array([position for _, position in entries], dtype=np.int64)
+
+    def matches(self, prefix: str) -> np.ndarray:
+        """Posições (distintas) dos valores que completam o prefixo"""
+        key = normalize_stat_key(prefix)
+        start = bisect_left(self.keys, key)
+        end = bisect_left(self.keys, key + '\uffff', lo=start)
+        return np.unique(self.entry_values[start:end])
+
+    def complete(self, prefix: str, k: int = 10) -> List[Completion]:
+        """
+        Completações de um prefixo, mais frequentes primeiro
+
+        Args:
+            prefix: Texto digitado (sem diferenciar maiúsculas e acentos)
+            k: Máximo de completações
+
+        Returns:
+            Lista de Completion
+        """
+        positions = self.matches(prefix)
+        if len(positions) == 0:
+            return []
+        if len(positions) > k:
+            counts = self.counts[positions]
+            top = np.argpartition(-counts, k - 1)[:k]
+            positions = positions[top]
+        ordered = sorted(positions.tolist(), key=lambda p: (-self.counts[p], str(self.values[p])))
+        return [Completion(self.column, self.values[p], int(self.counts[p])) for p in ordered]
+
+
+class ValueAutocomplete:
+    """Autocomplete sobre todas as colunas filtráveis de um dataset"""
+
+    def __init__(self, df: pd.DataFrame, columns: Optional[Iterable[str]] = None):
+        self.indexes: Dict[str, ColumnPrefixIndex] = {
+            column: ColumnPrefixIndex(column, df[column])
+            for column in (columns or AUTOCOMPLETE_COLUMNS)
+            if column in df.columns
+        }
+
+    def complete(self, prefix: str, column: Optional[str] = None, k: int = 10) -> List[Completion]:
+        """
+        Top-k completações de um prefixo, ordenadas pela frequência de linhas
+
+        Args:
+            prefix: Texto parcial (ex.: 'joinv', 'papel c')
+            column: Restringe a uma coluna; None busca em todas
+            k: Máximo de completações
+
+        Returns:
+            Lista de Completion (coluna, valor, linhas)
+        """
+        if not prefix or not prefix.strip():
+            return []
+        if column is not None:
+            index = self.indexes.get(column)
+            return index.complete(prefix, k) if index else []
+
+        completions = [c for index in self.indexes.values() for c in index.complete(prefix, k)]
+        completions.sort(key=lambda c: -c.count)
+        return completions[:k]
+
+    def resolve_partial_entities(self, text: str, columns: Optional[Iterable[str]] = None,
+                                 k: int = 3) -> Dict[str, List[Completion]]:
+        """
+        Resolve termos parciais de uma pergunta (ex.: 'joinv' -> Joinville)
+
+        Só considera termos com pelo menos MIN_PARTIAL_LENGTH caracteres que
+        não são palavras comuns de perguntas (QUESTION_STOPWORDS) nem palavras
+        completas de nenhum valor da coluna. Termos que completam mais de
+        MAX_HINT_MATCHES valores são ignorados, assim como valores com menos
+        de MIN_HINT_FREQUENCY das linhas da coluna.
+
+        Args:
+            text: Pergunta do usuário
+            columns: Colunas consultadas (padrão: ENTITY_HINT_COLUMNS)
+            k: Máximo de completações por termo
+
+        Returns:
+            Dict termo -> completações
+        """
+        indexes = [self.indexes[c] for c in (columns or ENTITY_HINT_COLUMNS) if c in self.indexes]
+        resolved: Dict[str, List[Completion]] = {}
+        for term in dict.fromkeys(WORD_PATTERN.findall(normalize_stat_key(text))):
+            if len(term) < MIN_PARTIAL_LENGTH or term.lower() in QUESTION_STOPWORDS:
+                continue
+            if any(term in index.words or len(index.matches(term)) > MAX_HINT_MATCHES for index in indexes):
+                continue
+            completions = [
+                c for index in indexes for c in index.complete(term, k)
+                if c.count >= MIN_HINT_FREQUENCY * index.total
+            ]
+            if completions:
+                completions.sort(key=lambda c: -c.count)
+                resolved[term.lower()] = completions[:k]
+        return resolved
+
+
+# Registro global: fingerprint do dataset -> autocomplete
+_autocomplete_registry: "OrderedDict[str, ValueAutocomplete]" = OrderedDict()
+_autocomplete_lock = threading.Lock()
+
+
+def get_value_autocomplete(df: pd.DataFrame) -> ValueAutocomplete:
+    """
+    Retorna o autocomplete do dataset, construindo-o na primeira chamada
+
+    Args:
+        df: DataFrame do dataset
+
+    Returns:
+        ValueAutocomplete compartilhado por todas as sessões com o mesmo dataset
+    """
+    fingerprint = calcular_fingerprint_dataset(df)
+    with _autocomplete_lock:
+        autocomplete = _autocomplete_registry.get(fingerprint)
+        if autocomplete is not None:
+            _autocomplete_registry.move_to_end(fingerprint)
+            return autocomplete
+
+    autocomplete = ValueAutocomplete(df)
+    with _autocomplete_lock:
+        _autocomplete_registry[fingerprint] = autocomplete
+        while len(_autocomplete_registry) > MAX_CACHED_AUTOCOMPLETES:
+            _autocomplete_registry.popitem(last=False)
+    return autocomplete
+
+
+def reset_value_autocompletes():
+    """Descarta os índices de autocomplete em cache (útil para testes)"""
+    with _autocomplete_lock:
+        _autocomplete_registry.clear()
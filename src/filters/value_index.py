@@ -0,0 +1,117 @@
+"""
+Índice de validação de valores por coluna
+Substitui as buscas lineares de JSONFilterManager.validar_valores por
+lookups em hash e um índice de trigramas para o fallback fuzzy
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+TRIGRAM_SIZE = 3
+
+
+def _trigrams(text: str) -> set:
+    """Conjunto de trigramas de um texto"""
+    return {text[i:i + TRIGRAM_SIZE] for i in range(len(text) - TRIGRAM_SIZE + 1)}
+
+
+class ColumnValueIndex:
+    """
+    Índice imutável dos valores válidos de uma coluna.
+
+    Mantém a mesma semântica da validação original:
+    - exata: comparação das representações str() dos valores;
+    - fuzzy: primeiro valor (na ordem do dataset) em que a entrada contém o
+      valor ou o valor contém a entrada, sem diferenciar maiúsculas.
+
+    Estruturas:
+    - value_set: hash set das strings canônicas (validação exata O(1));
+    - by_upper: chave normalizada (upper) -> posição da primeira ocorrência;
+    - trigram_postings: trigrama -> posições dos valores que o contêm.
+    """
+
+    def __init__(self, values: Iterable):
+        self.values: List[str] = [str(v) for v in values]
+        self.value_set = frozenset(self.values)
+        self.upper_values: List[str] = [v.upper() for v in self.values]
+
+        self.by_upper: Dict[str, int] = {}
+        postings: Dict[str, List[int]] = {}
+        for position, upper in enumerate(self.upper_values):
+            self.by_upper.setdefault(upper, position)
+            for trigram in _trigrams(upper):
+                postings.setdefault(trigram, []).append(position)
+        self.trigram_postings: Dict[str, Tuple[int, ...]] = {k: tuple(v) for k, v in postings.items()}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def contains(self, value: str) -> bool:
+        """Validação exata O(1)"""
+        return value in self.value_set
+
+    def _first_containing(self, query_upper: str) -> Optional[int]:
+        """Primeira posição cujo valor contém a entrada (via trigramas)"""
+        if len(query_upper) < TRIGRAM_SIZE:
+            # Entradas curtas não têm trigramas: busca linear (raro)
+            for position, upper in enumerate(self.upper_values):
+                if query_upper in upper:
+                    return position
+            return None
+
+        candidates = None
+        for trigram in _trigrams(query_upper):
+            posting = self.trigram_postings.get(trigram)
+            if posting is None:
+                return None
+            if candidates is None or len(posting) < len(candidates):
+                candidates = posting
+
+        for position in candidates:
+            if query_upper in self.upper_values[position]:
+                return position
+        return None
+
+    def _first_contained(self, query_upper: str) -> Optional[int]:
+        """Primeira posição cujo valor está contido na entrada (substrings da entrada)"""
+        best = self.by_upper.get("")
+        length = len(query_upper)
+        for start in range(length):
+            for end in range(start + 1, length + 1):
+                position = self.by_upper.get(query_upper[start:end])
+                if position is not None and (best is None or position < best):
+                    best = position
+        return best
+
+    def fuzzy_match(self, value: str) -> Optional[str]:
+        """
+        Primeiro valor válido (na ordem do dataset) relacionado por substring
+
+        Args:
+            value: Valor informado no filtro
+
+        Returns:
+            Valor canônico ou None
+        """
+        query_upper = value.upper()
+        positions = [p for p in (self._first_containing(query_upper), self._first_contained(query_upper))
+                     if p is not None]
+        return self.values[min(positions)] if positions else None
+
+
+def build_value_indexes(df_dataset, columns: Iterable[str]) -> Dict[str, ColumnValueIndex]:
+    """
+    Constrói os índices de validação das colunas existentes no dataset
+
+    Args:
+        df_dataset: DataFrame com os dados
+        columns: Colunas candidatas
+
+    Returns:
+        Dict coluna -> ColumnValueIndex
+    """
+    return {
+        column: ColumnValueIndex(df_dataset[column].dropna().unique().tolist())
+        for column in columns
+        if column in df_dataset.columns
+    }
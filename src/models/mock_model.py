@@ -0,0 +1,107 @@
+"""
+Modelo mock determinístico para executar o agente offline
+Reproduz chamadas de ferramentas roteirizadas sem acessar a OpenAI
+"""
+
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, Iterator, List
+
+from agno.models.base import Model
+from agno.models.message import Message
+from agno.models.metrics import Metrics
+from agno.models.response import ModelResponse
+
+
+@dataclass
+class MockModel(Model):
+    """
+    Modelo agno que devolve respostas roteirizadas.
+
+    O roteiro é uma lista de passos consumidos em ordem dentro de cada turno.
+    Cada passo é um dict com "tool_calls" (lista de {"name", "arguments"})
+    ou "content" (resposta final). Após o último passo, o modelo responde
+    com final_content. Tokens são estimados (~4 caracteres por token) e a
+    latência pode ser simulada para benchmarks.
+
+    Exemplo:
+        MockModel(script=[
+            {"tool_calls": [{"name": "run_query", "arguments": {"query": "SELECT 1"}}]},
+            {"content": "Resultado: 1"}
+        ])
+    """
+
+    id: str = "mock-model"
+    name: str = "MockModel"
+    provider: str = "Mock"
+
+    script: List[Dict[str, Any]] = field(default_factory=list)
+    final_content: str = "Análise concluída."
+    latency: float = 0.0
+
+    def _current_step(self, messages: List[Message]) -> int:
+        """Número de respostas do assistente desde a última mensagem do usuário"""
+        step = 0
+        for message in reversed(messages):
+            if message.role == "user":
+                break
+            if message.role == "assistant":
+                step += 1
+        return step
+
+    def _build_response(self, messages: List[Message]) -> ModelResponse:
+        """Monta a resposta do passo corrente do roteiro"""
+        step_index = self._current_step(messages)
+        step = self.script[step_index] if step_index < len(self.script) else {"content": self.final_content}
+
+        tool_calls = []
+        for call_index, call in enumerate(step.get("tool_calls", [])):
+            tool_calls.append({
+                "id": f"call_{step_index}_{call_index}",
+                "type": "function",
+                "function": {
+                    "name": call["name"],
+                    "arguments": json.dumps(call.get("arguments", {}), ensure_ascii=False)
+                }
+            })
+
+        content = step.get("content")
+        prompt_chars = sum(len(m.get_content_string() or "") for m in messages)
+        output_chars = len(content or "") + sum(len(c["function"]["arguments"]) for c in tool_calls)
+        input_tokens = max(1, prompt_chars // 4)
+        output_tokens = max(1, output_chars // 4)
+
+        return ModelResponse(
+            role="assistant",
+            content=content,
+            tool_calls=tool_calls,
+            response_usage=Metrics(
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                total_tokens=input_tokens + output_tokens
+            )
+        )
+
+    def invoke(self, messages: List[Message], assistant_message: Message, *args, **kwargs) -> ModelResponse:
+        assistant_message.metrics.start_timer()
+        if self.latency:
+            time.sleep(self.latency)
+        response = self._build_response(messages)
+        assistant_message.metrics.stop_timer()
+        return response
+
+    async def ainvoke(self, messages: List[Message], assistant_message: Message, *args, **kwargs) -> ModelResponse:
+        return self.invoke(messages, assistant_message, *args, **kwargs)
+
+    def invoke_stream(self, messages: List[Message], assistant_message: Message, *args, **kwargs) -> Iterator[ModelResponse]:
+        yield self.invoke(messages, assistant_message, *args, **kwargs)
+
+    async def ainvoke_stream(self, messages: List[Message], assistant_message: Message, *args, **kwargs) -> AsyncIterator[ModelResponse]:
+        yield self.invoke(messages, assistant_message, *args, **kwargs)
+
+    def _parse_provider_response(self, response: Any, **kwargs) -> ModelResponse:
+        return response
+
+    def _parse_provider_response_delta(self, response: Any) -> ModelResponse:
+        return response
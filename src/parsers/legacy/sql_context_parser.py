@@ -7,6 +7,8 @@ import re
 import pandas as pd
 from typing import Dict, List, Tuple, Optional
 
+from parsers.parsed_query import ParsedQuery, get_parsed_query
+
 
 def extract_where_clause_context(sql_query):
     """
@@ -29,69 +31,81 @@ def extract_where_clause_context(sql_query):
         if not where_match:
             return {}
 
-        where_clause = where_match.group(1).strip()
-        context = {}
-
-        # Buscar por padrões de filtro na cláusula WHERE
-        # Igualdade com aspas simples: coluna = 'valor' OU LOWER(coluna) = 'valor'
-        equality_single = re.findall(r"(?:LOWER\()?(\w+)\)?\s*=\s*'([^']*)'", where_clause, re.IGNORECASE)
-        for column, value in equality_single:
-            if column not in context:
-                context[column] = value
-
-        # Igualdade com aspas duplas: coluna = "valor" OU LOWER(coluna) = "valor"
-        equality_double = re.findall(r"(?:LOWER\()?(\w+)\)?\s*=\s*\"([^\"]*)\"", where_clause, re.IGNORECASE)
-        for column, value in equality_double:
-            if column not in context:
-                context[column] = value
-
-        # LIKE com aspas simples: coluna LIKE 'valor' OU LOWER(coluna) LIKE 'valor'
-        like_single = re.findall(r"(?:LOWER\()?(\w+)\)?\s+LIKE\s+'([^']*)'", where_clause, re.IGNORECASE)
-        for column, value in like_single:
-            if column not in context:
-                context[column] = value
-
-        # LIKE com aspas duplas: coluna LIKE "valor" OU LOWER(coluna) LIKE "valor"
-        like_double = re.findall(r"(?:LOWER\()?(\w+)\)?\s+LIKE\s+\"([^\"]*)\"", where_clause, re.IGNORECASE)
-        for column, value in like_double:
-            if column not in context:
-                context[column] = value
-
-        # IN: coluna IN (...) OU LOWER(coluna) IN (...)
-        in_clauses = re.findall(r"(?:LOWER\()?(\w+)\)?\s+IN\s*\([^)]+\)", where_clause, re.IGNORECASE)
-        for column in in_clauses:
-            key = f"{column}_IN"
-            if key not in context:
-                context[key] = "lista_valores"
-
-        # Comparações: coluna > valor, coluna < valor, etc. OU LOWER(coluna) > valor
-        # Regex melhorada para capturar DATE 'valor', 'valor' e "valor"
-        comparisons = re.findall(r"(?:LOWER\()?(\w+)\)?\s*([><=!]+)\s*((?:DATE\s*)?'[^']*'|(?:DATE\s*)?\"[^\"]*\"|[^\s'\"]+)", where_clause, re.IGNORECASE)
-        for column, operator, value in comparisons:
-            if operator != '=':  # Não sobrescrever igualdades já processadas
-                key = f"{column}_{operator}"
-                if key not in context:
-                    # Limpar o valor capturado
-                    cleaned_value = value.strip()
-                    if cleaned_value.upper().startswith('DATE'):
-                        cleaned_value = cleaned_value[4:].strip()  # Remove 'DATE'
-                    cleaned_value = cleaned_value.strip('\'"')  # Remove aspas
-                    context[key] = cleaned_value
-
-        # === PROCESSAMENTO ESPECIAL PARA FILTROS DE DATA COM PRESERVAÇÃO DE GRANULARIDADE ===
-        # Detectar ranges de data e formatá-los preservando granularidade de mês/ano
-        context = _enhance_temporal_context_with_granularity(context)
-
-        # === PROCESSAMENTO ADICIONAL PARA PADRÕES COMPLEXOS ===
-        context = _enhance_context_with_advanced_patterns(context, where_clause)
-
-        return context
+        return _where_clause_context(where_match.group(1).strip())
 
     except Exception as e:
         # Em caso de erro, retornar contexto básico
         return {"erro_parsing": str(e)}
 
 
+def _where_clause_context(where_clause: str) -> Dict:
+    """
+    Extrai os filtros de uma cláusula WHERE já isolada (sem a palavra WHERE)
+
+    Args:
+        where_clause: Condições da cláusula WHERE
+
+    Returns:
+        dict: Dicionário com filtros extraídos
+    """
+    context = {}
+
+    # Buscar por padrões de filtro na cláusula WHERE
+    # Igualdade com aspas simples: coluna = 'valor' OU LOWER(coluna) = 'valor'
+    equality_single = re.findall(r"(?:LOWER\()?(\w+)\)?\s*=\s*'([^']*)'", where_clause, re.IGNORECASE)
+    for column, value in equality_single:
+        if column not in context:
+            context[column] = value
+
+    # Igualdade com aspas duplas: coluna = "valor" OU LOWER(coluna) = "valor"
+    equality_double = re.findall(r"(?:LOWER\()?(\w+)\)?\s*=\s*\"([^\"]*)\"", where_clause, re.IGNORECASE)
+    for column, value in equality_double:
+        if column not in context:
+            context[column] = value
+
+    # LIKE com aspas simples: coluna LIKE 'valor' OU LOWER(coluna) LIKE 'valor'
+    like_single = re.findall(r"(?:LOWER\()?(\w+)\)?\s+LIKE\s+'([^']*)'", where_clause, re.IGNORECASE)
+    for column, value in like_single:
+        if column not in context:
+            context[column] = value
+
+    # LIKE com aspas duplas: coluna LIKE "valor" OU LOWER(coluna) LIKE "valor"
+    like_double = re.findall(r"(?:LOWER\()?(\w+)\)?\s+LIKE\s+\"([^\"]*)\"", where_clause, re.IGNORECASE)
+    for column, value in like_double:
+        if column not in context:
+            context[column] = value
+
+    # IN: coluna IN (...) OU LOWER(coluna) IN (...)
+    in_clauses = re.findall(r"(?:LOWER\()?(\w+)\)?\s+IN\s*\([^)]+\)", where_clause, re.IGNORECASE)
+    for column in in_clauses:
+        key = f"{column}_IN"
+        if key not in context:
+            context[key] = "lista_valores"
+
+    # Comparações: coluna > valor, coluna < valor, etc. OU LOWER(coluna) > valor
+    # Regex melhorada para capturar DATE 'valor', 'valor' e "valor"
+    comparisons = re.findall(r"(?:LOWER\()?(\w+)\)?\s*([><=!]+)\s*((?:DATE\s*)?'[^']*'|(?:DATE\s*)?\"[^\"]*\"|[^\s'\"]+)", where_clause, re.IGNORECASE)
+    for column, operator, value in comparisons:
+        if operator != '=':  # Não sobrescrever igualdades já processadas
+            key = f"{column}_{operator}"
+            if key not in context:
+                # Limpar o valor capturado
+                cleaned_value = value.strip()
+                if cleaned_value.upper().startswith('DATE'):
+                    cleaned_value = cleaned_value[4:].strip()  # Remove 'DATE'
+                cleaned_value = cleaned_value.strip('\'"')  # Remove aspas
+                context[key] = cleaned_value
+
+    # === PROCESSAMENTO ESPECIAL PARA FILTROS DE DATA COM PRESERVAÇÃO DE GRANULARIDADE ===
+    # Detectar ranges de data e formatá-los preservando granularidade de mês/ano
+    context = _enhance_temporal_context_with_granularity(context)
+
+    # === PROCESSAMENTO ADICIONAL PARA PADRÕES COMPLEXOS ===
+    context = _enhance_context_with_advanced_patterns(context, where_clause)
+
+    return context
+
+
 def _enhance_context_with_advanced_patterns(context: Dict, where_clause: str) -> Dict:
     """
     Detecta padrões complexos adicionais na cláusula WHERE
@@ -348,11 +362,17 @@ def extract_context_with_metadata(sql_query: str) -> Dict:
         - complexity: Nível de complexidade da query
     """
     try:
+        # Query analisada uma única vez (compartilhada com o extrator legado)
+        parsed = get_parsed_query(sql_query)
+
         # Extrair contexto básico
-        filters = extract_where_clause_context(sql_query)
+        if parsed.valid:
+            filters = _where_clause_context(parsed.where_clause) if parsed.where_clause else {}
+        else:
+            filters = extract_where_clause_context(sql_query)
 
         # Detectar metadados adicionais
-        metadata = _extract_query_metadata(sql_query)
+        metadata = _extract_query_metadata(parsed)
 
         # Calcular complexidade
         complexity = _calculate_query_complexity(sql_query, filters, metadata)
@@ -371,13 +391,13 @@ def extract_context_with_metadata(sql_query: str) -> Dict:
         }
 
 
-def _extract_query_metadata(sql_query: str) -> Dict:
+def _extract_query_metadata(parsed: ParsedQuery) -> Dict:
     """
     Extrai metadados sobre a estrutura da query
     """
     metadata = {}
 
-    normalized_query = re.sub(r'\s+', ' ', sql_query.strip())
+    normalized_query = parsed.normalized
 
     # Detectar agregações
     agg_functions = re.findall(r'\b(COUNT|SUM|AVG|MAX|MIN|GROUP_CONCAT)\s*\(', normalized_query, re.IGNORECASE)
@@ -399,13 +419,16 @@ def _extract_query_metadata(sql_query: str) -> Dict:
     if limit_match:
         metadata["limit"] = int(limit_match.group(1))
 
-    # Detectar HAVING
-    having_match = re.search(r'\bHAVING\b(.+?)(?:\bORDER BY\b|\bLIMIT\b|$)', normalized_query, re.IGNORECASE)
-    if having_match:
+    # Detectar HAVING e subconsultas (da travessia da query analisada)
+    if parsed.valid:
+        has_having, subquery_count = parsed.has_having, parsed.subquery_count
+    else:
+        has_having = re.search(r'\bHAVING\b(.+?)(?:\bORDER BY\b|\bLIMIT\b|$)', normalized_query, re.IGNORECASE)
+        subquery_count = len(re.findall(r'\(.*SELECT.*\)', normalized_query, re.IGNORECASE))
+
+    if has_having:
         metadata["has_having_clause"] = True
 
-    # Detectar subconsultas
-    subquery_count = len(re.findall(r'\(.*SELECT.*\)', normalized_query, re.IGNORECASE))
     if subquery_count > 0:
         metadata["subquery_count"] = subquery_count
 
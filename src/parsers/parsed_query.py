@@ -0,0 +1,256 @@
+"""
+Camada compartilhada de queries SQL analisadas (sqlparse)
+Cada texto de query é analisado uma única vez (cache LRU por texto). Uma só
+travessia da árvore de tokens separa as cláusulas WHERE e HAVING da consulta
+externa e das subconsultas; os predicados simples (coluna op 'valor') de cada
+cláusula ficam prontos para o extrator legado de filtros (UnifiedFilterManager)
+e para o parser de contexto SQL
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import sqlparse
+from sqlparse import sql as sql_tokens
+from sqlparse import tokens as token_types
+
+
+WHERE = 'where'
+HAVING = 'having'
+
+# Predicados simples reconhecidos em cada cláusula (coluna op 'valor')
+PREDICATE_PATTERNS: Tuple[Tuple["re.Pattern", str], ...] = tuple(
+    (re.compile(pattern, re.IGNORECASE), operator) for pattern, operator in (
+        (r"(\w+)\s*=\s*'([^']*)'", "="),
+        (r"(\w+)\s*>\s*'([^']*)'", ">"),
+        (r"(\w+)\s*<\s*'([^']*)'", "<"),
+        (r"(\w+)\s*>=\s*'([^']*)'", ">="),
+        (r"(\w+)\s*<=\s*'([^']*)'", "<="),
+        (r"(\w+)\s+LIKE\s+'([^']*)'", "LIKE"),
+    )
+)
+
+# Palavras-chave que encerram uma cláusula HAVING
+HAVING_CLOSE = frozenset({
+    'ORDER BY', 'LIMIT', 'OFFSET', 'UNION', 'UNION ALL', 'EXCEPT', 'INTERSECT', 'WINDOW', 'QUALIFY',
+})
+
+# Texto que substitui uma subconsulta dentro da cláusula que a contém
+SUBQUERY_PLACEHOLDER = '()'
+
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+
+class Clause(NamedTuple):
+    """Cláusula WHERE ou HAVING de um escopo da query"""
+    kind: str  # WHERE ou HAVING
+    depth: int  # 0 = consulta externa; > 0 = subconsulta
+    text: str  # condições sem o texto das subconsultas aninhadas
+    source: str  # condições como aparecem na query (espaços normalizados)
+
+
+class Predicate(NamedTuple):
+    """Condição simples coluna op 'valor'"""
+    column: str  # em minúsculas
+    operator: str
+    value: str
+    kind: str
+    depth: int
+
+
+def _normalize_space(text: str) -> str:
+    return WHITESPACE_PATTERN.sub(' ', text).strip()
+
+
+def _is_subquery(token) -> bool:
+    """Parêntese que contém um SELECT (subconsulta ou CTE)"""
+    return isinstance(token, sql_tokens.Parenthesis) and any(
+        child.ttype is token_types.DML and child.normalized == 'SELECT' for child in token.tokens
+    )
+
+
+class ParsedQuery:
+    """
+    Query SQL analisada uma vez, com cláusulas e predicados por escopo.
+
+    valid é False quando o sqlparse não produz um comando (texto vazio) ou a
+    travessia falha; nesse caso não há cláusulas e quem consome decide o
+    fallback.
+    """
+
+    def __init__(self, sql: str):
+        self.sql = sql
+        self.normalized = _normalize_space(sql)
+        self.clauses: Tuple[Clause, ...] = ()
+        self.subquery_count = 0
+        self.valid = False
+
+        clauses: List[Clause] = []
+        try:
+            statements = sqlparse.parse(sql)
+            if statements:
+                self._scan_scope(statements[0].tokens, 0, clauses)
+                self.valid = True
+        except Exception:
+            clauses, self.subquery_count = [], 0
+
+        self.clauses = tuple(clauses)
+        self.predicates: Tuple[Predicate, ...] = tuple(
+            Predicate(match.group(1).lower(), operator, match.group(2), clause.kind, clause.depth)
+            for clause in self.clauses
+            for pattern, operator in PREDICATE_PATTERNS
+            for match in pattern.finditer(clause.text)
+        )
+
+    def _scan_scope(self, tokens, depth: int, clauses: List[Clause]):
+        """Percorre um escopo (comando ou subconsulta) registrando WHERE e HAVING"""
+        having = None
+        for token in tokens:
+            if isinstance(token, sql_tokens.Where):
+                self._add_clause(WHERE, token.tokens[1:], depth, clauses)
+                continue
+            if token.ttype in token_types.Keyword:
+                keyword = " ".join(token.normalized.split())
+                if keyword == 'HAVING':
+                    having = []
+                    continue
+                if having is not None and keyword in HAVING_CLOSE:
+                    self._add_clause(HAVING, having, depth, clauses)
+                    having = None
+            if having is not None:
+                having.append(token)
+            else:
+                self._scan_subqueries(token, depth, clauses)
+        if having is not None:
+            self._add_clause(HAVING, having, depth, clauses)
+
+    def _scan_subqueries(self, token, depth: int, clauses: List[Clause]):
+        """Subconsultas fora de WHERE/HAVING (FROM, lista do SELECT, CTEs)"""
+        if _is_subquery(token):
+            self.subquery_count += 1
+            self._scan_scope(token.tokens[1:-1], depth + 1, clauses)
+        elif token.is_group:
+            for child in token.tokens:
+                self._scan_subqueries(child, depth, clauses)
+
+    def _render(self, token, depth: int, clauses: List[Clause]) -> str:
+        """Texto da condição com cada subconsulta substituída (e analisada no seu escopo)"""
+        if _is_subquery(token):
+            self.subquery_count += 1
+            self._scan_scope(token.tokens[1:-1], depth + 1, clauses)
+            return SUBQUERY_PLACEHOLDER
+        if token.is_group:
+            return "".join(self._render(child, depth, clauses) for child in token.tokens)
+        return token.value
+
+    def _add_clause(self, kind: str, tokens, depth: int, clauses: List[Clause]):
+        text = "".join(self._render(token, depth, clauses) for token in tokens)
+        source = "".join(str(token) for token in tokens)
+        clauses.append(Clause(kind, depth, _normalize_space(text), _normalize_space(source)))
+
+    def _outer_clause(self, kind: str) -> Optional[Clause]:
+        for clause in self.clauses:
+            if clause.kind == kind and clause.depth == 0:
+                return clause
+        return None
+
+    @property
+    def where_clause(self) -> str:
+        """Condições do primeiro WHERE da consulta externa ('' se não houver)"""
+        clause = self._outer_clause(WHERE)
+        return clause.source if clause else ''
+
+    @property
+    def has_having(self) -> bool:
+        return self._outer_clause(HAVING) is not None
+
+    @property
+    def where_predicates(self) -> List[Predicate]:
+        return [p for p in self.predicates if p.kind == WHERE and p.depth == 0]
+
+    @property
+    def having_predicates(self) -> List[Predicate]:
+        return [p for p in self.predicates if p.kind == HAVING and p.depth == 0]
+
+    @property
+    def subquery_predicates(self) -> List[Predicate]:
+        return [p for p in self.predicates if p.depth > 0]
+
+
+class _ParsedQueryCache:
+    """
+    Cache LRU thread-safe: texto da query -> ParsedQuery
+    """
+
+    def __init__(self, max_size: int = 512):
+        self.max_size = max_size
+        self._entries: "OrderedDict[str, ParsedQuery]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[ParsedQuery]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: str, value: ParsedQuery):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._entries),
+                "hit_rate": self.hits / total if total else 0.0
+            }
+
+
+# Cache compartilhado (a análise depende apenas do texto da query)
+_parsed_query_cache = _ParsedQueryCache()
+
+
+def get_parsed_query(sql: str) -> ParsedQuery:
+    """
+    Retorna a query analisada, analisando-a na primeira chamada com o texto
+
+    Args:
+        sql: Texto da query
+
+    Returns:
+        ParsedQuery compartilhada (somente leitura)
+    """
+    parsed = _parsed_query_cache.get(sql)
+    if parsed is None:
+        parsed = ParsedQuery(sql)
+        _parsed_query_cache.put(sql, parsed)
+    return parsed
+
+
+def parsed_query_cache_stats() -> Dict[str, Any]:
+    """Estatísticas do cache de queries analisadas"""
+    return _parsed_query_cache.stats()
+
+
+def reset_parsed_queries():
+    """Descarta as queries analisadas em cache (útil para testes)"""
+    _parsed_query_cache.clear()
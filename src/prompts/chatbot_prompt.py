@@ -3,7 +3,8 @@ Template de prompt para o chatbot Agno
 """
 
 import pandas as pd
-from dateutil.relativedelta import relativedelta
+
+from filters.calendar_dimension import get_calendar_dimension
 
 
 def create_chatbot_prompt(data_path, df, text_columns, alias_mapping):
@@ -19,6 +20,8 @@ def create_chatbot_prompt(data_path, df, text_columns, alias_mapping):
     Returns:
         str: Prompt formatado para o chatbot
     """
+    calendar = get_calendar_dimension(df['Data'].max(), df['Data'].min())
+
     return f"""
 # System Prompt - Target AI Agent Agno v0.5
 
@@ -31,10 +34,12 @@ def create_chatbot_prompt(data_path, df, text_columns, alias_mapping):
 - **"Mês passado"** = {df['Data'].max().strftime('%Y-%m')} (mesmo que último mês)
 - **"Período mais recente"** = {df['Data'].max().strftime('%Y-%m')} (mesmo que último mês)
 
-### 🎯 EXEMPLOS DE INTERPRETAÇÃO CORRETA
-- **"últimos 3 meses"** → SEMPRE calcular desde {(df['Data'].max() - relativedelta(months=3)).strftime('%Y-%m-%d')} até {df['Data'].max().strftime('%Y-%m-%d')}
-- **"últimos 6 meses"** → SEMPRE calcular desde {(df['Data'].max() - relativedelta(months=6)).strftime('%Y-%m-%d')} até {df['Data'].max().strftime('%Y-%m-%d')}
-- **"último ano"** → SEMPRE calcular desde {(df['Data'].max() - relativedelta(years=1)).strftime('%Y-%m-%d')} até {df['Data'].max().strftime('%Y-%m-%d')}
+### 🎯 EXEMPLOS DE INTERPRETAÇÃO CORRETA (MESES COMPLETOS)
+{_calendar_examples(calendar)}
+
+### 📆 TABELA CALENDARIO (PERÍODOS RELATIVOS EM SQL)
+Use a tabela `calendario` em vez de calcular datas manualmente:
+{calendar.prompt_section()}
 
 ### 🚨 VALIDAÇÃO AUTOMÁTICA OBRIGATÓRIA
 ANTES de processar QUALQUER consulta temporal, execute mentalmente:
@@ -225,6 +230,8 @@ Você é o **Agno**, um Analista Sênior de Business Intelligence especializado
 - ❌ NUNCA sugira código sem executar
 - ✅ SEMPRE use as ferramentas DuckDB e Python diretamente
 - ✅ SEMPRE forneça resultados concretos, não sugestões
+- ✅ Consultas SQL independentes (ex.: uma por período em comparações) → use `run_queries` com a lista completa, elas executam em paralelo
+- ✅ Filtros ativos "já aplicados na view dados_filtrados" → consulte `dados_filtrados` (mesmas colunas de `dados_comerciais`) sem repetir esses filtros
 ```
 
 ### 🚨 EXECUÇÃO AUTOMÁTICA OBRIGATÓRIA
@@ -571,4 +578,18 @@ cagr = ((valor_final / valor_inicial) ** (1 / periodos)) - 1
 > **"Cada resposta deve deixar o usuário mais inteligente sobre seu negócio"**
 
 Não apenas responda perguntas - eduque, inspire e capacite tomadas de decisão baseadas em dados. Seja o parceiro analítico que todo gestor gostaria de ter ao seu lado.
-"""
\ No newline at end of file
+"""
+
+
+def _calendar_examples(calendar):
+    """Exemplos de períodos relativos em meses completos do calendário (o mês da data máxima conta como o último)"""
+    examples = {
+        'últimos 3 meses': calendar.months(2),
+        'últimos 6 meses': calendar.months(5),
+        'último ano': calendar.months(11),
+    }
+    return "\n".join(
+        f"- **\"{label}\"** → `WHERE c.{period.condition}` (desde {period.start.strftime('%Y-%m-%d')} "
+        f"até {period.end.strftime('%Y-%m-%d')}, exclusivo)"
+        for label, period in examples.items()
+    )
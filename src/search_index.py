@@ -0,0 +1,139 @@
+"""
+Índice de busca por valor normalizado
+Construído de forma vetorizada: cada valor distinto da coluna é normalizado uma
+única vez (fatoração em códigos) e as linhas são agrupadas pelo código
+normalizado. As postings ficam em layout CSR (offsets + posições int32
+contíguas), opcionalmente persistido em .npy para reuso via memory-map
+"""
+
+import json
+import os
+from collections.abc import Mapping
+from typing import Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+import pandas as pd
+
+
+MANIFEST_FILE = 'search_index.json'
+
+
+class ColumnPostings(Mapping):
+    """
+    Postings de uma coluna: valor normalizado -> posições das linhas (int32).
+
+    values[i] tem as linhas positions[offsets[i]:offsets[i + 1]], em ordem
+    crescente. As posições são posicionais (iloc); com o índice padrão do
+    DataFrame (RangeIndex) coincidem com os rótulos das linhas.
+    """
+
+    def __init__(self, values: List[str], offsets: np.ndarray, positions: np.ndarray):
+        self.values = list(values)
+        self.offsets = offsets
+        self.positions = positions
+        self._slots = {value: slot for slot, value in enumerate(self.values)}
+
+    @classmethod
+    def from_series(cls, series: pd.Series, normalize: Callable[[str], str]) -> "ColumnPostings":
+        """
+        Constrói as postings de uma coluna
+
+        Args:
+            series: Coluna do DataFrame
+            normalize: Função de normalização de um valor (ex.: TextNormalizer.normalize_text)
+
+        Returns:
+            ColumnPostings
+        """
+        codes, uniques = pd.factorize(series, sort=False)
+
+        # Normalizar cada valor distinto uma vez; variações (ex.: 'SC' e 'sc') caem no mesmo grupo
+        normalized = [normalize(value) for value in uniques]
+        values = sorted(set(value for value in normalized if value))
+        slots = {value: slot for slot, value in enumerate(values)}
+
+        # Último elemento -1: código de nulos (-1) e valores vazios ficam fora do índice
+        lookup = np.array([slots.get(value, -1) for value in normalized] + [-1], dtype=np.int64)
+        groups = lookup[codes]
+
+        rows = np.flatnonzero(groups >= 0)
+        row_groups = groups[rows]
+        order = np.argsort(row_groups, kind='stable')
+        counts = np.bincount(row_groups, minlength=len(values))
+
+        offsets = np.zeros(len(values) + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+        return cls(values, offsets, rows[order].astype(np.int32))
+
+    def __getitem__(self, value: str) -> np.ndarray:
+        slot = self._slots[value]
+        return self.positions[self.offsets[slot]:self.offsets[slot + 1]]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.values)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __contains__(self, value) -> bool:
+        return value in self._slots
+
+
+def build_search_index(df: pd.DataFrame, columns: List[str], normalize: Callable[[str], str]) -> Dict[str, ColumnPostings]:
+    """
+    Índice de busca das colunas informadas
+
+    Args:
+        df: DataFrame para indexar
+        columns: Colunas de texto a indexar (ausentes são ignoradas)
+        normalize: Função de normalização de um valor
+
+    Returns:
+        Dicionário coluna -> ColumnPostings
+    """
+    return {col: ColumnPostings.from_series(df[col], normalize) for col in columns if col in df.columns}
+
+
+def save_search_index(index: Dict[str, ColumnPostings], directory: str):
+    """
+    Persiste o índice em .npy (offsets e posições) com um manifesto JSON dos valores
+
+    Args:
+        index: Índice retornado por build_search_index
+        directory: Diretório de destino (criado se não existir)
+    """
+    os.makedirs(directory, exist_ok=True)
+    manifest = {'columns': []}
+    for slot, (column, postings) in enumerate(index.items()):
+        stem = f"col_{slot}"
+        np.save(os.path.join(directory, f"{stem}.offsets.npy"), postings.offsets)
+        np.save(os.path.join(directory, f"{stem}.positions.npy"), postings.positions)
+        manifest['columns'].append({'column': column, 'file': stem, 'values': postings.values})
+
+    with open(os.path.join(directory, MANIFEST_FILE), 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+
+
+def load_search_index(directory: str, mmap_mode: Optional[str] = 'r') -> Dict[str, ColumnPostings]:
+    """
+    Carrega um índice salvo por save_search_index
+
+    Args:
+        directory: Diretório do índice
+        mmap_mode: Modo de memory-map dos arrays ('r' padrão; None carrega em memória)
+
+    Returns:
+        Dicionário coluna -> ColumnPostings
+    """
+    with open(os.path.join(directory, MANIFEST_FILE), 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    index = {}
+    for entry in manifest['columns']:
+        stem = os.path.join(directory, entry['file'])
+        index[entry['column']] = ColumnPostings(
+            entry['values'],
+            np.load(f"{stem}.offsets.npy", mmap_mode=mmap_mode),
+            np.load(f"{stem}.positions.npy", mmap_mode=mmap_mode)
+        )
+    return index
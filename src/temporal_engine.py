@@ -0,0 +1,506 @@
+"""
+Motor de expressões temporais
+Gramática compilada uma única vez (meses, famílias de padrões e indicadores),
+tokenização da pergunta em uma passada para decidir quais famílias podem
+casar e cache LRU por pergunta normalizada. Períodos relativos à data máxima
+do dataset são consultas ao calendário (filters.calendar_dimension).
+"""
+
+import re
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from dateutil.relativedelta import relativedelta
+
+from filters.calendar_dimension import CalendarDimension, calendar_from_context
+
+
+# Mapeamento de meses em português (e abreviações)
+MONTHS = {
+    'janeiro': 1, 'jan': 1,
+    'fevereiro': 2, 'fev': 2,
+    'março': 3, 'mar': 3, 'marco': 3,
+    'abril': 4, 'abr': 4,
+    'maio': 5, 'mai': 5,
+    'junho': 6, 'jun': 6,
+    'julho': 7, 'jul': 7,
+    'agosto': 8, 'ago': 8,
+    'setembro': 9, 'set': 9, 'sep': 9,
+    'outubro': 10, 'out': 10, 'oct': 10,
+    'novembro': 11, 'nov': 11,
+    'dezembro': 12, 'dez': 12, 'dec': 12
+}
+
+# "mês de ano", "mês ano", "mês/ano": vale a ÚLTIMA família com ocorrência válida
+MONTH_YEAR_PATTERNS = [re.compile(pattern) for pattern in (
+    r'\b(\w+)\s+de\s+(\d{4})\b',
+    r'\b(\w+)\s+(\d{4})\b',
+    r'\b(\w+)/(\d{4})\b',
+    r'\bem\s+(\w+)\s+de\s+(\d{4})\b',
+    r'\bno\s+(\w+)\s+de\s+(\d{4})\b',
+    r'\bdurante\s+(\w+)\s+de\s+(\d{4})\b',
+)]
+
+# Intervalos entre meses: vale a PRIMEIRA família que casar
+BETWEEN_PATTERNS = [re.compile(pattern) for pattern in (
+    r'\bentre\s+(\w+)\s+e\s+(\w+)\s+de\s+(\d{4})\b',
+    r'\bentre\s+(\w+)/(\d{4})\s+e\s+(\w+)/(\d{4})\b',
+    r'\bentre\s+os\s+per[íi]odos?\s+de\s+(\w+)\s+e\s+(\w+)\s+de\s+(\d{4})\b',
+    r'\bentre\s+os\s+meses\s+de\s+(\w+)\s+e\s+(\w+)\s+de\s+(\d{4})\b',
+    r'\bdo\s+per[íi]odo\s+de\s+(\w+)\s+a\s+(\w+)\s+de\s+(\d{4})\b',
+    r'\bde\s+(\w+)\s+a\s+(\w+)\s+de\s+(\d{4})\b',
+    r'\bper[íi]odos?\s+de\s+(\w+)/(\d{4})\s+a\s+(\w+)/(\d{4})\b',
+    r'\bentre\s+os\s+per[íi]odos?\s+de\s+(\w+)/(\d{4})\s+e\s+(\w+)/(\d{4})\b',
+)]
+# Famílias com grupos (mês inicial, mês final, ano); as demais: (mês, ano, mês, ano)
+BETWEEN_MONTH_MONTH_YEAR = {0, 2, 3, 4, 5}
+
+YEAR_PATTERNS = [re.compile(pattern) for pattern in (
+    r'\bem\s+(\d{4})\b',
+    r'\bno\s+ano\s+de\s+(\d{4})\b',
+    r'\bdurante\s+(\d{4})\b',
+    r'\bno\s+per[ií]odo\s+de\s+(\d{4})\b',
+    r'\bper[ií]odo\s+de\s+(\d{4})\b',
+)]
+
+LAST_MONTH_INDICATORS = (
+    'último mês', 'ultimo mês', 'último mes', 'ultimo mes',
+    'mês anterior', 'mes anterior', 'mês passado', 'mes passado',
+    'último período', 'ultimo período', 'ultimo periodo',
+    'mês mais recente', 'mes mais recente', 'período mais recente',
+    'último mês completo', 'ultimo mês completo',
+    'dados mais recentes do mês', 'dados mais recentes do mes',
+    'análise do período mais recente', 'analise do período mais recente',
+    'analise do periodo mais recente'
+)
+LAST_MONTH_WORD_PAIRS = (
+    ('último', 'mês'), ('ultimo', 'mês'), ('último', 'mes'), ('ultimo', 'mes'),
+    ('anterior', 'mês'), ('anterior', 'mes'), ('passado', 'mês'), ('passado', 'mes'),
+    ('recente', 'mês'), ('recente', 'mes'), ('mais', 'recente'),
+    ('período', 'recente'), ('periodo', 'recente'), ('dados', 'recentes')
+)
+LAST_MONTH_CONTEXT_WORDS = ('mês', 'mes', 'período', 'periodo')
+
+# Todo indicador de "último mês" contém um destes trechos (filtro rápido)
+LAST_MONTH_TRIGGERS = ('últim', 'ultim', 'anterior', 'passad', 'recente')
+
+RELATIVE_PATTERNS = [re.compile(pattern) for pattern in (
+    r'\b(?:últimos|ultimos)\s+(\d+)\s+(?:meses|mês|mes)\b',
+    r'\b(?:últimos|ultimos)\s+(\d+)\s+(?:anos|ano)\b',
+    r'\b(?:últimos|ultimos)\s+(\d+)\s+(?:dias|dia)\b',
+    r'\b(?:últimos|ultimos)\s+(\d+)\s+(?:trimestres|trimestre)\b',
+    r'\b(?:últimos|ultimos)\s+(\d+)\s+(?:semestres|semestre)\b',
+)]
+RELATIVE_TRIGGERS = ('últimos', 'ultimos')
+
+# Períodos do calendário (nome em calendar_dimension.NAMED_PERIOD_CONDITIONS): vale a PRIMEIRA família que casar
+CALENDAR_PERIOD_PATTERNS = [(re.compile(pattern), name) for pattern, name in (
+    (r'\bmesmo\s+m[eê]s\s+(?:do|no)\s+ano\s+(?:passado|anterior)\b', 'same_month_last_year'),
+    (r'\bacumulado\s+(?:do|no)\s+ano\b|\bytd\b|\bano\s+at[eé]\s+(?:agora|hoje|o\s+momento)\b', 'ytd'),
+    (r'\btrimestre\s+(?:passado|anterior)\b', 'last_quarter'),
+    (r'\b(?:este|neste|nesse|esse)\s+trimestre\b|\btrimestre\s+atual\b', 'this_quarter'),
+    (r'\bsemestre\s+(?:passado|anterior)\b', 'last_semester'),
+    (r'\b(?:este|neste|nesse|esse)\s+semestre\b|\bsemestre\s+atual\b', 'this_semester'),
+    (r'\bano\s+(?:passado|anterior)\b', 'last_year'),
+    (r'\b(?:este|neste|nesse|esse)\s+ano\b|\bano\s+atual\b', 'this_year'),
+)]
+# Toda família de período do calendário contém um destes trechos (filtro rápido)
+CALENDAR_TRIGGERS = ('trimestre', 'semestre', 'ano', 'ytd')
+
+# Tokenização única da pergunta
+TOKEN_PATTERN = re.compile(r'\w+')
+YEAR_TOKEN_PATTERN = re.compile(r'\d{4}')
+
+# Perguntas distintas mantidas em cache por motor
+TEMPORAL_CACHE_SIZE = 1024
+
+
+def _month_range(year: int, month: int) -> Tuple[str, str]:
+    """Primeiro dia do mês e primeiro dia do mês seguinte"""
+    next_year, next_month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return f"{year:04d}-{month:02d}-01", f"{next_year:04d}-{next_month:02d}-01"
+
+
+class TemporalEngine:
+    """
+    Resolve referências temporais de perguntas em português.
+
+    Produz o resultado do parser original (tests/fixtures/legacy_temporal_parser.py,
+    incluindo metadados) e, além dele, reconhece os períodos do calendário
+    (trimestre/semestre/ano passado, acumulado do ano, mesmo mês do ano
+    anterior). Famílias de padrões só são avaliadas quando os tokens da
+    pergunta permitem que casem (mês e ano de 4 dígitos, gatilhos de período
+    relativo). Resultados ficam em cache LRU por pergunta.
+    """
+
+    def __init__(self, dataset_context: Optional[Dict[str, Any]] = None, cache_size: int = TEMPORAL_CACHE_SIZE):
+        self.dataset_context = dataset_context
+        self.calendar: Optional[CalendarDimension] = calendar_from_context(dataset_context)
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------
+    # API
+    # ------------------------------------------------------------------
+
+    def parse(self, text: str) -> Dict[str, Any]:
+        """
+        Entidades temporais da pergunta (ex.: {'Data_>=': ..., 'Data_<': ..., '_temporal_metadata': ...})
+
+        Args:
+            text: Pergunta ou trecho com referências temporais
+
+        Returns:
+            Cópia do resultado (o chamador pode alterá-lo)
+        """
+        return _copy_entities(self._parse_cached(text.lower().strip()))
+
+    def structured(self, text: str) -> Dict[str, Any]:
+        """
+        Dados temporais preservando a granularidade (ex.: {'periodo': {'mes': '07', 'ano': '2015'}})
+
+        Args:
+            text: Pergunta ou trecho com referências temporais
+
+        Returns:
+            Estrutura de TextNormalizer.get_structured_temporal_data ou {}
+        """
+        return _structure(self._parse_cached(text.lower().strip()))
+
+    def detect_last_month(self, text_lower: str) -> Dict[str, Any]:
+        """Referência ao último mês do dataset (texto já em minúsculas)"""
+        if not self.dataset_context or not any(trigger in text_lower for trigger in LAST_MONTH_TRIGGERS):
+            return {}
+        return self._last_month(text_lower)
+
+    def detect_calendar_period(self, text_lower: str) -> Dict[str, Any]:
+        """Períodos do calendário como 'trimestre passado' (texto já em minúsculas)"""
+        if self.calendar is None or not any(trigger in text_lower for trigger in CALENDAR_TRIGGERS):
+            return {}
+        return self._calendar_period(text_lower)
+
+    def detect_relative_period(self, text_lower: str) -> Dict[str, Any]:
+        """Períodos relativos como 'últimos 3 meses' (texto já em minúsculas)"""
+        if not self.dataset_context or not any(trigger in text_lower for trigger in RELATIVE_TRIGGERS):
+            return {}
+        return self._relative_period(text_lower)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._cache),
+                "hit_rate": self.hits / total if total else 0.0
+            }
+
+    # ------------------------------------------------------------------
+    # Resolução
+    # ------------------------------------------------------------------
+
+    def _parse_cached(self, text_lower: str) -> Dict[str, Any]:
+        with self._lock:
+            cached = self._cache.get(text_lower)
+            if cached is not None:
+                self._cache.move_to_end(text_lower)
+                self.hits += 1
+                return cached
+            self.misses += 1
+
+        result = self._parse(text_lower)
+        with self._lock:
+            self._cache[text_lower] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    def _parse(self, text_lower: str) -> Dict[str, Any]:
+        tokens = TOKEN_PATTERN.findall(text_lower)
+        has_year = any(YEAR_TOKEN_PATTERN.fullmatch(token) for token in tokens)
+        has_month = has_year and any(token in MONTHS for token in tokens)
+
+        entities: Dict[str, Any] = {}
+        if has_month:
+            entities = self._month_year(text_lower)
+            between = self._between(text_lower)
+            if between:
+                entities = between
+
+        if not entities and has_year:
+            entities = self._full_year(text_lower)
+
+        if not entities:
+            entities = self.detect_calendar_period(text_lower)
+        if not entities:
+            entities = self.detect_last_month(text_lower)
+        if not entities:
+            entities = self.detect_relative_period(text_lower)
+        return entities
+
+    @staticmethod
+    def _month_year(text_lower: str) -> Dict[str, Any]:
+        """Mês/ano: primeira ocorrência válida de cada família; a última família prevalece"""
+        entities: Dict[str, Any] = {}
+        for pattern in MONTH_YEAR_PATTERNS:
+            for match in pattern.finditer(text_lower):
+                month_text = match.group(1).strip()
+                year_text = match.group(2).strip()
+                if month_text not in MONTHS:
+                    continue
+                month_num, year_num = MONTHS[month_text], int(year_text)
+                start_date, end_date = _month_range(year_num, month_num)
+                entities = {
+                    'Data_>=': start_date,
+                    'Data_<': end_date,
+                    '_temporal_metadata': {
+                        'original_text': match.group(0),
+                        'parsed_month': month_text,
+                        'parsed_year': year_text,
+                        'month_number': month_num,
+                        'year_number': year_num
+                    }
+                }
+                break
+        return entities
+
+    @staticmethod
+    def _between(text_lower: str) -> Dict[str, Any]:
+        """Intervalo entre meses: apenas a primeira família que casar é considerada"""
+        for index, pattern in enumerate(BETWEEN_PATTERNS):
+            match = pattern.search(text_lower)
+            if not match:
+                continue
+
+            if index in BETWEEN_MONTH_MONTH_YEAR:
+                start_month_text, end_month_text, year_text = (match.group(i).strip() for i in (1, 2, 3))
+            else:
+                # Mês/ano e mês/ano: usa o primeiro ano para o intervalo
+                start_month_text, year_text, end_month_text = (match.group(i).strip() for i in (1, 2, 3))
+
+            if start_month_text not in MONTHS or end_month_text not in MONTHS:
+                return {}
+            start_month_num, end_month_num = MONTHS[start_month_text], MONTHS[end_month_text]
+            year_num = int(year_text)
+            start_date = _month_range(year_num, start_month_num)[0]
+            end_date = _month_range(year_num, end_month_num)[1]
+            return {
+                'Data_>=': start_date,
+                'Data_<': end_date,
+                '_temporal_metadata': {
+                    'original_text': match.group(0),
+                    'type': 'period_between_months',
+                    'start_month': start_month_text,
+                    'end_month': end_month_text,
+                    'parsed_year': year_text,
+                    'pattern_index': index,
+                    'start_month_num': start_month_num,
+                    'end_month_num': end_month_num
+                }
+            }
+        return {}
+
+    @staticmethod
+    def _full_year(text_lower: str) -> Dict[str, Any]:
+        """Ano completo: 'em 2015', 'no ano de 2015', 'no período de 2015'"""
+        for pattern in YEAR_PATTERNS:
+            match = pattern.search(text_lower)
+            if match:
+                year_num = int(match.group(1))
+                return {
+                    'Data_>=': f"{year_num:04d}-01-01",
+                    'Data_<': f"{year_num + 1:04d}-01-01",
+                    '_temporal_metadata': {
+                        'original_text': match.group(0),
+                        'type': 'full_year',
+                        'parsed_year': year_num
+                    }
+                }
+        return {}
+
+    def _last_month(self, text: str) -> Dict[str, Any]:
+        has_reference = any(indicator in text for indicator in LAST_MONTH_INDICATORS)
+
+        if not has_reference:
+            words = text.split()
+            for word1, word2 in LAST_MONTH_WORD_PAIRS:
+                if word1 in words and word2 in words:
+                    # Palavras próximas e com menção a mês/período no entorno
+                    idx1, idx2 = words.index(word1), words.index(word2)
+                    if abs(idx1 - idx2) <= 15:
+                        context_words = words[max(0, min(idx1, idx2) - 5):min(len(words), max(idx1, idx2) + 6)]
+                        if any(word in context_words for word in LAST_MONTH_CONTEXT_WORDS):
+                            has_reference = True
+                            break
+
+        if not has_reference:
+            return {}
+
+        period = self.calendar.period('current_month')
+        return {
+            **period.as_filters(),
+            '_temporal_metadata': {
+                'original_text': text,
+                'type': 'intelligent_last_month_detection',
+                'dataset_last_month': self.dataset_context['last_month'],  # formato: 'YYYY-MM'
+                'computed_month': period.start.month,
+                'computed_year': period.start.year
+            }
+        }
+
+    def _calendar_period(self, text: str) -> Dict[str, Any]:
+        for pattern, name in CALENDAR_PERIOD_PATTERNS:
+            match = pattern.search(text)
+            if not match:
+                continue
+            period = self.calendar.period(name)
+            return {
+                **period.as_filters(),
+                '_temporal_metadata': {
+                    'original_text': match.group(0),
+                    'type': 'calendar_period_detection',
+                    'period': name,
+                    'calendar_condition': period.condition,
+                    'dataset_max_date': self.calendar.max_date.strftime('%Y-%m-%d')
+                }
+            }
+        return {}
+
+    def _relative_period(self, text: str) -> Dict[str, Any]:
+        for pattern in RELATIVE_PATTERNS:
+            match = pattern.search(text)
+            if not match:
+                continue
+            period_count = int(match.group(1))
+            period_text = match.group(0)
+
+            if any(word in period_text for word in ('mês', 'mes', 'meses')):
+                period_type = 'months'
+            elif any(word in period_text for word in ('ano', 'anos')):
+                period_type = 'years'
+            elif any(word in period_text for word in ('dia', 'dias')):
+                period_type = 'days'
+            elif 'trimestre' in period_text:
+                period_type = 'quarters'
+                period_count *= 3
+            elif 'semestre' in period_text:
+                period_type = 'semesters'
+                period_count *= 6
+            else:
+                continue
+
+            # Referência: data máxima do dataset (não a data atual)
+            max_date = self.dataset_context['max_date']
+            if period_type in ('months', 'quarters', 'semesters'):
+                period = self.calendar.months(period_count)
+                start_date, end_date = period.start, period.end
+            elif period_type == 'years':
+                start_date, end_date = self.calendar.year(period_count).start, self.calendar.end
+            else:
+                start_date = max_date - relativedelta(days=period_count - 1)
+                end_date = max_date + relativedelta(days=1)
+
+            return {
+                'Data_>=': start_date.strftime('%Y-%m-%d'),
+                'Data_<': end_date.strftime('%Y-%m-%d'),
+                '_temporal_metadata': {
+                    'original_text': period_text,
+                    'type': 'intelligent_relative_period_detection',
+                    'period_count': period_count,
+                    'period_type': period_type,
+                    'dataset_max_date': max_date.strftime('%Y-%m-%d'),
+                    'computed_start_date': start_date.strftime('%Y-%m-%d')
+                }
+            }
+        return {}
+
+
+def _copy_entities(entities: Dict[str, Any]) -> Dict[str, Any]:
+    """Cópia do resultado em cache (valores são escalares; metadados, um dict simples)"""
+    copied = dict(entities)
+    if '_temporal_metadata' in copied:
+        copied['_temporal_metadata'] = dict(copied['_temporal_metadata'])
+    return copied
+
+
+def _structure(entities: Dict[str, Any]) -> Dict[str, Any]:
+    """Converte entidades temporais na estrutura com granularidade ('periodo')"""
+    if not entities:
+        return {}
+
+    metadata = entities.get('_temporal_metadata', {})
+    resultado: Dict[str, Any] = {"periodo": {}}
+
+    if metadata.get('parsed_month') and metadata.get('parsed_year'):
+        resultado["periodo"] = {
+            "mes": f"{metadata.get('month_number'):02d}",
+            "ano": str(metadata.get('year_number'))
+        }
+
+    elif metadata.get('type') == 'period_between_months':
+        year_text = metadata.get('parsed_year')
+        resultado["periodo"] = {
+            "inicio": {"mes": f"{metadata['start_month_num']:02d}", "ano": str(year_text)},
+            "fim": {"mes": f"{metadata['end_month_num']:02d}", "ano": str(year_text)}
+        }
+        resultado["_debug_interval"] = {
+            "original_text": metadata.get('original_text', ''),
+            "start_month_name": metadata.get('start_month'),
+            "end_month_name": metadata.get('end_month'),
+            "pattern_used": metadata.get('pattern_index', -1)
+        }
+
+    elif metadata.get('type') == 'full_year':
+        resultado["periodo"] = {"ano": str(metadata.get('parsed_year'))}
+
+    elif metadata.get('type') in ('intelligent_last_month_detection', 'intelligent_relative_period_detection'):
+        if 'Data_>=' in entities and 'Data_<' in entities:
+            resultado["periodo"] = {"Data_>=": entities['Data_>='], "Data_<": entities['Data_<']}
+
+    # Fallback: manter os ranges originais
+    if not resultado["periodo"] and 'Data_>=' in entities and 'Data_<' in entities:
+        resultado["periodo"] = {"Data_>=": entities['Data_>='], "Data_<": entities['Data_<']}
+
+    return resultado
+
+
+# Registro global: um motor (e um cache) por contexto de dataset
+_engines: "OrderedDict[Tuple, TemporalEngine]" = OrderedDict()
+_engines_lock = threading.Lock()
+MAX_CACHED_ENGINES = 8
+
+
+def get_temporal_engine(dataset_context: Optional[Dict[str, Any]] = None) -> TemporalEngine:
+    """
+    Retorna o motor temporal do contexto de dataset, compartilhado entre normalizadores
+
+    Args:
+        dataset_context: Contexto de TextNormalizer.set_dataset_context (None: sem períodos relativos)
+
+    Returns:
+        TemporalEngine
+    """
+    key: Tuple = ()
+    if dataset_context:
+        key = (str(dataset_context.get('max_date')), str(dataset_context.get('last_month')))
+
+    with _engines_lock:
+        engine = _engines.get(key)
+        if engine is None:
+            engine = TemporalEngine(dataset_context)
+            _engines[key] = engine
+            while len(_engines) > MAX_CACHED_ENGINES:
+                _engines.popitem(last=False)
+        else:
+            _engines.move_to_end(key)
+        return engine
+
+
+def reset_temporal_engines():
+    """Descarta os motores e caches (útil para testes)"""
+    with _engines_lock:
+        _engines.clear()
@@ -3,12 +3,25 @@ Ferramenta DuckDB Otimizada com normalização automática de strings e captura
 """
 
 from agno.tools.duckdb import DuckDbTools
+from agno.utils.log import log_info
+from concurrent.futures import ThreadPoolExecutor
+import threading
+from typing import List, Optional, Tuple
+import pyarrow as pa
 import sys
 import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 # from parsers.sql_context_parser import extract_where_clause_context  # Removido - agora usando sistema JSON
 import pandas as pd
 import re
+from tools.tool_memo import canonicalize_sql, is_mutating_sql
+from filters.bitmap_index import BITMAP_COLUMNS, DATE_COLUMN, get_bitmap_index
+from filters.filter_compiler import BASE_TABLE_NAME, FILTERED_VIEW_NAME
+from filters.sql_ast_extractor import extract_table_conditions_ast
+
+
+# Resposta devolvida ao modelo quando o índice bitmap prova que a consulta é vazia
+EMPTY_QUERY_MESSAGE = "Nenhum registro atende aos filtros da consulta (verificado pelo índice de filtros, consulta não executada)."
 
 
 class DebugDuckDbTools(DuckDbTools):
@@ -17,10 +30,16 @@ class DebugDuckDbTools(DuckDbTools):
     de strings e captura contexto das queries SQL
     """
 
-    def __init__(self, debug_info_ref=None, *args, **kwargs):
+    def __init__(self, debug_info_ref=None, max_parallel_queries=4, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.debug_info_ref = debug_info_ref
+        self.max_parallel_queries = max_parallel_queries  # Limite do pool de consultas concorrentes
+        self.register(self.run_queries)
         self.last_result_df = None  # Armazenar último DataFrame resultado
+        self._turn_result_dfs = {}  # DataFrames do turno por query canônica (memoização)
+        self._bitmap_index = None  # Índice bitmap de dados_comerciais (construído na primeira consulta)
+        self._column_types = {}  # Coluna (minúsculas) -> tipo DuckDB em dados_comerciais
+        self._bitmap_index_lock = threading.Lock()
 
     def _normalize_query_strings(self, query: str) -> str:
         """Aplica normalização LOWER() automaticamente a todas as comparações de strings na query"""
@@ -79,21 +98,220 @@ class DebugDuckDbTools(DuckDbTools):
         # APLICAR NORMALIZAÇÃO AUTOMÁTICA de todas as strings na query
         normalized_query = self._normalize_query_strings(query)
 
-        # Executar a query normalizada
-        result = super().run_query(normalized_query)
+        # Executar a query normalizada UMA única vez (texto para o modelo + DataFrame),
+        # exceto quando o índice bitmap garante resultado vazio
+        if self._is_known_empty(normalized_query):
+            result, df_result = EMPTY_QUERY_MESSAGE, pd.DataFrame()
+        else:
+            result, df_result = self._execute_query(normalized_query, self.connection)
+
+        self._store_result_df(query, result, df_result)
+        self._record_query_debug(normalized_query)
+        if is_mutating_sql(query):
+            self.invalidate_bitmap_index()
+
+        return result
+
+    def run_queries(self, queries: List[str]) -> str:
+        """Executa várias consultas SQL independentes em paralelo e retorna os resultados na ordem enviada.
+
+        Use para consultas que não dependem umas das outras, por exemplo uma consulta
+        por período em uma comparação.
+
+        :param queries: Lista de consultas SQL independentes
+        :return: Resultado de cada consulta, na mesma ordem da lista
+        """
+        if not queries:
+            return "Nenhuma consulta informada."
+
+        # Normalização e debug são sequenciais (alteram debug_info); apenas a execução é paralela
+        normalized_queries = [self._normalize_query_strings(query) for query in queries]
+        memo = getattr(self.debug_info_ref, 'tool_memo', None)
+
+        outputs: List[Optional[Tuple[str, Optional[pd.DataFrame]]]] = [None] * len(queries)
+        pending = []
+        for i, query in enumerate(queries):
+            # A chamada run_queries já foi contabilizada pelo hook da memoização
+            found, cached = memo.get('run_query', {'query': query}, record_stats=False) if memo else (False, None)
+            if found:
+                outputs[i] = (cached, self._turn_result_dfs.get(canonicalize_sql(query)))
+            else:
+                pending.append(i)
+                if self._is_known_empty(normalized_queries[i]):
+                    outputs[i] = (EMPTY_QUERY_MESSAGE, pd.DataFrame())
+
+        to_execute = [i for i in pending if outputs[i] is None]
+        if len(to_execute) == 1:
+            i = to_execute[0]
+            outputs[i] = self._execute_query(normalized_queries[i], self.connection)
+        elif to_execute:
+            # Cada worker usa um cursor próprio sobre o mesmo banco (consultas independentes)
+            connection = self.connection
+            workers = min(self.max_parallel_queries, len(to_execute))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="duckdb-query") as pool:
+                futures = {
+                    i: pool.submit(self._execute_on_cursor, normalized_queries[i], connection)
+                    for i in to_execute
+                }
+                for i, future in futures.items():
+                    outputs[i] = future.result()
+
+        if any(is_mutating_sql(queries[i]) for i in to_execute):
+            self.invalidate_bitmap_index()
+
+        # Registrar resultados na ordem das chamadas
+        sections = []
+        for i, (query, normalized_query) in enumerate(zip(queries, normalized_queries)):
+            result, df_result = outputs[i]
+            if i in pending:
+                if memo:
+                    memo.put('run_query', {'query': query}, result)
+                self._store_result_df(query, result, df_result)
+            else:
+                self._set_last_result_df(df_result)
+            self._record_query_debug(normalized_query)
+            sections.append(f"-- Consulta {i + 1}\n{result}")
+
+        return "\n\n".join(sections)
+
+    def _get_bitmap_index(self):
+        """Índice bitmap das colunas de filtro de dados_comerciais (None se a tabela ainda não existe)"""
+        with self._bitmap_index_lock:
+            if self._bitmap_index is None:
+                try:
+                    existing = dict(self.connection.execute(
+                        "SELECT column_name, data_type FROM duckdb_columns() WHERE table_name = ?", [BASE_TABLE_NAME]
+                    ).fetchall())
+                    columns = [col for col in BITMAP_COLUMNS + [DATE_COLUMN] if col in existing]
+                    if not columns:
+                        return None
+                    select_list = ", ".join(f'"{col}"' for col in columns)
+                    df = self.connection.execute(f"SELECT {select_list} FROM {BASE_TABLE_NAME}").df()
+                except Exception:
+                    return None
+                self._column_types = {col.lower(): data_type for col, data_type in existing.items()}
+                self._bitmap_index = get_bitmap_index(df)
+            return self._bitmap_index
+
+    def invalidate_bitmap_index(self):
+        """Descarta o índice bitmap após SQL que altera o banco (reconstruído na próxima consulta)"""
+        with self._bitmap_index_lock:
+            self._bitmap_index = None
+            self._column_types = {}
+
+    def _is_known_empty(self, query: str) -> bool:
+        """
+        Verifica pelo índice bitmap se a consulta certamente não retorna registros
+
+        Só considera SELECTs simples e sem agregação sobre dados_comerciais ou
+        dados_filtrados (acrescido dos filtros ativos da view), com predicados
+        cujas constantes têm o tipo exato da coluna; as condições usadas são
+        necessárias, então contagem zero garante resultado vazio.
+
+        Args:
+            query: Query já normalizada
+
+        Returns:
+            True se a execução pode ser evitada
+        """
+        index = self._get_bitmap_index()
+        if index is None:
+            return False
+
+        eligible = extract_table_conditions_ast(query.replace("`", "").split(";")[0], self._column_types)
+        if eligible is None:
+            return False
+        table_name, conditions = eligible
+
+        if table_name.lower() == BASE_TABLE_NAME:
+            active_filter = {}
+        elif table_name.lower() == FILTERED_VIEW_NAME:
+            compiled = getattr(self.debug_info_ref, '_active_filter', None)
+            active_filter = compiled.applied if compiled is not None else {}
+        else:
+            return False
+
+        conditions = index.indexed_context(conditions)
+        if not conditions:
+            return False
+
+        if index.count_expression(('and', [conditions, index.indexed_context(active_filter)])) > 0:
+            return False
+
+        if self.debug_info_ref is not None and hasattr(self.debug_info_ref, "debug_info"):
+            self.debug_info_ref.debug_info.setdefault("skipped_empty_queries", []).append(query.strip())
+        return True
+
+    def _execute_on_cursor(self, query: str, connection) -> Tuple[str, Optional[pd.DataFrame]]:
+        """Executa a query em um cursor dedicado (uso concorrente)"""
+        cursor = connection.cursor()
+        try:
+            return self._execute_query(query, cursor)
+        finally:
+            cursor.close()
+
+    def _execute_query(self, query: str, connection) -> Tuple[str, Optional[pd.DataFrame]]:
+        """
+        Executa a query uma vez e produz o texto no formato do DuckDbTools e o DataFrame
+
+        Args:
+            query: Query já normalizada
+            connection: Conexão ou cursor DuckDB
+
+        Returns:
+            Tupla (resultado textual, DataFrame ou None)
+        """
+        # Mesmo pré-processamento do DuckDbTools.run_query
+        formatted_sql = query.replace("`", "").split(";")[0]
 
-        # CAPTURAR DADOS DO RESULTADO para visualização
         try:
-            # Tentar executar novamente a query para capturar DataFrame
-            if hasattr(self, 'connection') and self.connection:
-                df_result = self.connection.execute(normalized_query).df()
-                if not df_result.empty:
-                    self.last_result_df = df_result
+            log_info(f"Running: {formatted_sql}")
+            cursor = connection.execute(formatted_sql)
+            if cursor.description is None:
+                return "No output", None
+
+            columns = [column[0] for column in cursor.description]
+            fetch_table = getattr(cursor, 'to_arrow_table', None) or cursor.fetch_arrow_table
+            table = fetch_table()
         except Exception as e:
-            # Se falhar, tentar extrair dados do resultado textual
-            self.last_result_df = self._parse_result_to_dataframe(result)
+            return str(e), None
+
+        # Texto idêntico ao DuckDbTools: uma linha por registro, valores separados por vírgula
+        column_values = [table.column(i).to_pylist() for i in range(table.num_columns)]
+        result_rows = []
+        for row in zip(*column_values):
+            if len(row) == 1:
+                result_rows.append(str(row[0]))
+            else:
+                result_rows.append(",".join(str(x) for x in row))
+        result = ",".join(columns) + "\n" + "\n".join(result_rows)
+
+        # DataFrame com os mesmos tipos de .df() (DECIMAL -> float, datas -> datetime64)
+        for i, arrow_field in enumerate(table.schema):
+            if pa.types.is_decimal(arrow_field.type):
+                table = table.set_column(i, arrow_field.name, table.column(i).cast(pa.float64()))
+        df_result = table.to_pandas(date_as_object=False)
+
+        return result, df_result
+
+    def _store_result_df(self, query: str, result: str, df_result: Optional[pd.DataFrame]):
+        """Guarda o DataFrame desta query no cache do turno e atualiza last_result_df (para visualização)"""
+        if df_result is None:
+            # Sem DataFrame: tentar extrair dados do resultado textual
+            df_result = self._parse_result_to_dataframe(result)
+            self.last_result_df = df_result
+        else:
+            self._set_last_result_df(df_result)
 
-        # Debug info e context extraction
+        self._turn_result_dfs[canonicalize_sql(query)] = df_result
+
+    def _set_last_result_df(self, df_result: Optional[pd.DataFrame]):
+        """Resultados vazios não substituem os dados da última visualização"""
+        if df_result is not None and not df_result.empty:
+            self.last_result_df = df_result
+
+    def _record_query_debug(self, normalized_query: str):
+        """Registra a query executada em debug_info (sem duplicatas)"""
         if self.debug_info_ref is not None and hasattr(
             self.debug_info_ref, "debug_info"
         ):
@@ -116,7 +334,15 @@ class DebugDuckDbTools(DuckDbTools):
                 # Adicionar contexto mesmo se vazio (para garantir que sempre apareça)
                 self.debug_info_ref.debug_info["query_contexts"].append(context if context else {})
 
-        return result
+    def restore_cached_result(self, arguments):
+        """Restaura last_result_df quando run_query é servido pela memoização do turno"""
+        query = arguments.get('query')
+        if isinstance(query, str):
+            self._set_last_result_df(self._turn_result_dfs.get(canonicalize_sql(query)))
+
+    def clear_turn_cache(self):
+        """Descarta os DataFrames memoizados do turno"""
+        self._turn_result_dfs.clear()
 
     def _parse_result_to_dataframe(self, result_text):
         """Converte resultado textual em DataFrame quando possível"""
@@ -0,0 +1,182 @@
+"""
+Memoização por turno de chamadas de ferramentas
+Evita reexecutar a mesma ferramenta com os mesmos argumentos dentro de um turno
+"""
+
+import json
+import re
+import threading
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+# Argumentos SQL: espaços em branco (fora de literais) não alteram o significado da query
+SQL_ARGUMENT_NAMES = {'query', 'queries', 'sql'}
+
+# Ferramentas somente leitura cujo resultado pode ser reaproveitado no turno
+MEMOIZED_TOOLS = frozenset({'run_query', 'run_queries'})
+
+# Statements que alteram estado não podem ser reaproveitados (e invalidam o cache)
+_MUTATING_SQL_PATTERN = re.compile(
+    r'\b(CREATE|INSERT|UPDATE|DELETE|DROP|ALTER|TRUNCATE|COPY|ATTACH|DETACH|SET|INSTALL|LOAD)\b',
+    re.IGNORECASE
+)
+# Literais e identificadores entre aspas (aspas duplicadas como escape)
+_QUOTED_PATTERN = re.compile(r"'(?:[^']|'')*'|\"(?:[^\"]|\"\")*\"")
+_QUOTED_OR_WHITESPACE_PATTERN = re.compile(_QUOTED_PATTERN.pattern + r"|\s+")
+
+
+def canonicalize_sql(query: str) -> str:
+    """Normaliza uma query para comparação: espaços colapsados fora de literais e sem ';' final"""
+    collapsed = _QUOTED_OR_WHITESPACE_PATTERN.sub(
+        lambda match: match.group(0) if match.group(0)[0] in "'\"" else ' ', query
+    )
+    return collapsed.strip().rstrip(';').strip()
+
+
+def _canonical_value(name: str, value: Any) -> Any:
+    """Forma canônica de um argumento (SQL com espaços colapsados)"""
+    if name in SQL_ARGUMENT_NAMES:
+        if isinstance(value, str):
+            return canonicalize_sql(value)
+        if isinstance(value, (list, tuple)):
+            return [canonicalize_sql(v) if isinstance(v, str) else v for v in value]
+    return value
+
+
+def is_mutating_sql(query: str) -> bool:
+    """True se algum statement da query (fora de literais) altera estado"""
+    return bool(_MUTATING_SQL_PATTERN.search(_QUOTED_PATTERN.sub("''", query)))
+
+
+def _is_mutating(arguments: Dict[str, Any]) -> bool:
+    """True se algum argumento SQL contém statement que altera estado"""
+    for name in SQL_ARGUMENT_NAMES & set(arguments):
+        value = arguments[name]
+        values = value if isinstance(value, (list, tuple)) else [value]
+        if any(isinstance(v, str) and is_mutating_sql(v) for v in values):
+            return True
+    return False
+
+
+class ToolCallMemo:
+    """
+    Cache por turno de resultados de ferramentas.
+
+    A chave é (nome da função, argumentos canônicos em JSON). O cache vale
+    apenas dentro do turno: PrincipalAgent.clear_execution_state o limpa.
+    Só ferramentas de consulta somente leitura (memoized_tools) são
+    reaproveitadas; qualquer statement que altera estado descarta os
+    resultados já guardados.
+    Ferramentas podem registrar callbacks de hit para restaurar efeitos
+    colaterais (ex.: DataFrame do último resultado no DuckDB).
+    """
+
+    def __init__(self, memoized_tools=MEMOIZED_TOOLS):
+        self.memoized_tools = frozenset(memoized_tools)
+        self._results: Dict[Tuple[str, str], Any] = {}
+        self._hit_callbacks: Dict[str, Callable[[Dict[str, Any]], None]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(function_name: str, arguments: Dict[str, Any]) -> Optional[Tuple[str, str]]:
+        """
+        Gera a chave canônica de uma chamada
+
+        Returns:
+            Tupla (função, argumentos JSON) ou None se a chamada não é memoizável
+        """
+        if _is_mutating(arguments):
+            return None
+        canonical = {name: _canonical_value(name, value) for name, value in arguments.items()}
+        try:
+            return function_name, json.dumps(canonical, sort_keys=True, ensure_ascii=False, default=str)
+        except (TypeError, ValueError):
+            return None
+
+    def get(self, function_name: str, arguments: Dict[str, Any], record_stats: bool = True) -> Tuple[bool, Any]:
+        """
+        Busca um resultado memoizado
+
+        Args:
+            function_name: Nome da ferramenta
+            arguments: Argumentos da chamada
+            record_stats: Contabiliza acerto/falha (False para consultas internas
+                          de uma chamada já contabilizada pelo hook, ex.: run_queries)
+
+        Returns:
+            Tupla (encontrado, resultado)
+        """
+        key = self.make_key(function_name, arguments)
+        if key is None:
+            return False, None
+        with self._lock:
+            found = key in self._results
+            if record_stats:
+                if found:
+                    self.hits += 1
+                else:
+                    self.misses += 1
+            return found, self._results.get(key)
+
+    def put(self, function_name: str, arguments: Dict[str, Any], result: Any):
+        """Armazena o resultado de uma chamada memoizável"""
+        key = self.make_key(function_name, arguments)
+        if key is None:
+            return
+        with self._lock:
+            self._results[key] = result
+
+    def register_hit_callback(self, function_name: str, callback: Callable[[Dict[str, Any]], None]):
+        """Registra callback executado quando uma chamada da função é servida do cache"""
+        self._hit_callbacks[function_name] = callback
+
+    def invalidate(self):
+        """Descarta os resultados guardados (estado alterado), mantendo as estatísticas"""
+        with self._lock:
+            self._results.clear()
+
+    def clear(self):
+        """Limpa resultados e estatísticas do turno"""
+        with self._lock:
+            self._results.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Estatísticas de uso do cache no turno"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._results)}
+
+    def as_tool_hook(self) -> Callable:
+        """
+        Cria um tool_hook do agno que serve chamadas repetidas do cache
+
+        Ferramentas fora de memoized_tools sempre executam; chamadas com SQL
+        que altera estado executam e invalidam o cache.
+
+        Returns:
+            Hook compatível com Agent(tool_hooks=[...])
+        """
+        def memo_tool_hook(function_name: str, function_call: Callable, arguments: Dict[str, Any]):
+            if _is_mutating(arguments):
+                # Resultados anteriores do turno podem não refletir mais o banco
+                result = function_call(**arguments)
+                self.invalidate()
+                return result
+            if function_name not in self.memoized_tools:
+                return function_call(**arguments)
+
+            found, result = self.get(function_name, arguments)
+            if found:
+                callback = self._hit_callbacks.get(function_name)
+                if callback is not None:
+                    callback(arguments)
+                return result
+
+            result = function_call(**arguments)
+            self.put(function_name, arguments, result)
+            return result
+
+        return memo_tool_hook
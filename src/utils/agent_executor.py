@@ -0,0 +1,250 @@
+"""
+Executor em background para turnos do agente
+Desacopla a execução de agent.run dos reruns do Streamlit usando um pool de workers
+"""
+
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional
+
+
+# Tempo máximo (segundos) que a UI aguarda um turno antes de desistir da espera
+AGENT_JOB_TIMEOUT_SECONDS = 300
+
+
+class JobStatus(Enum):
+    """Estados possíveis de um job do agente"""
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    ERROR = "error"
+
+
+@dataclass
+class AgentJob:
+    """Um turno do agente submetido ao pool de workers"""
+    job_id: str
+    session_id: str
+    prompt: str
+    status: JobStatus = JobStatus.PENDING
+    submitted_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    @property
+    def is_finished(self) -> bool:
+        """True quando o job terminou (com sucesso ou erro)"""
+        return self.status in (JobStatus.DONE, JobStatus.ERROR)
+
+    @property
+    def elapsed(self) -> float:
+        """Tempo decorrido desde a submissão (ou duração total, se terminado)"""
+        end = self.finished_at or time.time()
+        return end - self.submitted_at
+
+    def to_status_dict(self) -> Dict[str, Any]:
+        """Resumo serializável do estado do job para exibição na UI"""
+        return {
+            "job_id": self.job_id,
+            "session_id": self.session_id,
+            "status": self.status.value,
+            "elapsed": self.elapsed,
+            "queue_time": (self.started_at - self.submitted_at) if self.started_at else None,
+            "error": self.error
+        }
+
+
+class AgentJobExecutor:
+    """
+    Pool de workers compartilhado entre sessões que executa turnos do agente.
+
+    Cada submissão recebe um job_id; a UI consulta o estado (poll) ou aguarda
+    com callback de progresso. Turnos do mesmo agente são serializados por um
+    lock por agente, pois o agente mantém estado mutável (debug_info, contexto);
+    o lock é descartado quando o agente não tem mais jobs pendentes.
+    """
+
+    def __init__(self, max_workers: int = 4, max_retained_jobs: int = 200):
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="agent-worker")
+        self._jobs: Dict[str, AgentJob] = {}
+        self._session_jobs: Dict[str, List[str]] = {}
+        self._agent_locks: Dict[int, threading.Lock] = {}
+        self._agent_active_jobs: Dict[int, int] = {}  # jobs pendentes/em execução por agente
+        self._lock = threading.Lock()
+        self._max_retained_jobs = max_retained_jobs
+
+    def submit(self, agent: Any, prompt: str, session_id: str,
+               turn_fn: Optional[Callable[[Any, str], Dict[str, Any]]] = None) -> str:
+        """
+        Submete um turno do agente para execução em background
+
+        Args:
+            agent: Instância do agente
+            prompt: Pergunta do usuário
+            session_id: ID da sessão dona do job
+            turn_fn: Função executada no worker (padrão: agent.run)
+
+        Returns:
+            ID do job
+        """
+        job = AgentJob(job_id=str(uuid.uuid4()), session_id=session_id, prompt=prompt)
+        turn_fn = turn_fn or _default_turn_fn
+
+        with self._lock:
+            self._jobs[job.job_id] = job
+            self._session_jobs.setdefault(session_id, []).append(job.job_id)
+            agent_lock = self._agent_locks.setdefault(id(agent), threading.Lock())
+            self._agent_active_jobs[id(agent)] = self._agent_active_jobs.get(id(agent), 0) + 1
+            self._prune_finished_jobs()
+
+        self._pool.submit(self._run_job, job, agent, turn_fn, agent_lock)
+        return job.job_id
+
+    def _run_job(self, job: AgentJob, agent: Any, turn_fn: Callable, agent_lock: threading.Lock):
+        """Executa o job no worker, registrando tempos e resultado"""
+        try:
+            with agent_lock:
+                job.started_at = time.time()
+                job.status = JobStatus.RUNNING
+                try:
+                    job.result = turn_fn(agent, job.prompt)
+                    job.status = JobStatus.DONE
+                except Exception as e:
+                    job.error = str(e)
+                    job.status = JobStatus.ERROR
+                finally:
+                    job.finished_at = time.time()
+        finally:
+            self._release_agent(id(agent))
+
+    def _release_agent(self, agent_id: int):
+        """Descarta o lock do agente quando seu último job pendente termina"""
+        with self._lock:
+            remaining = self._agent_active_jobs.get(agent_id, 0) - 1
+            if remaining > 0:
+                self._agent_active_jobs[agent_id] = remaining
+            else:
+                self._agent_active_jobs.pop(agent_id, None)
+                self._agent_locks.pop(agent_id, None)
+
+    def get_job(self, job_id: str) -> Optional[AgentJob]:
+        """Retorna o job pelo ID ou None se desconhecido"""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def get_status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Retorna o estado do job para polling pela UI"""
+        job = self.get_job(job_id)
+        return job.to_status_dict() if job else None
+
+    def wait(self, job_id: str, timeout: Optional[float] = None, poll_interval: float = 0.25,
+             on_poll: Optional[Callable[[AgentJob], None]] = None) -> Optional[AgentJob]:
+        """
+        Aguarda a conclusão do job, chamando on_poll a cada intervalo
+
+        Args:
+            job_id: ID do job
+            timeout: Tempo máximo de espera em segundos (None = sem limite)
+            poll_interval: Intervalo entre consultas de estado
+            on_poll: Callback de progresso (ex.: atualizar placeholder da UI)
+
+        Returns:
+            O job (terminado ou não, em caso de timeout) ou None se desconhecido
+        """
+        deadline = time.time() + timeout if timeout is not None else None
+        job = self.get_job(job_id)
+
+        while job is not None and not job.is_finished:
+            if on_poll:
+                on_poll(job)
+            if deadline is not None and time.time() >= deadline:
+                break
+            time.sleep(poll_interval)
+
+        return job
+
+    def get_session_jobs(self, session_id: str, only_active: bool = False) -> List[AgentJob]:
+        """Lista os jobs de uma sessão, na ordem de submissão"""
+        with self._lock:
+            jobs = [self._jobs[jid] for jid in self._session_jobs.get(session_id, []) if jid in self._jobs]
+        if only_active:
+            jobs = [job for job in jobs if not job.is_finished]
+        return jobs
+
+    def pop_result(self, job_id: str) -> Optional[AgentJob]:
+        """Remove e retorna um job terminado, anexando-o definitivamente à sessão chamadora"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or not job.is_finished:
+                return None
+            del self._jobs[job_id]
+            session_jobs = self._session_jobs.get(job.session_id, [])
+            if job_id in session_jobs:
+                session_jobs.remove(job_id)
+            if not session_jobs:
+                self._session_jobs.pop(job.session_id, None)
+            return job
+
+    def _prune_finished_jobs(self):
+        """Descarta os jobs terminados mais antigos que nunca foram coletados"""
+        if len(self._jobs) <= self._max_retained_jobs:
+            return
+
+        finished = sorted(
+            (job for job in self._jobs.values() if job.is_finished),
+            key=lambda job: job.finished_at or 0
+        )
+        for job in finished[:len(self._jobs) - self._max_retained_jobs]:
+            del self._jobs[job.job_id]
+            session_jobs = self._session_jobs.get(job.session_id, [])
+            if job.job_id in session_jobs:
+                session_jobs.remove(job.job_id)
+
+    def shutdown(self, wait: bool = True):
+        """Encerra o pool de workers"""
+        self._pool.shutdown(wait=wait)
+
+
+def _default_turn_fn(agent: Any, prompt: str) -> Dict[str, Any]:
+    """Turno mínimo: apenas executa o agente e devolve a resposta"""
+    return {"response": agent.run(prompt)}
+
+
+# Instância global compartilhada entre sessões (workers reutilizáveis)
+_global_agent_executor: Optional[AgentJobExecutor] = None
+_global_executor_lock = threading.Lock()
+
+
+def get_agent_executor(max_workers: int = 4) -> AgentJobExecutor:
+    """
+    Singleton para obter o executor global de turnos do agente
+
+    Args:
+        max_workers: Número de workers (usado apenas na criação)
+
+    Returns:
+        Instância do AgentJobExecutor
+    """
+    global _global_agent_executor
+
+    with _global_executor_lock:
+        if _global_agent_executor is None:
+            _global_agent_executor = AgentJobExecutor(max_workers=max_workers)
+
+    return _global_agent_executor
+
+
+def reset_agent_executor():
+    """Reset da instância global (útil para testes)"""
+    global _global_agent_executor
+
+    with _global_executor_lock:
+        if _global_agent_executor is not None:
+            _global_agent_executor.shutdown(wait=False)
+        _global_agent_executor = None
@@ -0,0 +1,95 @@
+"""
+Pipeline de um turno do agente sem dependência do Streamlit
+Execução do agente, extração de filtros das queries SQL e preparação da visualização
+"""
+
+import time
+import sys
+import os
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+from visualization.chart_data import prepare_visualization_data
+
+
+def run_agent_turn(agent, prompt, recorder=None):
+    """
+    Executa um turno do agente (usado pelo worker em background e pelo replay).
+
+    Args:
+        agent: Instância do PrincipalAgent
+        prompt: Pergunta do usuário
+        recorder: TurnRecorder opcional para capturar o turno como fixture
+
+    Returns:
+        Dict com resposta, tempo, debug_info, dados de visualização e tempos por etapa
+    """
+    stage_times = {}
+    start_time = time.time()
+    context_before = dict(getattr(agent, 'persistent_context', {}) or {})
+
+    # Clear execution state if needed
+    if hasattr(agent, 'clear_execution_state'):
+        agent.clear_execution_state()
+
+    # Get agent response
+    response = agent.run(prompt)
+    response_time = time.time() - start_time
+    stage_times['agent_run'] = response_time
+
+    # Process response content
+    response_content = str(response.content) if hasattr(response, 'content') else str(response)
+
+    debug_info = {"response_time": response_time}
+
+    if hasattr(agent, 'debug_info'):
+        debug_info.update(agent.debug_info)
+
+        # CORREÇÃO CRÍTICA: Extrair filtros ANTES de limpar debug_info
+        # Processar filtros usando APENAS as queries SQL
+        stage_start = time.time()
+        try:
+            df_dataset = getattr(agent, 'df_normalized', None)
+            # Usar debug_info local que contém as queries (não agent.debug_info)
+            if df_dataset is not None and 'sql_queries' in debug_info:
+                from filters.json_filter_manager import processar_filtros_apenas_sql
+                from filters.sql_filter_extractor import get_extraction_cache_stats
+
+                sql_queries = debug_info.get('sql_queries', [])
+                if sql_queries:
+                    # Extrair filtros das queries SQL
+                    updated_context_temp, filter_changes = processar_filtros_apenas_sql(
+                        sql_queries, {}, df_dataset
+                    )
+                    # Salvar resultado para uso posterior
+                    debug_info['extracted_filters'] = updated_context_temp
+                    debug_info['filter_changes'] = filter_changes
+                    debug_info['filter_cache_stats'] = get_extraction_cache_stats()
+        except Exception as e:
+            debug_info['filter_extraction_error'] = str(e)
+        stage_times['filter_extraction'] = time.time() - stage_start
+
+        agent.debug_info.clear()  # Clear for next query
+
+    # Extract visualization data if DuckDB tool has results
+    stage_start = time.time()
+    visualization_data = None
+    if hasattr(agent, 'tools'):
+        for tool in agent.tools:
+            if hasattr(tool, 'last_result_df') and tool.last_result_df is not None:
+                df_result = tool.last_result_df
+                if not df_result.empty and len(df_result) <= 20:
+                    visualization_data = prepare_visualization_data(df_result)
+                break
+    stage_times['visualization'] = time.time() - stage_start
+
+    turn_result = {
+        "response_content": response_content,
+        "response_time": response_time,
+        "debug_info": debug_info,
+        "visualization_data": visualization_data,
+        "stage_times": stage_times
+    }
+
+    if recorder is not None:
+        recorder.capture(prompt, turn_result, response, context_before)
+
+    return turn_result
@@ -0,0 +1,258 @@
+"""
+Gravação e replay de turnos do agente
+Captura turnos reais como fixtures e os reexecuta contra o MockModel para
+testes de regressão (funcionais e de desempenho) de todas as etapas não-LLM
+"""
+
+import json
+import os
+import re
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+import sys
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+
+# Campos comparados no replay (a resposta textual do modelo não entra: é roteirizada)
+REPLAY_COMPARED_FIELDS = ["final_message", "tool_calls", "sql_queries", "extracted_filters", "visualization"]
+
+
+def _summarize_visualization(visualization_data: Optional[Dict]) -> Optional[Dict]:
+    """Resumo serializável dos dados de visualização"""
+    if not visualization_data:
+        return None
+    data = visualization_data.get('data')
+    return {
+        "type": visualization_data.get('type'),
+        "rows": int(len(data)) if data is not None else 0,
+        "columns": list(data.columns) if data is not None else [],
+        "config": visualization_data.get('config', {})
+    }
+
+
+def _extract_model_steps(run_output: Any) -> List[Dict[str, Any]]:
+    """Reconstrói os passos de chamadas de ferramenta do modelo a partir do RunOutput"""
+    steps = []
+    for message in getattr(run_output, 'messages', None) or []:
+        if getattr(message, 'role', None) != 'assistant' or getattr(message, 'from_history', False):
+            continue
+        if not message.tool_calls:
+            continue
+        calls = []
+        for tool_call in message.tool_calls:
+            function = tool_call.get('function', {})
+            arguments = function.get('arguments') or '{}'
+            try:
+                arguments = json.loads(arguments) if isinstance(arguments, str) else arguments
+            except ValueError:
+                arguments = {}
+            calls.append({"name": function.get('name'), "arguments": arguments})
+        steps.append({"tool_calls": calls})
+    return steps
+
+
+class TurnRecorder:
+    """
+    Captura turnos do agente (prompt, mensagem final, ferramentas, SQL e filtros).
+
+    Com fixtures_dir definido, cada turno capturado é salvo como um arquivo
+    JSON; sem ele, os turnos ficam apenas em memória (usado pelo replay).
+    """
+
+    def __init__(self, fixtures_dir: Optional[str] = None, dataset_path: Optional[str] = None):
+        self.fixtures_dir = fixtures_dir
+        self.dataset_path = dataset_path
+        self.records: List[Dict[str, Any]] = []
+
+    def capture(self, prompt: str, turn_result: Dict[str, Any], run_output: Any,
+                context_before: Optional[Dict] = None) -> Dict[str, Any]:
+        """
+        Captura um turno já executado
+
+        Args:
+            prompt: Pergunta do usuário
+            turn_result: Resultado de run_agent_turn
+            run_output: RunOutput do agno
+            context_before: Contexto persistente antes do turno
+
+        Returns:
+            Registro do turno (formato de fixture)
+        """
+        debug_info = turn_result.get('debug_info', {})
+        modifications = debug_info.get('query_modifications', [])
+        final_message = modifications[-1]['final_message'] if modifications else prompt
+
+        tool_calls = []
+        for tool in getattr(run_output, 'tools', None) or []:
+            tool_calls.append({
+                "name": tool.tool_name,
+                "arguments": tool.tool_args or {},
+                "result": None if tool.result is None else str(tool.result)
+            })
+
+        record = {
+            "recorded_at": datetime.now().isoformat(),
+            "dataset_path": self.dataset_path,
+            "prompt": prompt,
+            "persistent_context": context_before or {},
+            "final_message": final_message,
+            "model_steps": _extract_model_steps(run_output),
+            "final_content": turn_result.get('response_content'),
+            "tool_calls": tool_calls,
+            "sql_queries": debug_info.get('sql_queries', []),
+            "extracted_filters": debug_info.get('extracted_filters', {}),
+            "visualization": _summarize_visualization(turn_result.get('visualization_data')),
+            "stage_times": turn_result.get('stage_times', {})
+        }
+        self.records.append(record)
+
+        if self.fixtures_dir:
+            self.save(record)
+        return record
+
+    def save(self, record: Dict[str, Any]) -> str:
+        """Salva o registro como fixture JSON e retorna o caminho"""
+        os.makedirs(self.fixtures_dir, exist_ok=True)
+        slug = re.sub(r'[^a-z0-9]+', '_', record['prompt'].lower()).strip('_')[:40] or 'turno'
+        path = os.path.join(self.fixtures_dir, f"{datetime.now():%Y%m%d_%H%M%S}_{slug}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(record, f, ensure_ascii=False, indent=2, default=str)
+        return path
+
+
+def get_turn_recorder() -> Optional[TurnRecorder]:
+    """
+    Retorna o gravador configurado em RECORDER_CONFIG ou None se desabilitado
+    """
+    from config.model_config import RECORDER_CONFIG, DATA_CONFIG
+    if not RECORDER_CONFIG.get("enabled"):
+        return None
+    return TurnRecorder(RECORDER_CONFIG["fixtures_dir"], dataset_path=DATA_CONFIG["data_path"])
+
+
+def load_fixture(path: str) -> Dict[str, Any]:
+    """Carrega uma fixture de turno"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_dataset(path: str) -> pd.DataFrame:
+    """
+    Carrega o dataset de uma fixture (parquet ou CSV de amostra)
+
+    Args:
+        path: Caminho do arquivo
+
+    Returns:
+        DataFrame com Data como datetime e colunas Cod_* como texto
+    """
+    if path.endswith('.parquet'):
+        return pd.read_parquet(path)
+    header = pd.read_csv(path, nrows=0).columns
+    code_columns = {col: str for col in header if col.startswith('Cod_')}
+    return pd.read_csv(path, dtype=code_columns, parse_dates=['Data'] if 'Data' in header else None)
+
+
+def build_replay_agent(df: pd.DataFrame, model, session_user_id: str = "replay"):
+    """
+    Cria um PrincipalAgent equivalente ao de create_agent, sem knowledge base,
+    com a tabela dados_comerciais carregada diretamente do DataFrame
+
+    Args:
+        df: Dataset original
+        model: Modelo agno (tipicamente MockModel)
+
+    Returns:
+        Instância do PrincipalAgent
+    """
+    from agno.tools.calculator import CalculatorTools
+    from agno.tools.duckdb import DuckDbTools
+    from agno.tools.python import PythonTools
+    from agno.tools.reasoning import ReasoningTools
+    from chatbot_agents import PrincipalAgent
+    from alias_registry import get_alias_registry
+    from text_normalizer import TextNormalizer
+
+    normalizer = TextNormalizer()
+    normalizer.set_dataset_context(df)
+    text_columns = normalizer.identify_text_columns(df)
+    df_normalized = normalizer.normalize_dataframe(df, text_columns)
+
+    agent = PrincipalAgent(
+        normalizer=normalizer,
+        alias_mapping=get_alias_registry(),
+        df_normalized=df_normalized,
+        text_columns=text_columns,
+        session_user_id=session_user_id,
+        model=model,
+        tools=[
+            ReasoningTools(add_instructions=True),
+            CalculatorTools(),
+            PythonTools(),
+            DuckDbTools(),
+        ],
+        markdown=True,
+    )
+
+    connection = agent.duckdb_tool_ref.connection
+    connection.register('_replay_df', df)
+    connection.execute("CREATE TABLE dados_comerciais AS SELECT * FROM _replay_df")
+    connection.unregister('_replay_df')
+    return agent
+
+
+def replay_turn(fixture: Dict[str, Any], df: Optional[pd.DataFrame] = None, agent=None) -> Dict[str, Any]:
+    """
+    Reexecuta um turno gravado: ferramentas, extração de filtros e visualização
+    rodam de verdade; apenas o modelo é substituído pelo roteiro gravado
+
+    Args:
+        fixture: Registro gravado pelo TurnRecorder
+        df: Dataset (padrão: carregado de fixture['dataset_path'])
+        agent: Agente de replay já construído (reutilizado em benchmarks)
+
+    Returns:
+        Dict com matches, mismatches, stage_times e o turno reexecutado
+    """
+    from models.mock_model import MockModel
+    from utils.agent_turn import run_agent_turn
+
+    script = fixture.get('model_steps', []) + [{"content": fixture.get('final_content') or ""}]
+    if agent is None:
+        if df is None:
+            df = load_dataset(fixture['dataset_path'])
+        agent = build_replay_agent(df, MockModel(script=script))
+    else:
+        agent.model.script = script
+
+    agent.persistent_context = dict(fixture.get('persistent_context', {}))
+    agent.debug_info.clear()
+
+    recorder = TurnRecorder()
+    start = time.time()
+    turn_result = run_agent_turn(agent, fixture['prompt'], recorder=recorder)
+    total_time = time.time() - start
+    replayed = recorder.records[-1]
+
+    mismatches = [field for field in REPLAY_COMPARED_FIELDS
+                  if _normalize_for_compare(replayed.get(field)) != _normalize_for_compare(fixture.get(field))]
+
+    stage_times = dict(turn_result.get('stage_times', {}))
+    telemetry = turn_result['debug_info'].get('telemetry', {})
+    stage_times['tools'] = telemetry.get('tool_time_total', 0.0)
+    stage_times['total'] = total_time
+
+    return {
+        "matches": not mismatches,
+        "mismatches": mismatches,
+        "stage_times": stage_times,
+        "replayed": replayed
+    }
+
+
+def _normalize_for_compare(value: Any) -> Any:
+    """Passa o valor por JSON para comparar gravação e replay no mesmo formato"""
+    return json.loads(json.dumps(value, ensure_ascii=False, default=str))
@@ -0,0 +1,234 @@
+"""
+Telemetria por turno do agente
+Registra latência do modelo, tokens e chamadas de ferramentas por tipo
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+
+# Tipos de ferramenta reportados na telemetria (nome da classe do toolkit -> tipo)
+TOOL_TYPE_BY_TOOLKIT = {
+    "DebugDuckDbTools": "DebugDuckDbTools",
+    "DuckDbTools": "DebugDuckDbTools",
+    "OptimizedPythonTools": "OptimizedPythonTools",
+    "PythonTools": "OptimizedPythonTools",
+    "CalculatorTools": "calculator",
+    "ReasoningTools": "reasoning",
+}
+
+
+def build_tool_type_map(tools: Optional[List[Any]]) -> Dict[str, str]:
+    """
+    Mapeia o nome de cada função registrada para o tipo do seu toolkit
+
+    Args:
+        tools: Lista de toolkits do agente
+
+    Returns:
+        Dict nome_da_funcao -> tipo de ferramenta
+    """
+    tool_types = {}
+    for toolkit in tools or []:
+        tool_type = None
+        for cls in type(toolkit).__mro__:
+            if cls.__name__ in TOOL_TYPE_BY_TOOLKIT:
+                tool_type = TOOL_TYPE_BY_TOOLKIT[cls.__name__]
+                break
+        tool_type = tool_type or type(toolkit).__name__
+
+        functions = getattr(toolkit, 'functions', None) or {}
+        for function_name in functions:
+            tool_types[function_name] = tool_type
+        for function in getattr(toolkit, 'tools', None) or []:
+            name = getattr(function, '__name__', None)
+            if name:
+                tool_types.setdefault(name, tool_type)
+    return tool_types
+
+
+class TurnTelemetry:
+    """
+    Coletor de métricas de um único turno (uma chamada a PrincipalAgent.run)
+    """
+
+    def __init__(self, prompt: str = "", session_id: str = "default_user",
+                 tool_types: Optional[Dict[str, str]] = None):
+        self.prompt = prompt
+        self.session_id = session_id
+        self.tool_types = tool_types or {}
+        self.started_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.tool_calls: List[Dict[str, Any]] = []
+        self.model_latency = 0.0
+        self.model_requests = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self._lock = threading.Lock()
+
+    def record_tool_call(self, function_name: str, duration: float, success: bool = True):
+        """Registra uma chamada de ferramenta com sua duração"""
+        with self._lock:
+            self.tool_calls.append({
+                "function": function_name,
+                "tool_type": self.tool_types.get(function_name, "other"),
+                "duration": duration,
+                "success": success
+            })
+
+    def record_run_output(self, run_output: Any):
+        """
+        Extrai tokens e latência do modelo do RunOutput do agno
+
+        Args:
+            run_output: Resultado de Agent.run
+        """
+        metrics = getattr(run_output, 'metrics', None)
+        if metrics is not None:
+            self.input_tokens = int(getattr(metrics, 'input_tokens', 0) or 0)
+            self.output_tokens = int(getattr(metrics, 'output_tokens', 0) or 0)
+
+        # Latência do modelo = soma das durações das mensagens do assistente.
+        # O agno descarta essas durações ao persistir a sessão; nesse caso a
+        # latência é estimada como duração do run menos o tempo em ferramentas.
+        message_latency = 0.0
+        has_message_durations = False
+        for message in getattr(run_output, 'messages', None) or []:
+            if getattr(message, 'role', None) != 'assistant':
+                continue
+            self.model_requests += 1
+            message_metrics = getattr(message, 'metrics', None)
+            duration = getattr(message_metrics, 'duration', None) if message_metrics else None
+            if duration is not None:
+                message_latency += duration
+                has_message_durations = True
+
+        if has_message_durations:
+            self.model_latency = message_latency
+        else:
+            run_duration = getattr(metrics, 'duration', None) if metrics is not None else None
+            if run_duration is not None:
+                tool_time = sum(call["duration"] for call in self.tool_calls)
+                self.model_latency = max(0.0, run_duration - tool_time)
+
+    def finish(self, run_output: Any = None) -> Dict[str, Any]:
+        """Finaliza o turno e retorna o registro consolidado"""
+        self.finished_at = time.time()
+        if run_output is not None:
+            self.record_run_output(run_output)
+        return self.to_dict()
+
+    def summarize_tools(self) -> Dict[str, Dict[str, Any]]:
+        """Agrupa as chamadas de ferramenta por tipo (contagem e tempo total)"""
+        summary: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            calls = list(self.tool_calls)
+        for call in calls:
+            entry = summary.setdefault(call["tool_type"], {"calls": 0, "time": 0.0})
+            entry["calls"] += 1
+            entry["time"] += call["duration"]
+        return summary
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Registro serializável do turno"""
+        end = self.finished_at or time.time()
+        tool_summary = self.summarize_tools()
+        return {
+            "timestamp": datetime.fromtimestamp(self.started_at).isoformat(),
+            "session_id": self.session_id,
+            "prompt": self.prompt,
+            "total_time": end - self.started_at,
+            "model_latency": self.model_latency,
+            "model_requests": self.model_requests,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "tool_calls_total": sum(entry["calls"] for entry in tool_summary.values()),
+            "tool_time_total": sum(entry["time"] for entry in tool_summary.values()),
+            "tools_by_type": tool_summary,
+            "tool_calls": list(self.tool_calls)
+        }
+
+
+def make_telemetry_tool_hook(get_telemetry: Callable[[], Optional[TurnTelemetry]]) -> Callable:
+    """
+    Cria um tool_hook do agno que cronometra cada chamada de ferramenta
+
+    Args:
+        get_telemetry: Função que retorna o coletor do turno ativo (ou None)
+
+    Returns:
+        Hook compatível com Agent(tool_hooks=[...])
+    """
+    def telemetry_tool_hook(function_name: str, function_call: Callable, arguments: Dict[str, Any]):
+        start = time.perf_counter()
+        success = True
+        try:
+            return function_call(**arguments)
+        except Exception:
+            success = False
+            raise
+        finally:
+            telemetry = get_telemetry()
+            if telemetry is not None:
+                telemetry.record_tool_call(function_name, time.perf_counter() - start, success)
+
+    return telemetry_tool_hook
+
+
+class TelemetryLog:
+    """Log JSONL append-only com os registros de telemetria de cada turno"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def append(self, record: Dict[str, Any]):
+        """Acrescenta um registro ao final do arquivo"""
+        directory = os.path.dirname(self.path)
+        with self._lock:
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+
+    def read_all(self) -> List[Dict[str, Any]]:
+        """Lê todos os registros do log (útil para benchmarks e análises)"""
+        if not os.path.exists(self.path):
+            return []
+        with open(self.path, 'r', encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+
+# Instância global do log de telemetria
+_global_telemetry_log: Optional[TelemetryLog] = None
+
+
+def get_telemetry_log(path: Optional[str] = None) -> Optional[TelemetryLog]:
+    """
+    Singleton para obter o log de telemetria
+
+    Args:
+        path: Caminho do arquivo JSONL (padrão: TELEMETRY_CONFIG)
+
+    Returns:
+        Instância do TelemetryLog ou None se a telemetria estiver desabilitada
+    """
+    global _global_telemetry_log
+
+    if _global_telemetry_log is None or (path and path != _global_telemetry_log.path):
+        from config.model_config import TELEMETRY_CONFIG
+        if not TELEMETRY_CONFIG.get("enabled", True):
+            return None
+        _global_telemetry_log = TelemetryLog(path or TELEMETRY_CONFIG["metrics_log_path"])
+
+    return _global_telemetry_log
+
+
+def reset_telemetry_log():
+    """Reset da instância global (útil para testes)"""
+    global _global_telemetry_log
+    _global_telemetry_log = None
@@ -0,0 +1,42 @@
+"""
+Preparação de dados para visualização automática (sem dependência do Streamlit)
+"""
+
+
+def prepare_visualization_data(df_result):
+    """Prepara dados para visualização automática"""
+    if df_result.empty or len(df_result.columns) < 2:
+        return None
+
+    # Tentar identificar colunas de valor e rótulo
+    numeric_cols = df_result.select_dtypes(include=['number']).columns
+    text_cols = df_result.select_dtypes(include=['object', 'string']).columns
+
+    if len(numeric_cols) >= 1 and len(text_cols) >= 1:
+        value_col = numeric_cols[0]
+        label_col = text_cols[0]
+
+        # Detectar se é dados temporais
+        is_temporal = any(
+            keyword in label_col.lower()
+            for keyword in ['data', 'mes', 'ano', 'periodo', 'date', 'month', 'year']
+        )
+
+        chart_type = 'line_chart' if is_temporal else 'bar_chart'
+
+        # Preparar dados no formato esperado
+        chart_data = df_result[[label_col, value_col]].copy()
+        chart_data.columns = ['label' if not is_temporal else 'date', 'value']
+
+        return {
+            'type': chart_type,
+            'data': chart_data,
+            'has_data': True,
+            'config': {
+                'title': f'Top {len(chart_data)} Resultados',
+                'value_format': 'currency' if 'valor' in value_col.lower() else 'number',
+                'is_categorical_id': chart_data['label' if not is_temporal else 'date'].dtype == 'object'
+            }
+        }
+
+    return None
@@ -0,0 +1,112 @@
+"""
+Testes para o executor em background de turnos do agente
+"""
+
+import unittest
+import threading
+import time
+import sys
+import os
+
+# Adicionar src ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.agent_executor import AgentJobExecutor, JobStatus
+
+
+class _FakeAgent:
+    """Agente mínimo que registra execuções concorrentes"""
+
+    def __init__(self, delay=0.05):
+        self.delay = delay
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def run(self, prompt):
+        with self._lock:
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(self.delay)
+        with self._lock:
+            self.active -= 1
+        return f"resposta: {prompt}"
+
+
+class TestAgentJobExecutor(unittest.TestCase):
+    """Testes para o AgentJobExecutor"""
+
+    def setUp(self):
+        self.executor = AgentJobExecutor(max_workers=4)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_submit_and_wait(self):
+        """Testa ciclo completo: submissão, espera e coleta do resultado"""
+        agent = _FakeAgent()
+        job_id = self.executor.submit(agent, "vendas em SP", session_id="s1")
+
+        job = self.executor.wait(job_id, timeout=5)
+        self.assertEqual(job.status, JobStatus.DONE)
+        self.assertEqual(job.result["response"], "resposta: vendas em SP")
+
+        self.assertIs(self.executor.pop_result(job_id), job)
+        self.assertIsNone(self.executor.get_job(job_id))
+
+    def test_error_is_captured(self):
+        """Testa que exceções no turno viram status ERROR"""
+        def failing_turn(agent, prompt):
+            raise RuntimeError("falha no modelo")
+
+        job_id = self.executor.submit(_FakeAgent(), "x", session_id="s1", turn_fn=failing_turn)
+        job = self.executor.wait(job_id, timeout=5)
+
+        self.assertEqual(job.status, JobStatus.ERROR)
+        self.assertIn("falha no modelo", job.error)
+
+    def test_wait_timeout_keeps_job_collectable(self):
+        """Testa que um job ainda em execução após o timeout segue pendente até terminar"""
+        job_id = self.executor.submit(_FakeAgent(delay=0.3), "lento", session_id="s1")
+
+        job = self.executor.wait(job_id, timeout=0.05)
+        self.assertFalse(job.is_finished)
+        self.assertIsNone(self.executor.pop_result(job_id))
+        self.assertIs(self.executor.get_job(job_id), job)
+
+        job = self.executor.wait(job_id, timeout=5)
+        self.assertEqual(job.result["response"], "resposta: lento")
+        self.assertIs(self.executor.pop_result(job_id), job)
+
+    def test_same_agent_is_serialized(self):
+        """Testa que turnos do mesmo agente não rodam em paralelo"""
+        agent = _FakeAgent()
+        job_ids = [self.executor.submit(agent, f"p{i}", session_id="s1") for i in range(3)]
+        for job_id in job_ids:
+            self.executor.wait(job_id, timeout=5)
+
+        self.assertEqual(agent.max_active, 1)
+
+    def test_agent_lock_released_after_last_job(self):
+        """Testa que o lock do agente é descartado quando não há mais jobs dele"""
+        agent = _FakeAgent()
+        job_ids = [self.executor.submit(agent, f"p{i}", session_id="s1") for i in range(3)]
+        self.assertIn(id(agent), self.executor._agent_locks)
+
+        self.executor.shutdown(wait=True)
+        self.assertTrue(all(self.executor.get_job(job_id).is_finished for job_id in job_ids))
+        self.assertEqual(self.executor._agent_locks, {})
+        self.assertEqual(self.executor._agent_active_jobs, {})
+
+    def test_session_isolation(self):
+        """Testa que jobs são listados apenas para a sessão dona"""
+        agent_a, agent_b = _FakeAgent(), _FakeAgent()
+        job_a = self.executor.submit(agent_a, "a", session_id="sessao_a")
+        self.executor.submit(agent_b, "b", session_id="sessao_b")
+
+        jobs = self.executor.get_session_jobs("sessao_a")
+        self.assertEqual([job.job_id for job in jobs], [job_a])
+
+
+if __name__ == '__main__':
+    unittest.main()
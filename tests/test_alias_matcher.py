@@ -0,0 +1,74 @@
+"""
+Testes para o autômato de aliases
+"""
+
+import random
+import re
+import unittest
+import sys
+import os
+
+# Adicionar src ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from alias_matcher import AliasMatcher
+from text_normalizer import TextNormalizer, load_alias_mapping
+
+
+ALIAS_FILE = os.path.join(os.path.dirname(__file__), '..', 'data', 'mappings', 'alias.yaml')
+
+
+class TestAliasMatcher(unittest.TestCase):
+    """Testes de limites de palavra, resolução de sobreposições e integração com o normalizador"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.normalizer = TextNormalizer()
+        cls.mapping = load_alias_mapping(ALIAS_FILE)
+        cls.matcher = AliasMatcher(cls.mapping, cls.normalizer.normalize_text)
+
+    def test_word_boundaries(self):
+        """Testa que aliases dentro de outras palavras não casam"""
+        matcher = AliasMatcher({'UF': ['uf'], 'Cidade': ['cidade']}, self.normalizer.normalize_text)
+        self.assertEqual([hit.alias for hit in matcher.find('vendas por uf e cidade')], ['uf', 'cidade'])
+        self.assertEqual(matcher.find('cidades do rufino'), [])
+
+    def test_longest_match_wins(self):
+        """Testa que a ocorrência mais longa prevalece sobre aliases contidos nela"""
+        normalized = self.normalizer.normalize_text('Qual o peso unitário por família do produto?')
+        hits = self.matcher.find(normalized)
+        self.assertEqual([hit.alias for hit in hits], ['peso unitario', 'familia do produto'])
+        self.assertEqual(hits[1].targets[0].column, 'Cod_Familia_Produto')
+
+    def test_find_all_matches_brute_force(self):
+        """Testa o autômato contra a busca alias a alias em textos aleatórios"""
+        aliases = list(self.matcher.targets)
+        words = [word for alias in aliases for word in alias.split()] + ['de', 'vendas', 'x']
+        rng = random.Random(7)
+        for _ in range(300):
+            text = ' '.join(rng.choice(words) for _ in range(rng.randint(1, 12)))
+            expected = sorted(
+                (match.start(), -len(alias), alias)
+                for alias in aliases
+                for match in re.finditer(r'(?<!\w)(?=' + re.escape(alias) + r'(?!\w))', text)
+            )
+            found = [(hit.start, -(hit.end - hit.start), hit.alias) for hit in self.matcher.find_all(text)]
+            self.assertEqual(sorted(found), expected, text)
+
+    def test_normalize_query_terms_reuses_matcher(self):
+        """Testa o mapeamento de termos e a reconstrução apenas quando o mapeamento muda"""
+        normalizer = TextNormalizer()
+        result = normalizer.normalize_query_terms('Faturamento por Grupo Comercial', self.mapping)
+        self.assertEqual(result['mapped_terms'], {
+            'faturamento': {'original_alias': 'faturamento', 'mapped_column': 'Valor_Vendido'},
+            'grupo comercial': {'original_alias': 'grupo comercial', 'mapped_column': 'Cod_Grupo_Produto'}
+        })
+
+        matcher = normalizer.get_alias_matcher(self.mapping)
+        normalizer.normalize_query_terms('outra pergunta', self.mapping)
+        self.assertIs(normalizer.get_alias_matcher(self.mapping), matcher)
+        self.assertIsNot(normalizer.get_alias_matcher(dict(self.mapping)), matcher)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+"""
+Testes para o registro de aliases com recarga a quente
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# Adicionar src ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from alias_registry import AliasRegistry, get_alias_registry, reset_alias_registries
+from chatbot_agents import make_instructions
+from text_normalizer import load_alias_mapping
+from utils.turn_recorder import load_dataset
+
+
+FIXTURE_DATASET = os.path.join(os.path.dirname(__file__), 'fixtures', 'dados_comerciais_amostra.csv')
+
+ALIASES_V1 = """columns:
+  Municipio_Cliente:
+    - "Cidade"
+    - "município"
+  UF_Cliente:
+    - "estado"
+    - "Cidade"
+"""
+
+ALIASES_V2 = """columns:
+  Municipio_Cliente:
+    - "praça"
+"""
+
+
+class TestAliasRegistry(unittest.TestCase):
+    """Testes de compilação do snapshot e recarga quando o arquivo muda"""
+
+    def setUp(self):
+        reset_alias_registries()
+        self.tmp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmp_dir, 'alias.yaml')
+        self._write(ALIASES_V1)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+
+    def _write(self, content, bump=0):
+        with open(self.path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        stat = os.stat(self.path)
+        # Garante mtime distinto mesmo em sistemas de arquivos com baixa resolução
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + bump * 1_000_000_000))
+
+    def test_snapshot_indexes(self):
+        """Testa aliases normalizados, índice reverso e autômato do snapshot"""
+        snapshot = AliasRegistry(self.path, check_interval=0).snapshot()
+        self.assertEqual(snapshot.alias_columns['municipio'], ('Municipio_Cliente',))
+        self.assertEqual(snapshot.alias_columns['cidade'], ('Municipio_Cliente', 'UF_Cliente'))
+        self.assertEqual(snapshot.column_aliases['UF_Cliente'], ('estado', 'cidade'))
+        self.assertEqual([hit.alias for hit in snapshot.matcher.find('vendas por estado')], ['estado'])
+        with self.assertRaises(TypeError):
+            snapshot.mapping['UF_Cliente'] = ('uf',)
+
+    def test_reload_on_mtime_change(self):
+        """Testa nova versão apenas quando o arquivo muda e manutenção da anterior com YAML inválido"""
+        registry = AliasRegistry(self.path, check_interval=0)
+        first = registry.snapshot()
+        self.assertIs(registry.snapshot(), first)
+
+        self._write(ALIASES_V2, bump=1)
+        second = registry.snapshot()
+        self.assertEqual(second.version, first.version + 1)
+        self.assertEqual(dict(second.mapping), {'Municipio_Cliente': ('praça',)})
+
+        self._write("columns: [invalido", bump=2)
+        self.assertIs(registry.snapshot(), second)
+
+    def test_check_interval_throttles_stat(self):
+        """Testa que mudanças só são vistas após o intervalo de verificação"""
+        registry = AliasRegistry(self.path, check_interval=3600)
+        first = registry.snapshot()
+        self._write(ALIASES_V2, bump=1)
+        self.assertIs(registry.snapshot(), first)
+        self.assertTrue(registry.reload_if_changed())
+        self.assertEqual(registry.version, first.version + 1)
+
+    def test_load_alias_mapping_and_instructions_follow_registry(self):
+        """Testa load_alias_mapping via registro e prompt recriado a cada nova versão"""
+        registry = get_alias_registry(self.path)
+        registry.check_interval = 0
+        self.assertEqual(load_alias_mapping(self.path)['UF_Cliente'], ['estado', 'Cidade'])
+
+        df = load_dataset(FIXTURE_DATASET)
+        instructions = make_instructions(self.path, df, [], registry)
+        prompt = instructions()
+        self.assertIn("'estado'", prompt)
+        self.assertIs(instructions(), prompt)
+
+        self._write(ALIASES_V2, bump=1)
+        updated = instructions()
+        self.assertIn("'praça'", updated)
+        self.assertNotIn("'estado'", updated)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+"""
+Testes para o índice bitmap das colunas de filtro
+"""
+
+import unittest
+import sys
+import os
+
+# Adicionar src ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from filters.bitmap_index import BitmapIndex, get_bitmap_index, reset_bitmap_indexes
+from tools.debug_duckdb_tools import DebugDuckDbTools, EMPTY_QUERY_MESSAGE
+from utils.turn_recorder import load_dataset
+
+
+FIXTURE_DATASET = os.path.join(os.path.dirname(__file__), 'fixtures', 'dados_comerciais_amostra.csv')
+
+
+class _DebugHolder:
+    """Substituto mínimo do agente para receber debug_info"""
+
+    def __init__(self):
+        self.debug_info = {}
+        self._active_filter = None
+
+
+class TestBitmapIndex(unittest.TestCase):
+    """Contagens do índice contra o filtro equivalente em pandas"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.df = load_dataset(FIXTURE_DATASET)
+        cls.index = BitmapIndex(cls.df)
+
+    def test_columns_and_partial_month_are_exact(self):
+        """Testa AND entre colunas, OR dentro de listas e intervalo com meses parciais"""
+        count = self.index.count({
+            'UF_Cliente': 'sp',
+            'Des_Linha_Produto': ['PAPEL CARTAO', 'Rótulos Adesivos'],
+            'Data_>=': '2023-03-15',
+            'Data_<=': '2024-10-20',
+        })
+        df = self.df
+        mask = (
+            (df['UF_Cliente'] == 'SP')
+            & df['Des_Linha_Produto'].isin(['Papel Cartão', 'Rótulos Adesivos'])
+            & (df['Data'] >= '2023-03-15') & (df['Data'] < '2024-10-21')
+        )
+        self.assertGreater(mask.sum(), 0)
+        self.assertEqual(count, int(mask.sum()))
+
+    def test_or_expression(self):
+        """Testa expressão OR entre contextos"""
+        segment = self.df['Cod_Segmento_Cliente'].iloc[0]
+        count = self.index.count_expression(('or', [
+            {'UF_Cliente': 'SC'},
+            {'Cod_Segmento_Cliente': str(segment).lower(), 'Data_<': '2024-01-01'},
+        ]))
+        df = self.df
+        mask = (df['UF_Cliente'] == 'SC') | (
+            (df['Cod_Segmento_Cliente'] == segment) & (df['Data'] < '2024-01-01')
+        )
+        self.assertEqual(count, int(mask.sum()))
+
+    def test_unindexed_key_returns_none(self):
+        """Testa que chaves sem bitmap impedem a contagem exata"""
+        self.assertIsNone(self.index.count({'UF_Cliente': 'SP', 'Valor_Vendido_>': '100'}))
+        self.assertEqual(self.index.count({}), len(self.df))
+
+    def test_registry_reuses_index(self):
+        """Testa que o mesmo dataset reaproveita o índice construído"""
+        reset_bitmap_indexes()
+        self.assertIs(get_bitmap_index(self.df), get_bitmap_index(self.df.copy()))
+
+
+class TestEmptyQuerySkip(unittest.TestCase):
+    """Consultas com resultado vazio garantido não são executadas"""
+
+    def setUp(self):
+        self.holder = _DebugHolder()
+        self.tools = DebugDuckDbTools(debug_info_ref=self.holder)
+        self.tools.connection.register('_df', load_dataset(FIXTURE_DATASET))
+        self.tools.connection.execute("CREATE TABLE dados_comerciais AS SELECT * FROM _df")
+        self.tools.connection.unregister('_df')
+
+    def test_contradictory_filters_are_skipped(self):
+        """Testa que filtros incompatíveis (município fora da UF) evitam a execução"""
+        query = ("SELECT Cod_Cliente, Valor_Vendido FROM dados_comerciais "
+                 "WHERE UF_Cliente = 'SP' AND Municipio_Cliente = 'JOINVILLE'")
+        self.assertEqual(self.tools.run_query(query), EMPTY_QUERY_MESSAGE)
+        self.assertEqual(len(self.holder.debug_info["skipped_empty_queries"]), 1)
+
+    def test_mutating_sql_rebuilds_index(self):
+        """Testa que SQL que altera dados_comerciais descarta o índice antes da próxima verificação"""
+        query = "SELECT Cod_Cliente FROM dados_comerciais WHERE UF_Cliente = 'SP' AND Municipio_Cliente = 'JOINVILLE'"
+        self.assertEqual(self.tools.run_query(query), EMPTY_QUERY_MESSAGE)
+
+        self.tools.run_query(
+            "INSERT INTO dados_comerciais SELECT * REPLACE ('SP' AS UF_Cliente) "
+            "FROM dados_comerciais WHERE Municipio_Cliente = 'JOINVILLE' LIMIT 1"
+        )
+        self.assertNotEqual(self.tools.run_query(query), EMPTY_QUERY_MESSAGE)
+
+        self.tools.run_queries(["DELETE FROM dados_comerciais WHERE UF_Cliente = 'SP'"])
+        self.assertEqual(self.tools.run_query(query), EMPTY_QUERY_MESSAGE)
+
+    def test_non_empty_and_ineligible_queries_run(self):
+        """Testa que consultas com resultado ou fora do escopo do índice são executadas"""
+        result = self.tools.run_queries([
+            "SELECT COUNT(*) FROM dados_comerciais WHERE UF_Cliente = 'SC'",
+            "SELECT COUNT(*) FROM dados_comerciais WHERE Municipio_Cliente LIKE '%joinville%' AND UF_Cliente = 'SP'",
+        ])
+        self.assertNotIn(EMPTY_QUERY_MESSAGE, result)
+        self.assertNotIn("skipped_empty_queries", self.holder.debug_info)
+
+    def test_aggregates_always_run(self):
+        """Testa que COUNT/SUM (sempre uma linha) são executados mesmo com filtros incompatíveis"""
+        result = self.tools.run_query(
+            "SELECT COUNT(*) FROM dados_comerciais WHERE UF_Cliente = 'SP' AND Municipio_Cliente = 'JOINVILLE'"
+        )
+        self.assertNotEqual(result, EMPTY_QUERY_MESSAGE)
+        self.assertEqual(len(self.tools.last_result_df), 1)
+        self.assertNotIn("skipped_empty_queries", self.holder.debug_info)
+
+    def test_literal_type_mismatch_runs(self):
+        """Testa que constantes de outro tipo (conversão implícita) ou com horário não são avaliadas pelo índice"""
+        self.tools.connection.execute("UPDATE dados_comerciais SET Cod_Vendedor = '007' WHERE Cod_Vendedor = '300'")
+
+        for query in (
+            "SELECT * FROM dados_comerciais WHERE Cod_Vendedor = 7",
+            "SELECT * FROM dados_comerciais WHERE Data >= '2023-01-04' AND Data < '2023-01-04 10:00:00'",
+            "SELECT * FROM dados_comerciais WHERE Data >= DATE '2023-01-04' AND Data < TIMESTAMP '2023-01-04 10:00'",
+        ):
+            self.assertNotEqual(self.tools.run_query(query), EMPTY_QUERY_MESSAGE, query)
+            self.assertGreater(len(self.tools.last_result_df), 0, query)
+        self.assertNotIn("skipped_empty_queries", self.holder.debug_info)
+
+        # Mesmas colunas com constantes do tipo exato continuam verificadas pelo índice
+        self.assertEqual(
+            self.tools.run_query("SELECT * FROM dados_comerciais WHERE Cod_Vendedor = '7'"), EMPTY_QUERY_MESSAGE
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
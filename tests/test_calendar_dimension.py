@@ -0,0 +1,113 @@
+"""
+Testes para a dimensão calendário do dataset
+"""
+
+import os
+import sys
+import unittest
+
+import duckdb
+
+# Adicionar src ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from filters.calendar_dimension import (
+    CALENDAR_JOIN, NAMED_PERIOD_CONDITIONS, CalendarDimension, get_calendar_dimension, reset_calendar_dimensions
+)
+from filters.legacy.intelligent_filter_detector import IntelligentFilterDetector
+from temporal_engine import TemporalEngine
+from text_normalizer import TextNormalizer
+from utils.turn_recorder import load_dataset
+
+
+FIXTURE_DATASET = os.path.join(os.path.dirname(__file__), 'fixtures', 'dados_comerciais_amostra.csv')
+
+
+class TestCalendarDimension(unittest.TestCase):
+    """Testes dos períodos nomeados, da tabela calendario e dos resolvedores"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.df = load_dataset(FIXTURE_DATASET)
+        normalizer = TextNormalizer()
+        normalizer.set_dataset_context(cls.df)
+        cls.context = normalizer.dataset_context
+
+    def setUp(self):
+        reset_calendar_dimensions()
+
+    def test_named_periods(self):
+        """Testa períodos relativos a uma data máxima no meio do trimestre"""
+        calendar = CalendarDimension('2024-02-10', '2022-11-03')
+        expected = {
+            'current_month': ('2024-02-01', '2024-03-01'),
+            'previous_month': ('2024-01-01', '2024-02-01'),
+            'this_quarter': ('2024-01-01', '2024-04-01'),
+            'last_quarter': ('2023-10-01', '2024-01-01'),
+            'this_semester': ('2024-01-01', '2024-07-01'),
+            'last_semester': ('2023-07-01', '2024-01-01'),
+            'last_year': ('2023-01-01', '2024-01-01'),
+            'ytd': ('2024-01-01', '2024-03-01'),
+            'same_month_last_year': ('2023-02-01', '2023-03-01'),
+        }
+        for name, (start, end) in expected.items():
+            with self.subTest(period=name):
+                self.assertEqual(calendar.period(name).as_filters(), {'Data_>=': start, 'Data_<': end})
+        self.assertEqual(calendar.months(2).as_filters(), {'Data_>=': '2023-12-01', 'Data_<': '2024-03-01'})
+        self.assertEqual(str(calendar.end), '2024-02-11')
+
+    def test_table_matches_python_periods(self):
+        """Testa que a junção com calendario seleciona as mesmas linhas dos intervalos resolvidos no Python"""
+        calendar = get_calendar_dimension(self.df['Data'].max(), self.df['Data'].min())
+        frame = calendar.to_frame()
+        self.assertEqual(len(frame), 24)
+        self.assertEqual(frame['month_offset'].tolist(), list(range(23, -1, -1)))
+
+        connection = duckdb.connect()
+        connection.register('_df', self.df)
+        connection.execute("CREATE TABLE dados_comerciais AS SELECT * FROM _df")
+        calendar.register(connection)
+        join = CALENDAR_JOIN.format(date_column='d."Data"', alias='c')
+        for name in NAMED_PERIOD_CONDITIONS:
+            period = calendar.period(name)
+            with self.subTest(period=name):
+                via_calendar = connection.execute(
+                    f"SELECT COUNT(*) FROM dados_comerciais d JOIN calendario c ON {join} WHERE c.{period.condition}"
+                ).fetchone()[0]
+                via_range = connection.execute(
+                    'SELECT COUNT(*) FROM dados_comerciais WHERE "Data" >= ? AND "Data" < ?',
+                    [period.start, period.end]
+                ).fetchone()[0]
+                self.assertEqual(via_calendar, via_range)
+        connection.close()
+
+    def test_temporal_engine_resolves_calendar_periods(self):
+        """Testa trimestre passado e mesmo mês do ano anterior (antes tratado como último mês)"""
+        engine = TemporalEngine(self.context)
+        quarter = engine.parse('Faturamento do trimestre passado por UF')
+        self.assertEqual((quarter['Data_>='], quarter['Data_<']), ('2024-07-01', '2024-10-01'))
+        self.assertEqual(quarter['_temporal_metadata']['period'], 'last_quarter')
+
+        same_month = engine.parse('Compare com o mesmo mês do ano anterior')
+        self.assertEqual((same_month['Data_>='], same_month['Data_<']), ('2023-12-01', '2024-01-01'))
+        self.assertEqual(engine.structured('acumulado do ano')['periodo'], {'Data_>=': '2024-01-01', 'Data_<': '2025-01-01'})
+
+        # Sem contexto do dataset não há períodos relativos
+        self.assertEqual(TemporalEngine(None).parse('trimestre passado'), {})
+
+    def test_filter_detector_uses_calendar(self):
+        """Testa o detector legado resolvendo períodos pelo calendário"""
+        detector = IntelligentFilterDetector()
+        max_date = self.df['Data'].max()
+        self.assertEqual(
+            detector._detect_temporal_filters('vendas do semestre passado', max_date),
+            {'Data_>=': '2024-01-01', 'Data_<': '2024-07-01'}
+        )
+        self.assertEqual(
+            detector._detect_temporal_filters('vendas do mês passado', max_date),
+            {'Data_>=': '2024-11-01', 'Data_<': '2024-12-01'}
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
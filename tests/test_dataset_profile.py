@@ -0,0 +1,78 @@
+"""
+Testes para o perfil de colunas do dataset
+"""
+
+import os
+import sys
+import unittest
+
+import pandas as pd
+
+# Adicionar src ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from filters.dataset_profile import CODE, DATETIME, NUMERIC, OTHER, TEXT, DatasetProfile, get_dataset_profile, reset_dataset_profiles
+from text_normalizer import TextNormalizer
+from utils.turn_recorder import load_dataset
+
+
+FIXTURE_DATASET = os.path.join(os.path.dirname(__file__), 'fixtures', 'dados_comerciais_amostra.csv')
+
+
+class TestDatasetProfile(unittest.TestCase):
+    """Testes de classificação das colunas e reaproveitamento do perfil"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.df = load_dataset(FIXTURE_DATASET)
+
+    def setUp(self):
+        reset_dataset_profiles()
+
+    def test_fixture_classification(self):
+        """Testa texto, códigos numéricos em string, números e datas do dataset"""
+        profile = DatasetProfile(self.df)
+        self.assertEqual(profile.text_columns, [
+            'Empresa', 'UF_Cliente', 'Municipio_Cliente', 'Cod_Segmento_Cliente',
+            'Des_Linha_Produto', 'Cod_Regiao_Vendedor'
+        ])
+        self.assertEqual(profile.code_columns, [
+            'Cod_Cliente', 'Cod_Familia_Produto', 'Cod_Grupo_Produto',
+            'Cod_Linha_Produto', 'Cod_Produto', 'Cod_Vendedor'
+        ])
+        self.assertEqual(profile.kind('Valor_Vendido'), NUMERIC)
+        self.assertEqual(profile.kind('Data'), DATETIME)
+
+    def test_mixed_null_and_categorical_columns(self):
+        """Testa colunas com tipos mistos, só nulos e categóricas"""
+        df = pd.DataFrame({
+            'misto': ['Joinville', 10, 'Blumenau', None],
+            'nulos': [None, None, None, None],
+            'categoria': pd.Categorical(['SC', 'PR', 'SC', 'RS']),
+            'codigo': ['001', '002', '1.003', None],
+        })
+        profile = DatasetProfile(df)
+        self.assertEqual(profile.kind('misto'), TEXT)
+        self.assertIsNone(profile.columns['misto'].arrow_type)
+        self.assertEqual(profile.kind('nulos'), OTHER)
+        self.assertEqual(profile.kind('categoria'), TEXT)
+        self.assertEqual(profile.kind('codigo'), CODE)
+
+        # Poucos valores não numéricos: nem texto nem código
+        self.assertEqual(DatasetProfile(pd.DataFrame({'quase_codigo': ['1'] * 19 + ['x']})).kind('quase_codigo'), OTHER)
+
+    def test_normalizer_uses_cached_profile(self):
+        """Testa perfil compartilhado e códigos fora da normalização"""
+        normalizer = TextNormalizer()
+        self.assertEqual(normalizer.identify_text_columns(self.df), get_dataset_profile(self.df).text_columns)
+        self.assertIs(get_dataset_profile(self.df), get_dataset_profile(self.df.copy()))
+
+        df = self.df.copy()
+        df.loc[0, 'Cod_Produto'] = ' 5015 '
+        normalized = normalizer.normalize_dataframe(df, ['Municipio_Cliente', 'Cod_Produto'])
+        self.assertEqual(normalized.loc[0, 'Cod_Produto'], ' 5015 ')
+        self.assertEqual(normalized.loc[0, 'Municipio_Cliente'], 'niteroi')
+
+
+if __name__ == '__main__':
+    unittest.main()
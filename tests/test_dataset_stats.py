@@ -0,0 +1,74 @@
+"""
+Testes para as estatísticas de cardinalidade do dataset
+"""
+
+import unittest
+import sys
+import os
+
+# Adicionar src ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from filters.dataset_stats import DatasetStats, get_dataset_stats, reset_dataset_stats
+from utils.turn_recorder import load_dataset
+
+
+FIXTURE_DATASET = os.path.join(os.path.dirname(__file__), 'fixtures', 'dados_comerciais_amostra.csv')
+
+
+class TestDatasetStats(unittest.TestCase):
+    """Testes das estimativas contra os valores exatos calculados em pandas"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.df = load_dataset(FIXTURE_DATASET)
+        cls.stats = DatasetStats(cls.df)
+
+    def _assert_exact(self, estimate, mask):
+        self.assertTrue(estimate["exact"])
+        self.assertEqual(estimate["rows"], int(mask.sum()))
+        self.assertAlmostEqual(estimate["revenue"], self.df.loc[mask, 'Valor_Vendido'].sum(), places=6)
+
+    def test_single_column_is_exact_and_normalized(self):
+        """Testa contagem exata de uma coluna, sem diferenciar maiúsculas e acentos"""
+        estimate = self.stats.estimate({'Des_Linha_Produto': ['papel cartao', 'RÓTULOS ADESIVOS']})
+        mask = self.df['Des_Linha_Produto'].isin(['Papel Cartão', 'Rótulos Adesivos'])
+        self._assert_exact(estimate, mask)
+
+    def test_joint_pair_is_exact(self):
+        """Testa que pares com contagem conjunta não usam independência"""
+        estimate = self.stats.estimate({'UF_Cliente': 'SC', 'Des_Linha_Produto': 'Embalagens Flexíveis'})
+        mask = (self.df['UF_Cliente'] == 'SC') & (self.df['Des_Linha_Produto'] == 'Embalagens Flexíveis')
+        self._assert_exact(estimate, mask)
+
+    def test_full_month_range_is_exact(self):
+        """Testa o histograma mensal em intervalos de meses completos"""
+        estimate = self.stats.estimate({'Data_>=': '2024-01-01', 'Data_<': '2024-07-01'})
+        mask = (self.df['Data'] >= '2024-01-01') & (self.df['Data'] < '2024-07-01')
+        self._assert_exact(estimate, mask)
+
+    def test_independent_combination_is_flagged_as_estimate(self):
+        """Testa combinação por independência e chaves sem estatística"""
+        estimate = self.stats.estimate({'UF_Cliente': 'SP', 'Data_>=': '2024-01-01', 'periodo': 'livre'})
+        self.assertFalse(estimate["exact"])
+        self.assertEqual(estimate["ignored"], ['periodo'])
+        expected = (self.df['UF_Cliente'] == 'SP').mean() * (self.df['Data'] >= '2024-01-01').mean()
+        self.assertAlmostEqual(estimate["selectivity"], expected)
+
+    def test_ignored_filters_are_not_exact(self):
+        """Testa que chaves sem estatística ou datas inválidas impedem o resultado exato"""
+        for context in ({'UF_Cliente': 'SC', 'periodo': 'livre'},
+                        {'UF_Cliente': 'SC', 'Data_>=': 'inicio do ano'},
+                        {'UF_Cliente': 'SC', 'Data_ano': '2024'}):
+            estimate = self.stats.estimate(context)
+            self.assertFalse(estimate["exact"], context)
+            self.assertEqual(len(estimate["ignored"]), 1, context)
+
+    def test_registry_reuses_stats(self):
+        """Testa que o mesmo dataset reaproveita as estatísticas construídas"""
+        reset_dataset_stats()
+        self.assertIs(get_dataset_stats(self.df), get_dataset_stats(self.df.copy()))
+
+
+if __name__ == '__main__':
+    unittest.main()
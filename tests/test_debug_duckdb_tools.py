@@ -0,0 +1,63 @@
+"""
+Testes para o DebugDuckDbTools (execução única e consultas concorrentes)
+"""
+
+import unittest
+import sys
+import os
+
+# Adicionar src ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from agno.tools.duckdb import DuckDbTools
+from tools.debug_duckdb_tools import DebugDuckDbTools
+
+
+class _DebugHolder:
+    """Substituto mínimo do agente para receber debug_info"""
+
+    def __init__(self):
+        self.debug_info = {}
+
+
+class TestDebugDuckDbTools(unittest.TestCase):
+    """Testes para run_query e run_queries"""
+
+    def setUp(self):
+        self.holder = _DebugHolder()
+        self.tools = DebugDuckDbTools(debug_info_ref=self.holder)
+        self.tools.connection.execute(
+            "CREATE TABLE vendas AS SELECT range AS id, "
+            "CASE WHEN range % 2 = 0 THEN 'sp' ELSE 'rj' END AS UF_Cliente, "
+            "range * 10.0 AS Valor_Vendido FROM range(100)"
+        )
+
+    def test_run_query_matches_duckdb_tools_output(self):
+        """Testa que o texto retornado é idêntico ao do DuckDbTools original"""
+        query = "SELECT UF_Cliente, SUM(Valor_Vendido) AS total FROM vendas GROUP BY 1 ORDER BY 1"
+        expected = DuckDbTools(connection=self.tools.connection).run_query(query)
+
+        self.assertEqual(self.tools.run_query(query), expected)
+        self.assertEqual(list(self.tools.last_result_df.columns), ["UF_Cliente", "total"])
+        self.assertEqual(self.holder.debug_info["sql_queries"], [query])
+
+    def test_run_queries_keeps_call_order(self):
+        """Testa que resultados e debug_info seguem a ordem das chamadas"""
+        queries = [
+            "SELECT COUNT(*) FROM vendas WHERE UF_Cliente = 'SP'",
+            "SELECT MAX(id) FROM vendas",
+            "SELECT MIN(id) FROM vendas",
+        ]
+        result = self.tools.run_queries(queries)
+
+        sections = result.split("\n\n")
+        self.assertEqual(len(sections), 3)
+        self.assertTrue(sections[0].endswith("\n50"))
+        self.assertTrue(sections[1].endswith("\n99"))
+        self.assertTrue(sections[2].endswith("\n0"))
+        self.assertEqual(len(self.holder.debug_info["sql_queries"]), 3)
+        self.assertIn("LOWER(UF_Cliente)", self.holder.debug_info["sql_queries"][0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+"""
+Testes para o resolvedor aproximado de entidades (trigramas)
+"""
+
+import os
+import random
+import sys
+import unittest
+
+import pandas as pd
+
+# Adicionar src ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from filters.entity_resolver import EntityResolver, _trigrams, fuzzy_key, get_entity_resolver, reset_entity_resolvers
+from filters.json_filter_manager import JSONFilterManager
+
+
+def _jaccard_linear(query, key):
+    """Referência: Jaccard dos conjuntos de trigramas"""
+    a, b = _trigrams(fuzzy_key(query)), _trigrams(key)
+    return len(a & b) / len(a | b)
+
+
+class TestEntityResolver(unittest.TestCase):
+    """Testes de pontuação, resolução na pergunta e validação de filtros"""
+
+    def setUp(self):
+        reset_entity_resolvers()
+        self.df = pd.DataFrame({
+            'Municipio_Cliente': ['São José dos Campos', 'São José do Rio Preto', 'São Paulo', 'Joinville',
+                                  'SÃO PAULO', 'São Paulo', None],
+            'Des_Linha_Produto': ['Linha Premium', 'Papel Cartão', 'Rótulos Adesivos', 'Linha Econômica',
+                                  'Papel Cartão', 'Caixas de Papelão', 'Linha Premium'],
+        })
+
+    def test_misspelled_values(self):
+        """Testa nomes com erros de digitação e variações de caixa agrupadas"""
+        resolver = EntityResolver(self.df)
+        self.assertEqual(resolver.best('Municipio_Cliente', 'sao jose dos campo'), 'São José dos Campos')
+        self.assertEqual(resolver.resolve('linha premiun')[0].value, 'Linha Premium')
+        self.assertEqual(resolver.resolve('sao paulo'), [resolver.resolve('SAO PAULO')[0]])
+        self.assertEqual(resolver.resolve('sao paulo')[0].count, 3)
+        self.assertIsNone(resolver.best('Municipio_Cliente', 'xyz'))
+        self.assertEqual(resolver.resolve('joinville', column='Cod_Vendedor'), [])
+
+    def test_scores_match_linear_jaccard(self):
+        """Testa a pontuação vetorizada contra o Jaccard calculado valor a valor"""
+        rng = random.Random(42)
+        index = EntityResolver(self.df).indexes['Municipio_Cliente']
+        alphabet = 'saojepulcmirvd '
+        for _ in range(300):
+            query = ''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 20)))
+            if not fuzzy_key(query):
+                continue
+            scores = index.scores(fuzzy_key(query))
+            for slot, key in enumerate(index.keys):
+                self.assertAlmostEqual(scores[slot], _jaccard_linear(query, key), msg=query)
+
+    def test_resolve_question(self):
+        """Testa trechos da pergunta com erros, ignorando nomes corretos"""
+        resolver = EntityResolver(self.df)
+        resolved = resolver.resolve_question('Qual o faturamento de Sao Jose dos Campo na linha premiun em 2024?')
+        self.assertEqual(list(resolved), ['sao jose dos campo', 'linha premiun'])
+        self.assertEqual(resolved['linha premiun'][0].column, 'Des_Linha_Produto')
+        self.assertEqual(resolver.resolve_question('vendas de papel cartão em Joinville'), {})
+
+    def test_filter_validation_falls_back_to_trigrams(self):
+        """Testa validar_valores usando o resolvedor compartilhado quando a busca parcial falha"""
+        manager = JSONFilterManager(self.df)
+        self.assertEqual(
+            manager.validar_valores('Municipio_Cliente', ['sao jose dos campo'], 'regiao'),
+            ['São José dos Campos']
+        )
+        self.assertIs(get_entity_resolver(self.df), get_entity_resolver(self.df.copy()))
+
+
+if __name__ == '__main__':
+    unittest.main()
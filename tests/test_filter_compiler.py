@@ -0,0 +1,212 @@
+"""
+Testes para o compilador de filtros persistentes e a view dados_filtrados
+"""
+
+import threading
+import unittest
+import sys
+import os
+
+# Adicionar src ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import duckdb
+
+from filters.filter_compiler import FilteredView, compile_filter_context
+from filters.slice_cache import SliceCache
+from utils.turn_recorder import load_dataset
+
+
+FIXTURE_DATASET = os.path.join(os.path.dirname(__file__), 'fixtures', 'dados_comerciais_amostra.csv')
+
+
+class TestFilterCompiler(unittest.TestCase):
+    """Testes da compilação do contexto em predicado SQL"""
+
+    def setUp(self):
+        self.df = load_dataset(FIXTURE_DATASET)
+        self.connection = duckdb.connect()
+        self.connection.register('_df', self.df)
+        self.connection.execute("CREATE TABLE dados_comerciais AS SELECT * FROM _df")
+        self.connection.unregister('_df')
+        self.view = FilteredView(self.connection)
+
+    def tearDown(self):
+        self.connection.close()
+
+    def _count(self, table='dados_filtrados'):
+        return self.connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def test_predicate_is_parameterized(self):
+        """Testa cláusulas com placeholders, chaves ignoradas e ordem estável"""
+        compiled = compile_filter_context(
+            {'UF_Cliente': ['SP', 'SC'], 'Data_>=': '2024-01-01', 'periodo': '01/2024'},
+            self.view.column_types()
+        )
+        self.assertEqual(compiled.params, ['2024-01-01', 'SP', 'SC'])
+        self.assertEqual(compiled.predicate.count('?'), 3)
+        self.assertEqual(compiled.skipped, {'periodo': '01/2024'})
+
+        reordered = compile_filter_context(
+            {'Data_>=': '2024-01-01', 'UF_Cliente': ['SP', 'SC']}, self.view.column_types()
+        )
+        self.assertEqual(compiled.fingerprint, reordered.fingerprint)
+
+    def test_view_matches_pandas_filter(self):
+        """Testa que a view contém exatamente as linhas do filtro equivalente em pandas"""
+        context = {
+            'UF_Cliente': 'sp',
+            'Des_Linha_Produto': ['PAPEL CARTAO', "Rótulos Adesivos"],
+            'Data_>=': '2024-01-01',
+            'Data_<': '2025-01-01',
+        }
+        self.view.sync(context)
+
+        df = self.df
+        expected = df[
+            (df['UF_Cliente'] == 'SP')
+            & df['Des_Linha_Produto'].isin(['Papel Cartão', 'Rótulos Adesivos'])
+            & (df['Data'] >= '2024-01-01') & (df['Data'] < '2025-01-01')
+        ]
+        self.assertGreater(len(expected), 0)
+        self.assertEqual(self._count(), len(expected))
+
+    def test_view_rebuilt_only_when_context_changes(self):
+        """Testa que a view só é recriada quando o predicado muda"""
+        self.view.sync({'UF_Cliente': 'SC'})
+        self.view.sync({'UF_Cliente': 'SC'})
+        self.assertEqual(self.view.rebuilds, 1)
+
+        self.view.sync({})
+        self.assertEqual(self.view.rebuilds, 2)
+        self.assertEqual(self._count(), self._count('dados_comerciais'))
+
+    def test_view_visible_from_cursors_and_quotes_escaped(self):
+        """Testa visibilidade em cursores (run_queries) e valores com aspas"""
+        self.view.sync({'Municipio_Cliente': "D'Oeste"})
+        cursor = self.connection.cursor()
+        try:
+            self.assertEqual(cursor.execute("SELECT COUNT(*) FROM dados_filtrados").fetchone()[0], 0)
+        finally:
+            cursor.close()
+
+    def test_sync_without_base_table(self):
+        """Testa que sem a tabela base a view não é criada"""
+        view = FilteredView(duckdb.connect())
+        self.assertIsNone(view.sync({'UF_Cliente': 'SP'}))
+
+
+class TestSliceMaterialization(unittest.TestCase):
+    """Testes da fatia materializada para contextos estáveis"""
+
+    def setUp(self):
+        self.df = load_dataset(FIXTURE_DATASET)
+        self.cache = SliceCache(budget_bytes=10 ** 9)
+
+    def _connection(self):
+        connection = duckdb.connect()
+        connection.register('_df', self.df)
+        connection.execute("CREATE TABLE dados_comerciais AS SELECT * FROM _df")
+        connection.unregister('_df')
+        self.addCleanup(connection.close)
+        return connection
+
+    def _tables(self, connection):
+        return {row[0] for row in connection.execute("SELECT table_name FROM duckdb_tables()").fetchall()}
+
+    def test_materialized_after_stable_turns_and_dropped_on_change(self):
+        """Testa materialização após K turnos, mesmo resultado e descarte ao mudar filtros"""
+        connection = self._connection()
+        view = FilteredView(connection, materialize_after=3, slice_cache=self.cache)
+        context = {'UF_Cliente': 'SP', 'Data_>=': '2024-01-01'}
+        expected = int(((self.df['UF_Cliente'] == 'SP') & (self.df['Data'] >= '2024-01-01')).sum())
+
+        view.sync(context)
+        view.sync(context)
+        self.assertIsNone(view.slice_table)
+
+        view.sync(dict(context))
+        self.assertIn(view.slice_table, self._tables(connection))
+        self.assertEqual(connection.execute("SELECT COUNT(*) FROM dados_filtrados").fetchone()[0], expected)
+        self.assertEqual(self.cache.stats()["entries"], 1)
+
+        slice_table = view.slice_table
+        view.sync({'UF_Cliente': 'SC'})
+        self.assertIsNone(view.slice_table)
+        self.assertNotIn(slice_table, self._tables(connection))
+        self.assertEqual(self.cache.stats()["entries"], 0)
+        self.assertEqual(
+            connection.execute("SELECT COUNT(*) FROM dados_filtrados").fetchone()[0],
+            int((self.df['UF_Cliente'] == 'SC').sum())
+        )
+
+    def test_budget_evicts_least_recently_used_session(self):
+        """Testa que o orçamento global remove na hora a fatia da sessão menos recente"""
+        first_connection, second_connection = self._connection(), self._connection()
+        first = FilteredView(first_connection, materialize_after=2, slice_cache=self.cache)
+        first.sync({'UF_Cliente': 'SP'})
+        first.sync({'UF_Cliente': 'SP'})
+        evicted_table = first.slice_table
+        self.cache.budget_bytes = self.cache.stats()["used_bytes"]
+
+        second = FilteredView(second_connection, materialize_after=1, slice_cache=self.cache)
+        second.sync({'UF_Cliente': 'RJ'})
+
+        self.assertIsNotNone(second.slice_table)
+        self.assertEqual(self.cache.evictions, 1)
+        self.assertEqual(self.cache.stats()["entries"], 1)
+
+        # A sessão ociosa não mantém a tabela: a view volta para a tabela base
+        self.assertIsNone(first.slice_table)
+        self.assertNotIn(evicted_table, self._tables(first_connection))
+        expected = int((self.df['UF_Cliente'] == 'SP').sum())
+        self.assertEqual(first_connection.execute("SELECT COUNT(*) FROM dados_filtrados").fetchone()[0], expected)
+
+    def test_release_while_view_is_busy_is_deferred(self):
+        """Testa que a liberação durante um sync do dono fica pendente e não bloqueia"""
+        view = FilteredView(self._connection(), materialize_after=2, slice_cache=self.cache)
+        view.sync({'UF_Cliente': 'SP'})
+        view.sync({'UF_Cliente': 'SP'})
+        slice_table = view.slice_table
+
+        locked, done = threading.Event(), threading.Event()
+
+        def hold_lock():
+            with view._lock:
+                locked.set()
+                done.wait(5)
+
+        holder = threading.Thread(target=hold_lock)
+        holder.start()
+        locked.wait(5)
+        view._release_slice()
+        self.assertEqual(view.slice_table, slice_table)
+        done.set()
+        holder.join()
+
+        view.sync({'UF_Cliente': 'SP'})
+        self.assertIsNone(view.slice_table)
+        self.assertNotIn(slice_table, self._tables(view.connection))
+
+    def test_slice_size_is_measured(self):
+        """Testa que o tamanho registrado acompanha o texto real da fatia"""
+        connection = self._connection()
+        connection.execute("UPDATE dados_comerciais SET Des_Linha_Produto = repeat(Des_Linha_Produto, 200)")
+        view = FilteredView(connection, materialize_after=1, slice_cache=self.cache)
+        view.sync({'UF_Cliente': 'SP'})
+
+        text_bytes = connection.execute(
+            "SELECT SUM(strlen(Des_Linha_Produto)) FROM dados_filtrados"
+        ).fetchone()[0]
+        self.assertGreaterEqual(self.cache.stats()["used_bytes"], text_bytes)
+
+    def test_empty_context_is_not_materialized(self):
+        """Testa que a view sem filtros nunca é materializada"""
+        view = FilteredView(self._connection(), materialize_after=1, slice_cache=self.cache)
+        view.sync({})
+        view.sync({})
+        self.assertIsNone(view.slice_table)
+
+
+if __name__ == '__main__':
+    unittest.main()
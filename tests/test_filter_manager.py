@@ -0,0 +1,45 @@
+"""
+Testes para os controles de filtros da sidebar (Streamlit)
+"""
+
+import importlib.util
+import os
+import sys
+import unittest
+
+# Adicionar src ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+
+def _interactive_filter_app():
+    """Script Streamlit mínimo que desenha os controles interativos"""
+    import os
+    import sys
+
+    sys.path.insert(0, os.environ['FILTER_MANAGER_SRC'])
+    from filters.filter_manager import create_interactive_filter_manager
+
+    context = {'UF_Cliente': 'SP', 'Data_>=': '2024-01-01', 'Data_<': '2024-02-01'}
+    create_interactive_filter_manager(context)
+    create_interactive_filter_manager(context, key_suffix='_v2')
+
+
+@unittest.skipUnless(importlib.util.find_spec('streamlit'), 'streamlit não instalado')
+class TestInteractiveFilterManager(unittest.TestCase):
+    """Testes de renderização dos controles interativos"""
+
+    def test_renders_controls_with_and_without_suffix(self):
+        """Testa que os controles são desenhados duas vezes sem colisão de chaves"""
+        from streamlit.testing.v1 import AppTest
+
+        os.environ['FILTER_MANAGER_SRC'] = os.path.join(os.path.dirname(__file__), '..', 'src')
+        app = AppTest.from_function(_interactive_filter_app).run()
+
+        self.assertFalse(app.exception)
+        keys = [checkbox.key for checkbox in app.checkbox]
+        self.assertEqual(len(keys), 4)
+        self.assertIn('checkbox_UF_Cliente:SP_v2', keys)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+"""
+Testes para o estado versionado dos filtros
+"""
+
+import unittest
+import sys
+import os
+
+# Adicionar src ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from filters.filter_state import FilterChange, FilterState
+
+
+class TestFilterState(unittest.TestCase):
+    """Testes de versão, diferenças e assinantes"""
+
+    def setUp(self):
+        self.state = FilterState({'UF_Cliente': 'SP', 'Data_>=': '2024-01-01'})
+        self.events = []
+        self.state.subscribe('teste', lambda state, changes: self.events.append((state.version, changes)))
+
+    def test_replace_produces_structural_diff(self):
+        """Testa adicionados, removidos e modificados calculados na mutação"""
+        changes = self.state.replace({'UF_Cliente': 'SC', 'Municipio_Cliente': 'JOINVILLE'})
+
+        self.assertEqual(sorted(changes), sorted([
+            FilterChange('removed', 'Data_>=', '2024-01-01', None),
+            FilterChange('modified', 'UF_Cliente', 'SP', 'SC'),
+            FilterChange('added', 'Municipio_Cliente', None, 'JOINVILLE'),
+        ]))
+        self.assertEqual(self.state.version, 1)
+        self.assertEqual(self.state.snapshot(), {'UF_Cliente': 'SC', 'Municipio_Cliente': 'JOINVILLE'})
+        self.assertEqual(self.events, [(1, changes)])
+
+    def test_noop_mutations_keep_version(self):
+        """Testa que mutações sem efeito não geram versão nem eventos"""
+        self.assertEqual(self.state.replace({'Data_>=': '2024-01-01', 'UF_Cliente': 'SP'}), [])
+        self.assertEqual(self.state.set('UF_Cliente', 'SP'), [])
+        self.assertEqual(self.state.remove('Cod_Vendedor'), [])
+        self.assertEqual(self.state.version, 0)
+        self.assertEqual(self.events, [])
+
+    def test_snapshot_is_isolated(self):
+        """Testa que alterar o snapshot não altera o estado"""
+        snapshot = self.state.snapshot()
+        snapshot['UF_Cliente'] = 'RJ'
+        self.assertEqual(self.state.get('UF_Cliente'), 'SP')
+
+    def test_changes_since_and_subscriber_replacement(self):
+        """Testa o histórico incremental e a substituição de assinantes pelo nome"""
+        self.state.set('Cod_Vendedor', '10')
+        self.state.subscribe('teste', lambda state, changes: None)
+        self.state.remove('UF_Cliente')
+
+        self.assertEqual(len(self.events), 1)
+        self.assertEqual(
+            [change.kind for change in self.state.changes_since(0)], ['added', 'removed']
+        )
+        self.assertEqual(self.state.changes_since(2), [])
+
+        short = FilterState(history_size=1)
+        short.set('a', 1)
+        short.set('b', 2)
+        self.assertIsNone(short.changes_since(0))
+
+
+if __name__ == '__main__':
+    unittest.main()
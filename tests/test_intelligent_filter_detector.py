@@ -0,0 +1,85 @@
+"""
+Testes para as famílias de padrões compiladas do IntelligentFilterDetector
+"""
+
+import os
+import random
+import re
+import sys
+import unittest
+
+import pandas as pd
+
+# Adicionar src ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from filters.legacy.intelligent_filter_detector import (
+    GEOGRAPHIC_PATTERNS, TEMPORAL_PATTERNS, WORD_START, IntelligentFilterDetector
+)
+
+
+def _first_linear(family, text):
+    """Referência: re.search padrão a padrão, na ordem da tabela"""
+    for pattern, value in family.entries:
+        match = re.search(f"{WORD_START}(?:{pattern})", text, family.flags)
+        if match:
+            return value, match.groups()
+    return None
+
+
+class TestIntelligentFilterDetector(unittest.TestCase):
+    """Testes de equivalência com a busca padrão a padrão e de limites de palavra"""
+
+    def setUp(self):
+        self.detector = IntelligentFilterDetector()
+        self.max_date = pd.Timestamp('2024-12-24')
+
+    def test_families_match_linear_search(self):
+        """Testa o primeiro padrão de cada família contra a busca padrão a padrão"""
+        rng = random.Random(3)
+        words = ['em', 'sp', 'são paulo', 'rj', 'cidade de joinville', 'município de blumenau,', 'jan',
+                 'março', 'mar', 'de 2024', 'últimos 3 meses', 'último ano', 'mês passado', 'neste mês',
+                 'semestre anterior', 'sem', 'apenas', 'todos exceto', 'sem filtros', 'consulta geral',
+                 'especiais', 'embalagens', 'mais', 'clientes', 'pb', 'p.e.', 'df', 'ytd', 'remover filtro']
+        texts = [" ".join(rng.choice(words) for _ in range(rng.randint(1, 8))) for _ in range(500)]
+
+        for name, family in IntelligentFilterDetector.compiled_families().items():
+            for text in texts:
+                self.assertEqual(family.first(text), _first_linear(family, text), f"{name}: {text}")
+                self.assertEqual(family.any(text), _first_linear(family, text) is not None)
+
+    def test_table_order_wins_over_text_position(self):
+        """Testa que vale o padrão de maior prioridade, não a primeira ocorrência no texto"""
+        families = IntelligentFilterDetector.compiled_families()
+        self.assertEqual(families['temporal'].first('mês passado e janeiro'), ('01', ()))
+        self.assertEqual(families['temporal'].first('nos últimos 6 meses'), ('last_n_months', ('6',)))
+        self.assertEqual(families['geographic'].first('cidade de joinville em sp'), ('SP', ()))
+        self.assertEqual(families['geographic'].first('na cidade de joinville, sc'), ('cidade', ('joinville',)))
+        self.assertEqual(len(families['temporal'].entries), len(TEMPORAL_PATTERNS))
+        self.assertEqual(len(families['geographic'].entries), len(GEOGRAPHIC_PATTERNS))
+
+    def test_word_boundaries(self):
+        """Testa que siglas e palavras curtas não casam dentro de outras palavras"""
+        detect = lambda text: self.detector.detect_filters_from_text(text, max_date=self.max_date)
+
+        self.assertEqual(detect('vendas especiais de embalagens'), {})
+        self.assertNotIn('_filter_mode', detect('faturamento no semestre anterior'))
+        self.assertEqual(detect('clientes com mais de 2023'),
+                         {'Data_>=': '2023-01-01', 'Data_<': '2024-01-01'})
+        self.assertEqual(detect('vendas em SP')['UF_Cliente'], 'SP')
+        self.assertEqual(detect('vendas em S.P.')['UF_Cliente'], 'SP')
+        self.assertEqual(detect('vendas em março de 2024'),
+                         {'Data_>=': '2024-03-01', 'Data_<': '2024-04-01'})
+        self.assertEqual(detect('vendas neste mês'), {'Data_>=': '2024-12-01'})
+        self.assertEqual(detect('sem SP')['_filter_mode'], 'exclude')
+        self.assertEqual(detect('pode limpar filtros'), {'clear_all_filters': True})
+
+    def test_families_compiled_once(self):
+        """Testa que as famílias compiladas são compartilhadas entre instâncias"""
+        other = IntelligentFilterDetector()
+        self.assertIs(self.detector.families, other.families)
+        self.assertIs(other.families, IntelligentFilterDetector.compiled_families())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+"""
+Testes para o registro de índices por dataset e gerenciadores por sessão
+"""
+
+import unittest
+import sys
+import os
+
+# Adicionar src ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pandas as pd
+
+from filters.json_filter_manager import (
+    MAX_GERENCIADORES_SESSAO,
+    calcular_fingerprint_dataset,
+    get_json_filter_manager,
+    obter_indices_validacao,
+    reset_filter_index_registry,
+    reset_json_filter_manager
+)
+
+
+class TestFilterManagerRegistry(unittest.TestCase):
+    """Testes para get_json_filter_manager com fingerprint do dataset"""
+
+    def setUp(self):
+        reset_json_filter_manager()
+        reset_filter_index_registry()
+        self.df = pd.DataFrame({
+            'UF_Cliente': ['SP', 'SC', 'RJ'],
+            'Municipio_Cliente': ['sao paulo', 'joinville', 'niteroi'],
+        })
+
+    def test_indexes_are_built_once_per_dataset(self):
+        """Testa que cópias idênticas do dataset compartilham os mesmos índices"""
+        fp1, indices1 = obter_indices_validacao(self.df)
+        fp2, indices2 = obter_indices_validacao(self.df.copy())
+
+        self.assertEqual(fp1, fp2)
+        self.assertIs(indices1, indices2)
+        with self.assertRaises(TypeError):
+            indices1['UF_Cliente'] = None
+
+    def test_reloaded_dataset_gets_fresh_indexes(self):
+        """Testa que um dataset alterado não reutiliza valores válidos antigos"""
+        manager = get_json_filter_manager(self.df)
+        df_novo = self.df.copy()
+        df_novo.loc[len(df_novo)] = ['PR', 'curitiba']
+
+        manager_novo = get_json_filter_manager(df_novo)
+
+        self.assertIsNot(manager, manager_novo)
+        self.assertNotEqual(calcular_fingerprint_dataset(self.df), calcular_fingerprint_dataset(df_novo))
+        self.assertIn('PR', manager_novo.valores_validos['UF_Cliente'])
+        self.assertNotIn('PR', manager.valores_validos['UF_Cliente'])
+
+    def test_fingerprint_covers_rows_outside_sample(self):
+        """Testa que alterações fora da amostra de linhas mudam o fingerprint"""
+        df = pd.DataFrame({'UF_Cliente': ['SP'] * 10000, 'Valor_Vendido': range(10000)})
+        df_novo = df.copy()
+        df_novo.loc[5, 'UF_Cliente'] = 'SC'
+
+        self.assertEqual(calcular_fingerprint_dataset(df), calcular_fingerprint_dataset(df.copy()))
+        self.assertNotEqual(calcular_fingerprint_dataset(df), calcular_fingerprint_dataset(df_novo))
+
+        # Mesmo objeto com linhas acrescentadas: a assinatura muda e o hash é refeito
+        fingerprint = calcular_fingerprint_dataset(df_novo)
+        df_novo.loc[len(df_novo)] = ['PR', 10000]
+        self.assertNotEqual(calcular_fingerprint_dataset(df_novo), fingerprint)
+
+    def test_session_managers_are_bounded(self):
+        """Testa que os gerenciadores por sessão são descartados em ordem LRU"""
+        primeiro = get_json_filter_manager(self.df, session_id='s0')
+        recente = get_json_filter_manager(self.df, session_id='s1')
+        for i in range(2, MAX_GERENCIADORES_SESSAO + 1):
+            if i == MAX_GERENCIADORES_SESSAO:
+                self.assertIs(recente, get_json_filter_manager(self.df, session_id='s1'))
+            get_json_filter_manager(self.df, session_id=f's{i}')
+
+        self.assertIs(recente, get_json_filter_manager(self.df, session_id='s1'))
+        self.assertIsNot(primeiro, get_json_filter_manager(self.df, session_id='s0'))
+
+    def test_sessions_do_not_share_filter_state(self):
+        """Testa que filtros persistentes são isolados por sessão"""
+        manager_a = get_json_filter_manager(self.df, session_id='a')
+        manager_b = get_json_filter_manager(self.df, session_id='b')
+        manager_a.sincronizar_com_contexto_agente({'UF_Cliente': 'SP'})
+
+        self.assertIs(manager_a, get_json_filter_manager(self.df, session_id='a'))
+        self.assertIs(manager_a.indices_validacao, manager_b.indices_validacao)
+        self.assertEqual(manager_b.obter_contexto_para_agente(), {})
+
+        reset_json_filter_manager('a')
+        self.assertIsNot(manager_a, get_json_filter_manager(self.df, session_id='a'))
+        self.assertIs(manager_b, get_json_filter_manager(self.df, session_id='b'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+"""
+Testes para a camada compartilhada de queries SQL analisadas
+"""
+
+import os
+import sys
+import unittest
+
+# Adicionar src ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from parsers.parsed_query import (
+    HAVING, WHERE, get_parsed_query, parsed_query_cache_stats, reset_parsed_queries
+)
+from parsers.legacy.sql_context_parser import extract_context_with_metadata
+from filters.legacy.unified_filter_core import SQLFilterExtractor
+
+
+QUERY = """
+SELECT UF_Cliente, SUM(Valor_Vendido)
+FROM (SELECT * FROM dados WHERE Data >= '2024-01-01'
+      AND Cod_Cliente IN (SELECT Cod_Cliente FROM clientes WHERE Cod_Segmento_Cliente = 'VAREJO')) sub
+WHERE UF_Cliente = 'SP' AND (Des_Linha_Produto = 'Papel Cartão' OR LOWER(Municipio_Cliente) LIKE 'joinville')
+GROUP BY UF_Cliente
+HAVING UF_Cliente <> 'RJ' AND ano >= '2023'
+ORDER BY 2 DESC
+LIMIT 5
+"""
+
+
+class TestParsedQuery(unittest.TestCase):
+    """Testes de cláusulas por escopo, cache e uso pelos parsers legados"""
+
+    def setUp(self):
+        reset_parsed_queries()
+
+    def test_clauses_by_scope(self):
+        """Testa WHERE/HAVING da consulta externa e das subconsultas em uma travessia"""
+        parsed = get_parsed_query(QUERY)
+
+        self.assertTrue(parsed.valid)
+        self.assertEqual(parsed.subquery_count, 2)
+        self.assertTrue(parsed.has_having)
+        self.assertEqual(sorted((c.kind, c.depth) for c in parsed.clauses),
+                         [(HAVING, 0), (WHERE, 0), (WHERE, 1), (WHERE, 2)])
+        self.assertEqual(
+            [(p.column, p.operator, p.value) for p in parsed.where_predicates],
+            [('uf_cliente', '=', 'SP'), ('des_linha_produto', '=', 'Papel Cartão')]
+        )
+        self.assertEqual([(p.column, p.operator) for p in parsed.having_predicates], [('ano', '>=')])
+        self.assertEqual(
+            sorted((p.column, p.depth) for p in parsed.subquery_predicates),
+            [('cod_segmento_cliente', 2), ('data', 1)]
+        )
+        # O texto das subconsultas não é repetido na cláusula que as contém
+        inner = next(c for c in parsed.clauses if c.depth == 1)
+        self.assertNotIn('VAREJO', inner.text)
+        self.assertIn('VAREJO', inner.source)
+
+    def test_parse_memoized_per_query_text(self):
+        """Testa que o mesmo texto reaproveita a mesma análise"""
+        first = get_parsed_query(QUERY)
+        self.assertIs(get_parsed_query(QUERY), first)
+        self.assertEqual(parsed_query_cache_stats()['hits'], 1)
+        self.assertFalse(get_parsed_query('   ').valid)
+
+    def test_legacy_extractor_uses_all_scopes(self):
+        """Testa o extrator do UnifiedFilterManager sobre a query analisada"""
+        filters = SQLFilterExtractor().extract_filters_from_sql(QUERY)
+        self.assertEqual(
+            {f.filter_id for f in filters},
+            {'uf_cliente:SP', 'des_linha_produto:Papel Cartão', 'ano:2023', 'data:2024-01-01',
+             'cod_segmento_cliente:VAREJO'}
+        )
+        self.assertTrue(all(f.source == 'sql' for f in filters))
+
+        # Texto sem comando: fallback regex
+        self.assertEqual(SQLFilterExtractor().extract_filters_from_sql(''), [])
+
+    def test_context_parser_reuses_parse(self):
+        """Testa extract_context_with_metadata sobre a mesma análise"""
+        sql = ("SELECT Des_Linha_Produto, SUM(Valor_Vendido) FROM dados WHERE UF_Cliente = 'SP' "
+               "AND Data >= '2024-01-01' AND Data < '2024-02-01' GROUP BY Des_Linha_Produto "
+               "HAVING SUM(Valor_Vendido) > 100 LIMIT 5")
+        result = extract_context_with_metadata(sql)
+
+        self.assertEqual(result['filters']['UF_Cliente'], 'SP')
+        self.assertEqual(result['filters']['Periodo'], '01/2024')
+        self.assertTrue(result['metadata']['has_having_clause'])
+        self.assertEqual(result['metadata']['limit'], 5)
+        self.assertNotIn('subquery_count', result['metadata'])
+
+        extract_context_with_metadata(sql)
+        self.assertEqual(parsed_query_cache_stats()['misses'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
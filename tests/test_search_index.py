@@ -0,0 +1,84 @@
+"""
+Testes para o índice de busca vetorizado
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+import pandas as pd
+
+# Adicionar src ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from search_index import load_search_index, save_search_index
+from text_normalizer import TextNormalizer
+from utils.turn_recorder import load_dataset
+
+
+FIXTURE_DATASET = os.path.join(os.path.dirname(__file__), 'fixtures', 'dados_comerciais_amostra.csv')
+
+
+def row_by_row_index(normalizer, df, columns):
+    """Construção original, linha a linha, usada como referência"""
+    index = {}
+    for col in columns:
+        index[col] = {}
+        for position, value in enumerate(df[col]):
+            normalized_value = normalizer.normalize_text(value)
+            if normalized_value:
+                index[col].setdefault(normalized_value, []).append(position)
+    return index
+
+
+class TestSearchIndex(unittest.TestCase):
+    """Testes de equivalência com a construção linha a linha e de persistência"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.normalizer = TextNormalizer()
+        cls.df = load_dataset(FIXTURE_DATASET)
+        cls.columns = cls.normalizer.identify_text_columns(cls.df)
+
+    def test_matches_row_by_row_construction(self):
+        """Testa postings iguais às da construção original, em int32"""
+        index = self.normalizer.create_search_index(self.df, self.columns)
+        expected = row_by_row_index(self.normalizer, self.df, self.columns)
+        self.assertEqual(set(index), set(expected))
+        for col in expected:
+            self.assertEqual({value: postings.tolist() for value, postings in index[col].items()}, expected[col])
+            self.assertEqual(index[col].positions.dtype, np.int32)
+
+    def test_groups_variants_and_skips_empty(self):
+        """Testa variações de caixa/acento no mesmo valor e nulos/vazios fora do índice"""
+        df = pd.DataFrame({'Cidade': ['Joinville', None, 'JOINVILLE ', '  ', 'Florianópolis', 'florianopolis']})
+        postings = self.normalizer.create_search_index(df, ['Cidade'])['Cidade']
+        self.assertEqual(dict((value, rows.tolist()) for value, rows in postings.items()),
+                         {'florianopolis': [4, 5], 'joinville': [0, 2]})
+        self.assertNotIn('', postings)
+
+        categorical = df.astype({'Cidade': 'category'})
+        postings = self.normalizer.create_search_index(categorical, ['Cidade'])['Cidade']
+        self.assertEqual(postings['joinville'].tolist(), [0, 2])
+
+    def test_save_and_load_memory_mapped(self):
+        """Testa persistência em .npy e leitura via memory-map"""
+        index = self.normalizer.create_search_index(self.df, self.columns)
+        directory = tempfile.mkdtemp()
+        try:
+            save_search_index(index, directory)
+            loaded = load_search_index(directory)
+            self.assertEqual(list(loaded), list(index))
+            for col in index:
+                self.assertIsInstance(loaded[col].positions, np.memmap)
+                for value in index[col]:
+                    np.testing.assert_array_equal(loaded[col][value], index[col][value])
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+"""
+Testes para a extração de filtros SQL (árvore sintática e cache)
+"""
+
+import unittest
+import sys
+import os
+
+# Adicionar src ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from filters.sql_filter_extractor import (
+    SQLFilterExtractor,
+    get_sql_filter_extractor,
+    get_extraction_cache_stats,
+    reset_sql_filter_extractor,
+)
+from filters.sql_ast_extractor import extract_where_conditions_ast
+
+
+QUERY = (
+    "SELECT Municipio_Cliente, SUM(Valor_Vendido) FROM dados_comerciais "
+    "WHERE LOWER(UF_Cliente) = 'sc' AND Data >= '2024-01-01' AND Data < '2025-01-01' "
+    "GROUP BY Municipio_Cliente"
+)
+
+
+class TestExtractionCache(unittest.TestCase):
+    """Testes do cache LRU por query normalizada"""
+
+    def setUp(self):
+        reset_sql_filter_extractor()
+
+    def test_whitespace_variants_hit_cache(self):
+        """Testa que variações de espaço da mesma query reutilizam a extração"""
+        extractor = get_sql_filter_extractor()
+        first = extractor.extract_filters_from_sql(QUERY)
+        second = extractor.extract_filters_from_sql("  " + QUERY.replace(" AND ", "\n   AND  ") + "\n")
+
+        self.assertEqual(first, second)
+        stats = get_extraction_cache_stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hits"], 1)
+        self.assertEqual(stats["size"], 1)
+        self.assertAlmostEqual(stats["hit_rate"], 0.5)
+
+    def test_cached_result_is_isolated(self):
+        """Testa que alterar o resultado devolvido não contamina o cache"""
+        extractor = get_sql_filter_extractor()
+        first = extractor.extract_filters_from_sql(QUERY)
+        expected = SQLFilterExtractor()._extract_filters_uncached(
+            SQLFilterExtractor.WHITESPACE_PATTERN.sub(' ', QUERY.strip())
+        )
+        self.assertEqual(first, expected)
+
+        first["regiao"]["UF_Cliente"] = "XX"
+        first.clear()
+
+        self.assertEqual(extractor.extract_filters_from_sql(QUERY), expected)
+
+    def test_singleton_and_reset(self):
+        """Testa o singleton do extrator e a limpeza do cache no reset"""
+        extractor = get_sql_filter_extractor()
+        self.assertIs(extractor, get_sql_filter_extractor())
+        extractor.extract_filters_from_sql(QUERY)
+
+        reset_sql_filter_extractor()
+        self.assertIsNot(extractor, get_sql_filter_extractor())
+        self.assertEqual(get_extraction_cache_stats()["size"], 0)
+
+
+class TestASTExtraction(unittest.TestCase):
+    """Testes da extração de condições via json_serialize_sql do DuckDB"""
+
+    def test_simple_query_matches_regex_extraction(self):
+        """Testa que queries simples produzem as mesmas condições do extrator por regex"""
+        extractor = SQLFilterExtractor()
+        self.assertEqual(extract_where_conditions_ast(QUERY), extractor._extract_where_conditions_regex(QUERY))
+
+    def test_cte_or_groups_and_exclusions(self):
+        """Testa CTEs, colunas qualificadas, grupos OR e NOT IN"""
+        query = (
+            "WITH base AS (SELECT * FROM dados_comerciais d "
+            "WHERE LOWER(d.UF_Cliente) IN ('sp', 'sc') AND Data BETWEEN DATE '2024-01-01' AND '2024-03-31') "
+            "SELECT * FROM base WHERE (Municipio_Cliente = 'JOINVILLE' OR Municipio_Cliente = 'BLUMENAU') "
+            "AND Cod_Cliente NOT IN ('9') AND NOT (Cod_Vendedor = '1') AND Cod_Vendedor <> '2'"
+        )
+        self.assertEqual(extract_where_conditions_ast(query), {
+            'UF_Cliente': ['SP', 'SC'],
+            'Data_>=': '2024-01-01',
+            'Data_<=': '2024-03-31',
+            'Municipio_Cliente': ['JOINVILLE', 'BLUMENAU'],
+        })
+
+    def test_mixed_or_and_predicate_subqueries_are_ignored(self):
+        """Testa que OR entre colunas e subqueries de predicado não viram filtros"""
+        query = (
+            "SELECT SUM(Valor_Vendido) FROM dados_comerciais WHERE YEAR(Data) = 2024 "
+            "AND (UF_Cliente = 'SP' OR Cod_Vendedor = '1') "
+            "AND Cod_Cliente IN (SELECT Cod_Cliente FROM dados_comerciais WHERE Des_Linha_Produto = 'X')"
+        )
+        self.assertEqual(extract_where_conditions_ast(query), {'Data_>=': '2024-01-01', 'Data_<': '2025-01-01'})
+
+    def test_unparseable_query_falls_back_to_regex(self):
+        """Testa o fallback por regex quando o parser rejeita a query"""
+        query = "SELECT * FROM dados_comerciais WHERE UF_Cliente = 'SP' AND"
+        self.assertIsNone(extract_where_conditions_ast(query))
+        filters = SQLFilterExtractor()._extract_filters_uncached(query)
+        self.assertEqual(filters['regiao']['UF_Cliente'], 'SP')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+Testes para o motor de expressões temporais
+"""
+
+import itertools
+import unittest
+import sys
+import os
+
+# Adicionar src e o parser original (fixture de referência) ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'fixtures'))
+
+from legacy_temporal_parser import LegacyTemporalParser
+from temporal_engine import TemporalEngine, get_temporal_engine, reset_temporal_engines
+from text_normalizer import TextNormalizer
+from utils.turn_recorder import load_dataset
+
+
+FIXTURE_DATASET = os.path.join(os.path.dirname(__file__), 'fixtures', 'dados_comerciais_amostra.csv')
+
+PERIODS = [
+    'em {mes} de {ano}', '{mes} {ano}', '{mes}/{ano}', 'no {mes} de {ano}', 'durante {mes} de {ano}',
+    'entre {mes} e {mes2} de {ano}', 'entre {mes}/{ano} e {mes2}/2024', 'de {mes} a {mes2} de {ano}',
+    'entre os períodos de {mes} e {mes2} de {ano}', 'do periodo de {mes} a {mes2} de {ano}',
+    'período de {mes}/{ano} a {mes2}/{ano}', 'em {ano}', 'no ano de {ano}', 'no período de {ano}',
+    'no último mês', 'dados do mes passado', 'mais recente período de vendas',
+    'últimos 3 meses', 'nos ultimos 2 anos', 'últimos 10 dias', 'ultimos 2 trimestres', '',
+]
+MONTHS = ['julho', 'dez', 'marco', 'Março', 'vendas', 'set']
+QUESTIONS = ['Faturamento {p}', 'Top clientes de {p} em Joinville', 'Compare {p} com {p}']
+
+
+def corpus():
+    for question, period, mes, mes2 in itertools.product(QUESTIONS, PERIODS, MONTHS, MONTHS[:3]):
+        yield question.format(p=period.format(mes=mes, mes2=mes2, ano='2023'))
+    yield 'vendas de maio de 2023 e julho de 2024'  # duas ocorrências da mesma família
+    yield 'entre vendas e clientes de 2023 em março/2024'  # intervalo com meses inválidos
+
+
+class TestTemporalEngine(unittest.TestCase):
+    """Testes de equivalência com o parser original e do cache"""
+
+    @classmethod
+    def setUpClass(cls):
+        normalizer = TextNormalizer()
+        normalizer.set_dataset_context(load_dataset(FIXTURE_DATASET))
+        cls.context = normalizer.dataset_context
+
+    def setUp(self):
+        reset_temporal_engines()
+
+    def test_equivalent_to_legacy_parser(self):
+        """Testa resultados idênticos ao parser original, com e sem contexto do dataset"""
+        for context in (None, self.context):
+            legacy = LegacyTemporalParser(context)
+            engine = TemporalEngine(context)
+            for text in corpus():
+                with self.subTest(text=text, context=bool(context)):
+                    self.assertEqual(engine.parse(text), legacy.parse_temporal_entities(text))
+                    self.assertEqual(engine.structured(text), legacy.get_structured_temporal_data(text))
+
+    def test_relative_period_uses_dataset_max_date(self):
+        """Testa 'últimos 3 meses' a partir da última data do dataset"""
+        result = TemporalEngine(self.context).parse('Faturamento dos últimos 3 meses')
+        self.assertEqual(result['Data_>='], '2024-09-01')
+        self.assertEqual(result['Data_<'], '2025-01-01')
+
+    def test_cache_returns_independent_copies(self):
+        """Testa acerto de cache por pergunta normalizada e cópias independentes"""
+        engine = TemporalEngine(self.context, cache_size=2)
+        first = engine.parse('Vendas em Julho de 2023')
+        first['_temporal_metadata']['month_number'] = 99
+        second = engine.parse('  vendas em julho de 2023 ')
+        self.assertEqual(second['_temporal_metadata']['month_number'], 7)
+        self.assertEqual(engine.cache_stats()['hits'], 1)
+
+        engine.parse('em 2023')
+        engine.parse('em 2024')
+        self.assertEqual(engine.cache_stats()['size'], 2)
+
+    def test_normalizer_shares_engine_per_dataset(self):
+        """Testa que normalizadores do mesmo dataset compartilham o motor"""
+        normalizer = TextNormalizer()
+        normalizer.dataset_context = self.context
+        self.assertEqual(normalizer.get_structured_temporal_data('julho/2023'), {"periodo": {"mes": "07", "ano": "2023"}})
+        self.assertIs(normalizer._temporal_engine(), get_temporal_engine(dict(self.context)))
+        self.assertIsNot(TextNormalizer()._temporal_engine(), normalizer._temporal_engine())
+
+
+if __name__ == '__main__':
+    unittest.main()
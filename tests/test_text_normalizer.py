@@ -0,0 +1,62 @@
+"""
+Testes para a normalização de texto em lote
+"""
+
+import os
+import random
+import sys
+import unittest
+
+import pandas as pd
+
+# Adicionar src ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from text_normalizer import TextNormalizer
+from utils.turn_recorder import load_dataset
+
+
+FIXTURE_DATASET = os.path.join(os.path.dirname(__file__), 'fixtures', 'dados_comerciais_amostra.csv')
+
+# ASCII, Latin-1, Latin Extended, marcas combinantes, grego, vietnamita, espaços Unicode e CJK
+CHARACTER_POOL = (
+    [chr(code) for code in list(range(0x00, 0x7f)) + list(range(0x80, 0x250)) + list(range(0x300, 0x370))]
+    + [chr(code) for code in list(range(0x391, 0x3ca)) + list(range(0x1ea0, 0x1efa))]
+    + ['\u2003', '\u3000', '\u0085', '\u00a0', '\u1dc0', '\u4e2d'] + [' '] * 40
+)
+
+
+class TestNormalizeMany(unittest.TestCase):
+    """Testes de equivalência entre normalize_many e normalize_text"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.normalizer = TextNormalizer()
+
+    def assert_equivalent(self, values):
+        self.assertEqual(self.normalizer.normalize_many(values), [self.normalizer.normalize_text(v) for v in values])
+
+    def test_random_unicode_batches(self):
+        """Testa lotes aleatórios com acentos, marcas avulsas e espaços Unicode"""
+        rng = random.Random(11)
+        for _ in range(500):
+            batch = [''.join(rng.choice(CHARACTER_POOL) for _ in range(rng.randint(0, 10)))
+                     for _ in range(rng.randint(0, 20))]
+            self.assert_equivalent(batch)
+
+    def test_edge_values(self):
+        """Testa nulos, não-strings, separador interno e espaços expostos pela remoção de acentos"""
+        self.assert_equivalent([None, float('nan'), pd.NA, 42, 3.5, '', '   ', 'a\x00b',
+                                ' \u0301x\u0301 ', '\u0301', '\u039f\u0394\u039f\u03a3 \u03a3'])
+        self.assertEqual(self.normalizer.normalize_many([]), [])
+
+    def test_dataset_columns(self):
+        """Testa as colunas de texto do dataset e normalize_column"""
+        df = load_dataset(FIXTURE_DATASET)
+        for col in self.normalizer.identify_text_columns(df):
+            expected = df[col].apply(self.normalizer.normalize_text)
+            pd.testing.assert_series_equal(self.normalizer.normalize_column(df[col]), expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,98 @@
+"""
+Testes para a memoização por turno de chamadas de ferramentas
+"""
+
+import unittest
+import sys
+import os
+
+# Adicionar src ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from tools.tool_memo import ToolCallMemo
+
+
+class TestToolCallMemo(unittest.TestCase):
+    """Testes para o ToolCallMemo"""
+
+    def setUp(self):
+        self.memo = ToolCallMemo()
+        self.hook = self.memo.as_tool_hook()
+        self.calls = []
+
+    def _run_query(self, query):
+        self.calls.append(query)
+        return f"resultado de {query}"
+
+    def test_repeated_sql_is_served_from_cache(self):
+        """Testa que a mesma SQL (com espaços diferentes) executa uma única vez"""
+        first = self.hook("run_query", self._run_query, {"query": "SELECT *\n  FROM dados;"})
+        second = self.hook("run_query", self._run_query, {"query": "SELECT * FROM dados"})
+
+        self.assertEqual(first, second)
+        self.assertEqual(len(self.calls), 1)
+        self.assertEqual(self.memo.stats()["hits"], 1)
+
+    def test_different_arguments_are_not_shared(self):
+        """Testa que argumentos distintos geram execuções distintas"""
+        self.hook("run_query", self._run_query, {"query": "SELECT 1"})
+        self.hook("run_query", self._run_query, {"query": "SELECT 2"})
+
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(self.memo.stats()["hits"], 0)
+
+    def test_whitespace_inside_literals_is_preserved(self):
+        """Testa que espaços dentro de literais distinguem as queries"""
+        self.hook("run_query", self._run_query, {"query": "SELECT * FROM dados WHERE cidade = 'São  Paulo'"})
+        self.hook("run_query", self._run_query, {"query": "SELECT * FROM dados WHERE cidade = 'São Paulo'"})
+        self.hook("run_query", self._run_query, {"query": "SELECT *  FROM dados WHERE cidade = 'São Paulo'"})
+
+        self.assertEqual(len(self.calls), 2)
+        self.assertEqual(self.memo.stats()["hits"], 1)
+
+    def test_only_read_only_query_tools_are_memoized(self):
+        """Testa que ferramentas fora da lista (ex.: Python, calculadora) sempre executam"""
+        calls = []
+
+        def add(a, b):
+            calls.append((a, b))
+            return a + b
+
+        for _ in range(2):
+            self.assertEqual(self.hook("add", add, {"a": 1, "b": 2}), 3)
+
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(self.memo.stats()["entries"], 0)
+
+    def test_mutating_sql_is_never_cached(self):
+        """Testa que statements que alteram estado sempre executam e invalidam o cache"""
+        self.hook("run_query", self._run_query, {"query": "SELECT COUNT(*) FROM t"})
+        for _ in range(2):
+            self.hook("run_query", self._run_query, {"query": "CREATE TABLE t AS SELECT 1"})
+        self.hook("run_queries", lambda queries: "ok", {"queries": ["SELECT 1", "INSERT INTO t VALUES (2)"]})
+        self.hook("run_query", self._run_query, {"query": "SELECT COUNT(*) FROM t"})
+
+        self.assertEqual(len(self.calls), 4)
+        self.assertEqual(self.memo.stats()["hits"], 0)
+
+        # Palavras-chave dentro de literais não tornam a query mutável
+        self.hook("run_query", self._run_query, {"query": "SELECT 'DROP TABLE t'"})
+        self.hook("run_query", self._run_query, {"query": "SELECT 'DROP TABLE t'"})
+        self.assertEqual(self.memo.stats()["hits"], 1)
+
+    def test_clear_and_hit_callback(self):
+        """Testa limpeza entre turnos e callback de restauração no hit"""
+        restored = []
+        self.memo.register_hit_callback("run_query", restored.append)
+
+        self.hook("run_query", self._run_query, {"query": "SELECT 1"})
+        self.hook("run_query", self._run_query, {"query": "SELECT 1"})
+        self.assertEqual(restored, [{"query": "SELECT 1"}])
+
+        self.memo.clear()
+        self.hook("run_query", self._run_query, {"query": "SELECT 1"})
+        self.assertEqual(len(self.calls), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
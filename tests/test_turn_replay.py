@@ -0,0 +1,52 @@
+"""
+Testes de replay de turnos gravados (regressão das etapas não-LLM)
+"""
+
+import unittest
+import glob
+import tempfile
+import sys
+import os
+
+# Adicionar src ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.turn_recorder import load_dataset, load_fixture, replay_turn
+from utils.turn_telemetry import get_telemetry_log, reset_telemetry_log
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+SAMPLE_DATASET = os.path.join(FIXTURES_DIR, 'dados_comerciais_amostra.csv')
+
+
+class TestTurnReplay(unittest.TestCase):
+    """Reexecuta cada fixture em tests/fixtures/turns e compara com a gravação"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.df = load_dataset(SAMPLE_DATASET)
+        cls.fixture_paths = sorted(glob.glob(os.path.join(FIXTURES_DIR, 'turns', '*.json')))
+
+    def setUp(self):
+        # Telemetria dos turnos reexecutados vai para um arquivo temporário, não para o log real
+        reset_telemetry_log()
+        get_telemetry_log(os.path.join(tempfile.mkdtemp(), "turn_metrics.jsonl"))
+
+    def tearDown(self):
+        reset_telemetry_log()
+
+    def test_fixtures_exist(self):
+        """Garante que há turnos gravados para o replay"""
+        self.assertGreater(len(self.fixture_paths), 0)
+
+    def test_replay_matches_recording(self):
+        """Testa que ferramentas, SQL, filtros e visualização reproduzem a gravação"""
+        for path in self.fixture_paths:
+            with self.subTest(fixture=os.path.basename(path)):
+                report = replay_turn(load_fixture(path), df=self.df)
+                self.assertTrue(report["matches"], f"Divergências: {report['mismatches']}")
+                for stage in ("agent_run", "filter_extraction", "visualization", "tools"):
+                    self.assertIn(stage, report["stage_times"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+"""
+Testes para a telemetria por turno usando o modelo mock (sem OpenAI)
+"""
+
+import unittest
+import tempfile
+import sys
+import os
+
+# Adicionar src ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pandas as pd
+from agno.tools.calculator import CalculatorTools
+from agno.tools.duckdb import DuckDbTools
+from agno.tools.reasoning import ReasoningTools
+
+from chatbot_agents import PrincipalAgent
+from models.mock_model import MockModel
+from text_normalizer import TextNormalizer
+from utils.turn_telemetry import get_telemetry_log, reset_telemetry_log
+
+
+def create_mock_agent(script):
+    """Cria um PrincipalAgent pequeno movido pelo MockModel"""
+    df = pd.DataFrame({'UF_Cliente': ['sp', 'rj'], 'Valor_Vendido': [10.0, 20.0]})
+    return PrincipalAgent(
+        normalizer=TextNormalizer(),
+        alias_mapping={},
+        df_normalized=df,
+        text_columns=['UF_Cliente'],
+        session_user_id="teste",
+        model=MockModel(script=script),
+        tools=[ReasoningTools(add_instructions=True), CalculatorTools(), DuckDbTools()],
+    )
+
+
+class TestTurnTelemetry(unittest.TestCase):
+    """Testes para a coleta de telemetria em PrincipalAgent.run"""
+
+    def setUp(self):
+        self.log_path = os.path.join(tempfile.mkdtemp(), "turn_metrics.jsonl")
+        reset_telemetry_log()
+        get_telemetry_log(self.log_path)
+
+    def tearDown(self):
+        reset_telemetry_log()
+
+    def test_scripted_turn_records_tools_and_tokens(self):
+        """Testa que ferramentas roteirizadas são contadas por tipo"""
+        agent = create_mock_agent([
+            {"tool_calls": [
+                {"name": "run_query", "arguments": {"query": "SELECT 42 AS total"}},
+                {"name": "add", "arguments": {"a": 1, "b": 2}},
+            ]},
+            {"content": "O total é 42."}
+        ])
+
+        response = agent.run("Qual o total?")
+        telemetry = agent.debug_info["telemetry"]
+
+        self.assertEqual(response.content, "O total é 42.")
+        self.assertEqual(telemetry["tool_calls_total"], 2)
+        self.assertEqual(telemetry["tools_by_type"]["DebugDuckDbTools"]["calls"], 1)
+        self.assertEqual(telemetry["tools_by_type"]["calculator"]["calls"], 1)
+        self.assertEqual(telemetry["model_requests"], 2)
+        self.assertGreater(telemetry["input_tokens"], 0)
+        self.assertGreater(telemetry["output_tokens"], 0)
+
+    def test_records_are_appended_to_jsonl(self):
+        """Testa que cada turno gera uma linha no log JSONL"""
+        agent = create_mock_agent([{"content": "ok"}])
+        agent.run("primeira")
+        agent.run("segunda")
+
+        records = get_telemetry_log().read_all()
+        self.assertEqual([r["prompt"] for r in records], ["primeira", "segunda"])
+
+    def test_repeated_query_is_memoized_within_turn(self):
+        """Testa que a SQL repetida no turno é servida pela memoização"""
+        agent = create_mock_agent([
+            {"tool_calls": [{"name": "run_query", "arguments": {"query": "SELECT 42 AS total"}}]},
+            {"tool_calls": [{"name": "run_query", "arguments": {"query": "SELECT 42  AS total;"}}]},
+            {"content": "ok"}
+        ])
+
+        agent.clear_execution_state()
+        agent.run("Qual o total?")
+        telemetry = agent.debug_info["telemetry"]
+
+        self.assertEqual(telemetry["tool_calls_total"], 2)
+        self.assertEqual(telemetry["tool_memo"]["hits"], 1)
+        self.assertEqual(int(agent.duckdb_tool_ref.last_result_df.iloc[0, 0]), 42)
+
+    def test_memoized_empty_query_keeps_latest_result(self):
+        """Testa que o acerto de uma query vazia não restaura o DataFrame de outra query"""
+        empty_query = "SELECT 1 AS x WHERE false"
+        agent = create_mock_agent([
+            {"tool_calls": [{"name": "run_query", "arguments": {"query": "SELECT 42 AS total"}}]},
+            {"tool_calls": [{"name": "run_query", "arguments": {"query": empty_query}}]},
+            {"tool_calls": [{"name": "run_query", "arguments": {"query": "SELECT 7 AS total"}}]},
+            {"tool_calls": [{"name": "run_query", "arguments": {"query": empty_query}}]},
+            {"content": "ok"}
+        ])
+
+        agent.clear_execution_state()
+        agent.run("Qual o total?")
+
+        self.assertEqual(agent.debug_info["telemetry"]["tool_memo"]["hits"], 1)
+        self.assertEqual(int(agent.duckdb_tool_ref.last_result_df.iloc[0, 0]), 7)
+
+    def test_run_queries_counts_each_miss_once(self):
+        """Testa que as consultas internas de run_queries não duplicam as falhas do cache"""
+        agent = create_mock_agent([
+            {"tool_calls": [{"name": "run_queries", "arguments": {"queries": ["SELECT 1 AS a", "SELECT 2 AS b"]}}]},
+            {"tool_calls": [{"name": "run_query", "arguments": {"query": "SELECT 1 AS a"}}]},
+            {"content": "ok"}
+        ])
+
+        agent.clear_execution_state()
+        agent.run("Compare")
+        memo_stats = agent.debug_info["telemetry"]["tool_memo"]
+
+        self.assertEqual(memo_stats["misses"], 1)
+        self.assertEqual(memo_stats["hits"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -11,11 +11,10 @@ import os
 # Adicionar src ao path para imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from filters.unified_filter_core import (
+from filters.legacy.unified_filter_core import (
     FilterState,
     FilterDefinition,
     FilterCategory,
-    FilterAction,
     SQLFilterExtractor,
     ContextSynchronizer,
     UnifiedFilterManager,
@@ -0,0 +1,84 @@
+"""
+Testes para o autocomplete de valores de filtro
+"""
+
+import unittest
+import sys
+import os
+
+import pandas as pd
+
+# Adicionar src ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from filters.value_autocomplete import (
+    MAX_HINT_MATCHES, ValueAutocomplete, get_value_autocomplete, reset_value_autocompletes
+)
+from utils.turn_recorder import load_dataset
+
+
+FIXTURE_DATASET = os.path.join(os.path.dirname(__file__), 'fixtures', 'dados_comerciais_amostra.csv')
+
+
+class TestValueAutocomplete(unittest.TestCase):
+    """Testes de completação por prefixo e resolução de termos parciais"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.df = load_dataset(FIXTURE_DATASET)
+        cls.autocomplete = ValueAutocomplete(cls.df)
+
+    def test_prefix_ignores_case_and_accents(self):
+        """Testa prefixo sem acentos e em minúsculas"""
+        completions = self.autocomplete.complete('florian', column='Municipio_Cliente')
+        self.assertEqual([c.value for c in completions], ['Florianópolis'])
+        self.assertEqual(completions[0].count, int((self.df['Municipio_Cliente'] == 'Florianópolis').sum()))
+
+    def test_word_prefix_and_frequency_order(self):
+        """Testa prefixo no meio do valor e ordenação pela frequência"""
+        self.assertIn('Papel Cartão', [c.value for c in self.autocomplete.complete('cart')])
+
+        completions = self.autocomplete.complete('S', column='UF_Cliente', k=5)
+        expected = self.df['UF_Cliente'].value_counts()
+        expected = expected[expected.index.str.startswith('S')]
+        self.assertEqual([c.value for c in completions], expected.index.tolist())
+        self.assertEqual([c.count for c in completions], expected.tolist())
+
+    def test_top_k_across_columns(self):
+        """Testa o limite k e a ordenação entre colunas"""
+        completions = self.autocomplete.complete('s', k=2)
+        self.assertEqual(len(completions), 2)
+        self.assertGreaterEqual(completions[0].count, completions[1].count)
+        self.assertEqual(self.autocomplete.complete('zzzz'), [])
+
+    def test_resolve_partial_entities(self):
+        """Testa resolução de termos parciais, ignorando palavras completas"""
+        resolved = self.autocomplete.resolve_partial_entities('Faturamento de joinv e de Blumenau em 2024')
+        self.assertEqual(list(resolved), ['joinv'])
+        self.assertEqual(resolved['joinv'][0].value, 'Joinville')
+
+    def test_common_question_words_are_not_hints(self):
+        """Testa que palavras comuns da pergunta não viram nomes parciais ('para' -> Paranaguá)"""
+        cities = ['Curitiba'] * 50 + ['Paranaguá'] * 20 + ['Totalândia'] * 20 + ['Qualópolis'] * 20
+        autocomplete = ValueAutocomplete(pd.DataFrame({'Municipio_Cliente': cities}))
+
+        self.assertEqual(autocomplete.resolve_partial_entities('Qual o total de vendas para Curitiba'), {})
+        self.assertEqual(autocomplete.resolve_partial_entities('vendas em parana')['parana'][0].value, 'Paranaguá')
+
+    def test_rare_and_unselective_completions_are_dropped(self):
+        """Testa frequência mínima do valor e limite de valores por termo"""
+        cities = ['Joinville'] * 2000 + ['Joinvilinha'] + [f'Santa Cidade {i}' for i in range(MAX_HINT_MATCHES + 1)]
+        autocomplete = ValueAutocomplete(pd.DataFrame({'Municipio_Cliente': cities}))
+
+        resolved = autocomplete.resolve_partial_entities('vendas de joinv e de sant')
+        self.assertEqual(list(resolved), ['joinv'])
+        self.assertEqual([c.value for c in resolved['joinv']], ['Joinville'])
+
+    def test_registry_reuses_autocomplete(self):
+        """Testa que o mesmo dataset reaproveita o índice construído"""
+        reset_value_autocompletes()
+        self.assertIs(get_value_autocomplete(self.df), get_value_autocomplete(self.df.copy()))
+
+
+if __name__ == '__main__':
+    unittest.main()
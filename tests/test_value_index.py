@@ -0,0 +1,66 @@
+"""
+Testes para o índice de validação de valores do JSONFilterManager
+"""
+
+import unittest
+import random
+import sys
+import os
+
+# Adicionar src ao path para imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import pandas as pd
+
+from filters.value_index import ColumnValueIndex
+from filters.json_filter_manager import JSONFilterManager
+
+
+def _fuzzy_linear(valor, validos_str):
+    """Implementação original (varredura linear) usada como referência"""
+    matches = [v for v in validos_str if valor.upper() in v.upper() or v.upper() in valor.upper()]
+    return matches[0] if matches else None
+
+
+class TestColumnValueIndex(unittest.TestCase):
+    """Testes de equivalência com a validação linear original"""
+
+    def test_fuzzy_matches_linear_scan(self):
+        """Testa que o fuzzy indexado devolve o mesmo primeiro match da varredura linear"""
+        rng = random.Random(42)
+        alphabet = "abcsãoJ "
+        values = sorted({''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 8))) for _ in range(400)})
+        index = ColumnValueIndex(values)
+
+        queries = [''.join(rng.choice(alphabet) for _ in range(rng.randint(1, 12))) for _ in range(500)]
+        for query in queries:
+            self.assertEqual(index.fuzzy_match(query), _fuzzy_linear(query, values), query)
+
+    def test_exact_uses_string_representation(self):
+        """Testa validação exata sobre valores não-string (códigos numéricos)"""
+        index = ColumnValueIndex([1001, 1002, 2003])
+        self.assertTrue(index.contains("1002"))
+        self.assertFalse(index.contains("999"))
+        self.assertEqual(index.fuzzy_match("200"), "2003")
+
+
+class TestValidarValores(unittest.TestCase):
+    """Testes para JSONFilterManager.validar_valores com índices"""
+
+    def setUp(self):
+        df = pd.DataFrame({
+            'Municipio_Cliente': ['joinville', 'sao paulo', 'sao jose', None],
+            'Cod_Cliente': ['1001', '1002', '1003', '1004'],
+        })
+        self.manager = JSONFilterManager(df)
+
+    def test_exact_then_fuzzy(self):
+        """Testa exato, fallback fuzzy e campos permissivos"""
+        self.assertEqual(self.manager.validar_valores('Cod_Cliente', ['1002', '9'], 'cliente'), ['1002'])
+        self.assertEqual(self.manager.validar_valores('Municipio_Cliente', ['SAO'], 'regiao'), ['sao paulo'])
+        self.assertEqual(self.manager.validar_valores('Municipio_Cliente', ['xyz'], 'regiao'), [])
+        self.assertEqual(self.manager.validar_valores('Data', ['2024-01'], 'periodo'), ['2024-01'])
+
+
+if __name__ == '__main__':
+    unittest.main()